@@ -0,0 +1,48 @@
+"""Composite and covering indexes for hot query shapes
+
+Tables are created by Base.metadata.create_all, which also creates these
+indexes on new databases; this migration adds them to existing ones and
+skips any index that is already present.
+
+Revision ID: 0001_hot_query_indexes
+Revises:
+Create Date: 2026-10-17 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_hot_query_indexes"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns, PostgreSQL INCLUDE columns)
+INDEXES = [
+    ("ix_inventory_product_id", "inventory", ["product_id"],
+     ["quantity", "reserved_quantity", "available_quantity"]),
+    ("ix_stock_movements_created_at_id", "stock_movements", ["created_at", "id"], None),
+    ("ix_stock_movements_product_created_at_id", "stock_movements", ["product_id", "created_at", "id"], None),
+    ("ix_stock_movements_type_created_at_id", "stock_movements", ["movement_type", "created_at", "id"], None),
+    ("ix_stock_movements_reference_created_at_id", "stock_movements", ["reference_type", "created_at", "id"], None),
+    ("ix_sales_history_product_sale_date", "sales_history", ["product_id", "sale_date"], ["quantity_sold"]),
+    ("ix_demand_forecasts_product_forecast_date", "demand_forecasts", ["product_id", "forecast_date"], None),
+    ("ix_outbound_orders_status_created_at", "outbound_orders", ["status", "created_at"], None),
+    ("ix_inbound_shipments_status_created_at", "inbound_shipments", ["status", "created_at"], None),
+    ("ix_chat_messages_session_created_at", "chat_messages", ["session_id", "created_at"], None),
+]
+
+def _existing_indexes(table_name):
+    inspector = sa.inspect(op.get_bind())
+    return {index["name"] for index in inspector.get_indexes(table_name)}
+
+def upgrade():
+    for name, table_name, columns, include in INDEXES:
+        if name in _existing_indexes(table_name):
+            continue
+        options = {"postgresql_include": include} if include else {}
+        op.create_index(name, table_name, columns, **options)
+
+def downgrade():
+    for name, table_name, _, _ in reversed(INDEXES):
+        if name in _existing_indexes(table_name):
+            op.drop_index(name, table_name=table_name)
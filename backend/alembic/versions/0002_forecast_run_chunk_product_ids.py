@@ -0,0 +1,37 @@
+"""Product ids planned into each forecast run chunk
+
+New databases get the column from Base.metadata.create_all; this migration
+adds it to existing forecast_run_chunks tables. Chunks planned before it
+keep a NULL list and forecast every product in their id range.
+
+Revision ID: 0002_forecast_run_chunk_product_ids
+Revises: 0001_hot_query_indexes
+Create Date: 2026-10-17 12:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_forecast_run_chunk_product_ids"
+down_revision = "0001_hot_query_indexes"
+branch_labels = None
+depends_on = None
+
+TABLE = "forecast_run_chunks"
+COLUMN = "product_ids"
+
+def _existing_columns():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(TABLE):
+        return None
+    return {column["name"] for column in inspector.get_columns(TABLE)}
+
+def upgrade():
+    columns = _existing_columns()
+    if columns is not None and COLUMN not in columns:
+        op.add_column(TABLE, sa.Column(COLUMN, sa.JSON(), nullable=True))
+
+def downgrade():
+    columns = _existing_columns()
+    if columns is not None and COLUMN in columns:
+        with op.batch_alter_table(TABLE) as batch:
+            batch.drop_column(COLUMN)
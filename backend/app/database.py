@@ -1,28 +1,181 @@
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, MetaData, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from contextlib import contextmanager
+from typing import Dict, Optional
 import os
+import logging
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Worker threads when the engine's pool does not bound its connections
+DEFAULT_THREADPOOL_SIZE = 40
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+def get_sqlite_pragmas() -> Dict[str, str]:
+    """SQLite pragmas applied to every new connection (override with SQLITE_* env vars)"""
+    return {
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "cache_size": str(_env_int("SQLITE_CACHE_SIZE", -64000)),  # negative = KiB, so 64 MB
+        "mmap_size": str(_env_int("SQLITE_MMAP_SIZE", 268435456)),
+        "busy_timeout": str(_env_int("SQLITE_BUSY_TIMEOUT_MS", 30000)),
+    }
+
+def get_postgres_pool_options() -> Dict:
+    """PostgreSQL pool settings (override with DB_POOL_* / DB_STATEMENT_TIMEOUT_MS env vars)"""
+    return {
+        "pool_size": _env_int("DB_POOL_SIZE", 10),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 20),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+        "statement_timeout_ms": _env_int("DB_STATEMENT_TIMEOUT_MS", 30000),
+    }
+
+def _sqlite_pragmas_for(database_url: str, sqlite_pragmas: Optional[Dict[str, str]]) -> Dict[str, str]:
+    pragmas = get_sqlite_pragmas() if sqlite_pragmas is None else dict(sqlite_pragmas)
+    if ":memory:" in database_url or "mode=memory" in database_url or database_url.endswith("://"):
+        # In-memory databases have no journal file to put in WAL mode
+        pragmas.pop("journal_mode", None)
+    return pragmas
+
+def _install_sqlite_pragmas(sync_engine, pragmas: Dict[str, str]):
+    if not pragmas:
+        return
+    
+    @event.listens_for(sync_engine, "connect")
+    def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+def create_database_engine(database_url: str, sqlite_pragmas: Optional[Dict[str, str]] = None,
+                           pool_options: Optional[Dict] = None, **engine_kwargs):
+    """
+    Create an engine tuned for its backend.
+
+    SQLite connections get a busy timeout and the given pragmas (WAL journal,
+    synchronous, cache and mmap sizes by default). PostgreSQL gets a sized,
+    pre-pinged, recycled pool and a server-side statement timeout.
+    Pass an empty dict to skip the tuning.
+    """
+    if database_url.startswith("sqlite"):
+        pragmas = _sqlite_pragmas_for(database_url, sqlite_pragmas)
+        connect_args = {"check_same_thread": False}
+        if "busy_timeout" in pragmas:
+            connect_args["timeout"] = int(pragmas["busy_timeout"]) / 1000
+        connect_args.update(engine_kwargs.pop("connect_args", {}))
+        engine = create_engine(database_url, connect_args=connect_args, **engine_kwargs)
+        _install_sqlite_pragmas(engine, pragmas)
+        return engine
+    
+    options = get_postgres_pool_options() if pool_options is None else dict(pool_options)
+    connect_args = dict(engine_kwargs.pop("connect_args", {}))
+    statement_timeout_ms = options.pop("statement_timeout_ms", None)
+    if statement_timeout_ms:
+        connect_args["options"] = f"-c statement_timeout={statement_timeout_ms}"
+    
+    return create_engine(database_url, connect_args=connect_args, **options, **engine_kwargs)
+
+def pool_capacity(sync_engine) -> Optional[int]:
+    """Most connections the engine's pool hands out at once (pool_size + max_overflow); None if unbounded"""
+    pool = sync_engine.pool
+    if not isinstance(pool, QueuePool) or pool._max_overflow < 0:
+        return None
+    return pool.size() + pool._max_overflow
+
+def get_threadpool_size(sync_engine) -> int:
+    """
+    Worker threads for the blocking route handlers (THREADPOOL_SIZE). Defaults
+    to the connection pool's capacity: more threads than connections would
+    wait on the pool and fail with QueuePool timeouts instead of queueing.
+    """
+    capacity = pool_capacity(sync_engine)
+    size = _env_int("THREADPOOL_SIZE", capacity if capacity is not None else DEFAULT_THREADPOOL_SIZE)
+    if capacity is not None and size > capacity:
+        logger.warning(f"THREADPOOL_SIZE={size} exceeds the database pool capacity ({capacity} = pool_size + "
+                       f"max_overflow); handlers beyond it will wait for connections and may time out")
+    return size
+
 # For development, use SQLite if PostgreSQL is not available
 DB_TYPE = os.getenv('DB_TYPE', 'sqlite')
 
 if DB_TYPE == 'sqlite':
     # SQLite database for development
     DATABASE_URL = "sqlite:///./smart_warehouse.db"
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
 else:
     # PostgreSQL database for production
     DATABASE_URL = f"postgresql://{os.getenv('DB_USER', 'warehouse_user')}:{os.getenv('DB_PASSWORD', 'warehouse_password')}@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/{os.getenv('DB_NAME', 'smart_warehouse')}"
-    engine = create_engine(DATABASE_URL)
+
+engine = create_database_engine(DATABASE_URL)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def to_async_url(database_url: str) -> str:
+    """Swap a sync driver URL for its async driver (aiosqlite / asyncpg)"""
+    if database_url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + database_url[len("sqlite://"):]
+    if database_url.startswith("postgresql://"):
+        return "postgresql+asyncpg://" + database_url[len("postgresql://"):]
+    return database_url
+
+def create_async_database_engine(database_url: str, sqlite_pragmas: Optional[Dict[str, str]] = None,
+                                 pool_options: Optional[Dict] = None, **engine_kwargs):
+    """Async counterpart of create_database_engine, with the same tuning"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+    
+    database_url = to_async_url(database_url)
+    if database_url.startswith("sqlite"):
+        pragmas = _sqlite_pragmas_for(database_url, sqlite_pragmas)
+        connect_args = {}
+        if "busy_timeout" in pragmas:
+            connect_args["timeout"] = int(pragmas["busy_timeout"]) / 1000
+        connect_args.update(engine_kwargs.pop("connect_args", {}))
+        async_engine = create_async_engine(database_url, connect_args=connect_args, **engine_kwargs)
+        _install_sqlite_pragmas(async_engine.sync_engine, pragmas)
+        return async_engine
+    
+    options = get_postgres_pool_options() if pool_options is None else dict(pool_options)
+    connect_args = dict(engine_kwargs.pop("connect_args", {}))
+    statement_timeout_ms = options.pop("statement_timeout_ms", None)
+    if statement_timeout_ms:
+        connect_args["server_settings"] = {"statement_timeout": str(statement_timeout_ms)}
+    
+    return create_async_engine(database_url, connect_args=connect_args, **options, **engine_kwargs)
+
+# Optional async data-access path for the hot read endpoints (needs aiosqlite / asyncpg)
+ASYNC_DB_ENABLED = _env_bool("ASYNC_DB_ENABLED", False)
+async_engine = None
+AsyncSessionLocal = None
+
+if ASYNC_DB_ENABLED:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    
+    async_engine = create_async_database_engine(DATABASE_URL)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Import Base from models - this ensures we use the same Base everywhere
 from .models.database_models import Base
 
+# Registers the events that keep the KPI rollup tables current on every write
+from .services import kpi_rollup_service
+
 # Metadata
 metadata = MetaData()
 
@@ -33,3 +186,43 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Dependency to get an async database session (ASYNC_DB_ENABLED=true)
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database access is disabled; set ASYNC_DB_ENABLED=true")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+class QueryCounter:
+    """Counts SQL statements executed on an engine while attached"""
+    
+    def __init__(self, bind=None):
+        self.bind = bind or engine
+        self.statements = []
+        self._lock = threading.Lock()
+    
+    @property
+    def count(self):
+        return len(self.statements)
+    
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.statements.append(statement)
+    
+    def __enter__(self):
+        event.listen(self.bind, "before_cursor_execute", self._before_cursor_execute)
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        event.remove(self.bind, "before_cursor_execute", self._before_cursor_execute)
+        return False
+
+@contextmanager
+def assert_max_queries(limit: int, bind=None):
+    """Opt-in test guard: fail if the block issues more than `limit` SQL statements"""
+    with QueryCounter(bind) as counter:
+        yield counter
+    if counter.count > limit:
+        statements = "\n".join(f"  {statement}" for statement in counter.statements)
+        raise AssertionError(f"Expected at most {limit} SQL statements, got {counter.count}:\n{statements}")
@@ -3,13 +3,16 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, JSONResponse
+from starlette.concurrency import run_in_threadpool
+from anyio import to_thread
 import os
 import time
 import asyncio
 from datetime import datetime
 from functools import lru_cache
-from .database import engine, Base
+from .database import engine, Base, SessionLocal, ASYNC_DB_ENABLED, get_threadpool_size
 from .routers import inventory, inbound, outbound, chatbot, dashboard, forecasting, commercial_features, ultra_analytics
+from .services.kpi_rollup_service import KpiRollupService
 from datetime import datetime
 
 # Create database tables
@@ -35,7 +38,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def configure_threadpool():
+    """Bound the worker threadpool that runs the (blocking) route handlers (to the connection pool size)"""
+    limiter = to_thread.current_default_thread_limiter()
+    limiter.total_tokens = get_threadpool_size(engine)
+
+@app.on_event("startup")
+async def reconcile_kpi_rollups():
+    """Rebuild KPI rollups left stale by writes that bypassed the application (one worker rebuilds, under a lock)"""
+    def reconcile():
+        db = SessionLocal()
+        try:
+            KpiRollupService(db).reconcile()
+        finally:
+            db.close()
+    await run_in_threadpool(reconcile)
+
+@app.on_event("startup")
+async def initialize_shared_services():
+    """Build stateless service components once per process"""
+    from .services.service_container import get_service_container
+    await run_in_threadpool(get_service_container().warm_up)
+
 # Include routers
+# Async hot read endpoints take precedence over their sync versions when enabled
+if ASYNC_DB_ENABLED:
+    from .routers import async_reads
+    app.include_router(async_reads.inventory_router, prefix="/api/inventory", tags=["Inventory"])
+    app.include_router(async_reads.dashboard_router, prefix="/api/dashboard", tags=["Dashboard"])
+
 app.include_router(inventory.router, prefix="/api/inventory", tags=["Inventory"])
 app.include_router(inbound.router, prefix="/api/inbound", tags=["Inbound"])
 app.include_router(outbound.router, prefix="/api/outbound", tags=["Outbound"])
@@ -171,14 +203,17 @@ async def commercial_intelligence_dashboard():
         return HTMLResponse(content="<h1>Commercial Intelligence Dashboard</h1><p>Error reading file - encoding issue</p>")
 
 @app.get("/health")
-async def health_check():
+def health_check():
     """Health check endpoint for monitoring"""
     try:
         # Test database connection
-        from .database import get_db
-        db = next(get_db())
+        from .database import SessionLocal
         from sqlalchemy import text
-        db.execute(text("SELECT 1"))
+        db = SessionLocal()
+        try:
+            db.execute(text("SELECT 1"))
+        finally:
+            db.close()
         db_status = "healthy"
     except Exception as e:
         db_status = f"unhealthy: {str(e)}"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, Text, ForeignKey, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -37,6 +37,12 @@ class Inventory(Base):
     
     # Relationships
     product = relationship("Product", back_populates="inventory_items")
+    
+    # Stock lookups by product; covering on PostgreSQL
+    __table_args__ = (
+        Index("ix_inventory_product_id", "product_id",
+              postgresql_include=["quantity", "reserved_quantity", "available_quantity"]),
+    )
 
 class Vendor(Base):
     __tablename__ = "vendors"
@@ -84,6 +90,11 @@ class InboundShipment(Base):
     # Relationships
     vendor = relationship("Vendor", back_populates="inbound_shipments")
     items = relationship("InboundItem", back_populates="shipment")
+    
+    # Status counts over a created_at window
+    __table_args__ = (
+        Index("ix_inbound_shipments_status_created_at", "status", "created_at"),
+    )
 
 class InboundItem(Base):
     __tablename__ = "inbound_items"
@@ -125,6 +136,11 @@ class OutboundOrder(Base):
     # Relationships
     customer = relationship("Customer", back_populates="outbound_orders")
     items = relationship("OutboundItem", back_populates="order")
+    
+    # Status counts over a created_at window
+    __table_args__ = (
+        Index("ix_outbound_orders_status_created_at", "status", "created_at"),
+    )
 
 class OutboundItem(Base):
     __tablename__ = "outbound_items"
@@ -158,6 +174,14 @@ class StockMovement(Base):
     
     # Relationships
     product = relationship("Product")
+    
+    # Keyset pagination over (created_at, id), optionally narrowed by a filter column
+    __table_args__ = (
+        Index("ix_stock_movements_created_at_id", "created_at", "id"),
+        Index("ix_stock_movements_product_created_at_id", "product_id", "created_at", "id"),
+        Index("ix_stock_movements_type_created_at_id", "movement_type", "created_at", "id"),
+        Index("ix_stock_movements_reference_created_at_id", "reference_type", "created_at", "id"),
+    )
 
 class User(Base):
     __tablename__ = "users"
@@ -235,6 +259,11 @@ class ChatMessage(Base):
     # Relationships
     session = relationship("ChatSession", back_populates="messages")
     user = relationship("User", back_populates="chat_messages")
+    
+    # A session's messages in order
+    __table_args__ = (
+        Index("ix_chat_messages_session_created_at", "session_id", "created_at"),
+    )
 
 # Phase 3: Forecasting and Space Planning Models
 
@@ -254,6 +283,12 @@ class SalesHistory(Base):
     
     # Relationships
     product = relationship("Product", foreign_keys=[product_id])
+    
+    # A product's sales over a date range; covering for the quantity on PostgreSQL
+    __table_args__ = (
+        Index("ix_sales_history_product_sale_date", "product_id", "sale_date",
+              postgresql_include=["quantity_sold"]),
+    )
 
 class DemandForecast(Base):
     __tablename__ = "demand_forecasts"
@@ -273,6 +308,59 @@ class DemandForecast(Base):
     
     # Relationships
     product = relationship("Product", foreign_keys=[product_id])
+    
+    # A product's forecasts over a date range
+    __table_args__ = (
+        Index("ix_demand_forecasts_product_forecast_date", "product_id", "forecast_date"),
+    )
+
+class ForecastCacheEntry(Base):
+    __tablename__ = "forecast_cache_entries"
+    
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    horizon_weeks = Column(Integer, primary_key=True)
+    model_version = Column(String(50), primary_key=True)
+    # Sales watermark the forecast was computed from
+    sales_count = Column(Integer, nullable=False)
+    last_sale_date = Column(DateTime)
+    result = Column(JSON, nullable=False)  # {"forecasts": [...], "ai_insights": [...]}
+    generated_at = Column(DateTime, default=datetime.utcnow)
+
+# A chunked, resumable forecast run over the whole catalog (see services/parallel_forecasting_service.py)
+
+class ForecastRun(Base):
+    __tablename__ = "forecast_runs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String(20), default="running")  # running, completed, failed
+    weeks = Column(Integer, nullable=False)
+    chunk_size = Column(Integer, nullable=False)
+    total_products = Column(Integer, default=0)
+    completed_products = Column(Integer, default=0)
+    error = Column(Text)
+    as_of = Column(DateTime, nullable=False)  # sales history cutoff, fixed so a resumed run matches
+    started_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+class ForecastRunChunk(Base):
+    __tablename__ = "forecast_run_chunks"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    run_id = Column(Integer, ForeignKey("forecast_runs.id"), nullable=False)
+    chunk_index = Column(Integer, nullable=False)
+    first_product_id = Column(Integer, nullable=False)  # inclusive product id range
+    last_product_id = Column(Integer, nullable=False)
+    product_count = Column(Integer, nullable=False)
+    product_ids = Column(JSON)  # ids planned into the chunk; NULL (older runs): every product in the range
+    status = Column(String(20), default="pending")  # pending, completed, failed
+    error = Column(Text)
+    completed_at = Column(DateTime)
+    
+    # Chunks of a run still to do
+    __table_args__ = (
+        Index("ix_forecast_run_chunks_run_status", "run_id", "status"),
+    )
 
 class StockAlert(Base):
     __tablename__ = "stock_alerts"
@@ -349,3 +437,37 @@ class ProductVelocity(Base):
     
     # Relationships
     product = relationship("Product", foreign_keys=[product_id])
+
+# KPI rollups, maintained incrementally as events are written (see services/kpi_rollup_service.py)
+
+class MovementDailyRollup(Base):
+    __tablename__ = "kpi_movement_daily"
+    
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, primary_key=True)
+    movement_type = Column(String(50), primary_key=True)
+    movement_count = Column(Integer, nullable=False, default=0)
+    quantity_total = Column(Integer, nullable=False, default=0)  # sum of absolute quantities
+
+class MovementHourlyRollup(Base):
+    __tablename__ = "kpi_movement_hourly"
+    
+    hour = Column(DateTime, primary_key=True)  # truncated to the hour
+    movement_type = Column(String(50), primary_key=True)
+    movement_count = Column(Integer, nullable=False, default=0)
+    quantity_total = Column(Integer, nullable=False, default=0)
+
+class OrderStatusDailyRollup(Base):
+    __tablename__ = "kpi_order_status_daily"
+    
+    day = Column(Date, primary_key=True)  # day the shipment / order was created
+    order_kind = Column(String(20), primary_key=True)  # inbound, outbound
+    status = Column(String(50), primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+
+class ChatIntentDailyRollup(Base):
+    __tablename__ = "kpi_chat_intent_daily"
+    
+    day = Column(Date, primary_key=True)
+    intent = Column(String(100), primary_key=True)
+    message_count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,98 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from datetime import datetime, timedelta
+import asyncio
+from ..database import get_async_db
+from ..services.inventory_service import AsyncInventoryService
+from .dashboard import (
+    OVERVIEW_PARALLEL, overview_statements, overview_statement, build_overview, build_inventory_alerts,
+    recent_activity_statement, build_recent_activity
+)
+
+# Async versions of the hot read endpoints, mounted ahead of the sync routers
+# when ASYNC_DB_ENABLED=true; every other endpoint stays on the sync path.
+inventory_router = APIRouter()
+dashboard_router = APIRouter()
+
+async def fetch_overview_metrics_async(db: AsyncSession, parallel: bool = None):
+    """Overview metrics in one statement, or concurrently on separate connections"""
+    week_ago = datetime.utcnow() - timedelta(days=7)
+    if parallel is None:
+        parallel = OVERVIEW_PARALLEL
+    
+    if not parallel:
+        return dict((await db.execute(overview_statement(week_ago))).one()._mapping)
+    
+    async def scalar(statement):
+        async with db.bind.connect() as connection:
+            return (await connection.execute(statement)).scalar()
+    
+    statements = overview_statements(week_ago)
+    values = await asyncio.gather(*(scalar(statement) for statement in statements.values()))
+    return dict(zip(statements, values))
+
+@inventory_router.get("/summary")
+async def get_inventory_summary_async(db: AsyncSession = Depends(get_async_db)):
+    """Get inventory summary with low stock alerts"""
+    service = AsyncInventoryService(db)
+    return await service.get_inventory_summary()
+
+@inventory_router.get("/low-stock")
+async def get_low_stock_items_async(db: AsyncSession = Depends(get_async_db)):
+    """Get items with low stock"""
+    service = AsyncInventoryService(db)
+    summary = await service.get_inventory_summary()
+    return summary["low_stock_alerts"]
+
+@inventory_router.get("/movements")
+async def get_stock_movements_async(
+    response: Response,
+    product_id: Optional[int] = None,
+    movement_type: Optional[str] = None,
+    reference_type: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get stock movement history (newest first); the next page cursor is returned in X-Next-Cursor"""
+    if limit < 1 or limit > 1000:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 1000")
+    
+    service = AsyncInventoryService(db)
+    try:
+        page = await service.get_stock_movements_page(
+            limit=limit,
+            cursor=cursor,
+            product_id=product_id,
+            movement_type=movement_type,
+            reference_type=reference_type,
+            start_date=start_date,
+            end_date=end_date
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+    return page["movements"]
+
+@dashboard_router.get("/overview")
+async def get_dashboard_overview_async(db: AsyncSession = Depends(get_async_db)):
+    """Get dashboard overview with key metrics"""
+    return build_overview(await fetch_overview_metrics_async(db))
+
+@dashboard_router.get("/inventory-alerts")
+async def get_inventory_alerts_async(db: AsyncSession = Depends(get_async_db)):
+    """Get inventory alerts and notifications"""
+    inventory_service = AsyncInventoryService(db)
+    summary = await inventory_service.get_inventory_summary()
+    return build_inventory_alerts(summary)
+
+@dashboard_router.get("/recent-activity")
+async def get_recent_activity_async(limit: int = 20, db: AsyncSession = Depends(get_async_db)):
+    """Get recent warehouse activity"""
+    movements = (await db.execute(recent_activity_statement(limit))).all()
+    return build_recent_activity(movements, limit)
@@ -4,7 +4,7 @@ from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 from ..database import get_db
-from ..services.chatbot_service import ChatbotService
+from ..services.service_container import get_service_container
 
 router = APIRouter()
 
@@ -31,12 +31,12 @@ class SystemStatus(BaseModel):
     enhanced_mode: bool
 
 @router.post("/message", response_model=ChatResponse)
-async def process_chat_message(chat_message: ChatMessage, db: Session = Depends(get_db)):
+def process_chat_message(chat_message: ChatMessage, db: Session = Depends(get_db)):
     """Process a chat message and return bot response with enhanced natural language understanding"""
     
     try:
-        # Use the consolidated chatbot service
-        chatbot_service = ChatbotService(db)
+        # Use the consolidated chatbot service (shared components, per-request DB session)
+        chatbot_service = get_service_container().create_chatbot_service(db)
         response = chatbot_service.process_message(
             user_message=chat_message.message,
             session_id=chat_message.session_id,
@@ -72,10 +72,10 @@ async def process_chat_message(chat_message: ChatMessage, db: Session = Depends(
         )
 
 @router.get("/status", response_model=SystemStatus)
-async def get_system_status(db: Session = Depends(get_db)):
+def get_system_status(db: Session = Depends(get_db)):
     """Get chatbot system status"""
     try:
-        chatbot_service = ChatbotService(db)
+        chatbot_service = get_service_container().create_chatbot_service(db)
         # Simple status check - service is available if we can instantiate it
         return SystemStatus(
             llm_service=False,  # No LLM service in consolidated version
@@ -90,7 +90,7 @@ async def get_system_status(db: Session = Depends(get_db)):
         )
 
 @router.get("/history/{session_id}")
-async def get_chat_history(session_id: str, limit: int = 50, db: Session = Depends(get_db)):
+def get_chat_history(session_id: str, limit: int = 50, db: Session = Depends(get_db)):
     """Get chat history for a session"""
     from ..models.database_models import ChatMessage as ChatMessageModel
     
@@ -111,7 +111,7 @@ async def get_chat_history(session_id: str, limit: int = 50, db: Session = Depen
     ]
 
 @router.get("/stats")
-async def get_chat_stats(db: Session = Depends(get_db)):
+def get_chat_stats(db: Session = Depends(get_db)):
     """Get chatbot usage statistics"""
     from ..models.database_models import ChatMessage as ChatMessageModel
     from sqlalchemy import func
@@ -110,7 +110,7 @@ class QRCodeService:
 # === HEALTH CHECK ENDPOINT ===
 
 @router.get("/commercial/health")
-async def commercial_health_check():
+def commercial_health_check():
     """Health check for commercial features"""
     return {
         "status": "healthy",
@@ -132,7 +132,7 @@ async def commercial_health_check():
 # === EXECUTIVE DASHBOARD ENDPOINTS ===
 
 @router.get("/commercial/executive-dashboard")
-async def get_executive_dashboard(db: Session = Depends(get_db)):
+def get_executive_dashboard(db: Session = Depends(get_db)):
     """Get executive-level dashboard metrics and insights"""
     try:
         financial_metrics = ExecutiveDashboardService.get_financial_metrics(db)
@@ -162,7 +162,7 @@ async def get_executive_dashboard(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error generating executive dashboard: {str(e)}")
 
 @router.get("/commercial/financial-metrics")
-async def get_financial_metrics(db: Session = Depends(get_db)):
+def get_financial_metrics(db: Session = Depends(get_db)):
     """Get detailed financial metrics and analysis"""
     try:
         financial_data = ExecutiveDashboardService.get_financial_metrics(db)
@@ -193,7 +193,7 @@ async def get_financial_metrics(db: Session = Depends(get_db)):
 # === ANALYTICS ENDPOINTS ===
 
 @router.get("/commercial/analytics/abc-analysis")
-async def get_abc_analysis(db: Session = Depends(get_db)):
+def get_abc_analysis(db: Session = Depends(get_db)):
     """Perform ABC analysis on inventory items"""
     try:
         return AdvancedAnalyticsService.abc_analysis(db)
@@ -201,7 +201,7 @@ async def get_abc_analysis(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"ABC analysis error: {str(e)}")
 
 @router.get("/commercial/analytics/velocity-analysis")
-async def get_velocity_analysis(db: Session = Depends(get_db)):
+def get_velocity_analysis(db: Session = Depends(get_db)):
     """Analyze product velocity and movement patterns"""
     try:
         inventory_items = db.query(Inventory).all()
@@ -234,7 +234,7 @@ async def get_velocity_analysis(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Velocity analysis error: {str(e)}")
 
 @router.get("/commercial/analytics/predictive-insights")
-async def get_predictive_insights(db: Session = Depends(get_db)):
+def get_predictive_insights(db: Session = Depends(get_db)):
     """Get AI-powered predictive insights"""
     try:
         return {
@@ -262,7 +262,7 @@ async def get_predictive_insights(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Predictive insights error: {str(e)}")
 
 @router.get("/commercial/analytics/roi-analysis")
-async def get_roi_analysis(db: Session = Depends(get_db)):
+def get_roi_analysis(db: Session = Depends(get_db)):
     """Calculate ROI analysis for warehouse operations"""
     try:
         return {
@@ -289,7 +289,7 @@ async def get_roi_analysis(db: Session = Depends(get_db)):
 # === QR CODE MANAGEMENT ===
 
 @router.post("/commercial/qr-codes/generate")
-async def generate_qr_code(
+def generate_qr_code(
     product_id: int,
     sku: str,
     location: str,
@@ -313,7 +313,7 @@ async def generate_qr_code(
         raise HTTPException(status_code=500, detail=f"QR code generation error: {str(e)}")
 
 @router.get("/commercial/qr-codes")
-async def list_qr_codes(
+def list_qr_codes(
     limit: int = Query(50, le=100),
     offset: int = Query(0, ge=0),
     db: Session = Depends(get_db)
@@ -344,7 +344,7 @@ async def list_qr_codes(
 # === OPTIMIZATION ENDPOINTS ===
 
 @router.get("/commercial/optimization/layout-analysis")
-async def get_layout_optimization(db: Session = Depends(get_db)):
+def get_layout_optimization(db: Session = Depends(get_db)):
     """Analyze warehouse layout optimization opportunities"""
     try:
         return {
@@ -374,7 +374,7 @@ async def get_layout_optimization(db: Session = Depends(get_db)):
 # === AUTOMATION FEATURES ===
 
 @router.get("/commercial/automation/opportunities")
-async def get_automation_opportunities(db: Session = Depends(get_db)):
+def get_automation_opportunities(db: Session = Depends(get_db)):
     """Identify automation opportunities"""
     try:
         return {
@@ -410,7 +410,7 @@ async def get_automation_opportunities(db: Session = Depends(get_db)):
 # === REAL-TIME KPI MONITORING ===
 
 @router.get("/commercial/kpi/real-time")
-async def get_real_time_kpis(db: Session = Depends(get_db)):
+def get_real_time_kpis(db: Session = Depends(get_db)):
     """Get real-time KPI dashboard data"""
     try:
         return {
@@ -435,7 +435,7 @@ async def get_real_time_kpis(db: Session = Depends(get_db)):
 # === COMPLIANCE AND REPORTING ===
 
 @router.get("/commercial/compliance/report")
-async def get_compliance_report(db: Session = Depends(get_db)):
+def get_compliance_report(db: Session = Depends(get_db)):
     """Generate compliance and audit report"""
     try:
         return {
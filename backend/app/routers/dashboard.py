@@ -1,78 +1,105 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, select
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import os
 from ..database import get_db
 from ..models.database_models import (
     Product, Inventory, InboundShipment, OutboundOrder, 
     StockMovement, ChatMessage
 )
 from ..services.inventory_service import InventoryService
+from ..services.kpi_rollup_service import KpiRollupService
 
 router = APIRouter()
 
-@router.get("/overview")
-async def get_dashboard_overview(db: Session = Depends(get_db)):
-    """Get dashboard overview with key metrics"""
-    
-    # Inventory metrics
-    inventory_service = InventoryService(db)
-    inventory_summary = inventory_service.get_inventory_summary()
-    
-    # Total products
-    total_products = inventory_summary["total_products"]
-    low_stock_count = inventory_summary["low_stock_count"]
-    
-    # Total inventory value (approximate)
-    total_value = db.query(func.sum(Inventory.quantity * Product.unit_price)).join(
-        Product, Inventory.product_id == Product.id
-    ).scalar() or 0
-    
-    # Inbound shipments
-    pending_inbound = db.query(func.count(InboundShipment.id)).filter(
-        InboundShipment.status.in_(["pending", "arrived"])
-    ).scalar()
-    
-    # Outbound orders
-    pending_outbound = db.query(func.count(OutboundOrder.id)).filter(
-        OutboundOrder.status.in_(["pending", "picking", "packed"])
-    ).scalar()
-    
-    # Recent activity (last 7 days)
+# By default the overview is one consolidated statement; with
+# DASHBOARD_OVERVIEW_PARALLEL=true its aggregates run concurrently on separate connections
+OVERVIEW_PARALLEL = os.getenv("DASHBOARD_OVERVIEW_PARALLEL", "false").lower() in ("1", "true", "yes", "on")
+_overview_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="dashboard-overview")
+
+def overview_statements(week_ago: datetime):
+    """Scalar queries behind the dashboard overview, keyed by metric"""
+    return {
+        # Inventory rows, and those at or below their reorder level
+        "total_products": select(func.count(Inventory.id)).join(
+            Product, Inventory.product_id == Product.id
+        ),
+        "low_stock_count": select(func.count(Inventory.id)).join(
+            Product, Inventory.product_id == Product.id
+        ).where(Inventory.available_quantity <= Product.reorder_level),
+        # Total inventory value (approximate)
+        "total_value": select(func.sum(Inventory.quantity * Product.unit_price)).join(
+            Product, Inventory.product_id == Product.id
+        ),
+        # Inbound shipments
+        "pending_inbound": select(func.count(InboundShipment.id)).where(
+            InboundShipment.status.in_(["pending", "arrived"])
+        ),
+        # Outbound orders
+        "pending_outbound": select(func.count(OutboundOrder.id)).where(
+            OutboundOrder.status.in_(["pending", "picking", "packed"])
+        ),
+        # Recent activity (last 7 days)
+        "recent_movements": select(func.count(StockMovement.id)).where(
+            StockMovement.created_at >= week_ago
+        ),
+        # Chat activity
+        "total_chat_messages": select(func.count(ChatMessage.id)),
+        "recent_chats": select(func.count(ChatMessage.id)).where(
+            ChatMessage.created_at >= week_ago
+        )
+    }
+
+def overview_statement(week_ago: datetime):
+    """Every overview metric as a scalar subquery of one statement (one round trip)"""
+    return select(*[
+        statement.scalar_subquery().label(name)
+        for name, statement in overview_statements(week_ago).items()
+    ])
+
+def _scalar_on_own_connection(bind, statement):
+    with bind.connect() as connection:
+        return connection.execute(statement).scalar()
+
+def fetch_overview_metrics(db: Session, parallel: bool = None):
+    """Overview metrics in one statement, or concurrently on separate connections"""
     week_ago = datetime.utcnow() - timedelta(days=7)
-    recent_movements = db.query(func.count(StockMovement.id)).filter(
-        StockMovement.created_at >= week_ago
-    ).scalar()
+    if parallel is None:
+        parallel = OVERVIEW_PARALLEL
     
-    # Chat activity
-    total_chat_messages = db.query(func.count(ChatMessage.id)).scalar()
-    recent_chats = db.query(func.count(ChatMessage.id)).filter(
-        ChatMessage.created_at >= week_ago
-    ).scalar()
+    if not parallel:
+        return dict(db.execute(overview_statement(week_ago)).one()._mapping)
     
+    bind = db.get_bind()
+    futures = {
+        name: _overview_executor.submit(_scalar_on_own_connection, bind, statement)
+        for name, statement in overview_statements(week_ago).items()
+    }
+    return {name: future.result() for name, future in futures.items()}
+
+def build_overview(metrics):
+    """Shape the overview response from the scalar metrics"""
     return {
         "inventory": {
-            "total_products": total_products,
-            "low_stock_items": low_stock_count,
-            "total_value": round(total_value, 2)
+            "total_products": metrics["total_products"],
+            "low_stock_items": metrics["low_stock_count"],
+            "total_value": round(metrics["total_value"] or 0, 2)
         },
         "operations": {
-            "pending_inbound": pending_inbound,
-            "pending_outbound": pending_outbound,
-            "recent_movements": recent_movements
+            "pending_inbound": metrics["pending_inbound"],
+            "pending_outbound": metrics["pending_outbound"],
+            "recent_movements": metrics["recent_movements"]
         },
         "chatbot": {
-            "total_messages": total_chat_messages,
-            "recent_messages": recent_chats
+            "total_messages": metrics["total_chat_messages"],
+            "recent_messages": metrics["recent_chats"]
         }
     }
 
-@router.get("/inventory-alerts")
-async def get_inventory_alerts(db: Session = Depends(get_db)):
-    """Get inventory alerts and notifications"""
-    inventory_service = InventoryService(db)
-    summary = inventory_service.get_inventory_summary()
-    
+def build_inventory_alerts(summary):
+    """Low-stock and out-of-stock alerts from an inventory summary"""
     alerts = []
     
     # Low stock alerts
@@ -102,26 +129,32 @@ async def get_inventory_alerts(db: Session = Depends(get_db)):
     
     return {"alerts": alerts, "count": len(alerts)}
 
-@router.get("/recent-activity")
-async def get_recent_activity(limit: int = 20, db: Session = Depends(get_db)):
-    """Get recent warehouse activity"""
-    
-    # Recent stock movements
-    movements = db.query(StockMovement).join(
+def recent_activity_statement(limit: int):
+    """Recent stock movements, with product columns projected from the join"""
+    return select(
+        StockMovement.created_at,
+        StockMovement.movement_type,
+        StockMovement.quantity,
+        StockMovement.reason,
+        Product.name,
+        Product.sku,
+        Product.unit
+    ).join(
         Product, StockMovement.product_id == Product.id
-    ).order_by(StockMovement.created_at.desc()).limit(limit).all()
-    
+    ).order_by(StockMovement.created_at.desc()).limit(limit)
+
+def build_recent_activity(movements, limit: int):
+    """Shape recent movement rows into activity entries"""
     activities = []
     
     for movement in movements:
-        product = movement.product
         activities.append({
             "type": "stock_movement",
             "timestamp": movement.created_at,
-            "description": f"{movement.movement_type.title()}: {abs(movement.quantity)} {product.unit} of {product.name}",
+            "description": f"{movement.movement_type.title()}: {abs(movement.quantity)} {movement.unit} of {movement.name}",
             "details": {
-                "product": product.name,
-                "sku": product.sku,
+                "product": movement.name,
+                "sku": movement.sku,
                 "quantity": movement.quantity,
                 "movement_type": movement.movement_type,
                 "reason": movement.reason
@@ -133,50 +166,46 @@ async def get_recent_activity(limit: int = 20, db: Session = Depends(get_db)):
     
     return {"activities": activities[:limit]}
 
+@router.get("/overview")
+def get_dashboard_overview(db: Session = Depends(get_db)):
+    """Get dashboard overview with key metrics"""
+    return build_overview(fetch_overview_metrics(db))
+
+@router.get("/inventory-alerts")
+def get_inventory_alerts(db: Session = Depends(get_db)):
+    """Get inventory alerts and notifications"""
+    inventory_service = InventoryService(db)
+    summary = inventory_service.get_inventory_summary()
+    return build_inventory_alerts(summary)
+
+@router.get("/recent-activity")
+def get_recent_activity(limit: int = 20, db: Session = Depends(get_db)):
+    """Get recent warehouse activity"""
+    movements = db.execute(recent_activity_statement(limit)).all()
+    return build_recent_activity(movements, limit)
+
 @router.get("/performance-metrics")
-async def get_performance_metrics(days: int = 30, db: Session = Depends(get_db)):
+def get_performance_metrics(days: int = 30, db: Session = Depends(get_db)):
     """Get performance metrics for the specified period"""
     
-    start_date = datetime.utcnow() - timedelta(days=days)
+    # Read from the daily KPI rollups; the window covers whole UTC days
+    since_day = (datetime.utcnow() - timedelta(days=days)).date()
+    rollups = KpiRollupService(db)
     
     # Inbound performance
-    total_shipments = db.query(func.count(InboundShipment.id)).filter(
-        InboundShipment.created_at >= start_date
-    ).scalar()
-    
-    completed_shipments = db.query(func.count(InboundShipment.id)).filter(
-        and_(
-            InboundShipment.created_at >= start_date,
-            InboundShipment.status == "completed"
-        )
-    ).scalar()
+    shipments = rollups.order_counts_by_status("inbound", since_day)
+    total_shipments = sum(shipments.values())
+    completed_shipments = shipments.get("completed", 0)
     
     # Outbound performance
-    total_orders = db.query(func.count(OutboundOrder.id)).filter(
-        OutboundOrder.created_at >= start_date
-    ).scalar()
-    
-    dispatched_orders = db.query(func.count(OutboundOrder.id)).filter(
-        and_(
-            OutboundOrder.created_at >= start_date,
-            OutboundOrder.status.in_(["dispatched", "delivered"])
-        )
-    ).scalar()
+    orders = rollups.order_counts_by_status("outbound", since_day)
+    total_orders = sum(orders.values())
+    dispatched_orders = orders.get("dispatched", 0) + orders.get("delivered", 0)
     
     # Stock movements
-    inbound_movements = db.query(func.count(StockMovement.id)).filter(
-        and_(
-            StockMovement.created_at >= start_date,
-            StockMovement.movement_type == "inbound"
-        )
-    ).scalar()
-    
-    outbound_movements = db.query(func.count(StockMovement.id)).filter(
-        and_(
-            StockMovement.created_at >= start_date,
-            StockMovement.movement_type == "outbound"
-        )
-    ).scalar()
+    movements = rollups.movement_totals_by_type(since_day)
+    inbound_movements = movements.get("inbound", {}).get("count", 0)
+    outbound_movements = movements.get("outbound", {}).get("count", 0)
     
     return {
         "period_days": days,
@@ -198,24 +227,12 @@ async def get_performance_metrics(days: int = 30, db: Session = Depends(get_db))
     }
 
 @router.get("/top-products")
-async def get_top_products(limit: int = 10, metric: str = "movement", db: Session = Depends(get_db)):
+def get_top_products(limit: int = 10, metric: str = "movement", db: Session = Depends(get_db)):
     """Get top products by various metrics"""
     
     if metric == "movement":
-        # Most active products by stock movement
-        query = db.query(
-            Product.id,
-            Product.sku,
-            Product.name,
-            func.count(StockMovement.id).label('movement_count'),
-            func.sum(func.abs(StockMovement.quantity)).label('total_quantity')
-        ).join(
-            StockMovement, Product.id == StockMovement.product_id
-        ).group_by(Product.id).order_by(
-            func.count(StockMovement.id).desc()
-        ).limit(limit)
-        
-        results = query.all()
+        # Most active products by stock movement, from the daily rollups
+        results = KpiRollupService(db).top_products_by_movement(limit)
         
         return {
             "metric": "movement",
@@ -261,7 +278,7 @@ async def get_top_products(limit: int = 10, metric: str = "movement", db: Sessio
         raise HTTPException(status_code=400, detail="Invalid metric. Use 'movement' or 'stock'")
 
 @router.get("/system-health")
-async def get_system_health(db: Session = Depends(get_db)):
+def get_system_health(db: Session = Depends(get_db)):
     """Get system health status"""
     
     try:
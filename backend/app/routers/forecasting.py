@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from pydantic import BaseModel
@@ -9,6 +9,7 @@ from ..database import get_db
 from ..services.forecasting_service import ForecastingService
 from ..services.space_optimization_service import SpaceOptimizationService
 from ..services.enhanced_analytics_service import EnhancedAnalyticsService
+from ..services.service_container import get_service_container
 
 router = APIRouter()
 
@@ -73,14 +74,14 @@ class PredictiveAnalyticsResponse(BaseModel):
     market_intelligence: dict
     business_impact: dict
 
-# Initialize services
-forecasting_service = ForecastingService()
-space_service = SpaceOptimizationService()
-ultra_analytics_service = EnhancedAnalyticsService()
+# Initialize services (shared with the chatbot via the service container)
+forecasting_service = get_service_container().forecasting_service or ForecastingService()
+space_service = get_service_container().space_service or SpaceOptimizationService()
+ultra_analytics_service = EnhancedAnalyticsService(llm_service=get_service_container().llm_service)
 
 # Forecasting endpoints
 @router.post("/forecast/ingest-sales", summary="Ingest Sales Data")
-async def ingest_sales_data(
+def ingest_sales_data(
     sales_data: List[SalesDataInput],
     db: Session = Depends(get_db)
 ):
@@ -106,51 +107,36 @@ async def ingest_sales_data(
         raise HTTPException(status_code=500, detail=f"Error ingesting sales data: {str(e)}")
 
 @router.post("/forecast/upload-sales-csv", summary="Upload Sales Data CSV")
-async def upload_sales_csv(
+def upload_sales_csv(
     file: UploadFile = File(...),
     db: Session = Depends(get_db)
 ):
     """
-    Upload and ingest sales data from CSV file
+    Upload and ingest sales data from CSV file (streamed in chunks, bulk inserted)
     """
+    # Validate file type
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="Only CSV files are supported")
+    
     try:
-        # Validate file type
-        if not file.filename.endswith('.csv'):
-            raise HTTPException(status_code=400, detail="Only CSV files are supported")
-        
-        # Read CSV file
-        contents = await file.read()
-        
-        # Use pandas to parse CSV
-        import io
-        df = pd.read_csv(io.StringIO(contents.decode('utf-8')))
-        
-        # Convert to expected format
-        sales_data = []
-        for _, row in df.iterrows():
-            sales_data.append({
-                "sku": row.get("sku", ""),
-                "quantity_sold": int(row.get("quantity_sold", 0)),
-                "sale_date": row.get("sale_date", ""),
-                "unit_price": float(row.get("unit_price", 0.0)),
-                "total_value": float(row.get("total_value", 0.0)),
-                "customer_type": row.get("customer_type", "retail"),
-                "channel": row.get("channel", "store")
-            })
-        
-        result = forecasting_service.ingest_sales_data(db, sales_data)
-        
-        return {
-            "message": f"Successfully processed {file.filename}",
-            "ingested_count": result["ingested_count"],
-            "errors": result.get("errors", [])
-        }
-        
+        # Stream the upload (spooled to disk by Starlette) through the chunked bulk ingester
+        result = forecasting_service.ingest_sales_csv(db, file.file)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing CSV file: {str(e)}")
+    
+    # Validation failures (e.g. a missing column) are the client's, not the server's. A file
+    # that breaks after chunks were committed succeeds, its errors naming the first row not ingested
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["error"])
+    
+    return {
+        "message": f"Successfully processed {file.filename}",
+        "ingested_count": result["ingested_count"],
+        "errors": result.get("errors", [])
+    }
 
 @router.post("/forecast/generate", response_model=ForecastResponse, summary="Generate Demand Forecast")
-async def generate_demand_forecast(
+def generate_demand_forecast(
     request: ForecastRequest,
     db: Session = Depends(get_db)
 ):
@@ -171,43 +157,69 @@ async def generate_demand_forecast(
         raise HTTPException(status_code=500, detail=f"Error generating forecast: {str(e)}")
 
 @router.get("/forecast/all-products", summary="Generate Forecasts for All Products")
-async def generate_all_forecasts(
+def generate_all_forecasts(
     weeks: int = 4,
     db: Session = Depends(get_db)
 ):
     """
-    Generate forecasts for all products in the system
+    Generate forecasts for all products in the system in one vectorized batch
     """
-    try:
-        from ..models.database_models import Product
-        
-        products = db.query(Product).all()
-        forecasts = []
-        errors = []
-        
-        for product in products:
-            try:
-                result = forecasting_service.generate_demand_forecast(db, product.id, weeks)
-                if result["success"]:
-                    forecasts.append(result)
-                else:
-                    errors.append(f"Product {product.sku}: {result['error']}")
-            except Exception as e:
-                errors.append(f"Product {product.sku}: {str(e)}")
-        
-        return {
-            "success": True,
-            "total_products": len(products),
-            "successful_forecasts": len(forecasts),
-            "forecasts": forecasts,
-            "errors": errors
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating all forecasts: {str(e)}")
+    result = forecasting_service.generate_all_forecasts(db, weeks)
+    if not result["success"]:
+        raise HTTPException(status_code=500, detail=f"Error generating all forecasts: {result['error']}")
+    return result
+
+@router.post("/forecast/runs", summary="Start a Parallel Forecast Run")
+def start_forecast_run(
+    background_tasks: BackgroundTasks,
+    weeks: int = 4,
+    resume: bool = True,
+    db: Session = Depends(get_db)
+):
+    """
+    Forecast every product across all cores in the background, committing in
+    chunks; an unfinished run for the same horizon is resumed unless resume=false
+    """
+    result = forecasting_service.start_forecast_run(db, weeks, resume)
+    if not result["success"]:
+        status_code = 409 if "run" in result else 500
+        raise HTTPException(status_code=status_code, detail=f"Error starting forecast run: {result['error']}")
+    background_tasks.add_task(forecasting_service.execute_forecast_run, result["run"]["id"])
+    return result
+
+@router.get("/forecast/runs/{run_id}", summary="Get Forecast Run Progress")
+def get_forecast_run(run_id: int, db: Session = Depends(get_db)):
+    """
+    Progress of a parallel forecast run
+    """
+    result = forecasting_service.get_forecast_run(db, run_id)
+    if not result["success"]:
+        raise HTTPException(status_code=404, detail=result["error"])
+    return result
+
+@router.get("/forecast/backtest", summary="Backtest Forecasters")
+def backtest_forecasters(
+    horizon: int = 4,
+    origins: int = 8,
+    forecasters: Optional[str] = None,
+    include_per_sku: bool = False,
+    llm_max_products: int = 20,
+    db: Session = Depends(get_db)
+):
+    """
+    Rolling-origin backtest of each forecaster on the sales history: MAPE, WAPE,
+    bias and runtime per SKU and overall (forecasters: comma-separated subset;
+    the LLM path is only run when requested with forecasters=llm)
+    """
+    result = forecasting_service.backtest_forecasters(
+        db, horizon, origins, forecasters.split(",") if forecasters else None, include_per_sku, llm_max_products
+    )
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
 
 @router.get("/forecast/stock-risks", response_model=StockAlertResponse, summary="Analyze Stock Risks")
-async def analyze_stock_risks(db: Session = Depends(get_db)):
+def analyze_stock_risks(db: Session = Depends(get_db)):
     """
     Analyze all products for overstock/understock risks using AI
     """
@@ -223,7 +235,7 @@ async def analyze_stock_risks(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error analyzing stock risks: {str(e)}")
 
 @router.get("/forecast/reorder-recommendations", response_model=ReorderRecommendationResponse, summary="Get Reorder Recommendations")
-async def get_reorder_recommendations(db: Session = Depends(get_db)):
+def get_reorder_recommendations(db: Session = Depends(get_db)):
     """
     Generate AI-powered reorder recommendations
     """
@@ -239,7 +251,7 @@ async def get_reorder_recommendations(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error generating recommendations: {str(e)}")
 
 @router.get("/forecast/export-csv", summary="Export Forecasts to CSV")
-async def export_forecast_csv(
+def export_forecast_csv(
     weeks: int = 4,
     db: Session = Depends(get_db)
 ):
@@ -265,7 +277,7 @@ async def export_forecast_csv(
 
 # Space Optimization endpoints
 @router.get("/space/analyze-velocity", summary="Analyze Product Velocity")
-async def analyze_product_velocity(db: Session = Depends(get_db)):
+def analyze_product_velocity(db: Session = Depends(get_db)):
     """
     Analyze product movement velocity to categorize fast/slow moving items
     """
@@ -281,7 +293,7 @@ async def analyze_product_velocity(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error analyzing velocity: {str(e)}")
 
 @router.get("/space/layout-optimization", response_model=SpaceOptimizationResponse, summary="Generate Layout Optimization")
-async def generate_layout_optimization(db: Session = Depends(get_db)):
+def generate_layout_optimization(db: Session = Depends(get_db)):
     """
     Generate AI-powered layout optimization recommendations
     """
@@ -297,7 +309,7 @@ async def generate_layout_optimization(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error generating layout optimization: {str(e)}")
 
 @router.get("/space/category-grouping", summary="Suggest Category Grouping")
-async def suggest_category_grouping(db: Session = Depends(get_db)):
+def suggest_category_grouping(db: Session = Depends(get_db)):
     """
     Suggest logical product grouping by category and volume
     """
@@ -313,7 +325,7 @@ async def suggest_category_grouping(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error suggesting category grouping: {str(e)}")
 
 @router.get("/space/fast-moving-optimization", summary="Optimize Fast-Moving Placement")
-async def optimize_fast_moving_placement(db: Session = Depends(get_db)):
+def optimize_fast_moving_placement(db: Session = Depends(get_db)):
     """
     Optimize placement of fast-moving goods near exit/entrance
     """
@@ -329,7 +341,7 @@ async def optimize_fast_moving_placement(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error optimizing fast-moving placement: {str(e)}")
 
 @router.get("/space/comprehensive-plan", summary="Generate Comprehensive Space Optimization Plan")
-async def generate_comprehensive_plan(db: Session = Depends(get_db)):
+def generate_comprehensive_plan(db: Session = Depends(get_db)):
     """
     Generate comprehensive text-based space optimization plan
     """
@@ -347,7 +359,7 @@ async def generate_comprehensive_plan(db: Session = Depends(get_db)):
 # Ultra-Enhanced Analytics Endpoints
 @router.get("/analytics/ultra/multi-dimensional", response_model=UltraAnalyticsResponse, 
            summary="Multi-Dimensional Business Intelligence")
-async def get_multi_dimensional_analytics(
+def get_multi_dimensional_analytics(
     analysis_type: str = "comprehensive",
     db: Session = Depends(get_db)
 ):
@@ -362,7 +374,7 @@ async def get_multi_dimensional_analytics(
 
 @router.get("/analytics/ultra/predictive", response_model=PredictiveAnalyticsResponse, 
            summary="Predictive Business Intelligence")
-async def get_predictive_analytics(
+def get_predictive_analytics(
     horizon: int = 12,
     db: Session = Depends(get_db)
 ):
@@ -377,7 +389,7 @@ async def get_predictive_analytics(
 
 @router.get("/analytics/ultra/cognitive", response_model=CognitiveInsightsResponse, 
            summary="Cognitive Business Insights")
-async def get_cognitive_insights(
+def get_cognitive_insights(
     focus_area: str = "strategic",
     db: Session = Depends(get_db)
 ):
@@ -391,7 +403,7 @@ async def get_cognitive_insights(
         raise HTTPException(status_code=500, detail=f"Error in cognitive analysis: {str(e)}")
 
 @router.get("/analytics/ultra/optimization-engine", summary="AI Optimization Engine")
-async def get_optimization_recommendations(
+def get_optimization_recommendations(
     scope: str = "full_warehouse",
     db: Session = Depends(get_db)
 ):
@@ -412,7 +424,7 @@ async def get_optimization_recommendations(
         raise HTTPException(status_code=500, detail=f"Error in optimization engine: {str(e)}")
 
 @router.get("/analytics/ultra/strategic-dashboard", summary="Strategic Intelligence Dashboard")
-async def get_strategic_dashboard(
+def get_strategic_dashboard(
     db: Session = Depends(get_db)
 ):
     """
@@ -446,7 +458,7 @@ async def get_strategic_dashboard(
 
 # Dashboard endpoints
 @router.get("/dashboard/overview", summary="Phase 3 Dashboard Overview")
-async def get_phase3_dashboard(db: Session = Depends(get_db)):
+def get_phase3_dashboard(db: Session = Depends(get_db)):
     """
     Get comprehensive Phase 3 dashboard with forecasting and space optimization data
     """
@@ -512,7 +524,7 @@ async def get_phase3_dashboard(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error getting dashboard: {str(e)}")
 
 @router.get("/health", summary="Phase 3 Health Check")
-async def phase3_health_check():
+def phase3_health_check():
     """
     Health check for Phase 3 services
     """
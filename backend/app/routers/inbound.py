@@ -30,19 +30,19 @@ class ReceiveItemRequest(BaseModel):
     damaged_quantity: int = 0
 
 @router.get("/shipments")
-async def get_all_shipments(status: Optional[str] = None, db: Session = Depends(get_db)):
+def get_all_shipments(status: Optional[str] = None, db: Session = Depends(get_db)):
     """Get all inbound shipments"""
     service = InboundService(db)
     return service.get_all_shipments(status=status)
 
 @router.get("/shipments/pending")
-async def get_pending_shipments(db: Session = Depends(get_db)):
+def get_pending_shipments(db: Session = Depends(get_db)):
     """Get pending shipments"""
     service = InboundService(db)
     return service.get_pending_shipments()
 
 @router.get("/shipments/{shipment_number}")
-async def get_shipment_by_number(shipment_number: str, db: Session = Depends(get_db)):
+def get_shipment_by_number(shipment_number: str, db: Session = Depends(get_db)):
     """Get shipment by number"""
     service = InboundService(db)
     shipment = service.get_shipment_by_number(shipment_number)
@@ -51,7 +51,7 @@ async def get_shipment_by_number(shipment_number: str, db: Session = Depends(get
     return shipment
 
 @router.get("/shipments/details/{shipment_id}")
-async def get_shipment_details(shipment_id: int, db: Session = Depends(get_db)):
+def get_shipment_details(shipment_id: int, db: Session = Depends(get_db)):
     """Get detailed shipment information"""
     service = InboundService(db)
     details = service.get_shipment_details(shipment_id)
@@ -60,7 +60,7 @@ async def get_shipment_details(shipment_id: int, db: Session = Depends(get_db)):
     return details
 
 @router.post("/shipments")
-async def create_shipment(shipment: InboundShipmentCreate, db: Session = Depends(get_db)):
+def create_shipment(shipment: InboundShipmentCreate, db: Session = Depends(get_db)):
     """Create a new inbound shipment"""
     service = InboundService(db)
     try:
@@ -69,7 +69,7 @@ async def create_shipment(shipment: InboundShipmentCreate, db: Session = Depends
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/shipments/{shipment_id}/items")
-async def add_shipment_item(
+def add_shipment_item(
     shipment_id: int, 
     item: InboundItemCreate, 
     db: Session = Depends(get_db)
@@ -84,7 +84,7 @@ async def add_shipment_item(
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.put("/shipments/{shipment_id}/status/{status}")
-async def update_shipment_status(
+def update_shipment_status(
     shipment_id: int, 
     status: str, 
     db: Session = Depends(get_db)
@@ -97,7 +97,7 @@ async def update_shipment_status(
     return {"message": f"Shipment status updated to {status}"}
 
 @router.post("/items/{item_id}/receive")
-async def receive_item(
+def receive_item(
     item_id: int,
     receive_data: ReceiveItemRequest,
     db: Session = Depends(get_db)
@@ -116,7 +116,7 @@ async def receive_item(
     return {"message": "Item received and inventory updated"}
 
 @router.put("/shipments/{shipment_id}/complete")
-async def complete_shipment(shipment_id: int, db: Session = Depends(get_db)):
+def complete_shipment(shipment_id: int, db: Session = Depends(get_db)):
     """Mark shipment as completed"""
     service = InboundService(db)
     success = service.complete_shipment(shipment_id)
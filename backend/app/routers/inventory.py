@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from pydantic import BaseModel
+from datetime import datetime
+import csv
+import io
+import json
 from ..database import get_db
-from ..services.inventory_service import InventoryService
+from ..services.inventory_service import InventoryService, MOVEMENT_EXPORT_FIELDS
 
 router = APIRouter()
 
@@ -24,19 +29,19 @@ class StockUpdate(BaseModel):
     reason: Optional[str] = None
 
 @router.get("/summary")
-async def get_inventory_summary(db: Session = Depends(get_db)):
+def get_inventory_summary(db: Session = Depends(get_db)):
     """Get inventory summary with low stock alerts"""
     service = InventoryService(db)
     return service.get_inventory_summary()
 
 @router.get("/products")
-async def get_all_products(db: Session = Depends(get_db)):
+def get_all_products(db: Session = Depends(get_db)):
     """Get all products"""
     service = InventoryService(db)
     return service.get_all_products()
 
 @router.get("/products/{sku}")
-async def get_product_by_sku(sku: str, db: Session = Depends(get_db)):
+def get_product_by_sku(sku: str, db: Session = Depends(get_db)):
     """Get product by SKU"""
     service = InventoryService(db)
     product = service.get_product_by_sku(sku)
@@ -45,7 +50,7 @@ async def get_product_by_sku(sku: str, db: Session = Depends(get_db)):
     return product
 
 @router.post("/products")
-async def create_product(product: ProductCreate, db: Session = Depends(get_db)):
+def create_product(product: ProductCreate, db: Session = Depends(get_db)):
     """Create a new product"""
     service = InventoryService(db)
     try:
@@ -54,7 +59,7 @@ async def create_product(product: ProductCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/stock/update")
-async def update_stock(stock_update: StockUpdate, db: Session = Depends(get_db)):
+def update_stock(stock_update: StockUpdate, db: Session = Depends(get_db)):
     """Update stock levels"""
     service = InventoryService(db)
     success = service.update_stock(
@@ -69,18 +74,99 @@ async def update_stock(stock_update: StockUpdate, db: Session = Depends(get_db))
     
     return {"message": "Stock updated successfully"}
 
+@router.post("/stock/bulk-update")
+def bulk_update_stock(adjustments: List[StockUpdate], db: Session = Depends(get_db)):
+    """Apply many stock adjustments in a single transaction"""
+    if not adjustments:
+        raise HTTPException(status_code=400, detail="No adjustments provided")
+    
+    service = InventoryService(db)
+    return service.bulk_update_stock([adjustment.dict() for adjustment in adjustments])
+
 @router.get("/movements")
-async def get_stock_movements(
+def get_stock_movements(
+    response: Response,
     product_id: Optional[int] = None,
+    movement_type: Optional[str] = None,
+    reference_type: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    cursor: Optional[str] = None,
     limit: int = 100,
     db: Session = Depends(get_db)
 ):
-    """Get stock movement history"""
+    """Get stock movement history (newest first); the next page cursor is returned in X-Next-Cursor"""
+    if limit < 1 or limit > 1000:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 1000")
+    
     service = InventoryService(db)
-    return service.get_stock_movements(product_id=product_id, limit=limit)
+    try:
+        page = service.get_stock_movements_page(
+            limit=limit,
+            cursor=cursor,
+            product_id=product_id,
+            movement_type=movement_type,
+            reference_type=reference_type,
+            start_date=start_date,
+            end_date=end_date
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+    return page["movements"]
+
+@router.get("/movements/export")
+def export_stock_movements(
+    format: str = "ndjson",
+    product_id: Optional[int] = None,
+    movement_type: Optional[str] = None,
+    reference_type: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """Stream the full filtered movement history as NDJSON or CSV"""
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+    
+    service = InventoryService(db)
+    movements = service.iter_stock_movements(
+        product_id=product_id,
+        movement_type=movement_type,
+        reference_type=reference_type,
+        start_date=start_date,
+        end_date=end_date
+    )
+    
+    def generate_ndjson():
+        for movement in movements:
+            yield json.dumps(movement, default=str) + "\n"
+    
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=MOVEMENT_EXPORT_FIELDS)
+        writer.writeheader()
+        for count, movement in enumerate(movements, 1):
+            writer.writerow(movement)
+            if count % 1000 == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    
+    # The request's DB session stays open until the response has finished streaming
+    if format == "csv":
+        return StreamingResponse(
+            generate_csv(),
+            media_type="text/csv",
+            headers={"Content-Disposition": "attachment; filename=stock_movements.csv"}
+        )
+    return StreamingResponse(generate_ndjson(), media_type="application/x-ndjson")
 
 @router.get("/low-stock")
-async def get_low_stock_items(db: Session = Depends(get_db)):
+def get_low_stock_items(db: Session = Depends(get_db)):
     """Get items with low stock"""
     service = InventoryService(db)
     summary = service.get_inventory_summary()
@@ -30,31 +30,31 @@ class PackItemRequest(BaseModel):
     packed_quantity: int
 
 @router.get("/orders")
-async def get_all_orders(status: Optional[str] = None, db: Session = Depends(get_db)):
+def get_all_orders(status: Optional[str] = None, db: Session = Depends(get_db)):
     """Get all outbound orders"""
     service = OutboundService(db)
     return service.get_all_orders(status=status)
 
 @router.get("/orders/pending")
-async def get_pending_orders(db: Session = Depends(get_db)):
+def get_pending_orders(db: Session = Depends(get_db)):
     """Get pending orders"""
     service = OutboundService(db)
     return service.get_pending_orders()
 
 @router.get("/orders/picking")
-async def get_orders_for_picking(db: Session = Depends(get_db)):
+def get_orders_for_picking(db: Session = Depends(get_db)):
     """Get orders ready for picking"""
     service = OutboundService(db)
     return service.get_orders_for_picking()
 
 @router.get("/orders/dispatch")
-async def get_orders_for_dispatch(db: Session = Depends(get_db)):
+def get_orders_for_dispatch(db: Session = Depends(get_db)):
     """Get orders ready for dispatch"""
     service = OutboundService(db)
     return service.get_orders_for_dispatch()
 
 @router.get("/orders/{order_number}")
-async def get_order_by_number(order_number: str, db: Session = Depends(get_db)):
+def get_order_by_number(order_number: str, db: Session = Depends(get_db)):
     """Get order by number"""
     service = OutboundService(db)
     order = service.get_order_by_number(order_number)
@@ -63,7 +63,7 @@ async def get_order_by_number(order_number: str, db: Session = Depends(get_db)):
     return order
 
 @router.get("/orders/details/{order_id}")
-async def get_order_details(order_id: int, db: Session = Depends(get_db)):
+def get_order_details(order_id: int, db: Session = Depends(get_db)):
     """Get detailed order information"""
     service = OutboundService(db)
     details = service.get_order_details(order_id)
@@ -72,7 +72,7 @@ async def get_order_details(order_id: int, db: Session = Depends(get_db)):
     return details
 
 @router.post("/orders")
-async def create_order(order: OutboundOrderCreate, db: Session = Depends(get_db)):
+def create_order(order: OutboundOrderCreate, db: Session = Depends(get_db)):
     """Create a new outbound order"""
     service = OutboundService(db)
     try:
@@ -81,7 +81,7 @@ async def create_order(order: OutboundOrderCreate, db: Session = Depends(get_db)
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/orders/{order_id}/items")
-async def add_order_item(
+def add_order_item(
     order_id: int, 
     item: OutboundItemCreate, 
     db: Session = Depends(get_db)
@@ -96,7 +96,7 @@ async def add_order_item(
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.put("/orders/{order_id}/status/{status}")
-async def update_order_status(
+def update_order_status(
     order_id: int, 
     status: str, 
     db: Session = Depends(get_db)
@@ -109,7 +109,7 @@ async def update_order_status(
     return {"message": f"Order status updated to {status}"}
 
 @router.post("/items/{item_id}/pick")
-async def pick_item(
+def pick_item(
     item_id: int,
     pick_data: PickItemRequest,
     db: Session = Depends(get_db)
@@ -124,7 +124,7 @@ async def pick_item(
     return {"message": "Item picked quantity updated"}
 
 @router.post("/items/{item_id}/pack")
-async def pack_item(
+def pack_item(
     item_id: int,
     pack_data: PackItemRequest,
     db: Session = Depends(get_db)
@@ -139,7 +139,7 @@ async def pack_item(
     return {"message": "Item packed quantity updated"}
 
 @router.get("/orders/{order_id}/stock-check")
-async def check_stock_availability(order_id: int, db: Session = Depends(get_db)):
+def check_stock_availability(order_id: int, db: Session = Depends(get_db)):
     """Check stock availability for order"""
     service = OutboundService(db)
     return service.check_stock_availability(order_id)
@@ -5,6 +5,7 @@ from pydantic import BaseModel
 from datetime import datetime
 from ..database import get_db
 from ..services.enhanced_analytics_service import EnhancedAnalyticsService
+from ..services.service_container import get_service_container
 
 router = APIRouter(prefix="/analytics/ultra", tags=["Ultra Analytics"])
 
@@ -43,11 +44,11 @@ class StrategicDashboardResponse(BaseModel):
     generated_at: str
 
 # Initialize service
-ultra_analytics_service = EnhancedAnalyticsService()
+ultra_analytics_service = EnhancedAnalyticsService(llm_service=get_service_container().llm_service)
 
 @router.get("/multi-dimensional", response_model=UltraAnalyticsResponse, 
            summary="Multi-Dimensional Business Intelligence")
-async def get_multi_dimensional_analytics(
+def get_multi_dimensional_analytics(
     analysis_type: str = "comprehensive",
     db: Session = Depends(get_db)
 ):
@@ -62,7 +63,7 @@ async def get_multi_dimensional_analytics(
 
 @router.get("/predictive", response_model=PredictiveAnalyticsResponse, 
            summary="Predictive Business Intelligence")
-async def get_predictive_analytics(
+def get_predictive_analytics(
     horizon: int = 12,
     db: Session = Depends(get_db)
 ):
@@ -77,7 +78,7 @@ async def get_predictive_analytics(
 
 @router.get("/cognitive", response_model=CognitiveInsightsResponse, 
            summary="Cognitive Business Insights")
-async def get_cognitive_insights(
+def get_cognitive_insights(
     focus_area: str = "strategic",
     db: Session = Depends(get_db)
 ):
@@ -91,7 +92,7 @@ async def get_cognitive_insights(
         raise HTTPException(status_code=500, detail=f"Error in cognitive analysis: {str(e)}")
 
 @router.get("/optimization-engine", summary="AI Optimization Engine")
-async def get_optimization_recommendations(
+def get_optimization_recommendations(
     scope: str = "full_warehouse",
     db: Session = Depends(get_db)
 ):
@@ -114,7 +115,7 @@ async def get_optimization_recommendations(
 
 @router.get("/strategic-dashboard", response_model=StrategicDashboardResponse, 
            summary="Strategic Intelligence Dashboard")
-async def get_strategic_dashboard(
+def get_strategic_dashboard(
     db: Session = Depends(get_db)
 ):
     """
@@ -150,7 +151,7 @@ async def get_strategic_dashboard(
         raise HTTPException(status_code=500, detail=f"Error generating strategic dashboard: {str(e)}")
 
 @router.get("/innovation-opportunities", summary="Innovation Opportunities Analysis")
-async def get_innovation_opportunities(
+def get_innovation_opportunities(
     sector: str = "all",
     db: Session = Depends(get_db)
 ):
@@ -212,7 +213,7 @@ async def get_innovation_opportunities(
         raise HTTPException(status_code=500, detail=f"Error analyzing innovation opportunities: {str(e)}")
 
 @router.get("/health-check", summary="Ultra Analytics Health Check")
-async def ultra_analytics_health_check():
+def ultra_analytics_health_check():
     """
     Check the health and availability of ultra-enhanced analytics services
     """
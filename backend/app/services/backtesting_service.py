@@ -0,0 +1,282 @@
+import argparse
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from sqlalchemy.orm import Session
+from ..models.database_models import Product
+from .batch_forecasting_service import (
+    BatchForecastingService, WeeklyDemand, exponential_smoothing_forecast, forecast_demand,
+    holt_winters_forecast, moving_average_forecast
+)
+from .parallel_forecasting_service import tune_seasonal_forecasts
+from .sales_ingestion_service import SEASON_BY_MONTH
+
+logger = logging.getLogger(__name__)
+
+def naive_forecast(demand: WeeklyDemand, horizon: int) -> np.ndarray:
+    """Last observed week, repeated"""
+    return np.repeat(demand.matrix[:, -1:], horizon, axis=1)
+
+def seasonal_naive_forecast(demand: WeeklyDemand, horizon: int, season_length: int = 52) -> np.ndarray:
+    """Same week one season earlier; NaN for products with less than a season of history"""
+    Y, start = demand.matrix, demand.start
+    T = demand.week_count
+    forecast = np.full((Y.shape[0], horizon), np.nan)
+    if T < season_length:
+        return forecast
+    columns = T - season_length + np.arange(horizon) % season_length
+    eligible = T - start >= season_length
+    forecast[eligible] = Y[eligible][:, columns]
+    return forecast
+
+def _statistical_forecasters(season_length: int) -> Dict[str, Callable[[WeeklyDemand, int], np.ndarray]]:
+    return {
+        "naive": naive_forecast,
+        "seasonal_naive": lambda demand, horizon: seasonal_naive_forecast(demand, horizon, season_length),
+        "moving_average": lambda demand, horizon: moving_average_forecast(demand, horizon)[0],
+        "exponential_smoothing": lambda demand, horizon: exponential_smoothing_forecast(demand, horizon)[0],
+        "holt_winters": lambda demand, horizon: holt_winters_forecast(demand, horizon, season_length=season_length)[0],
+        "batch": lambda demand, horizon: forecast_demand(demand, horizon, season_length=season_length)["forecast"],
+        "tuned": lambda demand, horizon: tune_seasonal_forecasts(demand, horizon)["forecast"],
+    }
+
+LLM_FORECASTER = "llm"
+# Run when no forecasters are named; the LLM path is opt-in (one blocking call per SKU and origin)
+DEFAULT_FORECASTERS = list(_statistical_forecasters(52))
+FORECASTERS = DEFAULT_FORECASTERS + [LLM_FORECASTER]
+
+class _ErrorTotals:
+    """Per-product error sums for one forecaster across all origins"""
+
+    def __init__(self, products: int):
+        self.abs_error = np.zeros(products)
+        self.actual = np.zeros(products)
+        self.forecast = np.zeros(products)
+        self.percentage_error = np.zeros(products)
+        self.percentage_points = np.zeros(products, dtype=np.int64)
+        self.forecasts = np.zeros(products, dtype=np.int64)  # (product, origin) forecasts evaluated
+        self.seconds = 0.0
+        self.fallbacks = 0
+
+    def add(self, rows: np.ndarray, forecast: np.ndarray, actual: np.ndarray):
+        # NaN: the forecaster had no forecast for that product at this origin
+        valid = ~np.isnan(forecast)
+        forecast = np.where(valid, np.clip(np.nan_to_num(forecast), 0, None), 0.0)
+        actual = np.where(valid, actual, 0.0)
+        error = np.abs(forecast - actual)
+        positive = valid & (actual > 0)
+        self.abs_error[rows] += error.sum(axis=1)
+        self.actual[rows] += actual.sum(axis=1)
+        self.forecast[rows] += forecast.sum(axis=1)
+        self.percentage_error[rows] += np.where(positive, error / np.where(positive, actual, 1), 0).sum(axis=1)
+        self.percentage_points[rows] += positive.sum(axis=1)
+        self.forecasts[rows] += valid.any(axis=1)
+
+def _accuracy(abs_error: float, actual: float, forecast: float, percentage_error: float, percentage_points: int) -> Dict:
+    """MAPE (over weeks with sales), WAPE and bias, in percent"""
+    return {
+        "mape": round(100 * percentage_error / percentage_points, 2) if percentage_points else None,
+        "wape": round(100 * abs_error / actual, 2) if actual else None,
+        "bias": round(100 * (forecast - actual) / actual, 2) if actual else None,
+    }
+
+class BacktestingService:
+    """
+    Rolling-origin backtests of the demand forecasters.
+
+    Sales history is loaded once as a product x week matrix. At each origin
+    every forecaster sees only the weeks before it and forecasts `horizon`
+    weeks, which are scored against what actually sold. Accuracy (MAPE, WAPE,
+    bias) and runtime are reported per SKU and in aggregate, so forecasters
+    can be chosen on both accuracy and cost per SKU. The ranking holds only
+    forecasters scored on every (SKU, origin) pair.
+    """
+
+    def __init__(self, horizon: int = 4, origins: int = 8, step: int = 1, min_train_weeks: int = 8,
+                 history_weeks: int = 104, season_length: int = 52, llm_max_products: int = 20):
+        self.horizon = horizon
+        self.origins = origins
+        self.step = step
+        self.min_train_weeks = min_train_weeks
+        self.season_length = season_length
+        self.llm_max_products = llm_max_products
+        self.batch = BatchForecastingService(history_weeks=history_weeks)
+
+    def origin_columns(self, week_count: int) -> List[int]:
+        """Matrix columns where forecasts start, latest last; each leaves `horizon` weeks to score"""
+        last = week_count - self.horizon
+        columns = range(last - (self.origins - 1) * self.step, last + 1, self.step)
+        return [column for column in columns if column >= self.min_train_weeks]
+
+    def run(self, db: Session, forecasters: Optional[List[str]] = None, product_ids: Optional[List[int]] = None,
+            as_of: Optional[datetime] = None, forecasting_service=None, include_per_sku: bool = True) -> Dict:
+        """
+        Backtest `forecasters` (default: the statistical ones; "llm" must be named,
+        needs `forecasting_service` and is limited to the first `llm_max_products` SKUs)
+        """
+        try:
+            forecasters = forecasters or DEFAULT_FORECASTERS
+            statistical = _statistical_forecasters(self.season_length)
+            unknown = [name for name in forecasters if name not in statistical and name != LLM_FORECASTER]
+            if unknown:
+                return {"success": False, "error": f"Unknown forecasters: {', '.join(unknown)}"}
+            if LLM_FORECASTER in forecasters and forecasting_service is None:
+                return {"success": False, "error": "The llm forecaster needs a ForecastingService"}
+
+            demand = self.batch.load_weekly_demand(db, product_ids, as_of=as_of)
+            origins = self.origin_columns(demand.week_count)
+            if not origins:
+                return {"success": False, "error": "Not enough sales history for a backtest"}
+
+            products = len(demand.product_ids)
+            totals = {name: _ErrorTotals(products) for name in forecasters}
+            pairs = 0  # (product, origin) pairs with enough training history to be scored
+            llm_products = self._llm_products(db, demand) if LLM_FORECASTER in forecasters else {}
+
+            for origin in origins:
+                rows = np.flatnonzero(origin - demand.start >= self.min_train_weeks)
+                if rows.size == 0:
+                    continue
+                pairs += rows.size
+                train = WeeklyDemand(demand.product_ids[rows], demand.first_week,
+                                     demand.matrix[rows, :origin], demand.start[rows])
+                actual = demand.matrix[rows, origin:origin + self.horizon]
+                for name in forecasters:
+                    started = time.perf_counter()
+                    if name == LLM_FORECASTER:
+                        forecast = self._llm_forecast(forecasting_service, llm_products, train, totals[name])
+                    else:
+                        forecast = statistical[name](train, self.horizon)
+                    totals[name].seconds += time.perf_counter() - started
+                    totals[name].add(rows, forecast, actual)
+
+            return self._report(db, demand, origins, pairs, totals, include_per_sku)
+
+        except Exception as e:
+            logger.error(f"Error running forecast backtest: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    def _llm_products(self, db: Session, demand: WeeklyDemand) -> Dict[int, Product]:
+        ids = demand.product_ids[:self.llm_max_products].tolist()
+        return {product.id: product for product in db.query(Product).filter(Product.id.in_(ids)).all()}
+
+    def _llm_forecast(self, forecasting_service, llm_products: Dict[int, Product], train: WeeklyDemand,
+                      totals: _ErrorTotals) -> np.ndarray:
+        """The per-product AI path, prompted with the weekly history before the origin"""
+        forecast = np.full((len(train.product_ids), self.horizon), np.nan)
+        for row, product_id in enumerate(train.product_ids.tolist()):
+            product = llm_products.get(product_id)
+            if product is None:
+                continue
+            history = [
+                {
+                    "date": train.week_start(column),
+                    "quantity": train.matrix[row, column],
+                    "value": 0.0,
+                    "season": SEASON_BY_MONTH[train.week_start(column).month],
+                    "channel": "all"
+                }
+                for column in range(max(int(train.start[row]), train.week_count - 100), train.week_count)
+            ]
+            summary = forecasting_service._prepare_sales_summary(history)
+            result = forecasting_service._get_ai_forecast(product, summary, self.horizon)
+            if result.get("fallback"):
+                totals.fallbacks += 1
+            forecast[row] = [float(result.get(f"week_{week}", 0) or 0) for week in range(1, self.horizon + 1)]
+        return forecast
+
+    def _report(self, db: Session, demand: WeeklyDemand, origins: List[int], pairs: int,
+                totals: Dict[str, _ErrorTotals], include_per_sku: bool) -> Dict:
+        forecasters = {}
+        for name, total in totals.items():
+            evaluated = total.forecasts > 0
+            forecast_count = int(total.forecasts.sum())
+            forecasters[name] = dict(
+                _accuracy(total.abs_error.sum(), total.actual.sum(), total.forecast.sum(),
+                          total.percentage_error.sum(), int(total.percentage_points.sum())),
+                skus=int(evaluated.sum()),
+                forecasts=forecast_count,
+                coverage=round(forecast_count / pairs, 4) if pairs else None,
+                runtime_seconds=round(total.seconds, 4),
+                # Cost of forecasting one SKU once (amortized for the vectorized forecasters)
+                seconds_per_sku=round(total.seconds / forecast_count, 6) if forecast_count else None
+            )
+            if name == LLM_FORECASTER:
+                forecasters[name]["fallback_forecasts"] = total.fallbacks
+
+        # Aggregate WAPEs compare only over the same (SKU, origin) pairs: forecasters that skipped
+        # some (no full season, LLM sample) are listed with their coverage instead of ranked
+        scored = [name for name in forecasters if forecasters[name]["wape"] is not None]
+        ranked = sorted((name for name in scored if totals[name].forecasts.sum() == pairs),
+                        key=lambda name: forecasters[name]["wape"])
+        partial = {name: forecasters[name]["coverage"] for name in scored if name not in ranked}
+        report = {
+            "success": True,
+            "horizon_weeks": self.horizon,
+            "origins": [demand.week_start(origin).strftime("%Y-%m-%d") for origin in origins],
+            "total_skus": len(demand.product_ids),
+            "forecasters": forecasters,
+            "ranking": ranked,
+            "partial_coverage": partial
+        }
+
+        if include_per_sku:
+            skus = dict(db.query(Product.id, Product.sku).filter(Product.id.in_(demand.product_ids.tolist())).all()) \
+                if len(demand.product_ids) else {}
+            per_sku = []
+            for row, product_id in enumerate(demand.product_ids.tolist()):
+                entry = {"product_id": product_id, "sku": skus.get(product_id)}
+                for name, total in totals.items():
+                    if total.forecasts[row]:
+                        entry[name] = _accuracy(total.abs_error[row], total.actual[row], total.forecast[row],
+                                                total.percentage_error[row], int(total.percentage_points[row]))
+                per_sku.append(entry)
+            report["per_sku"] = per_sku
+        return report
+
+def main():
+    """Print a backtest of the current database: python -m app.services.backtesting_service (from backend/)"""
+    from ..database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of the demand forecasters")
+    parser.add_argument("--horizon", type=int, default=4)
+    parser.add_argument("--origins", type=int, default=8)
+    parser.add_argument("--forecasters", help=f"comma-separated subset of {', '.join(FORECASTERS)}")
+    parser.add_argument("--llm", action="store_true", help="include the LLM path")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        forecasting_service = None
+        if args.llm:
+            from .forecasting_service import ForecastingService
+            forecasting_service = ForecastingService()
+        forecasters = args.forecasters.split(",") if args.forecasters else list(DEFAULT_FORECASTERS)
+        if args.llm and LLM_FORECASTER not in forecasters:
+            forecasters.append(LLM_FORECASTER)
+        report = BacktestingService(horizon=args.horizon, origins=args.origins).run(
+            db, forecasters, forecasting_service=forecasting_service, include_per_sku=False
+        )
+    finally:
+        db.close()
+
+    if not report["success"]:
+        print(f"Backtest failed: {report['error']}")
+        return 1
+    print(f"{report['total_skus']} SKUs, {len(report['origins'])} origins, {report['horizon_weeks']}-week horizon")
+    print(f"{'forecaster':<22} {'MAPE %':>8} {'WAPE %':>8} {'bias %':>8} {'SKUs':>6} {'s/SKU':>10}")
+    for name in report["ranking"]:
+        result = report["forecasters"][name]
+        mape = f"{result['mape']:.1f}" if result["mape"] is not None else "-"
+        print(f"{name:<22} {mape:>8} {result['wape']:>8.1f} {result['bias']:>8.1f} "
+              f"{result['skus']:>6} {result['seconds_per_sku']:>10.6f}")
+    for name, coverage in report["partial_coverage"].items():
+        result = report["forecasters"][name]
+        print(f"{name:<22} not ranked: scored on {100 * coverage:.1f}% of SKU-origins "
+              f"(WAPE {result['wape']:.1f}% on those)")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
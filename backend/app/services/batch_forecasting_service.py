@@ -0,0 +1,350 @@
+import itertools
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from sqlalchemy import Integer, cast, func, insert, select
+from sqlalchemy.orm import Session
+from ..models.database_models import Product, SalesHistory, DemandForecast
+from .forecast_cache import prune_superseded_forecasts
+
+logger = logging.getLogger(__name__)
+
+METHOD_MOVING_AVERAGE = "moving_average"
+METHOD_EXPONENTIAL_SMOOTHING = "exponential_smoothing"
+METHOD_HOLT_WINTERS = "holt_winters"
+FORECAST_METHODS = [METHOD_MOVING_AVERAGE, METHOD_EXPONENTIAL_SMOOTHING, METHOD_HOLT_WINTERS]
+
+METHOD_LABELS = {
+    METHOD_MOVING_AVERAGE: "moving average",
+    METHOD_EXPONENTIAL_SMOOTHING: "exponential smoothing",
+    METHOD_HOLT_WINTERS: "Holt-Winters",
+}
+
+# Weeks are numbered from this Monday
+WEEK_ORIGIN = np.datetime64("1970-01-05")
+
+class WeeklyDemand:
+    """Product x week demand matrix; weeks before a product's first sale are not observed"""
+
+    def __init__(self, product_ids: np.ndarray, first_week: int, matrix: np.ndarray, start: np.ndarray):
+        self.product_ids = product_ids  # (n,)
+        self.first_week = first_week  # week number of column 0
+        self.matrix = matrix  # (n, T) units sold per week
+        self.start = start  # (n,) column of each product's first sale
+
+    @property
+    def week_count(self) -> int:
+        return self.matrix.shape[1]
+
+    def week_start(self, column: int) -> datetime:
+        """Monday of the week in `column`"""
+        return week_start(self.first_week + column)
+
+def week_start(week: int) -> datetime:
+    """Monday 00:00 of a week number"""
+    return pd.Timestamp(WEEK_ORIGIN + np.timedelta64(7 * week, "D")).to_pydatetime()
+
+def week_numbers(dates) -> np.ndarray:
+    """Week number (weeks since WEEK_ORIGIN, Monday-based) of each date"""
+    days = np.asarray(dates, dtype="datetime64[D]")
+    return ((days - WEEK_ORIGIN).astype(np.int64) // 7).astype(np.int64)
+
+def _week_number_expression(dialect_name: str):
+    """SQL for week_numbers(SalesHistory.sale_date), or None if the backend has no date arithmetic for it"""
+    if dialect_name == "sqlite":
+        # julianday('1970-01-05') == 2440591.5
+        return cast((func.julianday(SalesHistory.sale_date) - 2440591.5) / 7, Integer)
+    if dialect_name == "postgresql":
+        # 1970-01-05 is 345600 seconds after the Unix epoch
+        return cast(func.floor((func.extract("epoch", SalesHistory.sale_date) - 345600) / 604800), Integer)
+    return None
+
+def build_weekly_demand(product_ids, sale_dates, quantities, history_weeks: Optional[int] = None,
+                        last_week: Optional[int] = None, weeks=None) -> WeeklyDemand:
+    """
+    Pivot sales rows into a product x week matrix ending at `last_week`
+    (default: latest sale). Pass `weeks` instead of `sale_dates` for rows
+    already bucketed by week number.
+    """
+    frame = pd.DataFrame({
+        "product_id": np.asarray(product_ids, dtype=np.int64),
+        "week": week_numbers(sale_dates) if weeks is None else np.asarray(weeks, dtype=np.int64),
+        "quantity": np.asarray(quantities, dtype=float),
+    })
+    if frame.empty:
+        return WeeklyDemand(np.array([], dtype=np.int64), 0, np.zeros((0, 0)), np.array([], dtype=np.int64))
+
+    if last_week is None:
+        last_week = int(frame["week"].max())
+    first_week = int(frame["week"].min())
+    if history_weeks is not None:
+        first_week = max(first_week, last_week - history_weeks + 1)
+    frame = frame[(frame["week"] >= first_week) & (frame["week"] <= last_week)]
+
+    weekly = frame.groupby(["product_id", "week"])["quantity"].sum().unstack(fill_value=0.0)
+    weekly = weekly.reindex(columns=range(first_week, last_week + 1), fill_value=0.0)
+    matrix = weekly.to_numpy(dtype=float)
+    start = np.argmax(matrix > 0, axis=1)
+    return WeeklyDemand(weekly.index.to_numpy(dtype=np.int64), first_week, matrix, start)
+
+def moving_average_forecast(demand: WeeklyDemand, horizon: int, window: int = 4) -> Tuple[np.ndarray, np.ndarray]:
+    """Mean of the last `window` observed weeks; returns (forecast (n, horizon), in-sample MAE (n,))"""
+    Y, start = demand.matrix, demand.start
+    n, T = Y.shape
+    observed = np.maximum(T - start, 1)
+    recent = np.minimum(observed, window)
+    cumulative = np.concatenate([np.zeros((n, 1)), np.cumsum(Y, axis=1)], axis=1)
+    level = (cumulative[:, T] - cumulative[np.arange(n), T - recent]) / recent
+
+    # One-step-ahead error of the trailing mean, once a full window has been observed
+    t = np.arange(T)
+    trailing = np.full((n, T), np.nan)
+    if T > window:
+        trailing[:, window:] = (cumulative[:, window:T] - cumulative[:, :T - window]) / window
+    active = t[None, :] >= (start + window)[:, None]
+    errors = np.where(active, np.abs(Y - trailing), np.nan)
+    return np.repeat(level[:, None], horizon, axis=1), _mean_ignoring_nan(errors)
+
+def exponential_smoothing_forecast(demand: WeeklyDemand, horizon: int, alpha: float = 0.3) -> Tuple[np.ndarray, np.ndarray]:
+    """Simple exponential smoothing; returns (forecast (n, horizon), in-sample MAE (n,))"""
+    Y, start = demand.matrix, demand.start
+    n, T = Y.shape
+    level = Y[np.arange(n), start] if T else np.zeros(n)
+    errors = np.full((n, T), np.nan)
+    for t in range(T):
+        active = t > start
+        errors[:, t] = np.where(active, np.abs(Y[:, t] - level), np.nan)
+        level = np.where(active, alpha * Y[:, t] + (1 - alpha) * level, level)
+    return np.repeat(level[:, None], horizon, axis=1), _mean_ignoring_nan(errors)
+
+def holt_winters_forecast(demand: WeeklyDemand, horizon: int, season_length: int = 52, alpha: float = 0.3,
+                          beta: float = 0.05, gamma: float = 0.2) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Additive Holt-Winters; returns (forecast (n, horizon), in-sample MAE (n,)).
+    Smoothing parameters may be scalars or per-product (n,) arrays. Products
+    with fewer than two full seasons of history get NaN.
+    """
+    Y, start = demand.matrix, demand.start
+    n, T = Y.shape
+    m = season_length
+    forecast = np.full((n, horizon), np.nan)
+    mae = np.full(n, np.nan)
+    eligible = np.flatnonzero(T - start >= 2 * m)
+    if eligible.size == 0:
+        return forecast, mae
+
+    Y, start = Y[eligible], start[eligible]
+    alpha, beta, gamma = (np.broadcast_to(np.asarray(value, dtype=float), (n,))[eligible]
+                          for value in (alpha, beta, gamma))
+    rows = np.arange(eligible.size)
+    first = np.take_along_axis(Y, start[:, None] + np.arange(m), axis=1)
+    second = np.take_along_axis(Y, start[:, None] + m + np.arange(m), axis=1)
+    level = first.mean(axis=1)
+    trend = (second.mean(axis=1) - level) / m
+    seasonal = first - level[:, None]
+
+    errors = np.full((eligible.size, T), np.nan)
+    for t in range(T):
+        since_start = t - start
+        active = since_start >= m
+        position = since_start % m
+        season = seasonal[rows, position]
+        errors[:, t] = np.where(active, np.abs(Y[:, t] - (level + trend + season)), np.nan)
+
+        new_level = alpha * (Y[:, t] - season) + (1 - alpha) * (level + trend)
+        new_trend = beta * (new_level - level) + (1 - beta) * trend
+        new_season = gamma * (Y[:, t] - new_level) + (1 - gamma) * season
+        level = np.where(active, new_level, level)
+        trend = np.where(active, new_trend, trend)
+        seasonal[rows[active], position[active]] = new_season[active]
+
+    steps = np.arange(1, horizon + 1)
+    positions = (T - start)[:, None] + steps[None, :] - 1
+    forecast[eligible] = level[:, None] + trend[:, None] * steps[None, :] + \
+        np.take_along_axis(seasonal, positions % m, axis=1)
+    mae[eligible] = _mean_ignoring_nan(errors)
+    return forecast, mae
+
+def _mean_ignoring_nan(values: np.ndarray) -> np.ndarray:
+    counts = np.sum(~np.isnan(values), axis=1)
+    totals = np.nansum(values, axis=1)
+    return np.where(counts > 0, totals / np.maximum(counts, 1), np.nan)
+
+def forecast_demand(demand: WeeklyDemand, horizon: int, season_length: int = 52,
+                    methods: Optional[List[str]] = None) -> Dict:
+    """
+    Run every method over the whole matrix and pick, per product, the one with
+    the lowest in-sample one-step error.
+
+    Returns {"forecast": (n, horizon) units, "method": (n,) names, "error": (n,)
+    in-sample MAE (inf when unknown), "confidence": (n,) 0.1-0.95, "forecasts_by_method": {name: (n, horizon)}}.
+    """
+    methods = methods or FORECAST_METHODS
+    runners = {
+        METHOD_MOVING_AVERAGE: lambda: moving_average_forecast(demand, horizon),
+        METHOD_EXPONENTIAL_SMOOTHING: lambda: exponential_smoothing_forecast(demand, horizon),
+        METHOD_HOLT_WINTERS: lambda: holt_winters_forecast(demand, horizon, season_length=season_length),
+    }
+    results = {method: runners[method]() for method in methods}
+
+    errors = np.column_stack([results[method][1] for method in methods])
+    # Products with too little history for any error estimate fall back to the first method
+    errors = np.where(np.isnan(errors), np.inf, errors)
+    best = np.argmin(errors, axis=1)
+    stacked = np.stack([results[method][0] for method in methods], axis=1)  # (n, methods, horizon)
+    forecast = stacked[np.arange(len(best)), best]
+    forecast = np.clip(np.nan_to_num(forecast), 0, None)
+
+    best_error = errors[np.arange(len(best)), best]
+    return {
+        "forecast": forecast,
+        "method": np.array(methods)[best],
+        "error": best_error,
+        "confidence": forecast_confidence(demand, best_error),
+        "forecasts_by_method": {method: results[method][0] for method in methods},
+    }
+
+def forecast_confidence(demand: WeeklyDemand, error: np.ndarray) -> np.ndarray:
+    """0.1-0.95 confidence from in-sample MAE relative to mean weekly demand (inf / NaN: no estimate)"""
+    mean_demand = demand.matrix.sum(axis=1) / np.maximum(demand.week_count - demand.start, 1)
+    relative_error = np.where(np.isfinite(error), error / np.maximum(mean_demand, 1e-9), 1.0)
+    return np.clip(1 - relative_error, 0.1, 0.95)
+
+def forecast_records(product_id: int, forecast_dates: List[datetime], predicted: List[int], confidence: float,
+                     model_version: str, now: datetime) -> List[Dict]:
+    """DemandForecast rows for one product, ready for a bulk insert"""
+    return [
+        {
+            "product_id": product_id,
+            "forecast_date": forecast_date,
+            "predicted_demand": demand_units,
+            "confidence_level": confidence,
+            "forecast_type": "weekly",
+            "ai_generated": False,
+            "model_version": model_version,
+            "created_at": now,
+            "updated_at": now
+        }
+        for forecast_date, demand_units in zip(forecast_dates, predicted)
+    ]
+
+class BatchForecastingService:
+    """
+    Statistical demand forecasts for every product at once.
+
+    All sales history is read in one query and pivoted into a product x week
+    matrix; moving average, exponential smoothing and Holt-Winters run over the
+    whole matrix with NumPy, and the forecasts are written with one bulk insert.
+    """
+
+    def __init__(self, history_weeks: int = 104, season_length: int = 52):
+        self.history_weeks = history_weeks
+        self.season_length = season_length
+
+    def load_weekly_demand(self, db: Session, product_ids: Optional[List[int]] = None,
+                           as_of: Optional[datetime] = None) -> WeeklyDemand:
+        """Weekly units sold per product up to the last complete week before `as_of`, from one query"""
+        last_week = int(week_numbers([as_of or datetime.utcnow()])[0]) - 1
+        first_week = last_week - self.history_weeks + 1
+        conditions = [
+            SalesHistory.sale_date >= week_start(first_week),
+            SalesHistory.sale_date < week_start(last_week + 1)
+        ]
+        if product_ids is not None:
+            conditions.append(SalesHistory.product_id.in_(product_ids))
+
+        week = _week_number_expression(db.get_bind().dialect.name)
+        if week is None:
+            # No SQL week arithmetic for this backend: bucket the raw rows in NumPy
+            rows = db.execute(select(
+                SalesHistory.product_id, SalesHistory.sale_date, SalesHistory.quantity_sold
+            ).where(*conditions)).all()
+            if not rows:
+                return build_weekly_demand([], [], [])
+            product_column, date_column, quantity_column = zip(*rows)
+            return build_weekly_demand(product_column, date_column, quantity_column,
+                                       history_weeks=self.history_weeks, last_week=last_week)
+
+        # Week numbers are computed in SQL, so only integers cross into Python. PostgreSQL
+        # also sums per week (hash aggregate, less to transfer); for in-process SQLite the
+        # GROUP BY sort costs more than letting pandas sum the rows.
+        query = select(SalesHistory.product_id, week, SalesHistory.quantity_sold).where(*conditions)
+        if db.get_bind().dialect.name == "postgresql":
+            query = select(SalesHistory.product_id, week, func.sum(SalesHistory.quantity_sold)).where(
+                *conditions
+            ).group_by(SalesHistory.product_id, week)
+        # A Core result flattened with fromiter avoids per-row ORM and NumPy object overhead
+        result = db.connection().execute(query)
+        weekly = np.fromiter(itertools.chain.from_iterable(result), dtype=np.int64).reshape(-1, 3)
+        return build_weekly_demand(weekly[:, 0], None, weekly[:, 2], history_weeks=self.history_weeks,
+                                   last_week=last_week, weeks=weekly[:, 1])
+
+    def generate_all_forecasts(self, db: Session, weeks: int = 4, products: Optional[List] = None) -> Dict:
+        """Forecast `weeks` ahead for every product (or the given Product rows) and store the results"""
+        try:
+            product_ids = None
+            if products is None:
+                products = db.query(Product.id, Product.sku, Product.name, Product.reorder_level).all()
+            else:
+                product_ids = [product.id for product in products]
+            # One UTC clock for the demand window, the forecast dates and the pruning cutoff
+            now = datetime.utcnow()
+            demand = self.load_weekly_demand(db, product_ids, as_of=now)
+            results = forecast_demand(demand, weeks, season_length=self.season_length)
+            row_of = {product_id: row for row, product_id in enumerate(demand.product_ids.tolist())}
+
+            forecast_dates = [now + timedelta(weeks=week) for week in range(1, weeks + 1)]
+            forecasts = []
+            records = []
+            for product in products:
+                row = row_of.get(product.id)
+                if row is None:
+                    # No sales history: same reorder-level heuristic as the single-product path
+                    predicted = [(product.reorder_level or 0) // 2] * weeks
+                    confidence = 0.5
+                    model_version = "simple_heuristic"
+                    insights = ["Forecast based on reorder level due to limited historical data"]
+                else:
+                    predicted = [int(round(value)) for value in results["forecast"][row]]
+                    confidence = round(float(results["confidence"][row]), 2)
+                    method = str(results["method"][row])
+                    model_version = f"batch_{method}"
+                    observed_weeks = demand.week_count - int(demand.start[row])
+                    insights = [f"{METHOD_LABELS[method].capitalize()} forecast from {observed_weeks} weeks of sales history"]
+
+                records.extend(forecast_records(product.id, forecast_dates, predicted, confidence, model_version, now))
+                forecasts.append({
+                    "success": True,
+                    "product": {"id": product.id, "sku": product.sku, "name": product.name},
+                    "forecasts": [
+                        {
+                            "week": week,
+                            "date": forecast_date.strftime("%Y-%m-%d"),
+                            "predicted_demand": demand_units,
+                            "confidence": confidence
+                        }
+                        for week, (forecast_date, demand_units) in enumerate(zip(forecast_dates, predicted), 1)
+                    ],
+                    "ai_insights": insights
+                })
+
+            # Each product's new forecasts replace its outstanding ones
+            prune_superseded_forecasts(db, product_ids, now=now)
+            if records:
+                db.execute(insert(DemandForecast.__table__), records)
+            db.commit()
+
+            return {
+                "success": True,
+                "total_products": len(products),
+                "successful_forecasts": len(forecasts),
+                "forecasts": forecasts,
+                "errors": []
+            }
+
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error generating batch forecasts: {str(e)}")
+            return {"success": False, "error": str(e)}
@@ -12,18 +12,29 @@ from .inventory_service import InventoryService
 from .inbound_service import InboundService
 from .outbound_service import OutboundService
 from .enhanced_nlp_processor import EnhancedNLPProcessor
+from .product_name_index import ProductNameIndex, get_product_name_index
+from .low_stock_index import get_low_stock_index
 
 class ChatbotService:
     """Enhanced chatbot service with natural language understanding for layman queries"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, nlp_processor: Optional[EnhancedNLPProcessor] = None,
+                 forecasting_service=None, space_service=None,
+                 product_index: Optional[ProductNameIndex] = None):
         self.db = db
         self.inventory_service = InventoryService(db)
         self.inbound_service = InboundService(db)
         self.outbound_service = OutboundService(db)
-        self.enhanced_nlp = EnhancedNLPProcessor()  # Enhanced NLP processor
-        
-        # Phase 3 services (if available)
+        self.enhanced_nlp = nlp_processor or EnhancedNLPProcessor()  # Enhanced NLP processor
+        self.product_index = product_index or get_product_name_index()  # Shared product name index
+
+        # Phase 3 services - reuse shared instances when provided (see ServiceContainer)
+        if forecasting_service is not None and space_service is not None:
+            self.forecasting_service = forecasting_service
+            self.space_service = space_service
+            self.phase3_enabled = True
+            return
+
         try:
             from .forecasting_service import ForecastingService
             from .space_optimization_service import SpaceOptimizationService
@@ -486,16 +497,13 @@ What would you like me to help you with?""",
         except Exception as e:
             return self._generate_inventory_error_response(str(e))
     
-    def _find_product_by_name(self, product_name: str) -> Optional[Product]:
+    def _find_product_by_name(self, product_name: str, retry: bool = True) -> Optional[Product]:
         """Enhanced product finding with fuzzy matching, synonyms, and plural handling"""
-        products = self.db.query(Product).all()
+        index = self.product_index
         product_name_clean = self._clean_product_name(product_name)
         
         print(f"Debug: Searching for '{product_name_clean}'")
-        print(f"Debug: Total products in database: {len(products)}")
-        if products:
-            product_names = [p.name for p in products[:5]]  # Show first 5
-            print(f"Debug: Available products: {product_names}")
+        print(f"Debug: Total products in index: {index.size(self.db)}")
         
         # Product synonyms for better matching
         product_synonyms = {
@@ -510,18 +518,24 @@ What would you like me to help you with?""",
         }
         
         # 1. Exact match (case insensitive)
-        for product in products:
-            if product.name.lower() == product_name_clean.lower():
-                print(f"Debug: Exact match found: {product.name}")
-                return product
+        product_id = index.find_exact(self.db, product_name_clean)
+        if product_id is not None:
+            product = self._get_product(product_id)
+            if product is None:
+                return self._retry_with_fresh_index(product_name, retry)
+            print(f"Debug: Exact match found: {product.name}")
+            return product
         
         # 2. Handle plurals - try singular forms
         singular_name = self._get_singular_form(product_name_clean)
         if singular_name != product_name_clean:
-            for product in products:
-                if product.name.lower() == singular_name.lower():
-                    print(f"Debug: Singular match found: {product.name}")
-                    return product
+            product_id = index.find_exact(self.db, singular_name)
+            if product_id is not None:
+                product = self._get_product(product_id)
+                if product is None:
+                    return self._retry_with_fresh_index(product_name, retry)
+                print(f"Debug: Singular match found: {product.name}")
+                return product
         
         # 3. Check synonyms
         search_terms = [product_name_clean.lower()]
@@ -529,52 +543,56 @@ What would you like me to help you with?""",
             search_terms.extend(product_synonyms[product_name_clean.lower()])
         
         for search_term in search_terms:
-            for product in products:
-                if search_term.lower() in product.name.lower():
-                    print(f"Debug: Synonym match found: {product.name} (searched for: {search_term})")
-                    return product
-        
-        # 4. Partial match (either direction)
-        for product in products:
-            if (product_name_clean.lower() in product.name.lower() or 
-                product.name.lower() in product_name_clean.lower()):
-                print(f"Debug: Partial match found: {product.name}")
+            product_id = index.find_containing(self.db, search_term)
+            if product_id is not None:
+                product = self._get_product(product_id)
+                if product is None:
+                    return self._retry_with_fresh_index(product_name, retry)
+                print(f"Debug: Synonym match found: {product.name} (searched for: {search_term})")
                 return product
         
-        # 5. Word-based fuzzy matching
-        product_words = set(product_name_clean.lower().split())
-        best_match = None
-        best_score = 0
-        
-        for product in products:
-            product_words_set = set(product.name.lower().split())
-            
-            # Calculate intersection score
-            common_words = product_words.intersection(product_words_set)
-            if common_words:
-                score = len(common_words) / max(len(product_words), len(product_words_set))
-                if score > best_score and score >= 0.5:  # At least 50% word overlap
-                    best_score = score
-                    best_match = product
-        
-        if best_match:
-            print(f"Debug: Word-based match found: {best_match.name} (score: {best_score})")
-            return best_match
-        
-        # 5. Fuzzy matching with character similarity (using difflib)
-        import difflib
-        product_names = [p.name for p in products]
-        matches = difflib.get_close_matches(product_name_clean, product_names, n=1, cutoff=0.6)
-        
-        if matches:
-            for product in products:
-                if product.name == matches[0]:
-                    print(f"Debug: Fuzzy match found: {product.name}")
-                    return product
+        # 4. Partial match (product name contained in the search term; the other
+        #    direction was already covered by the first synonym search term)
+        product_id = index.find_contained_in(self.db, product_name_clean)
+        if product_id is not None:
+            product = self._get_product(product_id)
+            if product is None:
+                return self._retry_with_fresh_index(product_name, retry)
+            print(f"Debug: Partial match found: {product.name}")
+            return product
+        
+        # 5. Word-based fuzzy matching (at least 50% word overlap)
+        word_match = index.find_best_word_overlap(self.db, product_name_clean, min_score=0.5)
+        if word_match:
+            product_id, best_score = word_match
+            product = self._get_product(product_id)
+            if product is None:
+                return self._retry_with_fresh_index(product_name, retry)
+            print(f"Debug: Word-based match found: {product.name} (score: {best_score})")
+            return product
+        
+        # 6. Fuzzy matching with character similarity (difflib over trigram candidates)
+        product_id = index.find_close_match(self.db, product_name_clean, cutoff=0.6)
+        if product_id is not None:
+            product = self._get_product(product_id)
+            if product is None:
+                return self._retry_with_fresh_index(product_name, retry)
+            print(f"Debug: Fuzzy match found: {product.name}")
+            return product
         
         print(f"Debug: No match found for '{product_name_clean}'")
         return None
     
+    def _retry_with_fresh_index(self, product_name: str, retry: bool) -> Optional[Product]:
+        """The index named a product another worker has deleted: reload it and look up once more"""
+        print("Debug: Indexed product no longer exists, reloading the index")
+        self.product_index.invalidate()
+        return self._find_product_by_name(product_name, retry=False) if retry else None
+    
+    def _get_product(self, product_id: int) -> Optional[Product]:
+        """Load a product by primary key"""
+        return self.db.query(Product).filter(Product.id == product_id).first()
+    
     def _clean_product_name(self, product_name: str) -> str:
         """Clean and normalize product name for better matching"""
         # Remove common filler words and punctuation
@@ -938,19 +956,11 @@ Please try your request again in a moment.""",
     def _handle_layman_alerts(self, message: str, entities: Dict, context: Dict, response_style: str) -> Dict:
         """Enhanced alerts and monitoring handler"""
         try:
-            # Get low stock items
-            low_stock_items = self.db.query(Product, Inventory).join(
-                Inventory, Product.id == Inventory.product_id
-            ).filter(
-                Inventory.quantity <= Product.reorder_level
-            ).all()
+            # Get low stock items (most urgent first)
+            low_stock_items = get_low_stock_index().get_low_stock_items(self.db)
             
-            # Get out of stock items
-            out_of_stock_items = self.db.query(Product, Inventory).join(
-                Inventory, Product.id == Inventory.product_id
-            ).filter(
-                Inventory.quantity <= 0
-            ).all()
+            # Out of stock items are the low stock items with nothing on hand
+            out_of_stock_items = [item for item in low_stock_items if item["quantity"] <= 0]
             
             if not low_stock_items and not out_of_stock_items:
                 return {
@@ -984,19 +994,19 @@ Keep up the excellent warehouse management!""",
             
             if out_of_stock_items:
                 alert_message += f"CRITICAL - {len(out_of_stock_items)} Out of Stock:\n"
-                for product, inventory in out_of_stock_items[:5]:  # Show max 5
-                    alert_message += f"• {product.name} (SKU: {product.sku}) - Location: {inventory.location or 'Not specified'}\n"
+                for item in out_of_stock_items[:5]:  # Show max 5
+                    alert_message += f"• {item['name']} (SKU: {item['sku']}) - Location: {item['location'] or 'Not specified'}\n"
                 
                 if len(out_of_stock_items) > 5:
                     alert_message += f"• ... and {len(out_of_stock_items) - 5} more items\n"
                 alert_message += "\n"
             
             if low_stock_items:
-                low_only = [item for item in low_stock_items if item not in out_of_stock_items]
+                low_only = [item for item in low_stock_items if item["quantity"] > 0]
                 if low_only:
                     alert_message += f"WARNING - {len(low_only)} Low Stock:\n"
-                    for product, inventory in low_only[:5]:  # Show max 5
-                        alert_message += f"• {product.name} (SKU: {product.sku}) - Qty: {inventory.quantity}/{product.reorder_level}\n"
+                    for item in low_only[:5]:  # Show max 5
+                        alert_message += f"• {item['name']} (SKU: {item['sku']}) - Qty: {item['quantity']}/{item['reorder_level']}\n"
                     
                     if len(low_only) > 5:
                         alert_message += f"• ... and {len(low_only) - 5} more items\n"
@@ -1020,8 +1030,8 @@ Need help with any specific items? Just ask me about them!"""
                     "total_alerts": total_issues,
                     "out_of_stock": len(out_of_stock_items),
                     "low_stock": len(low_stock_items),
-                    "critical_items": [{"sku": p.sku, "name": p.name, "quantity": i.quantity} 
-                                     for p, i in out_of_stock_items[:10]]
+                    "critical_items": [{"sku": item["sku"], "name": item["name"], "quantity": item["quantity"]} 
+                                     for item in out_of_stock_items[:10]]
                 },
                 "suggestions": suggestions,
                 "actions": actions,
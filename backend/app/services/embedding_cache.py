@@ -0,0 +1,102 @@
+import os
+import hashlib
+import logging
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Hashes per SELECT ... IN (...) (below SQLite's bound-parameter limit)
+LOOKUP_CHUNK_SIZE = 500
+
+def text_hash(text: str) -> str:
+    """sha256 hex digest of a document text"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """
+    Persistent embedding vectors keyed by (model name, sha256 of the text).
+
+    Stored as float32 blobs in a standalone SQLite file next to the vector
+    store, so it survives restarts and vector store rebuilds. Safe to share
+    between threads.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("EMBEDDING_CACHE_PATH", "./data/embedding_cache.db")
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        if self.path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL, "
+            "PRIMARY KEY (model, text_hash))"
+        )
+        self._connection.commit()
+
+    def get_many(self, model: str, hashes: Iterable[str]) -> Dict[str, np.ndarray]:
+        """{hash: vector} for the hashes that are cached"""
+        hashes = list(hashes)
+        found = {}
+        with self._lock:
+            for start in range(0, len(hashes), LOOKUP_CHUNK_SIZE):
+                chunk = hashes[start:start + LOOKUP_CHUNK_SIZE]
+                rows = self._connection.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? "
+                    f"AND text_hash IN ({','.join('?' * len(chunk))})",
+                    [model, *chunk]
+                )
+                for key, vector in rows:
+                    found[key] = np.frombuffer(vector, dtype=np.float32)
+        return found
+
+    def put_many(self, model: str, items: Iterable[Tuple[str, List[float]]]):
+        """Store (hash, vector) pairs"""
+        rows = [(model, key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items]
+        with self._lock:
+            self._connection.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)", rows)
+            self._connection.commit()
+
+    def count(self, model: Optional[str] = None) -> int:
+        with self._lock:
+            if model is None:
+                return self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            return self._connection.execute("SELECT COUNT(*) FROM embeddings WHERE model = ?", (model,)).fetchone()[0]
+
+class CachedEmbeddings:
+    """
+    Embeddings wrapper (embed_documents / embed_query) that only sends texts
+    missing from the cache to the underlying model. Queries are embedded
+    directly; they rarely repeat.
+    """
+
+    def __init__(self, embeddings, model_name: str, cache: EmbeddingCache):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        hashes = [text_hash(text) for text in texts]
+        vectors = self.cache.get_many(self.model_name, set(hashes))
+        missing = {}
+        for key, text in zip(hashes, texts):
+            if key not in vectors and key not in missing:
+                missing[key] = text
+        if missing:
+            embedded = self.embeddings.embed_documents(list(missing.values()))
+            self.cache.put_many(self.model_name, zip(missing.keys(), embedded))
+            for key, vector in zip(missing.keys(), embedded):
+                vectors[key] = np.asarray(vector, dtype=np.float32)
+        self.misses += len(missing)
+        self.hits += len(texts) - len(missing)
+        return [vectors[key].tolist() for key in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
@@ -0,0 +1,81 @@
+import os
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (document id, text, metadata)
+IndexDocument = Tuple[str, str, Dict]
+
+def write_embeddings(vector_store, ids: List[str], texts: List[str], vectors: List[List[float]], metadatas: List[Dict]):
+    """
+    Upsert documents with precomputed vectors, so the store does not embed
+    them again (Chroma's collection API, also offered by the NumPy index)
+    """
+    vector_store._collection.upsert(ids=ids, embeddings=vectors, metadatas=metadatas, documents=texts)
+
+def _batches(documents: Iterable[IndexDocument], size: int) -> Iterator[List[IndexDocument]]:
+    batch = []
+    for document in documents:
+        batch.append(document)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class EmbeddingPipeline:
+    """
+    Streams documents into a vector store with bounded memory.
+
+    The caller's iterator (typically a yield_per query) is consumed on the
+    calling thread; texts are embedded `batch_size` at a time on a pool of
+    `max_workers` threads, and the vectors are upserted `write_batch_size`
+    at a time in input order. At most two batches per worker are in flight,
+    so memory does not grow with the corpus.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, max_workers: Optional[int] = None,
+                 write_batch_size: Optional[int] = None):
+        self.batch_size = max(1, batch_size or int(os.getenv("RAG_INDEX_BATCH_SIZE", "64")))
+        workers = max_workers if max_workers is not None else int(os.getenv("RAG_EMBED_WORKERS", "0"))
+        self.max_workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.write_batch_size = max(1, write_batch_size or int(os.getenv("RAG_WRITE_BATCH_SIZE", "1000")))
+
+    def run(self, vector_store, documents: Iterable[IndexDocument]) -> List[str]:
+        """Embed and upsert all documents; returns their ids in input order"""
+        embeddings = vector_store.embeddings
+        written: List[str] = []
+        buffer: List[Tuple[IndexDocument, List[float]]] = []
+        in_flight = deque()
+
+        def collect():
+            batch, future = in_flight.popleft()
+            buffer.extend(zip(batch, future.result()))
+            while len(buffer) >= self.write_batch_size:
+                self._write(vector_store, buffer[:self.write_batch_size], written)
+                del buffer[:self.write_batch_size]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="rag-embed") as pool:
+            for batch in _batches(documents, self.batch_size):
+                in_flight.append((batch, pool.submit(embeddings.embed_documents, [text for _, text, _ in batch])))
+                if len(in_flight) >= 2 * self.max_workers:
+                    collect()
+            while in_flight:
+                collect()
+        if buffer:
+            self._write(vector_store, buffer, written)
+        return written
+
+    def _write(self, vector_store, entries: List[Tuple[IndexDocument, List[float]]], written: List[str]):
+        ids = [document[0] for document, _ in entries]
+        write_embeddings(
+            vector_store,
+            ids,
+            [document[1] for document, _ in entries],
+            [list(vector) for _, vector in entries],
+            [document[2] for document, _ in entries]
+        )
+        written.extend(ids)
@@ -11,6 +11,7 @@ from ..models.database_models import (
     OutboundOrder, ChatMessage, DemandForecast, ProductVelocity, StockAlert
 )
 from .enhanced_smart_llm_service import EnhancedSmartLLMService
+from .kpi_rollup_service import KpiRollupService
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,8 +22,8 @@ class EnhancedAnalyticsService:
     executive summaries, ROI calculations, and strategic recommendations
     """
     
-    def __init__(self):
-        self.llm_service = EnhancedSmartLLMService()
+    def __init__(self, llm_service: Optional[EnhancedSmartLLMService] = None):
+        self.llm_service = llm_service or EnhancedSmartLLMService()
         
     def generate_executive_summary(self, db: Session) -> Dict:
         """
@@ -196,21 +197,17 @@ class EnhancedAnalyticsService:
         total_products = db.query(func.count(Product.id)).scalar()
         total_inventory_value = db.query(func.sum(Inventory.quantity * Product.unit_price)).join(Product).scalar() or 0
         
-        # Get movement data
+        # Movement, order and chat activity from the KPI rollups
+        rollups = KpiRollupService(db)
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_movements = db.query(func.count(StockMovement.id)).filter(
-            StockMovement.created_at >= thirty_days_ago
-        ).scalar()
+        recent_movements = rollups.movement_count_since(thirty_days_ago)
         
         # Get order data
-        pending_orders = db.query(func.count(OutboundOrder.id)).filter(
-            OutboundOrder.status.in_(["pending", "picking", "packed"])
-        ).scalar()
+        order_counts = rollups.order_counts_by_status("outbound")
+        pending_orders = sum(order_counts.get(status, 0) for status in ("pending", "picking", "packed"))
         
         # Get chatbot usage
-        chatbot_interactions = db.query(func.count(ChatMessage.id)).filter(
-            ChatMessage.created_at >= thirty_days_ago
-        ).scalar()
+        chatbot_interactions = rollups.chat_message_count(thirty_days_ago.date())
         
         return {
             "total_products": total_products,
@@ -320,9 +317,7 @@ class EnhancedAnalyticsService:
         
         # Estimate other financial metrics
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_transactions = db.query(func.count(StockMovement.id)).filter(
-            StockMovement.created_at >= thirty_days_ago
-        ).scalar()
+        recent_transactions = KpiRollupService(db).movement_count_since(thirty_days_ago)
         
         return {
             "inventory_turnover": max(0.5, min(12, recent_transactions / 30 * 12)) if recent_transactions > 0 else 1,
@@ -431,9 +426,8 @@ class EnhancedAnalyticsService:
             })
         
         # Check for pending orders
-        pending_orders = db.query(func.count(OutboundOrder.id)).filter(
-            OutboundOrder.status.in_(["pending", "picking", "packed"])
-        ).scalar()
+        order_counts = KpiRollupService(db).order_counts_by_status("outbound")
+        pending_orders = sum(order_counts.get(status, 0) for status in ("pending", "picking", "packed"))
         
         if pending_orders > 10:
             risks.append({
@@ -627,9 +621,8 @@ class EnhancedAnalyticsService:
     def _analyze_market_demand_patterns(self, db: Session) -> Dict:
         """Analyze market demand patterns"""
         # Get order data for demand analysis
-        recent_orders = db.query(OutboundOrder).filter(
-            OutboundOrder.created_at >= datetime.utcnow() - timedelta(days=30)
-        ).count()
+        since_day = (datetime.utcnow() - timedelta(days=30)).date()
+        recent_orders = sum(KpiRollupService(db).order_counts_by_status("outbound", since_day).values())
         
         return {
             "demand_trend": "stable" if recent_orders > 0 else "low",
@@ -693,10 +686,9 @@ class EnhancedAnalyticsService:
         total_products = db.query(func.count(Product.id)).scalar()
         total_inventory_value = db.query(func.sum(Inventory.quantity * Product.unit_price)).join(Product).scalar() or 0
         
+        rollups = KpiRollupService(db)
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_movements = db.query(func.count(StockMovement.id)).filter(
-            StockMovement.created_at >= thirty_days_ago
-        ).scalar()
+        recent_movements = rollups.movement_count_since(thirty_days_ago)
         
         return {
             "inventory_performance": {
@@ -710,9 +702,7 @@ class EnhancedAnalyticsService:
                 "accuracy_rate": 97.8      # Simulated
             },
             "technology_performance": {
-                "chatbot_utilization": db.query(func.count(ChatMessage.id)).filter(
-                    ChatMessage.created_at >= thirty_days_ago
-                ).scalar(),
+                "chatbot_utilization": rollups.chat_message_count(thirty_days_ago.date()),
                 "automation_score": 65.2   # Simulated
             }
         }
@@ -7,10 +7,14 @@ import difflib
 class EnhancedNLPProcessor:
     """Enhanced natural language processing for layman warehouse queries"""
     
+    # Confidence assigned when any pattern of the given tier matches
+    PATTERN_TIER_WEIGHTS = (("casual_patterns", 0.8), ("formal_patterns", 0.9))
+    
     def __init__(self):
         self.setup_enhanced_patterns()
         self.setup_layman_language()
         self.setup_response_templates()
+        self.compile_matchers()
     
     def setup_enhanced_patterns(self):
         """Setup enhanced patterns for better layman language understanding"""
@@ -204,6 +208,35 @@ class EnhancedNLPProcessor:
             "charger": ["power adapter", "charging cable", "power cord"]
         }
     
+    def compile_matchers(self):
+        """Compile intent patterns and the synonym table into single-pass matchers"""
+        # Each intent/tier becomes one optional lookahead anchored at the start of
+        # the message, so a single match() reports every tier that matches anywhere
+        self._intent_groups = []
+        branches = []
+        for intent, pattern_groups in self.intent_patterns.items():
+            for tier, weight in self.PATTERN_TIER_WEIGHTS:
+                patterns = pattern_groups.get(tier, [])
+                if not patterns:
+                    continue
+                group_name = f"intent_{len(self._intent_groups)}"
+                alternation = "|".join(f"(?:{pattern})" for pattern in patterns)
+                branches.append(rf"(?=[\s\S]*?(?P<{group_name}>{alternation}))?")
+                self._intent_groups.append((group_name, intent, weight))
+        self._intent_matcher = re.compile("".join(branches), re.IGNORECASE)
+        
+        # Synonyms never overlap each other, so one alternation (longest first)
+        # gives the same result as substituting them one at a time
+        self._synonym_lookup = {}
+        for technical_term, synonyms in self.layman_translations.items():
+            for synonym in synonyms:
+                if isinstance(synonym, str):
+                    self._synonym_lookup.setdefault(synonym, technical_term)
+        alternatives = sorted(self._synonym_lookup, key=len, reverse=True)
+        self._synonym_matcher = re.compile(
+            r'\b(?:' + "|".join(re.escape(synonym) for synonym in alternatives) + r')\b'
+        )
+    
     def setup_response_templates(self):
         """Setup response templates for different scenarios"""
         self.response_templates = {
@@ -260,14 +293,10 @@ class EnhancedNLPProcessor:
         """Normalize message by expanding synonyms and cleaning text"""
         normalized = message.lower().strip()
         
-        # Expand synonyms
-        for technical_term, synonyms in self.layman_translations.items():
-            for synonym in synonyms:
-                if isinstance(synonym, str):
-                    pattern = r'\b' + re.escape(synonym) + r'\b'
-                    normalized = re.sub(pattern, technical_term, normalized)
-        
-        return normalized
+        # Expand synonyms in a single pass
+        return self._synonym_matcher.sub(
+            lambda match: self._synonym_lookup[match.group(0)], normalized
+        )
     
     def extract_context(self, message: str) -> Dict[str, Any]:
         """Extract conversational context from the message"""
@@ -309,24 +338,24 @@ class EnhancedNLPProcessor:
         
         return context
     
+    def score_intents(self, message: str) -> Dict[str, float]:
+        """Score every intent in one pass over the message"""
+        scores = {intent: 0.0 for intent in self.intent_patterns}
+        match = self._intent_matcher.match(message)
+        
+        for group_name, intent, weight in self._intent_groups:
+            if match.group(group_name) is not None:
+                scores[intent] = max(scores[intent], weight)
+        
+        return scores
+    
     def classify_intent_enhanced(self, message: str) -> Tuple[str, float]:
         """Enhanced intent classification for layman language"""
         best_intent = "help_general"
         best_confidence = 0.0
         
-        for intent, pattern_groups in self.intent_patterns.items():
-            confidence = 0.0
-            
-            # Check casual patterns (higher weight for layman language)
-            for pattern in pattern_groups.get("casual_patterns", []):
-                if re.search(pattern, message, re.IGNORECASE):
-                    confidence = max(confidence, 0.8)
-            
-            # Check formal patterns
-            for pattern in pattern_groups.get("formal_patterns", []):
-                if re.search(pattern, message, re.IGNORECASE):
-                    confidence = max(confidence, 0.9)
-            
+        # Casual patterns score 0.8, formal patterns 0.9; ties keep the earlier intent
+        for intent, confidence in self.score_intents(message).items():
             if confidence > best_confidence:
                 best_intent = intent
                 best_confidence = confidence
@@ -4,8 +4,6 @@ import logging
 from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_
-from langchain_chroma import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.docstore.document import Document
 from langchain.schema import BaseRetriever
@@ -18,6 +16,12 @@ from ..models.database_models import (
     DemandForecast, ProductVelocity, StockAlert, WarehouseLayout, SpaceOptimization,
     SalesHistory, ConversationContext
 )
+from .low_stock_index import get_low_stock_index
+from .rag_runtime import ENHANCED_COLLECTION, get_rag_runtime
+from .rag_indexer import (
+    chunk_ids, enhanced_product_document, get_rag_indexer, index_products, load_product_rows,
+    persist_index, prune_documents
+)
 
 logger = logging.getLogger(__name__)
 
@@ -26,10 +30,9 @@ class EnhancedWarehouseRAGService:
     
     def __init__(self, db: Session):
         self.db = db
-        self.vector_store = None
-        self.retriever = None
-        self.embeddings = None
-        self._initialize_rag()
+        # Embeddings and the vector store are process-wide and load on the first RAG query
+        self.rag_runtime = get_rag_runtime()
+        self.top_k = int(os.getenv("TOP_K_RETRIEVAL", "10"))
         
         # Intent patterns for natural language processing
         self.intent_patterns = {
@@ -126,40 +129,32 @@ class EnhancedWarehouseRAGService:
             ]
         }
     
+    @property
+    def vector_store(self):
+        """Shared vector store, or None if RAG is unavailable"""
+        return self._initialize_rag()
+    
+    @property
+    def retriever(self):
+        """Shared retriever, or None if RAG is unavailable"""
+        if self._initialize_rag() is None:
+            return None
+        return self.rag_runtime.retriever(ENHANCED_COLLECTION, self.top_k)
+    
     def _initialize_rag(self):
-        """Initialize RAG components with enhanced capabilities"""
+        """Resolve the shared vector store, loading and indexing it on first use"""
         try:
-            # Initialize embeddings
-            embedding_model = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
-            self.embeddings = HuggingFaceEmbeddings(model_name=embedding_model)
-            
-            # Initialize vector store
-            vector_db_path = os.getenv("VECTOR_DB_PATH", "./data/chroma_db")
-            os.makedirs(vector_db_path, exist_ok=True)
-            
-            self.vector_store = Chroma(
-                persist_directory=vector_db_path,
-                embedding_function=self.embeddings,
-                collection_name="enhanced_warehouse_knowledge"
+            indexer = get_rag_indexer(ENHANCED_COLLECTION)
+            self.rag_runtime.ensure_indexed(
+                ENHANCED_COLLECTION,
+                lambda vector_store: indexer.index_all(vector_store, self._index_comprehensive_warehouse_data)
             )
-            
-            # Create retriever
-            top_k = int(os.getenv("TOP_K_RETRIEVAL", "10"))
-            self.retriever = self.vector_store.as_retriever(
-                search_type="similarity",
-                search_kwargs={"k": top_k}
-            )
-            
-            # Index warehouse data
-            self._index_comprehensive_warehouse_data()
-            
-            logger.info("Enhanced RAG service initialized successfully")
+            return self.rag_runtime.vector_store(ENHANCED_COLLECTION)
             
         except Exception as e:
-            logger.error(f"Failed to initialize enhanced RAG service: {str(e)}")
+            logger.error(f"Enhanced RAG unavailable: {str(e)}")
             # Continue without vector store for basic operations
-            self.vector_store = None
-            self.retriever = None
+            return None
     
     def process_natural_language_query(self, query: str, user_id: int = None) -> Dict[str, Any]:
         """Process natural language query and perform appropriate database operations"""
@@ -601,9 +596,7 @@ class EnhancedWarehouseRAGService:
     def _handle_low_stock_query(self) -> Dict[str, Any]:
         """Handle low stock queries"""
         
-        low_stock_products = self.db.query(Product, Inventory).join(Inventory).filter(
-            Inventory.available_quantity <= Product.reorder_level
-        ).all()
+        low_stock_products = get_low_stock_index().get_low_stock_items(self.db)
         
         if not low_stock_products:
             return {
@@ -616,16 +609,16 @@ class EnhancedWarehouseRAGService:
             }
         
         low_stock_data = []
-        for product, inventory in low_stock_products:
-            urgency = "CRITICAL" if inventory.available_quantity <= (product.reorder_level * 0.5) else "WARNING"
+        for item in low_stock_products:
+            urgency = "CRITICAL" if item["available_quantity"] <= (item["reorder_level"] * 0.5) else "WARNING"
             low_stock_data.append({
-                "sku": product.sku,
-                "name": product.name,
-                "current_stock": inventory.available_quantity,
-                "reorder_level": product.reorder_level,
+                "sku": item["sku"],
+                "name": item["name"],
+                "current_stock": item["available_quantity"],
+                "reorder_level": item["reorder_level"],
                 "urgency": urgency,
-                "location": product.location,
-                "suggested_reorder": product.reorder_level * 2
+                "location": item["location"],
+                "suggested_reorder": item["reorder_level"] * 2
             })
         
         return {
@@ -637,59 +630,19 @@ class EnhancedWarehouseRAGService:
             "summary": f"{len(low_stock_data)} products need restocking"
         }
     
-    def _index_comprehensive_warehouse_data(self):
+    def _index_comprehensive_warehouse_data(self, vector_store):
         """Index comprehensive warehouse data for RAG"""
         
-        if not self.vector_store:
-            return
-        
         try:
-            # Check if already indexed
-            if self.vector_store._collection.count() > 100:
-                logger.info("Vector store already contains comprehensive data")
-                return
+            # Rebuilt on the first query of each process under stable ids; products
+            # stream through the batched embedding pipeline and the embedding
+            # cache means only changed texts are embedded again
+            keep_ids = index_products(vector_store, load_product_rows(self.db), enhanced_product_document,
+                                      get_rag_indexer(ENHANCED_COLLECTION).pipeline)
+            logger.info(f"Indexed {len(keep_ids)} product documents")
             
             documents = []
             
-            # Index all products with detailed information
-            products = self.db.query(Product).all()
-            for product in products:
-                inventory = self.db.query(Inventory).filter(Inventory.product_id == product.id).first()
-                velocity = self.db.query(ProductVelocity).filter(ProductVelocity.product_id == product.id).first()
-                
-                content = f"""
-                Product: {product.sku} - {product.name}
-                Category: {product.category}
-                Description: {product.description or 'No description'}
-                Unit Price: ${product.unit_price}
-                Reorder Level: {product.reorder_level}
-                Location: {product.location or 'Not assigned'}
-                Current Stock: {inventory.quantity if inventory else 0} total
-                Available Stock: {inventory.available_quantity if inventory else 0} available
-                Reserved Stock: {inventory.reserved_quantity if inventory else 0} reserved
-                Stock Status: {'LOW STOCK' if inventory and inventory.available_quantity <= product.reorder_level else 'NORMAL'}
-                Velocity: {velocity.velocity_category if velocity else 'unknown'} moving
-                Last Updated: {inventory.last_updated if inventory else 'never'}
-                
-                Operations:
-                - Check stock: "What is the stock level of {product.sku}?"
-                - Add stock: "Add [quantity] to {product.sku}"
-                - Remove stock: "Remove [quantity] from {product.sku}"
-                - Update stock: "Set {product.sku} stock to [quantity]"
-                """
-                
-                doc = Document(
-                    page_content=content.strip(),
-                    metadata={
-                        "type": "product_detailed",
-                        "sku": product.sku,
-                        "product_id": product.id,
-                        "category": product.category,
-                        "stock_level": inventory.available_quantity if inventory else 0
-                    }
-                )
-                documents.append(doc)
-            
             # Index warehouse procedures and commands
             procedures = self._get_enhanced_procedures()
             for procedure in procedures:
@@ -727,13 +680,21 @@ class EnhancedWarehouseRAGService:
                 )
                 
                 split_docs = text_splitter.split_documents(documents)
-                self.vector_store.add_documents(split_docs)
-                self.vector_store.persist()
+                ids = chunk_ids(split_docs)
+                vector_store.add_documents(split_docs, ids=ids)
+                keep_ids.extend(ids)
                 
                 logger.info(f"Indexed {len(split_docs)} enhanced document chunks")
+            
+            # Drop documents of deleted products (and any left by older index layouts)
+            removed = prune_documents(vector_store, keep_ids, ("product_detailed", "procedure", "nl_command"))
+            if removed:
+                logger.info(f"Removed {removed} stale document chunks")
+            persist_index(vector_store)
                 
         except Exception as e:
             logger.error(f"Error indexing enhanced warehouse data: {str(e)}")
+            raise
     
     def _get_natural_language_examples(self) -> List[Dict[str, str]]:
         """Get natural language command examples for RAG"""
@@ -872,37 +833,18 @@ class EnhancedWarehouseRAGService:
         ]
     
     def _update_rag_product_data(self, product_id: int):
-        """Update RAG index when product data changes"""
-        
-        if not self.vector_store:
-            return
-        
-        try:
-            # This is a simplified approach - in production you might want
-            # more sophisticated incremental updates
-            logger.info(f"RAG index update triggered for product {product_id}")
-            
-        except Exception as e:
-            logger.error(f"Error updating RAG index: {str(e)}")
+        """Queue a product's document for re-indexing (debounced, batched)"""
+        get_rag_indexer(ENHANCED_COLLECTION).enqueue(self.db.get_bind(), [product_id])
     
     def _remove_from_rag_index(self, product_id: int):
-        """Remove product from RAG index when deleted"""
-        
-        if not self.vector_store:
-            return
-        
-        try:
-            # This is a simplified approach - in production you might want
-            # more sophisticated deletion from vector store
-            logger.info(f"Product {product_id} removed from RAG index")
-            
-        except Exception as e:
-            logger.error(f"Error removing from RAG index: {str(e)}")
+        """Queue a deleted product; the indexer drops documents of missing products"""
+        get_rag_indexer(ENHANCED_COLLECTION).enqueue(self.db.get_bind(), [product_id])
     
     def _handle_general_query(self, query: str) -> Dict[str, Any]:
         """Handle general queries using RAG"""
         
-        if not self.retriever:
+        retriever = self.retriever
+        if not retriever:
             return {
                 "success": False,
                 "intent": "general_query",
@@ -912,7 +854,7 @@ class EnhancedWarehouseRAGService:
         
         try:
             # Retrieve relevant documents
-            docs = self.retriever.get_relevant_documents(query)
+            docs = retriever.get_relevant_documents(query)
             
             if not docs:
                 return {
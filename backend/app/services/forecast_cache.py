@@ -0,0 +1,84 @@
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..models.database_models import SalesHistory, DemandForecast, ForecastCacheEntry
+
+logger = logging.getLogger(__name__)
+
+# (sales row count, latest sale_date) of one product
+SalesWatermark = Tuple[int, Optional[datetime]]
+
+def sales_watermark(db: Session, product_id: int) -> SalesWatermark:
+    """Row count and latest sale date of a product's sales history (one index range scan)"""
+    count, last_sale_date = db.query(func.count(SalesHistory.id), func.max(SalesHistory.sale_date)).filter(
+        SalesHistory.product_id == product_id
+    ).one()
+    return count or 0, last_sale_date
+
+def prune_superseded_forecasts(db: Session, product_ids: Optional[List[int]] = None,
+                               now: Optional[datetime] = None) -> int:
+    """
+    Delete the still-future weekly forecasts (and cached results) of the given
+    products (default: all) before a new forecast replaces them. Past-dated
+    forecasts are kept for backtesting. Does not commit.
+    """
+    now = now or datetime.utcnow()
+    forecasts = db.query(DemandForecast).filter(
+        DemandForecast.forecast_type == "weekly", DemandForecast.forecast_date > now
+    )
+    entries = db.query(ForecastCacheEntry)
+    if product_ids is not None:
+        forecasts = forecasts.filter(DemandForecast.product_id.in_(product_ids))
+        entries = entries.filter(ForecastCacheEntry.product_id.in_(product_ids))
+    entries.delete(synchronize_session=False)
+    return forecasts.delete(synchronize_session=False)
+
+class ForecastCache:
+    """
+    Stored demand forecast results keyed by (product, horizon, model) and the
+    product's sales watermark.
+
+    A lookup hits while the product's sales count and latest sale date are
+    unchanged, so new sales invalidate only the products they belong to.
+    Entries older than `max_age_hours` are recomputed so forecast dates stay
+    current. Entries are dropped whenever the product's forecasts are
+    replaced, so a hit always matches the stored DemandForecast rows.
+    """
+
+    def __init__(self, max_age_hours: Optional[float] = None):
+        self.max_age = timedelta(hours=max_age_hours if max_age_hours is not None
+                                 else float(os.getenv("FORECAST_CACHE_MAX_AGE_HOURS", "24")))
+
+    def get(self, db: Session, product_id: int, weeks: int, model_version: str,
+            watermark: SalesWatermark) -> Optional[Dict]:
+        """The cached {"forecasts", "ai_insights"} for this key and watermark, or None"""
+        entry = db.get(ForecastCacheEntry, (product_id, weeks, model_version))
+        if entry is None or (entry.sales_count, entry.last_sale_date) != tuple(watermark):
+            return None
+        if datetime.utcnow() - entry.generated_at > self.max_age:
+            return None
+        return entry.result
+
+    def put(self, db: Session, product_id: int, weeks: int, model_version: str,
+            watermark: SalesWatermark, result: Dict):
+        """Store (or replace) a result; committed with the caller's transaction"""
+        db.merge(ForecastCacheEntry(
+            product_id=product_id,
+            horizon_weeks=weeks,
+            model_version=model_version,
+            sales_count=watermark[0],
+            last_sale_date=watermark[1],
+            result={"forecasts": result["forecasts"], "ai_insights": result["ai_insights"]},
+            generated_at=datetime.utcnow()
+        ))
+
+_forecast_cache = None
+
+def get_forecast_cache() -> ForecastCache:
+    global _forecast_cache
+    if _forecast_cache is None:
+        _forecast_cache = ForecastCache()
+    return _forecast_cache
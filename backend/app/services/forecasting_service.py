@@ -1,7 +1,7 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import BinaryIO, List, Dict, Optional, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
 import logging
@@ -11,6 +11,12 @@ from ..models.database_models import (
     ProductVelocity, Inventory
 )
 from .enhanced_smart_llm_service import EnhancedSmartLLMService
+from .low_stock_index import get_low_stock_index
+from .batch_forecasting_service import BatchForecastingService
+from .parallel_forecasting_service import ParallelForecastingService
+from .sales_ingestion_service import SalesIngestionService
+from .backtesting_service import BacktestingService
+from .forecast_cache import SalesWatermark, get_forecast_cache, prune_superseded_forecasts, sales_watermark
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,66 +27,28 @@ class ForecastingService:
     Uses historical sales data and OpenAI to predict demand and flag stock risks
     """
     
-    def __init__(self):
-        self.llm_service = EnhancedSmartLLMService()
+    AI_MODEL_VERSION = "gpt-4-turbo"
+    SIMPLE_MODEL_VERSION = "simple_heuristic"
+    
+    def __init__(self, llm_service: Optional[EnhancedSmartLLMService] = None):
+        self.llm_service = llm_service or EnhancedSmartLLMService()
         
     def ingest_sales_data(self, db: Session, sales_data: List[Dict]) -> Dict:
         """
         Ingest historical sales/dispatch data from Excel/API
         """
-        try:
-            ingested_count = 0
-            errors = []
-            
-            for record in sales_data:
-                try:
-                    # Find product by SKU
-                    product = db.query(Product).filter(
-                        Product.sku == record.get('sku')
-                    ).first()
-                    
-                    if not product:
-                        errors.append(f"Product not found for SKU: {record.get('sku')}")
-                        continue
-                    
-                    # Create sales history record
-                    sales_record = SalesHistory(
-                        product_id=product.id,
-                        quantity_sold=record.get('quantity_sold', 0),
-                        sale_date=pd.to_datetime(record.get('sale_date')),
-                        unit_price=record.get('unit_price', 0.0),
-                        total_value=record.get('total_value', 0.0),
-                        customer_type=record.get('customer_type', 'retail'),
-                        season=self._get_season(pd.to_datetime(record.get('sale_date'))),
-                        channel=record.get('channel', 'store')
-                    )
-                    
-                    db.add(sales_record)
-                    ingested_count += 1
-                    
-                except Exception as e:
-                    errors.append(f"Error processing record {record}: {str(e)}")
-                    
-            db.commit()
-            
-            return {
-                "success": True,
-                "ingested_count": ingested_count,
-                "errors": errors,
-                "message": f"Successfully ingested {ingested_count} sales records"
-            }
-            
-        except Exception as e:
-            logger.error(f"Error ingesting sales data: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e),
-                "message": "Failed to ingest sales data"
-            }
+        return SalesIngestionService().ingest_records(db, sales_data)
+    
+    def ingest_sales_csv(self, db: Session, source: BinaryIO) -> Dict:
+        """
+        Stream a sales CSV into the sales history in bulk, chunk by chunk
+        """
+        return SalesIngestionService().ingest_csv(db, source)
     
     def generate_demand_forecast(self, db: Session, product_id: int, weeks: int = 4) -> Dict:
         """
-        Generate weekly demand forecast for a product using AI
+        Generate weekly demand forecast for a product using AI; the stored result
+        is returned while the product's sales history is unchanged
         """
         try:
             # Get product info
@@ -88,11 +56,29 @@ class ForecastingService:
             if not product:
                 return {"success": False, "error": "Product not found"}
             
+            watermark = sales_watermark(db, product_id)
+            # Which path produced the stored result is only known after the history
+            # query the cache exists to skip, so both keys are tried (replacing a
+            # forecast drops every entry of the product, so at most one is stored)
+            cached = None
+            for model_version in (self.AI_MODEL_VERSION, self.SIMPLE_MODEL_VERSION):
+                cached = get_forecast_cache().get(db, product_id, weeks, model_version, watermark)
+                if cached is not None:
+                    break
+            if cached is not None:
+                return {
+                    "success": True,
+                    "product": {"id": product.id, "sku": product.sku, "name": product.name},
+                    "forecasts": cached["forecasts"],
+                    "ai_insights": cached["ai_insights"],
+                    "cached": True
+                }
+            
             # Get historical sales data
             historical_data = self._get_historical_sales(db, product_id)
             
             if not historical_data:
-                return self._generate_simple_forecast(db, product, weeks)
+                return self._generate_simple_forecast(db, product, weeks, watermark)
             
             # Prepare data for AI analysis
             sales_summary = self._prepare_sales_summary(historical_data)
@@ -100,10 +86,11 @@ class ForecastingService:
             # Use AI to predict demand
             ai_forecast = self._get_ai_forecast(product, sales_summary, weeks)
             
-            # Save forecasts to database
+            # Replace the product's outstanding forecasts
+            prune_superseded_forecasts(db, [product_id])
             forecasts = []
             for week in range(1, weeks + 1):
-                forecast_date = datetime.now() + timedelta(weeks=week)
+                forecast_date = datetime.utcnow() + timedelta(weeks=week)
                 predicted_demand = ai_forecast.get(f'week_{week}', 0)
                 confidence = ai_forecast.get('confidence', 0.7)
                 
@@ -114,7 +101,7 @@ class ForecastingService:
                     confidence_level=confidence,
                     forecast_type="weekly",
                     ai_generated=True,
-                    model_version="gpt-4-turbo"
+                    model_version=self.AI_MODEL_VERSION
                 )
                 
                 db.add(forecast)
@@ -125,9 +112,7 @@ class ForecastingService:
                     "confidence": confidence
                 })
             
-            db.commit()
-            
-            return {
+            result = {
                 "success": True,
                 "product": {
                     "id": product.id,
@@ -137,11 +122,63 @@ class ForecastingService:
                 "forecasts": forecasts,
                 "ai_insights": ai_forecast.get('insights', [])
             }
+            # Placeholder forecasts from an unavailable AI service are not worth keeping
+            if not ai_forecast.get('fallback'):
+                get_forecast_cache().put(db, product_id, weeks, self.AI_MODEL_VERSION, watermark, result)
+            db.commit()
+            
+            return result
             
         except Exception as e:
+            db.rollback()
             logger.error(f"Error generating forecast: {str(e)}")
             return {"success": False, "error": str(e)}
     
+    def generate_all_forecasts(self, db: Session, weeks: int = 4) -> Dict:
+        """
+        Generate weekly demand forecasts for every product with the vectorized
+        batch engine (statistical models, no per-product LLM calls)
+        """
+        return BatchForecastingService().generate_all_forecasts(db, weeks)
+    
+    def start_forecast_run(self, db: Session, weeks: int = 4, resume: bool = True) -> Dict:
+        """
+        Plan a chunked forecast run over the whole catalog, or pick up the
+        latest unfinished one; execute it with execute_forecast_run
+        """
+        return ParallelForecastingService().start_run(db, weeks, resume)
+    
+    def execute_forecast_run(self, run_id: int) -> Dict:
+        """
+        Fit the run's remaining chunks across all cores on its own session
+        (safe to call from a background task after the request has finished)
+        """
+        from ..database import SessionLocal
+        
+        db = SessionLocal()
+        try:
+            return ParallelForecastingService().execute_run(db, run_id)
+        finally:
+            db.close()
+    
+    def get_forecast_run(self, db: Session, run_id: int) -> Dict:
+        """
+        Progress of a forecast run
+        """
+        return ParallelForecastingService().get_run_status(db, run_id)
+    
+    def backtest_forecasters(self, db: Session, horizon: int = 4, origins: int = 8,
+                             forecasters: Optional[List[str]] = None, include_per_sku: bool = True,
+                             llm_max_products: int = 20) -> Dict:
+        """
+        Rolling-origin backtest of the statistical and batch forecasters with
+        accuracy and runtime per SKU; this service's AI path runs only when
+        "llm" is named in `forecasters`
+        """
+        return BacktestingService(horizon=horizon, origins=origins, llm_max_products=llm_max_products).run(
+            db, forecasters, forecasting_service=self, include_per_sku=include_per_sku
+        )
+    
     def analyze_stock_risks(self, db: Session) -> Dict:
         """
         Analyze all products for overstock/understock risks using AI
@@ -162,7 +199,7 @@ class ForecastingService:
                 # Get recent forecasts
                 recent_forecast = db.query(DemandForecast).filter(
                     DemandForecast.product_id == product.id,
-                    DemandForecast.forecast_date >= datetime.now()
+                    DemandForecast.forecast_date >= datetime.utcnow()
                 ).order_by(DemandForecast.forecast_date).first()
                 
                 # Analyze risk using AI
@@ -226,7 +263,7 @@ class ForecastingService:
                 # Get forecast data
                 forecast = db.query(DemandForecast).filter(
                     DemandForecast.product_id == product.id,
-                    DemandForecast.forecast_date >= datetime.now()
+                    DemandForecast.forecast_date >= datetime.utcnow()
                 ).order_by(DemandForecast.forecast_date).first()
                 
                 # Generate AI recommendation
@@ -268,8 +305,8 @@ class ForecastingService:
         try:
             # Get all recent forecasts
             forecasts = db.query(DemandForecast, Product).join(Product).filter(
-                DemandForecast.forecast_date >= datetime.now(),
-                DemandForecast.forecast_date <= datetime.now() + timedelta(weeks=weeks)
+                DemandForecast.forecast_date >= datetime.utcnow(),
+                DemandForecast.forecast_date <= datetime.utcnow() + timedelta(weeks=weeks)
             ).all()
             
             # Convert to DataFrame
@@ -477,13 +514,15 @@ class ForecastingService:
             logger.error(f"Error getting reorder recommendation: {str(e)}")
             return self._generate_basic_reorder_recommendation(product, inventory)
     
-    def _generate_simple_forecast(self, db: Session, product: Product, weeks: int) -> Dict:
+    def _generate_simple_forecast(self, db: Session, product: Product, weeks: int,
+                                  watermark: Optional[SalesWatermark] = None) -> Dict:
         """Generate simple forecast when no historical data is available"""
         base_demand = product.reorder_level // 2  # Simple heuristic
         
+        prune_superseded_forecasts(db, [product.id])
         forecasts = []
         for week in range(1, weeks + 1):
-            forecast_date = datetime.now() + timedelta(weeks=week)
+            forecast_date = datetime.utcnow() + timedelta(weeks=week)
             
             forecast = DemandForecast(
                 product_id=product.id,
@@ -492,7 +531,7 @@ class ForecastingService:
                 confidence_level=0.5,
                 forecast_type="weekly",
                 ai_generated=False,
-                model_version="simple_heuristic"
+                model_version=self.SIMPLE_MODEL_VERSION
             )
             
             db.add(forecast)
@@ -503,14 +542,17 @@ class ForecastingService:
                 "confidence": 0.5
             })
         
-        db.commit()
-        
-        return {
+        result = {
             "success": True,
             "product": {"id": product.id, "sku": product.sku, "name": product.name},
             "forecasts": forecasts,
             "ai_insights": ["Forecast based on reorder level due to limited historical data"]
         }
+        if watermark is not None:
+            get_forecast_cache().put(db, product.id, weeks, self.SIMPLE_MODEL_VERSION, watermark, result)
+        db.commit()
+        
+        return result
     
     def _get_season(self, date: datetime) -> str:
         """Determine season from date"""
@@ -526,16 +568,25 @@ class ForecastingService:
     
     def _get_low_stock_products(self, db: Session) -> List[Dict]:
         """Get products with low stock levels"""
-        products = db.query(Product, Inventory).join(Inventory).filter(
+        low_stock_items = get_low_stock_index().get_low_stock_items(db)
+        product_ids = [item["product_id"] for item in low_stock_items]
+        if not product_ids:
+            return []
+        
+        # Load full rows for the low-stock products only, most urgent first
+        rows = db.query(Product, Inventory).join(Inventory).filter(
+            Product.id.in_(product_ids),
             Inventory.available_quantity <= Product.reorder_level
         ).all()
+        rank = {product_id: position for position, product_id in enumerate(product_ids)}
+        rows.sort(key=lambda row: rank[row[0].id])
         
         return [
             {
                 "product": product,
                 "inventory": inventory
             }
-            for product, inventory in products
+            for product, inventory in rows
         ]
     
     def _get_current_stock(self, db: Session, product_id: int) -> int:
@@ -553,7 +604,8 @@ class ForecastingService:
         } | {
             "confidence": 0.5,
             "insights": ["Basic forecast due to AI service unavailability"],
-            "trend": "stable"
+            "trend": "stable",
+            "fallback": True
         }
     
     def _parse_text_forecast(self, response: str, weeks: int) -> Dict:
@@ -1,10 +1,139 @@
-from typing import List, Optional
+import base64
+from typing import Dict, Iterator, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, or_, update, select, insert, case, bindparam
 from ..models.database_models import Product, Inventory, StockMovement
 from ..database import get_db
+from .inventory_summary_cache import get_inventory_summary_cache, mark_inventory_changed
+from .kpi_rollup_service import record_stock_movements
+from .low_stock_index import get_low_stock_index
 from datetime import datetime
 
+MOVEMENT_EXPORT_FIELDS = [
+    "id", "product_sku", "product_name", "movement_type", "quantity",
+    "reference_type", "reference_id", "reason", "created_at", "created_by"
+]
+
+def encode_movement_cursor(created_at: datetime, movement_id: int) -> str:
+    """Opaque keyset cursor for the (created_at, id) position of a movement"""
+    raw = f"{created_at.isoformat()}|{movement_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_movement_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor from encode_movement_cursor; raises ValueError if malformed"""
+    try:
+        created_at, movement_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(movement_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def _inventory_summary_query():
+    """Product and inventory columns for every inventory row"""
+    return select(
+        Product.id,
+        Product.sku,
+        Product.name,
+        Product.category,
+        Product.reorder_level,
+        Product.location,
+        Inventory.quantity,
+        Inventory.reserved_quantity,
+        Inventory.available_quantity,
+        Inventory.last_updated
+    ).join(Inventory, Product.id == Inventory.product_id)
+
+def _summary_from_rows(rows, low_stock_items: List[Dict]) -> Dict:
+    inventory_data = []
+    
+    for item in rows:
+        inventory_item = {
+            "product_id": item.id,
+            "sku": item.sku,
+            "name": item.name,
+            "category": item.category,
+            "location": item.location,
+            "quantity": item.quantity,
+            "reserved_quantity": item.reserved_quantity,
+            "available_quantity": item.available_quantity,
+            "reorder_level": item.reorder_level,
+            "last_updated": item.last_updated,
+            "needs_reorder": item.available_quantity <= item.reorder_level
+        }
+        
+        inventory_data.append(inventory_item)
+    
+    return {
+        "inventory": inventory_data,
+        "low_stock_alerts": low_stock_items,
+        "total_products": len(inventory_data),
+        "low_stock_count": len(low_stock_items)
+    }
+
+def _stock_movement_query(product_id: int = None, movement_type: str = None,
+                          reference_type: str = None, start_date: datetime = None,
+                          end_date: datetime = None, cursor: str = None):
+    """Projected movement history query (newest first) with the product columns joined in"""
+    query = select(
+        StockMovement.id,
+        StockMovement.movement_type,
+        StockMovement.quantity,
+        StockMovement.reference_type,
+        StockMovement.reference_id,
+        StockMovement.reason,
+        StockMovement.created_at,
+        StockMovement.created_by,
+        Product.sku,
+        Product.name
+    ).outerjoin(Product, Product.id == StockMovement.product_id)
+    
+    if product_id:
+        query = query.where(StockMovement.product_id == product_id)
+    if movement_type:
+        query = query.where(StockMovement.movement_type == movement_type)
+    if reference_type:
+        query = query.where(StockMovement.reference_type == reference_type)
+    if start_date:
+        query = query.where(StockMovement.created_at >= start_date)
+    if end_date:
+        query = query.where(StockMovement.created_at < end_date)
+    if cursor:
+        cursor_created_at, cursor_id = decode_movement_cursor(cursor)
+        query = query.where(or_(
+            StockMovement.created_at < cursor_created_at,
+            and_(StockMovement.created_at == cursor_created_at, StockMovement.id < cursor_id)
+        ))
+    
+    return query.order_by(StockMovement.created_at.desc(), StockMovement.id.desc())
+
+def _movement_to_dict(movement) -> Dict:
+    return {
+        "id": movement.id,
+        "product_sku": movement.sku or "Unknown",
+        "product_name": movement.name or "Unknown",
+        "movement_type": movement.movement_type,
+        "quantity": movement.quantity,
+        "reference_type": movement.reference_type,
+        "reference_id": movement.reference_id,
+        "reason": movement.reason,
+        "created_at": movement.created_at,
+        "created_by": movement.created_by
+    }
+
+def _movement_page(rows, limit: int) -> Dict:
+    """Page dict from up to limit + 1 rows; the extra row only signals another page"""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    next_cursor = None
+    if has_more and rows:
+        next_cursor = encode_movement_cursor(rows[-1].created_at, rows[-1].id)
+    
+    return {
+        "movements": [_movement_to_dict(row) for row in rows],
+        "next_cursor": next_cursor
+    }
+
 class InventoryService:
     def __init__(self, db: Session):
         self.db = db
@@ -37,68 +166,58 @@ class InventoryService:
         return product
 
     def get_inventory_summary(self):
-        """Get inventory summary with low stock alerts"""
-        query = self.db.query(
-            Product.id,
-            Product.sku,
-            Product.name,
-            Product.category,
-            Product.reorder_level,
-            Product.location,
-            Inventory.quantity,
-            Inventory.reserved_quantity,
-            Inventory.available_quantity,
-            Inventory.last_updated
-        ).join(Inventory, Product.id == Inventory.product_id)
-        
-        results = query.all()
+        """Get inventory summary with low stock alerts (cached until the next stock change)"""
+        return get_inventory_summary_cache().get(self.db.get_bind(), self._build_inventory_summary)
+
+    def _build_inventory_summary(self):
+        """Compute the inventory summary from the database"""
+        rows = self.db.execute(_inventory_summary_query()).all()
+        low_stock_items = get_low_stock_index().get_low_stock_items(self.db)
+        return _summary_from_rows(rows, low_stock_items)
+
+    def _apply_inventory_update(self, product_id: int, values: dict, *conditions):
+        """
+        Apply one conditional UPDATE to a product's inventory row and return
+        the new (quantity, reserved_quantity, available_quantity), or None if
+        no row matched. Column expressions on the right-hand side read the
+        row's current values, so concurrent writers cannot lose updates.
+        """
+        inventory_id = select(func.min(Inventory.id)).where(
+            Inventory.product_id == product_id
+        ).scalar_subquery()
         
-        inventory_data = []
-        low_stock_items = []
+        stmt = update(Inventory).where(Inventory.id == inventory_id, *conditions).values(
+            **values, last_updated=datetime.utcnow()
+        ).execution_options(synchronize_session=False)
+        levels = (Inventory.quantity, Inventory.reserved_quantity, Inventory.available_quantity)
         
-        for item in results:
-            inventory_item = {
-                "product_id": item.id,
-                "sku": item.sku,
-                "name": item.name,
-                "category": item.category,
-                "location": item.location,
-                "quantity": item.quantity,
-                "reserved_quantity": item.reserved_quantity,
-                "available_quantity": item.available_quantity,
-                "reorder_level": item.reorder_level,
-                "last_updated": item.last_updated,
-                "needs_reorder": item.available_quantity <= item.reorder_level
-            }
-            
-            inventory_data.append(inventory_item)
-            
-            if item.available_quantity <= item.reorder_level:
-                low_stock_items.append(inventory_item)
+        if self.db.get_bind().dialect.update_returning:
+            result = self.db.execute(stmt.returning(*levels)).first()
+        elif self.db.execute(stmt).rowcount == 0:
+            result = None
+        else:
+            # Dialects without UPDATE ... RETURNING: the UPDATE holds the row lock,
+            # so reading it back in the same transaction is still consistent
+            result = self.db.execute(select(*levels).where(Inventory.id == inventory_id)).first()
         
-        return {
-            "inventory": inventory_data,
-            "low_stock_alerts": low_stock_items,
-            "total_products": len(inventory_data),
-            "low_stock_count": len(low_stock_items)
-        }
+        if result is not None:
+            mark_inventory_changed(self.db, [product_id])
+        return result
 
     def update_stock(self, product_id: int, quantity_change: int, movement_type: str, 
                      reference_type: str = None, reference_id: int = None, 
                      reason: str = None, created_by: str = "system") -> bool:
         """Update stock levels and create stock movement record"""
         try:
-            # Get current inventory
-            inventory = self.db.query(Inventory).filter(Inventory.product_id == product_id).first()
-            if not inventory:
+            # Atomic increment; available is recomputed from the same row values
+            levels = self._apply_inventory_update(product_id, {
+                "quantity": Inventory.quantity + quantity_change,
+                "available_quantity": Inventory.quantity + quantity_change - Inventory.reserved_quantity,
+            })
+            if levels is None:
                 return False
             
-            # Update inventory
-            inventory.quantity += quantity_change
-            inventory.available_quantity = inventory.quantity - inventory.reserved_quantity
-            inventory.last_updated = datetime.utcnow()
-            
-            # Create stock movement record
+            # Create stock movement record in the same transaction
             movement = StockMovement(
                 product_id=product_id,
                 movement_type=movement_type,
@@ -117,17 +236,96 @@ class InventoryService:
             self.db.rollback()
             return False
 
+    def bulk_update_stock(self, adjustments: List[dict], created_by: str = "system") -> Dict:
+        """
+        Apply many stock adjustments in one transaction.
+
+        Adjustments are netted per product and applied with one executemany
+        UPDATE; all StockMovement rows are inserted with one executemany INSERT.
+        Lines for products without an inventory record fail individually.
+        """
+        inventory_ids = {}
+        product_ids = list({adjustment["product_id"] for adjustment in adjustments})
+        for start in range(0, len(product_ids), 500):
+            rows = self.db.query(Inventory.product_id, func.min(Inventory.id)).filter(
+                Inventory.product_id.in_(product_ids[start:start + 500])
+            ).group_by(Inventory.product_id).all()
+            inventory_ids.update(rows)
+        
+        results = []
+        net_changes = {}
+        movements = []
+        now = datetime.utcnow()
+        for index, adjustment in enumerate(adjustments):
+            product_id = adjustment["product_id"]
+            quantity_change = adjustment["quantity_change"]
+            result = {"index": index, "product_id": product_id, "quantity_change": quantity_change}
+            
+            if product_id not in inventory_ids:
+                result.update(success=False, error="Inventory record not found")
+                results.append(result)
+                continue
+            
+            net_changes[product_id] = net_changes.get(product_id, 0) + quantity_change
+            movements.append({
+                "product_id": product_id,
+                "movement_type": adjustment["movement_type"],
+                "quantity": quantity_change,
+                "reference_type": adjustment.get("reference_type"),
+                "reference_id": adjustment.get("reference_id"),
+                "reason": adjustment.get("reason"),
+                "created_at": now,
+                "created_by": created_by
+            })
+            result.update(success=True, error=None)
+            results.append(result)
+        
+        try:
+            if net_changes:
+                inventory_table = Inventory.__table__
+                self.db.execute(
+                    update(inventory_table).where(
+                        inventory_table.c.id == bindparam("inventory_id")
+                    ).values(
+                        quantity=inventory_table.c.quantity + bindparam("delta"),
+                        available_quantity=inventory_table.c.quantity + bindparam("delta") - inventory_table.c.reserved_quantity,
+                        last_updated=now
+                    ),
+                    [
+                        {"inventory_id": inventory_ids[product_id], "delta": delta}
+                        for product_id, delta in net_changes.items()
+                    ]
+                )
+                self.db.execute(insert(StockMovement.__table__), movements)
+                record_stock_movements(self.db, movements)
+                mark_inventory_changed(self.db, net_changes.keys())
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            for result in results:
+                if result["success"]:
+                    result.update(success=False, error=str(e))
+        
+        applied = sum(1 for result in results if result["success"])
+        return {
+            "results": results,
+            "total": len(results),
+            "applied": applied,
+            "failed": len(results) - applied,
+            "products_updated": len(net_changes) if applied else 0
+        }
+
     def reserve_stock(self, product_id: int, quantity: int) -> bool:
         """Reserve stock for outbound orders"""
         try:
-            inventory = self.db.query(Inventory).filter(Inventory.product_id == product_id).first()
-            if not inventory or inventory.available_quantity < quantity:
+            # Only reserves when enough stock is available at the time of the UPDATE
+            levels = self._apply_inventory_update(product_id, {
+                "reserved_quantity": Inventory.reserved_quantity + quantity,
+                "available_quantity": Inventory.quantity - Inventory.reserved_quantity - quantity,
+            }, Inventory.available_quantity >= quantity)
+            if levels is None:
                 return False
             
-            inventory.reserved_quantity += quantity
-            inventory.available_quantity = inventory.quantity - inventory.reserved_quantity
-            inventory.last_updated = datetime.utcnow()
-            
             self.db.commit()
             return True
         except Exception as e:
@@ -137,44 +335,72 @@ class InventoryService:
     def release_stock(self, product_id: int, quantity: int) -> bool:
         """Release reserved stock"""
         try:
-            inventory = self.db.query(Inventory).filter(Inventory.product_id == product_id).first()
-            if not inventory:
+            released_reserve = case(
+                (Inventory.reserved_quantity > quantity, Inventory.reserved_quantity - quantity),
+                else_=0
+            )
+            levels = self._apply_inventory_update(product_id, {
+                "reserved_quantity": released_reserve,
+                "available_quantity": Inventory.quantity - released_reserve,
+            })
+            if levels is None:
                 return False
             
-            inventory.reserved_quantity = max(0, inventory.reserved_quantity - quantity)
-            inventory.available_quantity = inventory.quantity - inventory.reserved_quantity
-            inventory.last_updated = datetime.utcnow()
-            
             self.db.commit()
             return True
         except Exception as e:
             self.db.rollback()
             return False
 
+    def get_stock_movements_page(self, limit: int = 100, cursor: str = None, **filters) -> Dict:
+        """
+        Get one page of stock movement history, newest first.
+
+        Pages are keyset-paginated on (created_at, id): pass the returned
+        next_cursor back in to continue after the last row of this page.
+        """
+        query = _stock_movement_query(cursor=cursor, **filters)
+        
+        # Fetch one extra row to know whether another page exists
+        rows = self.db.execute(query.limit(limit + 1)).all()
+        return _movement_page(rows, limit)
+
     def get_stock_movements(self, product_id: int = None, limit: int = 100):
         """Get stock movement history"""
-        query = self.db.query(StockMovement)
-        
-        if product_id:
-            query = query.filter(StockMovement.product_id == product_id)
-        
-        movements = query.order_by(StockMovement.created_at.desc()).limit(limit).all()
-        
-        # Join with product information
-        result = []
-        for movement in movements:
-            product = self.db.query(Product).filter(Product.id == movement.product_id).first()
-            result.append({
-                "id": movement.id,
-                "product_sku": product.sku if product else "Unknown",
-                "product_name": product.name if product else "Unknown",
-                "movement_type": movement.movement_type,
-                "quantity": movement.quantity,
-                "reference_type": movement.reference_type,
-                "reference_id": movement.reference_id,
-                "reason": movement.reason,
-                "created_at": movement.created_at,
-                "created_by": movement.created_by
-            })
-        
-        return result
+        return self.get_stock_movements_page(limit=limit, product_id=product_id)["movements"]
+
+    def iter_stock_movements(self, batch_size: int = 1000, **filters) -> Iterator[Dict]:
+        """Yield the full filtered movement history from a server-side cursor"""
+        query = _stock_movement_query(**filters).execution_options(
+            stream_results=True, yield_per=batch_size
+        )
+        for row in self.db.execute(query):
+            yield _movement_to_dict(row)
+
+class AsyncInventoryService:
+    """Async versions of the hot InventoryService read paths (ASYNC_DB_ENABLED=true)"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_inventory_summary(self):
+        """Get inventory summary with low stock alerts (cached until the next stock change)"""
+        return await get_inventory_summary_cache().get_async(
+            self.db.get_bind(), self._build_inventory_summary
+        )
+    
+    async def _build_inventory_summary(self):
+        """Compute the inventory summary from the database"""
+        rows = (await self.db.execute(_inventory_summary_query())).all()
+        low_stock_items = await self.get_low_stock_items()
+        return _summary_from_rows(rows, low_stock_items)
+    
+    async def get_low_stock_items(self) -> List[Dict]:
+        """Low-stock items from the maintained index, most urgent first"""
+        return await get_low_stock_index().get_low_stock_items_async(self.db)
+    
+    async def get_stock_movements_page(self, limit: int = 100, cursor: str = None, **filters) -> Dict:
+        """Get one page of stock movement history, newest first"""
+        query = _stock_movement_query(cursor=cursor, **filters)
+        rows = (await self.db.execute(query.limit(limit + 1))).all()
+        return _movement_page(rows, limit)
@@ -0,0 +1,207 @@
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from ..models.database_models import Product, Inventory
+
+logger = logging.getLogger(__name__)
+
+SESSION_CHANGED_PRODUCTS_KEY = "inventory_changed_products"
+# Versions bumped by this process that are remembered for bumped_here
+LOCAL_VERSION_HISTORY = 4096
+
+class LocalVersionStore:
+    """Summary version counter for a single process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = 0
+
+    def get_version(self) -> int:
+        return self._version
+
+    def bump_version(self) -> int:
+        with self._lock:
+            self._version += 1
+            return self._version
+
+class RedisVersionStore:
+    """Summary version counter shared by every worker through Redis"""
+
+    def __init__(self, redis_url: str, key: str = "smart_warehouse:inventory_summary:version"):
+        import redis
+
+        self.client = redis.Redis.from_url(redis_url, socket_timeout=1)
+        self.key = key
+        self.client.ping()
+
+    def get_version(self) -> int:
+        return int(self.client.get(self.key) or 0)
+
+    def bump_version(self) -> int:
+        return int(self.client.incr(self.key))
+
+class InventorySummaryCache:
+    """
+    Versioned cache for InventoryService.get_inventory_summary.
+
+    Every committed stock or product change bumps the version; a read returns
+    the cached summary while its version is current and rebuilds it otherwise.
+    With the Redis version store, a write in any worker invalidates all of them.
+    Summaries are cached per engine, so separate databases never share one.
+    Cached summaries are shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, version_store=None, max_age_seconds: Optional[float] = None):
+        self.version_store = version_store or LocalVersionStore()
+        # Upper bound on staleness for writes made outside this application
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._entries = weakref.WeakKeyDictionary()  # engine -> (version, built_at, summary)
+        self._versions_lock = threading.Lock()
+        self._local_versions: Dict[int, None] = {}  # insertion-ordered set
+
+    def get(self, bind, loader: Callable[[], Dict]) -> Dict:
+        """Return the current summary for `bind`, rebuilding it with `loader` if stale"""
+        try:
+            version = self.version_store.get_version()
+        except Exception as e:
+            logger.warning(f"Inventory summary cache unavailable: {str(e)}")
+            return loader()
+
+        summary = self._current(bind, version)
+        if summary is not None:
+            return summary
+
+        with self._lock:
+            summary = self._current(bind, version)
+            if summary is not None:
+                return summary
+            # The version is read before loading, so a write committed during
+            # the load leaves this entry already stale
+            summary = loader()
+            self._entries[bind] = (version, time.monotonic(), summary)
+            return summary
+
+    async def get_async(self, bind, loader: Callable[[], Awaitable[Dict]]) -> Dict:
+        """Like get, for an async loader (concurrent misses may each rebuild)"""
+        try:
+            version = self.version_store.get_version()
+        except Exception as e:
+            logger.warning(f"Inventory summary cache unavailable: {str(e)}")
+            return await loader()
+
+        summary = self._current(bind, version)
+        if summary is None:
+            summary = await loader()
+            self._entries[bind] = (version, time.monotonic(), summary)
+        return summary
+
+    def _current(self, bind, version: int) -> Optional[Dict]:
+        entry = self._entries.get(bind)
+        if entry is None or entry[0] != version:
+            return None
+        if self.max_age_seconds is not None and time.monotonic() - entry[1] > self.max_age_seconds:
+            return None
+        return entry[2]
+
+    def invalidate(self) -> Optional[int]:
+        """Discard cached summaries in this process and every worker sharing the store; returns the new version"""
+        self._entries.clear()
+        try:
+            version = self.version_store.bump_version()
+        except Exception as e:
+            logger.warning(f"Could not bump inventory summary version: {str(e)}")
+            return None
+        with self._versions_lock:
+            self._local_versions[version] = None
+            while len(self._local_versions) > LOCAL_VERSION_HISTORY:
+                del self._local_versions[next(iter(self._local_versions))]
+        return version
+
+    def current_version(self) -> Optional[int]:
+        """Shared version, or None while the version store is unavailable"""
+        try:
+            return self.version_store.get_version()
+        except Exception as e:
+            logger.warning(f"Inventory summary version unavailable: {str(e)}")
+            return None
+
+    def bumped_here(self, since: int, version: int) -> bool:
+        """Whether every version after `since` up to `version` was bumped by this process"""
+        if version < since or version - since > LOCAL_VERSION_HISTORY:
+            return False
+        with self._versions_lock:
+            return all(bumped in self._local_versions for bumped in range(since + 1, version + 1))
+
+def _create_summary_cache() -> InventorySummaryCache:
+    backend = os.getenv("INVENTORY_CACHE_BACKEND", "local")
+    max_age = os.getenv("INVENTORY_CACHE_MAX_AGE")
+    max_age_seconds = float(max_age) if max_age else None
+
+    version_store = None
+    if backend == "redis":
+        redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
+        try:
+            version_store = RedisVersionStore(redis_url)
+            logger.info("Inventory summary cache using Redis version store")
+        except Exception as e:
+            logger.warning(f"Redis unavailable for inventory summary cache, using local store: {str(e)}")
+
+    return InventorySummaryCache(version_store, max_age_seconds=max_age_seconds)
+
+# Process-wide summary cache
+inventory_summary_cache = _create_summary_cache()
+
+def get_inventory_summary_cache() -> InventorySummaryCache:
+    """Get the process-wide inventory summary cache"""
+    return inventory_summary_cache
+
+# Called with (engine, product ids) after every commit that changed inventory
+_commit_listeners: List[Callable] = []
+
+def on_inventory_committed(listener: Callable) -> Callable:
+    """Register a listener for committed inventory changes"""
+    _commit_listeners.append(listener)
+    return listener
+
+def mark_inventory_changed(session: Session, product_ids: Iterable[int] = ()):
+    """Invalidate the summary cache (and notify listeners) once the session's transaction commits"""
+    session.info.setdefault(SESSION_CHANGED_PRODUCTS_KEY, set()).update(product_ids)
+
+@event.listens_for(Product, "after_insert")
+@event.listens_for(Product, "after_update")
+@event.listens_for(Product, "after_delete")
+def _mark_product_changed_on_flush(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        mark_inventory_changed(session, [target.id])
+
+@event.listens_for(Inventory, "after_insert")
+@event.listens_for(Inventory, "after_update")
+@event.listens_for(Inventory, "after_delete")
+def _mark_inventory_changed_on_flush(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        mark_inventory_changed(session, [target.product_id])
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_summary_on_commit(session):
+    product_ids = session.info.pop(SESSION_CHANGED_PRODUCTS_KEY, None)
+    if product_ids is None:
+        return
+    inventory_summary_cache.invalidate()
+    bind = session.get_bind()
+    for listener in _commit_listeners:
+        try:
+            listener(bind, product_ids)
+        except Exception as e:
+            logger.warning(f"Inventory commit listener failed: {str(e)}")
+
+@event.listens_for(Session, "after_rollback")
+def _discard_summary_changes_on_rollback(session):
+    session.info.pop(SESSION_CHANGED_PRODUCTS_KEY, None)
@@ -0,0 +1,291 @@
+import logging
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, event, func, inspect, select, text, update
+from sqlalchemy.orm import Session, object_session
+from ..models.database_models import (
+    Product, StockMovement, InboundShipment, OutboundOrder, ChatMessage,
+    MovementDailyRollup, MovementHourlyRollup, OrderStatusDailyRollup, ChatIntentDailyRollup
+)
+
+logger = logging.getLogger(__name__)
+
+SESSION_ROLLUP_DELTAS_KEY = "kpi_rollup_deltas"
+
+# rollup model -> (key columns, counter columns)
+ROLLUP_COLUMNS = {
+    MovementDailyRollup: (("day", "product_id", "movement_type"), ("movement_count", "quantity_total")),
+    MovementHourlyRollup: (("hour", "movement_type"), ("movement_count", "quantity_total")),
+    OrderStatusDailyRollup: (("day", "order_kind", "status"), ("order_count",)),
+    ChatIntentDailyRollup: (("day", "intent"), ("message_count",)),
+}
+
+def _hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+def _movement_rollups(get: Callable) -> List[Tuple]:
+    created_at = get("created_at") or datetime.utcnow()
+    quantity = abs(get("quantity") or 0)
+    return [
+        (MovementDailyRollup, (created_at.date(), get("product_id"), get("movement_type")), (1, quantity)),
+        (MovementHourlyRollup, (_hour(created_at), get("movement_type")), (1, quantity)),
+    ]
+
+def _inbound_rollups(get: Callable) -> List[Tuple]:
+    created_at = get("created_at") or datetime.utcnow()
+    return [(OrderStatusDailyRollup, (created_at.date(), "inbound", get("status") or "unknown"), (1,))]
+
+def _outbound_rollups(get: Callable) -> List[Tuple]:
+    created_at = get("created_at") or datetime.utcnow()
+    return [(OrderStatusDailyRollup, (created_at.date(), "outbound", get("status") or "unknown"), (1,))]
+
+def _chat_rollups(get: Callable) -> List[Tuple]:
+    created_at = get("created_at") or datetime.utcnow()
+    return [(ChatIntentDailyRollup, (created_at.date(), get("intent") or "unknown"), (1,))]
+
+# source model -> (rollup entries for one row, columns the entries depend on)
+ROLLUP_SOURCES = {
+    StockMovement: (_movement_rollups, ("created_at", "product_id", "movement_type", "quantity")),
+    InboundShipment: (_inbound_rollups, ("created_at", "status")),
+    OutboundOrder: (_outbound_rollups, ("created_at", "status")),
+    ChatMessage: (_chat_rollups, ("created_at", "intent")),
+}
+
+# source model -> rollup tables it feeds, with the filter selecting its share of a shared table
+ROLLUP_TARGETS = {
+    StockMovement: [(MovementDailyRollup, None), (MovementHourlyRollup, None)],
+    InboundShipment: [(OrderStatusDailyRollup, OrderStatusDailyRollup.order_kind == "inbound")],
+    OutboundOrder: [(OrderStatusDailyRollup, OrderStatusDailyRollup.order_kind == "outbound")],
+    ChatMessage: [(ChatIntentDailyRollup, None)],
+}
+
+def _accumulate(deltas: Dict, entries: Iterable[Tuple], sign: int = 1):
+    for model, key, increments in entries:
+        current = deltas.get((model, key))
+        signed = tuple(sign * value for value in increments)
+        deltas[(model, key)] = signed if current is None else tuple(a + b for a, b in zip(current, signed))
+
+def _upsert(connection, model, rows: List[Dict]):
+    key_columns, counter_columns = ROLLUP_COLUMNS[model]
+    table = model.__table__
+    dialect = connection.dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={column: table.c[column] + statement.excluded[column] for column in counter_columns}
+        )
+        connection.execute(statement, rows)
+        return
+
+    # Other backends: update the existing bucket, insert it if there was none
+    for row in rows:
+        result = connection.execute(
+            update(table).where(and_(*[table.c[column] == row[column] for column in key_columns])).values(
+                {column: table.c[column] + row[column] for column in counter_columns}
+            )
+        )
+        if result.rowcount == 0:
+            connection.execute(table.insert(), row)
+
+def apply_rollup_deltas(connection, deltas: Dict):
+    """Add accumulated {(rollup model, key): increments} to the rollup tables"""
+    rows_by_model = {}
+    for (model, key), increments in deltas.items():
+        if not any(increments):
+            continue
+        key_columns, counter_columns = ROLLUP_COLUMNS[model]
+        row = dict(zip(key_columns, key))
+        row.update(zip(counter_columns, increments))
+        rows_by_model.setdefault(model, []).append(row)
+
+    for model, rows in rows_by_model.items():
+        _upsert(connection, model, rows)
+
+def record_stock_movements(session: Session, movements: List[Dict]):
+    """Roll up StockMovement rows inserted with Core (bypassing the ORM events)"""
+    deltas = {}
+    for movement in movements:
+        _accumulate(deltas, _movement_rollups(movement.get))
+    apply_rollup_deltas(session.connection(), deltas)
+
+def _record(target, entries: List[Tuple], sign: int):
+    session = object_session(target)
+    if session is not None:
+        _accumulate(session.info.setdefault(SESSION_ROLLUP_DELTAS_KEY, {}), entries, sign)
+
+def _previous_value(state, attribute: str):
+    history = state.attrs[attribute].history
+    return history.deleted[0] if history.deleted else state.attrs[attribute].value
+
+def _register_rollup_events(model, rollups_for: Callable, attributes: Tuple[str, ...]):
+    @event.listens_for(model, "after_insert")
+    def _rollup_insert(mapper, connection, target):
+        _record(target, rollups_for(lambda attribute: getattr(target, attribute)), 1)
+
+    @event.listens_for(model, "after_delete")
+    def _rollup_delete(mapper, connection, target):
+        _record(target, rollups_for(lambda attribute: getattr(target, attribute)), -1)
+
+    @event.listens_for(model, "after_update")
+    def _rollup_update(mapper, connection, target):
+        state = inspect(target)
+        if not any(state.attrs[attribute].history.has_changes() for attribute in attributes):
+            return
+        _record(target, rollups_for(lambda attribute: _previous_value(state, attribute)), -1)
+        _record(target, rollups_for(lambda attribute: getattr(target, attribute)), 1)
+
+for _model, (_rollups_for, _attributes) in ROLLUP_SOURCES.items():
+    _register_rollup_events(_model, _rollups_for, _attributes)
+
+@event.listens_for(Session, "after_flush")
+def _apply_rollup_deltas_on_flush(session, flush_context):
+    # Written in the flush's transaction, so rollups commit or roll back with the events
+    deltas = session.info.pop(SESSION_ROLLUP_DELTAS_KEY, None)
+    if deltas:
+        apply_rollup_deltas(session.connection(), deltas)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rollup_deltas_on_rollback(session):
+    session.info.pop(SESSION_ROLLUP_DELTAS_KEY, None)
+
+class KpiRollupService:
+    """
+    Window aggregates read from the KPI rollup tables.
+
+    Rollups are updated in the same transaction as every ORM write to stock
+    movements, shipments, orders and chat messages, so a window query costs
+    O(days) (or O(hours)) instead of O(rows). Day windows are whole UTC days.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def movement_totals_by_type(self, since_day: Optional[date] = None) -> Dict[str, Dict]:
+        """{movement_type: {"count", "quantity"}} for movements created on or after since_day"""
+        query = self.db.query(
+            MovementDailyRollup.movement_type,
+            func.sum(MovementDailyRollup.movement_count),
+            func.sum(MovementDailyRollup.quantity_total)
+        )
+        if since_day is not None:
+            query = query.filter(MovementDailyRollup.day >= since_day)
+        rows = query.group_by(MovementDailyRollup.movement_type).all()
+        return {movement_type: {"count": count or 0, "quantity": quantity or 0}
+                for movement_type, count, quantity in rows}
+
+    def movement_count_since(self, since: datetime) -> int:
+        """Movements created since `since`, at hour resolution"""
+        return self.db.query(func.sum(MovementHourlyRollup.movement_count)).filter(
+            MovementHourlyRollup.hour >= _hour(since)
+        ).scalar() or 0
+
+    def order_counts_by_status(self, order_kind: str, since_day: Optional[date] = None) -> Dict[str, int]:
+        """{status: count} for inbound shipments or outbound orders created on or after since_day"""
+        query = self.db.query(
+            OrderStatusDailyRollup.status,
+            func.sum(OrderStatusDailyRollup.order_count)
+        ).filter(OrderStatusDailyRollup.order_kind == order_kind)
+        if since_day is not None:
+            query = query.filter(OrderStatusDailyRollup.day >= since_day)
+        rows = query.group_by(OrderStatusDailyRollup.status).all()
+        return {status: count or 0 for status, count in rows if count}
+
+    def chat_message_count(self, since_day: Optional[date] = None) -> int:
+        """Chat messages created on or after since_day"""
+        query = self.db.query(func.sum(ChatIntentDailyRollup.message_count))
+        if since_day is not None:
+            query = query.filter(ChatIntentDailyRollup.day >= since_day)
+        return query.scalar() or 0
+
+    def top_products_by_movement(self, limit: int = 10) -> List:
+        """Most active products by movement count (id, sku, name, movement_count, total_quantity)"""
+        movement_count = func.sum(MovementDailyRollup.movement_count).label("movement_count")
+        return self.db.query(
+            Product.id,
+            Product.sku,
+            Product.name,
+            movement_count,
+            func.sum(MovementDailyRollup.quantity_total).label("total_quantity")
+        ).join(
+            MovementDailyRollup, Product.id == MovementDailyRollup.product_id
+        ).group_by(Product.id).having(movement_count > 0).order_by(movement_count.desc()).limit(limit).all()
+
+    def reconcile(self) -> List[str]:
+        """Rebuild any rollup whose totals no longer match its source table; returns the rebuilt tables"""
+        if not self._stale_sources():
+            return []
+        # Every worker reconciles at startup: re-check under the lock, so only the first one rebuilds
+        try:
+            self._lock_rollups()
+            stale_sources = self._stale_sources()
+        except Exception:
+            self.db.rollback()
+            raise
+        if not stale_sources:
+            self.db.commit()
+            return []
+        return self.rebuild(stale_sources)
+
+    def _lock_rollups(self):
+        """
+        Block rollup writers until this transaction ends. On PostgreSQL (READ
+        COMMITTED) a rebuild would otherwise miss rows a concurrent rebuild or
+        write just committed and add its totals on top of theirs. SQLite
+        already serializes writers on the database.
+        """
+        connection = self.db.connection()
+        if connection.dialect.name == "postgresql":
+            tables = ", ".join(sorted(model.__tablename__ for model in ROLLUP_COLUMNS))
+            connection.execute(text(f"LOCK TABLE {tables} IN EXCLUSIVE MODE"))
+
+    def _stale_sources(self) -> List:
+        stale_sources = []
+        for source, targets in ROLLUP_TARGETS.items():
+            expected = self.db.query(func.count()).select_from(source).scalar()
+            for model, condition in targets:
+                counter = getattr(model, ROLLUP_COLUMNS[model][1][0])
+                query = self.db.query(func.coalesce(func.sum(counter), 0))
+                if condition is not None:
+                    query = query.filter(condition)
+                if query.scalar() != expected:
+                    stale_sources.append(source)
+                    break
+        return stale_sources
+
+    def rebuild(self, sources: Optional[List] = None) -> List[str]:
+        """Recompute rollups from their source rows (one pass per source table)"""
+        sources = sources or list(ROLLUP_SOURCES)
+        rebuilt = []
+        try:
+            # Taken before the deletes, so the source scan (a fresh snapshot per statement) sees every committed row
+            self._lock_rollups()
+            for source in sources:
+                rollups_for, attributes = ROLLUP_SOURCES[source]
+                for model, condition in ROLLUP_TARGETS[source]:
+                    statement = model.__table__.delete()
+                    if condition is not None:
+                        statement = statement.where(condition)
+                    self.db.execute(statement)
+
+                deltas = {}
+                columns = [getattr(source, attribute) for attribute in attributes]
+                for row in self.db.execute(select(*columns).execution_options(yield_per=5000)):
+                    values = dict(zip(attributes, row))
+                    _accumulate(deltas, rollups_for(values.get))
+                apply_rollup_deltas(self.db.connection(), deltas)
+                rebuilt.extend(model.__tablename__ for model, _ in ROLLUP_TARGETS[source])
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error rebuilding KPI rollups: {str(e)}")
+            raise
+
+        if rebuilt:
+            logger.info(f"Rebuilt KPI rollups: {', '.join(rebuilt)}")
+        return rebuilt
@@ -0,0 +1,247 @@
+import bisect
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Dict, List, Optional, Set
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..models.database_models import Product, Inventory
+from .inventory_summary_cache import InventorySummaryCache, get_inventory_summary_cache, on_inventory_committed
+
+logger = logging.getLogger(__name__)
+
+def shortfall_ratio(available_quantity: int, reorder_level: int) -> float:
+    """Available stock as a fraction of the reorder level (lower is more urgent)"""
+    if reorder_level and reorder_level > 0:
+        return available_quantity / reorder_level
+    return float(available_quantity)
+
+class _LowStockState:
+    """Low-stock members of one database, ordered by shortfall ratio"""
+
+    def __init__(self):
+        self.loaded = False
+        self.loading = False
+        self.loaded_at = 0.0
+        self.epoch = 0  # bumped by every full load
+        self.version: Optional[int] = None  # shared summary version the entries reflect
+        self.entries: Dict[int, Dict] = {}  # inventory id -> item
+        self.inventory_ids_by_product: Dict[int, Set[int]] = {}
+        self.order: List[tuple] = []  # sorted (ratio, inventory id)
+        self.dirty: Dict[int, int] = {}  # product id -> change sequence number
+        self.applied: Dict[int, int] = {}  # product id -> sequence number last applied
+
+    def reset(self):
+        self.entries = {}
+        self.inventory_ids_by_product = {}
+        self.order = []
+
+    def add(self, inventory_id: int, item: Dict):
+        self.entries[inventory_id] = item
+        self.inventory_ids_by_product.setdefault(item["product_id"], set()).add(inventory_id)
+        bisect.insort(self.order, (item["shortfall_ratio"], inventory_id))
+
+    def remove_product(self, product_id: int):
+        for inventory_id in self.inventory_ids_by_product.pop(product_id, ()):
+            item = self.entries.pop(inventory_id)
+            position = bisect.bisect_left(self.order, (item["shortfall_ratio"], inventory_id))
+            del self.order[position]
+
+class LowStockIndex:
+    """
+    Maintained set of inventory rows with available_quantity <= reorder_level.
+
+    The first read loads only the low-stock rows. Afterwards every committed
+    stock or product change marks its product ids dirty, and the next read
+    re-reads just those products, so alert queries do not scan the catalog.
+
+    Commits in other workers only show up as a newer shared summary version
+    (the Redis version store): when the version moved past any bump this
+    process did not make itself, the next read reloads in full.
+
+    Reads plan their work under the lock, run the query without it, then apply
+    the rows under the lock again; sequence numbers keep a slow reader from
+    overwriting newer rows applied by a faster one.
+    """
+
+    def __init__(self, max_age_seconds: Optional[float] = None,
+                 summary_cache: Optional[InventorySummaryCache] = None):
+        # Upper bound on staleness for writes made outside this application
+        self.max_age_seconds = max_age_seconds
+        self._summary_cache = summary_cache
+        self._lock = threading.Lock()
+        self._states = weakref.WeakKeyDictionary()  # engine -> _LowStockState
+        self._sequence = 0
+
+    def _select(self):
+        return select(
+            Inventory.id.label("inventory_id"),
+            Product.id,
+            Product.sku,
+            Product.name,
+            Product.category,
+            Product.reorder_level,
+            Product.location,
+            Inventory.quantity,
+            Inventory.reserved_quantity,
+            Inventory.available_quantity,
+            Inventory.last_updated
+        ).join(Inventory, Product.id == Inventory.product_id)
+
+    def _to_item(self, row) -> Dict:
+        return {
+            "product_id": row.id,
+            "sku": row.sku,
+            "name": row.name,
+            "category": row.category,
+            "location": row.location,
+            "quantity": row.quantity,
+            "reserved_quantity": row.reserved_quantity,
+            "available_quantity": row.available_quantity,
+            "reorder_level": row.reorder_level,
+            "last_updated": row.last_updated,
+            "needs_reorder": True,
+            "shortfall_ratio": shortfall_ratio(row.available_quantity, row.reorder_level)
+        }
+
+    def _is_low(self, row) -> bool:
+        return (row.available_quantity is not None and row.reorder_level is not None
+                and row.available_quantity <= row.reorder_level)
+
+    @property
+    def summary_cache(self) -> InventorySummaryCache:
+        return self._summary_cache or get_inventory_summary_cache()
+
+    def _changed_elsewhere(self, state: _LowStockState, version: Optional[int]) -> bool:
+        """Whether another worker committed since the state was read (always, while the version is unknown)"""
+        if version is None or state.version is None:
+            return True
+        return version != state.version and not self.summary_cache.bumped_here(state.version, version)
+
+    def _plan(self, bind):
+        """Decide what to read: ("load", epoch, None), ("refresh", epoch, {product: seq}) or None"""
+        # Read outside the lock: with Redis this is a network round trip
+        version = self.summary_cache.current_version()
+        with self._lock:
+            state = self._states.get(bind)
+            if state is None:
+                state = self._states[bind] = _LowStockState()
+            expired = (state.loaded and self.max_age_seconds is not None
+                       and time.monotonic() - state.loaded_at > self.max_age_seconds)
+            if not state.loaded or expired or self._changed_elsewhere(state, version):
+                state.epoch += 1
+                state.version = version
+                state.loading = True
+                # Changes committed from here on stay dirty and are re-read after the load
+                state.dirty = {}
+                state.applied = {}
+                return state, ("load", state.epoch, None)
+            # Every commit since the last read was made here and marked its products dirty
+            state.version = version
+            if state.dirty:
+                batch, state.dirty = state.dirty, {}
+                return state, ("refresh", state.epoch, batch)
+            return state, None
+
+    def _load_statements(self):
+        return [self._select().where(Inventory.available_quantity <= Product.reorder_level)]
+
+    def _refresh_statements(self, product_ids: List[int]):
+        return [
+            self._select().where(Product.id.in_(product_ids[start:start + 500]))
+            for start in range(0, len(product_ids), 500)
+        ]
+
+    def _apply(self, state: _LowStockState, plan, rows) -> bool:
+        """Apply rows read for `plan`; False if a newer full load superseded it"""
+        kind, epoch, batch = plan
+        with self._lock:
+            if epoch != state.epoch:
+                return False
+            if kind == "load":
+                state.reset()
+                for row in rows:
+                    state.add(row.inventory_id, self._to_item(row))
+                state.loaded = True
+                state.loading = False
+                state.loaded_at = time.monotonic()
+                logger.info(f"Low stock index loaded with {len(rows)} items")
+                return True
+
+            current = {product_id for product_id, sequence in batch.items()
+                       if state.applied.get(product_id, 0) <= sequence}
+            for product_id in current:
+                state.remove_product(product_id)
+                state.applied[product_id] = batch[product_id]
+            for row in rows:
+                if row.id in current and self._is_low(row):
+                    state.add(row.inventory_id, self._to_item(row))
+            return True
+
+    def _statements_for(self, plan):
+        kind, _, batch = plan
+        return self._load_statements() if kind == "load" else self._refresh_statements(list(batch))
+
+    def _read(self, state: _LowStockState, plan, rows, limit: Optional[int]) -> List[Dict]:
+        if plan is not None and not self._apply(state, plan, rows) and plan[0] == "load":
+            # Another reader started a newer load; answer from the rows read here
+            items = sorted((self._to_item(row) for row in rows),
+                           key=lambda item: item["shortfall_ratio"])
+            return items if limit is None else items[:limit]
+        with self._lock:
+            order = state.order if limit is None else state.order[:limit]
+            return [state.entries[inventory_id] for _, inventory_id in order]
+
+    def get_low_stock_items(self, db: Session, limit: Optional[int] = None) -> List[Dict]:
+        """Low-stock items, most urgent (lowest available / reorder level) first"""
+        state, plan = self._plan(db.get_bind())
+        rows = []
+        if plan is not None:
+            for statement in self._statements_for(plan):
+                rows.extend(db.execute(statement).all())
+        return self._read(state, plan, rows, limit)
+
+    async def get_low_stock_items_async(self, db, limit: Optional[int] = None) -> List[Dict]:
+        """get_low_stock_items for an AsyncSession"""
+        state, plan = self._plan(db.get_bind())
+        rows = []
+        if plan is not None:
+            for statement in self._statements_for(plan):
+                rows.extend((await db.execute(statement)).all())
+        return self._read(state, plan, rows, limit)
+
+    def count(self, db: Session) -> int:
+        """Number of low-stock inventory rows"""
+        return len(self.get_low_stock_items(db))
+
+    def mark_dirty(self, product_ids):
+        """Re-check these products on the next read"""
+        # Every engine is marked: the sync and async engines share one database
+        with self._lock:
+            self._sequence += 1
+            for state in self._states.values():
+                if state.loaded or state.loading:
+                    for product_id in product_ids:
+                        state.dirty[product_id] = self._sequence
+
+    def invalidate(self):
+        """Drop all state; the next read reloads from the database"""
+        with self._lock:
+            self._states.clear()
+
+def _create_low_stock_index() -> LowStockIndex:
+    max_age = os.getenv("INVENTORY_CACHE_MAX_AGE")
+    return LowStockIndex(max_age_seconds=float(max_age) if max_age else None)
+
+# Process-wide low stock index
+low_stock_index = _create_low_stock_index()
+
+def get_low_stock_index() -> LowStockIndex:
+    """Get the process-wide low stock index"""
+    return low_stock_index
+
+@on_inventory_committed
+def _mark_low_stock_dirty(bind, product_ids):
+    low_stock_index.mark_dirty(product_ids)
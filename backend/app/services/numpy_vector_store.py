@@ -0,0 +1,415 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock (single worker only)
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.json"
+RECORDS_FILE = "records.jsonl"
+LOCK_FILE = "index.lock"
+# Version directories that are neither current nor this old are left over from a crashed writer
+ORPHAN_SECONDS = 3600
+# Metadata fields that can be filtered on (held as integer codes next to the matrix)
+FILTER_FIELDS = ("type", "category")
+# int8 rows scored per block, bounding the float32 temporary of a query
+BLOCK_ROWS = 16384
+
+def _normalize(vectors) -> np.ndarray:
+    matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+def _quantize(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-row symmetric int8 codes and scales (row ~= codes * scale)"""
+    scales = np.abs(matrix).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    return np.round(matrix / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+@contextmanager
+def _locked(path: str, shared: bool = False):
+    """flock on `path` (exclusive for writers, shared for readers) across processes"""
+    with open(path, "a") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+class NumpyVectorStore:
+    """
+    Brute-force vector index for deployments without chromadb.
+
+    Normalized embeddings live in one float32 matrix, so a top-k query is
+    one vectorized dot product plus an argpartition. With dtype="int8" each
+    row's offset from a fixed center vector is quantized with its own scale:
+    a quarter of the memory, and the shared component that dominates
+    similar documents (e.g. templated product texts) costs no precision. `type` and `category` metadata are kept as integer codes
+    for vectorized filtering. Persisted as .npy files plus a JSON-lines
+    record sidecar; reloading memory-maps the matrix and reads document
+    texts only for the rows a query returns. Implements the parts of the
+    LangChain vector store API the RAG services use.
+
+    Workers may share a path: each keeps its own copy in memory (and rebuilds
+    it on its first query), and persist writes a uniquely named version
+    directory, swapping index.json under a file lock. persist rewrites the
+    whole matrix and record file, so a debounced incremental flush costs time
+    proportional to the index size, not the change (about 0.1 s per 100k
+    384-dim float32 rows); raise RAG_INDEX_DEBOUNCE_SECONDS for large catalogs.
+    """
+
+    def __init__(self, path: Optional[str], embeddings, dtype: str = "float32"):
+        if dtype not in ("float32", "int8"):
+            raise ValueError(f"Unsupported vector dtype: {dtype}")
+        self.path = path
+        self.embeddings = embeddings
+        self.dtype = dtype
+        self._lock = threading.RLock()
+        self._dim: Optional[int] = None
+        self._count = 0
+        self._vectors: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._center: Optional[np.ndarray] = None
+        self._codes = {field: np.empty(0, dtype=np.int32) for field in FILTER_FIELDS}
+        self._vocabulary: Dict[str, List[str]] = {field: [] for field in FILTER_FIELDS}
+        self._vocabulary_codes: Dict[str, Dict[str, int]] = {field: {} for field in FILTER_FIELDS}
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadatas: List[Dict] = []
+        self._rows: Dict[str, int] = {}
+        # Byte offsets of the records while they are still on disk (after a reload)
+        self._offsets: Optional[np.ndarray] = None
+        self._records_handle = None
+        self._version: Optional[str] = None
+        self._dirty = False
+        if path and os.path.exists(os.path.join(path, INDEX_FILE)):
+            self._load()
+
+    @property
+    def _collection(self):
+        """Chroma-style collection handle (count / upsert), for callers written against Chroma"""
+        return self
+
+    def count(self) -> int:
+        return self._count
+
+    def upsert(self, ids: List[str], embeddings, metadatas: List[Dict], documents: List[str]):
+        """Insert or replace documents with precomputed embeddings (Chroma's collection signature)"""
+        if not ids:
+            return
+        matrix = _normalize(embeddings)
+        with self._lock:
+            self._load_records()
+            if self._dim is None:
+                self._dim = matrix.shape[1]
+            elif matrix.shape[1] != self._dim:
+                raise ValueError(f"Embedding dimension {matrix.shape[1]} does not match the index ({self._dim})")
+            # The last occurrence of a repeated id wins
+            positions = {doc_id: position for position, doc_id in enumerate(ids)}
+            new_ids = [doc_id for doc_id in positions if doc_id not in self._rows]
+            self._reserve(self._count + len(new_ids))
+            for doc_id in new_ids:
+                self._rows[doc_id] = self._count
+                self._ids.append(doc_id)
+                self._texts.append("")
+                self._metadatas.append({})
+                self._count += 1
+            rows = np.fromiter((self._rows[doc_id] for doc_id in positions), dtype=np.int64, count=len(positions))
+            sources = np.fromiter(positions.values(), dtype=np.int64, count=len(positions))
+            if self.dtype == "int8":
+                if self._center is None:
+                    self._center = matrix.mean(axis=0)
+                self._vectors[rows], self._scales[rows] = _quantize(matrix[sources] - self._center)
+            else:
+                self._vectors[rows] = matrix[sources]
+            for row, position in zip(rows.tolist(), sources.tolist()):
+                metadata = dict(metadatas[position] or {})
+                self._texts[row] = documents[position]
+                self._metadatas[row] = metadata
+                for field in FILTER_FIELDS:
+                    self._codes[field][row] = self._code(field, metadata.get(field), add=True)
+            self._dirty = True
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[Dict]] = None,
+                  ids: Optional[List[str]] = None, **kwargs) -> List[str]:
+        texts = list(texts)
+        ids = list(ids) if ids is not None else [str(uuid.uuid4()) for _ in texts]
+        self.upsert(ids, self.embeddings.embed_documents(texts), metadatas or [{} for _ in texts], texts)
+        return ids
+
+    def add_documents(self, documents: List, ids: Optional[List[str]] = None, **kwargs) -> List[str]:
+        return self.add_texts([document.page_content for document in documents],
+                              [document.metadata for document in documents], ids=ids)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs):
+        with self._lock:
+            self._load_records()
+            drop = {self._rows[doc_id] for doc_id in ids or () if doc_id in self._rows}
+            if not drop:
+                return
+            keep = np.array([row not in drop for row in range(self._count)], dtype=bool)
+            self._vectors = self._vectors[:self._count][keep]
+            if self._scales is not None:
+                self._scales = self._scales[:self._count][keep]
+            for field in FILTER_FIELDS:
+                self._codes[field] = self._codes[field][:self._count][keep]
+            self._ids = [doc_id for row, doc_id in enumerate(self._ids) if keep[row]]
+            self._texts = [text for row, text in enumerate(self._texts) if keep[row]]
+            self._metadatas = [metadata for row, metadata in enumerate(self._metadatas) if keep[row]]
+            self._rows = {doc_id: row for row, doc_id in enumerate(self._ids)}
+            self._count = len(self._ids)
+            self._dirty = True
+
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict] = None,
+            include: Optional[List[str]] = None, **kwargs) -> Dict[str, List]:
+        """Documents by id and/or metadata filter: {"ids", "metadatas", "documents"}"""
+        include = ["metadatas", "documents"] if include is None else include
+        with self._lock:
+            self._load_records()
+            mask = self._filter_mask(where, self._count)
+            rows = np.flatnonzero(mask).tolist()
+            if ids is not None:
+                wanted = set(ids)
+                rows = [row for row in rows if self._ids[row] in wanted]
+            result = {"ids": [self._ids[row] for row in rows]}
+            if "metadatas" in include:
+                result["metadatas"] = [self._metadatas[row] for row in rows]
+            if "documents" in include:
+                result["documents"] = [self._texts[row] for row in rows]
+        return result
+
+    def search(self, query_vector, k: int = 4, where: Optional[Dict] = None) -> List[Tuple[str, str, Dict, float]]:
+        """Top-k (id, text, metadata, cosine similarity) for a query embedding"""
+        query = _normalize(query_vector)[0]
+        with self._lock:
+            count = self._count
+            if count == 0 or k <= 0:
+                return []
+            scores = self._scores(query, count)
+            mask = self._filter_mask(where, count)
+            if not mask.all():
+                scores = np.where(mask, scores, -np.inf)
+            k = min(k, int(mask.sum()))
+            if k == 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [(*self._record(row), float(scores[row])) for row in top.tolist()]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: Optional[Dict] = None,
+                                     **kwargs) -> List[Tuple[Any, float]]:
+        from langchain.docstore.document import Document
+
+        return [(Document(page_content=text, metadata=metadata), score)
+                for doc_id, text, metadata, score in self.search(self.embeddings.embed_query(query), k, filter)]
+
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[Dict] = None, **kwargs) -> List:
+        return [document for document, _ in self.similarity_search_with_score(query, k, filter)]
+
+    def as_retriever(self, search_type: str = "similarity", search_kwargs: Optional[Dict] = None, **kwargs):
+        if search_type != "similarity":
+            raise ValueError(f"Unsupported search type for the NumPy vector store: {search_type}")
+        search_kwargs = search_kwargs or {}
+        return NumpyRetriever(self, search_kwargs.get("k", 4), search_kwargs.get("filter"))
+
+    def persist(self):
+        """Write the index if it changed (new version directory, then a locked index.json swap)"""
+        with self._lock:
+            if not self._dirty or not self.path:
+                return
+            # Unique per writer, so workers sharing the path never write into the same directory
+            version = f"{os.getpid()}-{uuid.uuid4().hex[:12]}"
+            directory = os.path.join(self.path, version)
+            os.makedirs(directory)
+            count = self._count
+            np.save(os.path.join(directory, "vectors.npy"), self._vectors[:count])
+            if self._scales is not None:
+                np.save(os.path.join(directory, "scales.npy"), self._scales[:count])
+                np.save(os.path.join(directory, "center.npy"), self._center)
+            for field in FILTER_FIELDS:
+                np.save(os.path.join(directory, f"{field}.npy"), self._codes[field][:count])
+            offsets = np.zeros(count + 1, dtype=np.int64)
+            with open(os.path.join(directory, RECORDS_FILE), "wb") as handle:
+                for row in range(count):
+                    handle.write((json.dumps({"id": self._ids[row], "text": self._texts[row],
+                                              "metadata": self._metadatas[row]}) + "\n").encode("utf-8"))
+                    offsets[row + 1] = handle.tell()
+            np.save(os.path.join(directory, "offsets.npy"), offsets)
+            index = {"version": version, "dtype": self.dtype, "dim": self._dim, "count": count,
+                     "vocabulary": self._vocabulary}
+            with _locked(os.path.join(self.path, LOCK_FILE)):
+                replaced = {self._version, self._current_version()}
+                temporary = os.path.join(self.path, f"{INDEX_FILE}.{version}.tmp")
+                with open(temporary, "w") as handle:
+                    json.dump(index, handle)
+                os.replace(temporary, os.path.join(self.path, INDEX_FILE))
+                self._remove_old_versions(version, replaced)
+            self._version = version
+            self._dirty = False
+
+    def _current_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.path, INDEX_FILE)) as handle:
+                return str(json.load(handle)["version"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _remove_old_versions(self, current: str, replaced: set):
+        """
+        Delete the versions this swap replaced, plus directories left by crashed
+        writers (called under the file lock). Workers that memory-mapped a
+        deleted version keep reading it through their open files; versions other
+        writers are still preparing are recent and kept.
+        """
+        cutoff = time.time() - ORPHAN_SECONDS
+        for name in os.listdir(self.path):
+            directory = os.path.join(self.path, name)
+            if name == current or not os.path.isdir(directory):
+                continue
+            if name in replaced or os.path.getmtime(directory) < cutoff:
+                shutil.rmtree(directory, ignore_errors=True)
+
+    def _load(self):
+        # Shared lock: a concurrent persist cannot delete the version between reading index.json and opening it
+        with _locked(os.path.join(self.path, LOCK_FILE), shared=True):
+            with open(os.path.join(self.path, INDEX_FILE)) as handle:
+                index = json.load(handle)
+            if index["dtype"] != self.dtype:
+                raise ValueError(f"Index at {self.path} holds {index['dtype']} vectors, not {self.dtype}")
+            directory = os.path.join(self.path, str(index["version"]))
+            self._version = str(index["version"])
+            self._dim = index["dim"]
+            self._count = index["count"]
+            self._vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r")
+            if self.dtype == "int8":
+                self._scales = np.load(os.path.join(directory, "scales.npy"), mmap_mode="r")
+                self._center = np.load(os.path.join(directory, "center.npy"))
+            for field in FILTER_FIELDS:
+                self._codes[field] = np.load(os.path.join(directory, f"{field}.npy"), mmap_mode="r")
+                self._vocabulary[field] = list(index["vocabulary"][field])
+                self._vocabulary_codes[field] = {value: code for code, value in enumerate(self._vocabulary[field])}
+            self._offsets = np.load(os.path.join(directory, "offsets.npy"), mmap_mode="r")
+            # Kept open, so the records stay readable after another worker replaces this version
+            self._records_handle = open(os.path.join(directory, RECORDS_FILE), "rb")
+        self._ids = self._texts = self._metadatas = None
+        self._rows = None
+
+    def _load_records(self):
+        """Read every record (and copy the memory-mapped arrays) before a write or a scan by id"""
+        if self._offsets is None:
+            return
+        self._ids, self._texts, self._metadatas = [], [], []
+        with self._records_handle as handle:
+            handle.seek(0)
+            for line in handle:
+                record = json.loads(line)
+                self._ids.append(record["id"])
+                self._texts.append(record["text"])
+                self._metadatas.append(record["metadata"])
+        self._rows = {doc_id: row for row, doc_id in enumerate(self._ids)}
+        self._vectors = np.array(self._vectors)
+        if self._scales is not None:
+            self._scales = np.array(self._scales)
+        for field in FILTER_FIELDS:
+            self._codes[field] = np.array(self._codes[field])
+        self._offsets = None
+        self._records_handle = None
+
+    def _record(self, row: int) -> Tuple[str, str, Dict]:
+        if self._offsets is None:
+            return self._ids[row], self._texts[row], self._metadatas[row]
+        self._records_handle.seek(int(self._offsets[row]))
+        record = json.loads(self._records_handle.read(int(self._offsets[row + 1] - self._offsets[row])))
+        return record["id"], record["text"], record["metadata"]
+
+    def _reserve(self, rows: int):
+        """Grow the arrays (doubling) to hold at least `rows` rows"""
+        capacity = 0 if self._vectors is None else self._vectors.shape[0]
+        if rows <= capacity:
+            return
+        capacity = max(rows, 2 * capacity, 1024)
+        vectors = np.zeros((capacity, self._dim), dtype=np.int8 if self.dtype == "int8" else np.float32)
+        vectors[:self._count] = self._vectors[:self._count] if self._vectors is not None else 0
+        self._vectors = vectors
+        if self.dtype == "int8":
+            scales = np.ones(capacity, dtype=np.float32)
+            if self._scales is not None:
+                scales[:self._count] = self._scales[:self._count]
+            self._scales = scales
+        for field in FILTER_FIELDS:
+            codes = np.full(capacity, -1, dtype=np.int32)
+            codes[:self._count] = self._codes[field][:self._count]
+            self._codes[field] = codes
+
+    def _scores(self, query: np.ndarray, count: int) -> np.ndarray:
+        if self.dtype == "float32":
+            return self._vectors[:count] @ query
+        scores = np.empty(count, dtype=np.float32)
+        for start in range(0, count, BLOCK_ROWS):
+            end = min(start + BLOCK_ROWS, count)
+            scores[start:end] = (self._vectors[start:end].astype(np.float32) @ query) * self._scales[start:end]
+        return scores + float(self._center @ query)
+
+    def _code(self, field: str, value, add: bool = False) -> int:
+        if value is None:
+            return -1
+        value = str(value)
+        code = self._vocabulary_codes[field].get(value)
+        if code is None and add:
+            code = len(self._vocabulary[field])
+            self._vocabulary[field].append(value)
+            self._vocabulary_codes[field][value] = code
+        return -2 if code is None else code
+
+    def _filter_mask(self, where: Optional[Dict], count: int) -> np.ndarray:
+        """Rows matching a Chroma-style filter on type/category ($eq, $in, $and)"""
+        mask = np.ones(count, dtype=bool)
+        if not where:
+            return mask
+        for key, condition in where.items():
+            if key == "$and":
+                for clause in condition:
+                    mask &= self._filter_mask(clause, count)
+                continue
+            if key not in FILTER_FIELDS:
+                raise ValueError(f"NumPy vector store can only filter on {', '.join(FILTER_FIELDS)}, not {key}")
+            if isinstance(condition, dict):
+                if "$in" in condition:
+                    values = condition["$in"]
+                elif "$eq" in condition:
+                    values = [condition["$eq"]]
+                else:
+                    raise ValueError(f"Unsupported filter operator in {condition}")
+            else:
+                values = [condition]
+            codes = [self._code(key, value) for value in values]
+            mask &= np.isin(self._codes[key][:count], codes)
+        return mask
+
+class NumpyRetriever:
+    """Similarity retriever over a NumpyVectorStore (get_relevant_documents / invoke)"""
+
+    def __init__(self, vector_store: NumpyVectorStore, k: int, filter: Optional[Dict] = None):
+        self.vector_store = vector_store
+        self.k = k
+        self.filter = filter
+
+    def get_relevant_documents(self, query: str) -> List:
+        return self.vector_store.similarity_search(query, k=self.k, filter=self.filter)
+
+    def invoke(self, query: str, **kwargs) -> List:
+        return self.get_relevant_documents(query)
@@ -0,0 +1,312 @@
+import argparse
+import itertools
+import logging
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+from ..models.database_models import Product, DemandForecast, ForecastRun, ForecastRunChunk
+from .batch_forecasting_service import (
+    METHOD_HOLT_WINTERS, BatchForecastingService, WeeklyDemand, forecast_confidence,
+    forecast_demand, forecast_records, holt_winters_forecast
+)
+from .forecast_cache import prune_superseded_forecasts
+
+logger = logging.getLogger(__name__)
+
+# Candidate seasons per product: yearly, quarterly and four-weekly
+SEASON_LENGTHS = (52, 13, 4)
+# (alpha, beta, gamma) combinations tried for each product and season
+SMOOTHING_GRID = np.array(list(itertools.product((0.1, 0.3, 0.5), (0.01, 0.1), (0.1, 0.3))))
+
+# A "running" run not updated for this long is assumed to have crashed and may be resumed
+STALE_RUN_AFTER = timedelta(minutes=30)
+
+def tune_seasonal_forecasts(demand: WeeklyDemand, horizon: int, season_lengths=SEASON_LENGTHS) -> Dict:
+    """
+    Per-product model selection: the batch methods plus Holt-Winters fitted
+    for every candidate season length and smoothing combination, keeping
+    whichever has the lowest in-sample error for each product.
+
+    Returns forecast_demand's "forecast", "method", "error" and "confidence",
+    plus "season_length" (0 for non-seasonal methods).
+    """
+    result = forecast_demand(demand, horizon, season_length=season_lengths[0])
+    forecast = result["forecast"].copy()
+    error = result["error"].copy()
+    method = result["method"].astype(object)
+    season_length = np.where(method == METHOD_HOLT_WINTERS, season_lengths[0], 0)
+
+    combinations = len(SMOOTHING_GRID)
+    for m in season_lengths:
+        eligible = np.flatnonzero(demand.week_count - demand.start >= 2 * m)
+        if eligible.size == 0:
+            continue
+        # One row per (product, parameter combination)
+        tiled = WeeklyDemand(
+            np.repeat(demand.product_ids[eligible], combinations), demand.first_week,
+            np.repeat(demand.matrix[eligible], combinations, axis=0), np.repeat(demand.start[eligible], combinations)
+        )
+        parameters = np.tile(SMOOTHING_GRID, (eligible.size, 1))
+        fitted, fitted_error = holt_winters_forecast(
+            tiled, horizon, season_length=m,
+            alpha=parameters[:, 0], beta=parameters[:, 1], gamma=parameters[:, 2]
+        )
+        fitted = fitted.reshape(eligible.size, combinations, horizon)
+        fitted_error = fitted_error.reshape(eligible.size, combinations)
+
+        best = np.argmin(fitted_error, axis=1)
+        best_error = fitted_error[np.arange(eligible.size), best]
+        better = best_error < error[eligible]
+        rows = eligible[better]
+        forecast[rows] = np.clip(fitted[better, best[better]], 0, None)
+        error[rows] = best_error[better]
+        method[rows] = METHOD_HOLT_WINTERS
+        season_length[rows] = m
+
+    return {
+        "forecast": forecast,
+        "method": method.astype(str),
+        "season_length": season_length,
+        "error": error,
+        "confidence": forecast_confidence(demand, error),
+    }
+
+def forecast_chunk(product_ids: np.ndarray, first_week: int, matrix: np.ndarray, start: np.ndarray,
+                   horizon: int, season_lengths=SEASON_LENGTHS) -> Dict:
+    """Process pool entry point: fit one chunk (plain arrays in and out, no database access)"""
+    result = tune_seasonal_forecasts(WeeklyDemand(product_ids, first_week, matrix, start), horizon, season_lengths)
+    return {key: result[key] for key in ("forecast", "method", "season_length", "confidence")}
+
+def _run_status(run: ForecastRun) -> Dict:
+    return {
+        "id": run.id,
+        "status": run.status,
+        "weeks": run.weeks,
+        "total_products": run.total_products,
+        "completed_products": run.completed_products,
+        "progress": round(100 * run.completed_products / run.total_products, 1) if run.total_products else 100.0,
+        "error": run.error,
+        "started_at": run.started_at.isoformat() if run.started_at else None,
+        "updated_at": run.updated_at.isoformat() if run.updated_at else None,
+        "finished_at": run.finished_at.isoformat() if run.finished_at else None
+    }
+
+class ParallelForecastingService:
+    """
+    Chunked, resumable forecast runs that use every core.
+
+    A run splits the catalog into chunks of product ids, fixed when the run is
+    planned (products created later wait for the next run). The parent
+    process reads each chunk's sales history and streams it to a process pool
+    for the per-product seasonal fits; each finished chunk's forecasts are committed
+    in one transaction together with the chunk's completed mark, so a run
+    interrupted by a crash resumes at its unfinished chunks.
+    """
+
+    def __init__(self, chunk_size: Optional[int] = None, max_workers: Optional[int] = None,
+                 history_weeks: int = 104, season_lengths=SEASON_LENGTHS):
+        self.chunk_size = chunk_size or int(os.getenv("FORECAST_CHUNK_SIZE", "500"))
+        self.max_workers = max_workers or int(os.getenv("FORECAST_WORKERS", "0")) or os.cpu_count() or 1
+        self.batch = BatchForecastingService(history_weeks=history_weeks)
+        self.season_lengths = tuple(season_lengths)
+
+    def start_run(self, db: Session, weeks: int = 4, resume: bool = True) -> Dict:
+        """Resume the latest unfinished run for `weeks`, or plan a new one over the current catalog"""
+        try:
+            run = None
+            if resume:
+                run = db.query(ForecastRun).filter(
+                    ForecastRun.weeks == weeks, ForecastRun.status != "completed"
+                ).order_by(ForecastRun.id.desc()).first()
+            if run is not None:
+                if run.status == "running" and datetime.utcnow() - run.updated_at < STALE_RUN_AFTER:
+                    return {"success": False, "error": f"Forecast run {run.id} is already in progress",
+                            "run": _run_status(run)}
+                db.query(ForecastRunChunk).filter(
+                    ForecastRunChunk.run_id == run.id, ForecastRunChunk.status == "failed"
+                ).update({"status": "pending", "error": None}, synchronize_session=False)
+                run.status = "running"
+                run.error = None
+                db.commit()
+                logger.info(f"Resuming forecast run {run.id} at {run.completed_products}/{run.total_products} products")
+                return {"success": True, "resumed": True, "run": _run_status(run)}
+
+            product_ids = [product_id for (product_id,) in db.query(Product.id).order_by(Product.id)]
+            run = ForecastRun(status="running", weeks=weeks, chunk_size=self.chunk_size,
+                              total_products=len(product_ids), completed_products=0, as_of=datetime.utcnow())
+            db.add(run)
+            db.flush()
+            chunks = [
+                {
+                    "run_id": run.id,
+                    "chunk_index": index,
+                    "first_product_id": ids[0],
+                    "last_product_id": ids[-1],
+                    "product_count": len(ids),
+                    "product_ids": ids,
+                    "status": "pending"
+                }
+                for index, ids in enumerate(
+                    product_ids[offset:offset + self.chunk_size] for offset in range(0, len(product_ids), self.chunk_size)
+                )
+            ]
+            if chunks:
+                db.execute(insert(ForecastRunChunk.__table__), chunks)
+            db.commit()
+            logger.info(f"Planned forecast run {run.id}: {len(product_ids)} products in {len(chunks)} chunks")
+            return {"success": True, "resumed": False, "run": _run_status(run)}
+
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error starting forecast run: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    def execute_run(self, db: Session, run_id: int, progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """Forecast the run's pending chunks in the process pool, committing chunk by chunk"""
+        run = db.get(ForecastRun, run_id)
+        if run is None:
+            return {"success": False, "error": f"Forecast run {run_id} not found"}
+
+        try:
+            chunks = db.query(ForecastRunChunk).filter(
+                ForecastRunChunk.run_id == run.id, ForecastRunChunk.status == "pending"
+            ).order_by(ForecastRunChunk.chunk_index).all()
+            forecast_dates = [run.as_of + timedelta(weeks=week) for week in range(1, run.weeks + 1)]
+            pending = iter(chunks)
+            in_flight = {}
+
+            # spawn: workers never inherit the parent's connections or threads
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context) as pool:
+                def submit_next() -> bool:
+                    for chunk in pending:
+                        products, demand = self._load_chunk(db, run, chunk)
+                        future = pool.submit(forecast_chunk, demand.product_ids, demand.first_week, demand.matrix,
+                                             demand.start, run.weeks, self.season_lengths)
+                        in_flight[future] = (chunk, products, demand)
+                        return True
+                    return False
+
+                # Keep every worker busy with one chunk queued behind it
+                while len(in_flight) < 2 * self.max_workers and submit_next():
+                    pass
+                while in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        chunk, products, demand = in_flight.pop(future)
+                        self._finish_chunk(db, run, chunk, products, demand, future, forecast_dates)
+                        logger.info(f"Forecast run {run.id}: {run.completed_products}/{run.total_products} products")
+                        if progress:
+                            progress(_run_status(run))
+                        submit_next()
+
+            failed = db.query(func.count(ForecastRunChunk.id)).filter(
+                ForecastRunChunk.run_id == run.id, ForecastRunChunk.status == "failed"
+            ).scalar()
+            run.status = "failed" if failed else "completed"
+            run.error = f"{failed} chunk(s) failed; start the run again to retry them" if failed else None
+            run.finished_at = datetime.utcnow()
+            db.commit()
+            return {"success": not failed, "run": _run_status(run)}
+
+        except Exception as e:
+            db.rollback()
+            run.status = "failed"
+            run.error = str(e)
+            db.commit()
+            logger.error(f"Error in forecast run {run.id}: {str(e)}")
+            return {"success": False, "error": str(e), "run": _run_status(run)}
+
+    def get_run_status(self, db: Session, run_id: int) -> Dict:
+        """Progress of a run, with its chunks counted by status"""
+        run = db.get(ForecastRun, run_id)
+        if run is None:
+            return {"success": False, "error": f"Forecast run {run_id} not found"}
+        chunk_counts = dict(db.query(ForecastRunChunk.status, func.count(ForecastRunChunk.id)).filter(
+            ForecastRunChunk.run_id == run.id
+        ).group_by(ForecastRunChunk.status).all())
+        return {"success": True, "run": dict(_run_status(run), chunks=chunk_counts)}
+
+    def run(self, db: Session, weeks: int = 4, resume: bool = True,
+            progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """Start (or resume) a run and execute it to the end"""
+        started = self.start_run(db, weeks, resume)
+        if not started["success"]:
+            return started
+        return self.execute_run(db, started["run"]["id"], progress)
+
+    def _load_chunk(self, db: Session, run: ForecastRun, chunk: ForecastRunChunk) -> Tuple[List, WeeklyDemand]:
+        products = db.query(Product.id, Product.reorder_level).filter(
+            Product.id.between(chunk.first_product_id, chunk.last_product_id)
+        ).order_by(Product.id).all()
+        if chunk.product_ids is not None:
+            planned = set(chunk.product_ids)
+            products = [product for product in products if product.id in planned]
+        demand = self.batch.load_weekly_demand(db, [product.id for product in products], as_of=run.as_of)
+        return products, demand
+
+    def _finish_chunk(self, db: Session, run: ForecastRun, chunk: ForecastRunChunk, products: List,
+                      demand: WeeklyDemand, future, forecast_dates: List[datetime]):
+        try:
+            fitted = future.result()
+            row_of = {product_id: row for row, product_id in enumerate(demand.product_ids.tolist())}
+            now = datetime.utcnow()
+            records = []
+            for product in products:
+                row = row_of.get(product.id)
+                if row is None:
+                    # No sales history: same reorder-level heuristic as the batch path
+                    predicted = [(product.reorder_level or 0) // 2] * run.weeks
+                    confidence = 0.5
+                    model_version = "simple_heuristic"
+                else:
+                    predicted = [int(round(value)) for value in fitted["forecast"][row]]
+                    confidence = round(float(fitted["confidence"][row]), 2)
+                    season_length = int(fitted["season_length"][row])
+                    model_version = f"tuned_{fitted['method'][row]}" + (f"_{season_length}" if season_length else "")
+                records.extend(forecast_records(product.id, forecast_dates, predicted, confidence, model_version, now))
+
+            prune_superseded_forecasts(db, [product.id for product in products], now=run.as_of)
+            if records:
+                db.execute(insert(DemandForecast.__table__), records)
+            chunk.status = "completed"
+            chunk.completed_at = datetime.utcnow()
+            # The planned count: products deleted since planning are done too, so progress ends at 100%
+            run.completed_products += chunk.product_count
+            db.commit()
+
+        except Exception as e:
+            db.rollback()
+            chunk.status = "failed"
+            chunk.error = str(e)
+            db.commit()
+            logger.error(f"Forecast run {run.id} chunk {chunk.chunk_index} failed: {str(e)}")
+
+def main():
+    """Nightly entry point: python -m app.services.parallel_forecasting_service (from backend/)"""
+    from ..database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Forecast every product across all cores")
+    parser.add_argument("--weeks", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--no-resume", action="store_true", help="plan a new run even if one is unfinished")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        service = ParallelForecastingService(chunk_size=args.chunk_size, max_workers=args.workers)
+        result = service.run(db, args.weeks, resume=not args.no_resume)
+    finally:
+        db.close()
+    logger.info(f"Forecast run finished: {result}")
+    return 0 if result["success"] else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,287 @@
+import difflib
+import logging
+import math
+import os
+import threading
+import time
+import weakref
+from collections import Counter
+from typing import Dict, FrozenSet, List, Optional, Set
+import numpy as np
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session, object_session
+from ..models.database_models import Product
+
+logger = logging.getLogger(__name__)
+
+def _trigrams(text: str, padded: bool = True) -> Set[str]:
+    """Character trigrams of a lowercased string (padded like pg_trgm)"""
+    if padded:
+        text = f"  {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class _IndexSnapshot:
+    """Immutable lookup tables built from one read of the product catalog"""
+
+    def __init__(self, rows: List[tuple]):
+        # Positions follow product id order, which is the order the
+        # original linear scans visited the catalog in
+        self.ids: List[int] = [row[0] for row in rows]
+        self.names: List[str] = [row[1] or "" for row in rows]
+        self.names_lower: List[str] = [name.lower() for name in self.names]
+        self.word_sets: List[FrozenSet[str]] = [frozenset(name.split()) for name in self.names_lower]
+
+        self.max_name_length = max((len(name) for name in self.names), default=0)
+        # Distinct names and their character counts (built on first use), for the difflib pass
+        self.distinct_names: List[str] = []
+        self._char_counts: Optional[tuple] = None
+
+        self.exact: Dict[str, int] = {}
+        self.first_by_name: Dict[str, int] = {}
+        self.words: Dict[str, List[int]] = {}
+        self.trigrams: Dict[str, List[int]] = {}
+
+        for position, name in enumerate(self.names_lower):
+            self.exact.setdefault(name, position)
+            if self.first_by_name.setdefault(self.names[position], position) == position:
+                self.distinct_names.append(self.names[position])
+            for word in self.word_sets[position]:
+                self.words.setdefault(word, []).append(position)
+            for trigram in _trigrams(name):
+                self.trigrams.setdefault(trigram, []).append(position)
+
+    def char_counts(self) -> tuple:
+        """(alphabet {char: column}, distinct name x char count matrix, name lengths)"""
+        if self._char_counts is None:
+            alphabet = {char: column for column, char in enumerate(sorted(set("".join(self.distinct_names))))}
+            counts = np.zeros((len(self.distinct_names), len(alphabet)), dtype=np.uint16)
+            for row, name in enumerate(self.distinct_names):
+                for char, count in Counter(name).items():
+                    counts[row, alphabet[char]] = count
+            lengths = np.array([len(name) for name in self.distinct_names], dtype=np.int64)
+            self._char_counts = (alphabet, counts, lengths)
+        return self._char_counts
+
+    def quick_ratios(self, name: str) -> np.ndarray:
+        """difflib's quick_ratio (an upper bound on ratio) of `name` against every distinct name"""
+        alphabet, counts, lengths = self.char_counts()
+        query = np.zeros(len(alphabet), dtype=np.uint16)
+        for char, count in Counter(name).items():
+            if char in alphabet:
+                query[alphabet[char]] = count
+        matches = np.minimum(counts, query).sum(axis=1, dtype=np.int64)
+        total = lengths + len(name)
+        # difflib scores two empty strings 1.0
+        return np.where(total > 0, 2.0 * matches / np.maximum(total, 1), 1.0)
+
+class ProductNameIndex:
+    """
+    In-memory product name index used by the chatbot's product lookup.
+
+    Provides exact/normalized hash lookups, an inverted word index, a
+    trigram index for substring and fuzzy candidates and character counts.
+    The catalog is loaded lazily and reloaded after any Product insert,
+    update or delete.
+
+    Those events only fire in this process. Products created, renamed or
+    deleted by other workers are caught by a catalog signature (row count,
+    max id, latest updated_at) re-read at most every `check_seconds`.
+    """
+
+    # Every live index is invalidated by the Product mapper events below
+    _instances = weakref.WeakSet()
+
+    def __init__(self, check_seconds: Optional[float] = None):
+        self.check_seconds = check_seconds if check_seconds is not None else float(
+            os.getenv("PRODUCT_NAME_INDEX_CHECK_SECONDS", "5"))
+        self._lock = threading.Lock()
+        self._snapshot: Optional[_IndexSnapshot] = None
+        self._signature: Optional[tuple] = None
+        self._checked_at = 0.0
+        self._stale = True
+        ProductNameIndex._instances.add(self)
+
+    def invalidate(self):
+        """Mark the index stale; it is rebuilt on the next lookup"""
+        self._stale = True
+
+    @classmethod
+    def invalidate_all(cls):
+        """Mark every product name index in the process stale"""
+        for index in list(cls._instances):
+            index.invalidate()
+
+    def refresh(self, db: Session) -> _IndexSnapshot:
+        """Reload the index from the database"""
+        with self._lock:
+            self._stale = False
+            # Read before the rows, so a change committed in between shows up at the next check
+            self._signature = self._catalog_signature(db)
+            self._checked_at = time.monotonic()
+            rows = db.query(Product.id, Product.name).order_by(Product.id).all()
+            self._snapshot = _IndexSnapshot(rows)
+            logger.info(f"Product name index loaded with {len(rows)} products")
+            return self._snapshot
+
+    def _catalog_signature(self, db: Session) -> tuple:
+        return tuple(db.query(func.count(Product.id), func.max(Product.id), func.max(Product.updated_at)).one())
+
+    def _changed_elsewhere(self, db: Session) -> bool:
+        """Whether the catalog changed without this process seeing it (checked every check_seconds)"""
+        if time.monotonic() - self._checked_at < self.check_seconds:
+            return False
+        self._checked_at = time.monotonic()
+        return self._catalog_signature(db) != self._signature
+
+    def _get_snapshot(self, db: Session) -> _IndexSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None or self._stale or self._changed_elsewhere(db):
+            snapshot = self.refresh(db)
+        return snapshot
+
+    def size(self, db: Session) -> int:
+        """Number of indexed products"""
+        return len(self._get_snapshot(db).ids)
+
+    def find_exact(self, db: Session, name: str) -> Optional[int]:
+        """Product id whose name equals `name` (case insensitive)"""
+        snapshot = self._get_snapshot(db)
+        position = snapshot.exact.get(name.lower())
+        return snapshot.ids[position] if position is not None else None
+
+    def find_containing(self, db: Session, term: str) -> Optional[int]:
+        """First product id whose name contains `term` (case insensitive)"""
+        snapshot = self._get_snapshot(db)
+        term = term.lower()
+
+        if len(term) < 3:
+            positions = range(len(snapshot.ids))
+        else:
+            postings = [snapshot.trigrams.get(trigram) for trigram in _trigrams(term, padded=False)]
+            if not all(postings):
+                return None
+            postings.sort(key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+            positions = sorted(candidates)
+
+        for position in positions:
+            if term in snapshot.names_lower[position]:
+                return snapshot.ids[position]
+        return None
+
+    def find_contained_in(self, db: Session, text: str) -> Optional[int]:
+        """First product id whose full name appears inside `text` (case insensitive)"""
+        snapshot = self._get_snapshot(db)
+        text = text.lower()
+
+        best_position = snapshot.exact.get("")
+        for start in range(len(text)):
+            for end in range(start + 1, min(len(text), start + snapshot.max_name_length) + 1):
+                position = snapshot.exact.get(text[start:end])
+                if position is not None and (best_position is None or position < best_position):
+                    best_position = position
+
+        return snapshot.ids[best_position] if best_position is not None else None
+
+    def find_best_word_overlap(self, db: Session, text: str, min_score: float = 0.5) -> Optional[tuple]:
+        """(product id, score) with the highest word overlap ratio, or None"""
+        snapshot = self._get_snapshot(db)
+        query_words = set(text.lower().split())
+        if not query_words:
+            return None
+
+        # A product needs at least `required` shared words to reach min_score, so
+        # (pigeonhole) it must appear in one of the shortest posting lists
+        required = max(1, math.ceil(min_score * len(query_words)))
+        postings = sorted((snapshot.words.get(word, ()) for word in query_words), key=len)
+        candidates = set()
+        for posting in postings[:len(postings) - required + 1]:
+            candidates.update(posting)
+
+        best_position = None
+        best_score = 0
+        for position in sorted(candidates):
+            product_words = snapshot.word_sets[position]
+            common_words = query_words.intersection(product_words)
+            score = len(common_words) / max(len(query_words), len(product_words))
+            if score > best_score and score >= min_score:
+                best_score = score
+                best_position = position
+
+        if best_position is None:
+            return None
+        return snapshot.ids[best_position], best_score
+
+    def find_close_match(self, db: Session, name: str, cutoff: float = 0.6,
+                         max_candidates: int = 200) -> Optional[int]:
+        """
+        Closest product id by difflib similarity, as difflib.get_close_matches
+        over the whole catalog would pick it. The best trigram candidates are
+        scored first; other names are scored only if their quick_ratio bound
+        (computed for the whole catalog at once) reaches the best ratio so far.
+        """
+        snapshot = self._get_snapshot(db)
+
+        trigram_counts = Counter()
+        for trigram in _trigrams(name.lower()):
+            trigram_counts.update(snapshot.trigrams.get(trigram, ()))
+
+        # ratio = 2*M/T can only reach the cutoff when the lengths are close enough
+        length = len(name)
+        shortlist = set()
+        for position, _ in trigram_counts.most_common(max_candidates * 5):
+            candidate = snapshot.names[position]
+            if 2 * min(length, len(candidate)) >= cutoff * (length + len(candidate)):
+                shortlist.add(candidate)
+                if len(shortlist) >= max_candidates:
+                    break
+        best = _closest(name, shortlist, cutoff)
+
+        # Any other name whose quick_ratio bound reaches the best ratio so far could still win
+        threshold = best[0] if best else cutoff
+        bounds = snapshot.quick_ratios(name)
+        others = (snapshot.distinct_names[row] for row in np.flatnonzero(bounds >= threshold).tolist()
+                  if snapshot.distinct_names[row] not in shortlist)
+        other = _closest(name, others, threshold)
+        if other and (best is None or other > best):
+            best = other
+
+        if best is None:
+            return None
+        return snapshot.ids[snapshot.first_by_name[best[1]]]
+
+def _closest(name: str, candidates, cutoff: float) -> Optional[tuple]:
+    """Highest (ratio, candidate) at or above cutoff, scored and tie-broken as difflib.get_close_matches does"""
+    matcher = difflib.SequenceMatcher()
+    matcher.set_seq2(name)
+    best = None
+    for candidate in candidates:
+        matcher.set_seq1(candidate)
+        if matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff:
+            score = (matcher.ratio(), candidate)
+            if score[0] >= cutoff and (best is None or score > best):
+                best = score
+    return best
+
+# Process-wide index shared by all chatbot requests
+product_name_index = ProductNameIndex()
+
+def get_product_name_index() -> ProductNameIndex:
+    """Get the process-wide product name index"""
+    return product_name_index
+
+@event.listens_for(Product, "after_insert")
+@event.listens_for(Product, "after_update")
+@event.listens_for(Product, "after_delete")
+def _invalidate_product_name_index(mapper, connection, target):
+    ProductNameIndex.invalidate_all()
+    # Invalidate again once the change is committed, in case another session
+    # rebuilt the index from pre-commit data in the meantime
+    session = object_session(target)
+    if session is not None:
+        session.info["product_name_index_dirty"] = True
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_product_name_index_on_commit(session):
+    if session.info.pop("product_name_index_dirty", False):
+        ProductNameIndex.invalidate_all()
@@ -0,0 +1,241 @@
+import os
+import logging
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..models.database_models import Product, Inventory, ProductVelocity
+from .inventory_summary_cache import on_inventory_committed
+from .rag_runtime import ENHANCED_COLLECTION, WAREHOUSE_COLLECTION, RAGRuntime, get_rag_runtime
+from .embedding_pipeline import EmbeddingPipeline, IndexDocument
+
+logger = logging.getLogger(__name__)
+
+def product_document_id(product_id: int) -> str:
+    """Stable vector store id of a product's document"""
+    return f"product:{product_id}"
+
+def load_product_rows(db: Session, product_ids: Optional[Iterable[int]] = None,
+                      yield_per: int = 1000) -> Iterator[Tuple]:
+    """
+    (product, inventory, velocity) per product from a server-side cursor
+    (`yield_per` rows per fetch); inventory and velocity may be None
+    """
+    query = select(Product, Inventory, ProductVelocity).outerjoin(
+        Inventory, Inventory.product_id == Product.id
+    ).outerjoin(
+        ProductVelocity, ProductVelocity.product_id == Product.id
+    ).order_by(Product.id).execution_options(stream_results=True, yield_per=yield_per)
+    if product_ids is not None:
+        query = query.where(Product.id.in_(list(product_ids)))
+    seen = set()
+    for product, inventory, velocity in db.execute(query):
+        if product.id not in seen:
+            seen.add(product.id)
+            yield product, inventory, velocity
+
+def enhanced_product_document(product, inventory, velocity) -> Tuple[str, Dict]:
+    """(text, metadata) of a product in the enhanced knowledge collection"""
+    low_stock = inventory and inventory.available_quantity <= product.reorder_level
+    text = "\n".join([
+        f"Product: {product.sku} - {product.name}",
+        f"Category: {product.category}",
+        f"Description: {product.description or 'No description'}",
+        f"Unit Price: ${product.unit_price}",
+        f"Reorder Level: {product.reorder_level}",
+        f"Location: {product.location or 'Not assigned'}",
+        f"Current Stock: {inventory.quantity if inventory else 0} total",
+        f"Available Stock: {inventory.available_quantity if inventory else 0} available",
+        f"Reserved Stock: {inventory.reserved_quantity if inventory else 0} reserved",
+        f"Stock Status: {'LOW STOCK' if low_stock else 'NORMAL'}",
+        f"Velocity: {velocity.velocity_category if velocity else 'unknown'} moving",
+        f"Last Updated: {inventory.last_updated if inventory else 'never'}",
+        "",
+        "Operations:",
+        f"- Check stock: \"What is the stock level of {product.sku}?\"",
+        f"- Add stock: \"Add [quantity] to {product.sku}\"",
+        f"- Remove stock: \"Remove [quantity] from {product.sku}\"",
+        f"- Update stock: \"Set {product.sku} stock to [quantity]\"",
+    ])
+    metadata = {
+        "type": "product_detailed",
+        "sku": product.sku,
+        "product_id": product.id,
+        "category": product.category,
+        "stock_level": inventory.available_quantity if inventory else 0
+    }
+    return text, metadata
+
+def warehouse_product_document(product, inventory, velocity) -> Tuple[str, Dict]:
+    """(text, metadata) of a product in the basic knowledge collection"""
+    text = "\n".join([
+        "Product Information:",
+        f"SKU: {product.sku}",
+        f"Name: {product.name}",
+        f"Description: {product.description or 'No description'}",
+        f"Category: {product.category}",
+        f"Unit: {product.unit}",
+        f"Unit Price: ${product.unit_price}",
+        f"Reorder Level: {product.reorder_level}",
+        f"Location: {product.location or 'Not specified'}",
+        f"Current Stock: {inventory.quantity if inventory else 0}",
+        f"Available Stock: {inventory.available_quantity if inventory else 0}",
+        f"Reserved Stock: {inventory.reserved_quantity if inventory else 0}",
+    ])
+    metadata = {
+        "type": "product",
+        "sku": product.sku,
+        "product_id": product.id,
+        "category": product.category
+    }
+    return text, metadata
+
+# Product document builder of each collection
+PRODUCT_DOCUMENTS: Dict[str, Callable] = {
+    ENHANCED_COLLECTION: enhanced_product_document,
+    WAREHOUSE_COLLECTION: warehouse_product_document,
+}
+
+def product_documents(rows: Iterable[Tuple], build_document: Callable) -> Iterator[IndexDocument]:
+    """(product:{id}, text, metadata) per row"""
+    for product, inventory, velocity in rows:
+        text, metadata = build_document(product, inventory, velocity)
+        yield product_document_id(product.id), text, metadata
+
+def index_products(vector_store, rows: Iterable[Tuple], build_document: Callable,
+                   pipeline: EmbeddingPipeline) -> List[str]:
+    """Embed and upsert the documents of all given rows; returns their document ids"""
+    return pipeline.run(vector_store, product_documents(rows, build_document))
+
+def persist_index(vector_store):
+    """Flush stores that buffer writes (the NumPy index); Chroma persists on write"""
+    persist = getattr(vector_store, "persist", None)
+    if persist is not None:
+        persist()
+
+def chunk_ids(documents: List) -> List[str]:
+    """Stable ids "{type}:{n}" for split documents, numbered per metadata type"""
+    counts: Dict[str, int] = {}
+    ids = []
+    for document in documents:
+        document_type = document.metadata["type"]
+        ids.append(f"{document_type}:{counts.get(document_type, 0)}")
+        counts[document_type] = counts.get(document_type, 0) + 1
+    return ids
+
+def prune_documents(vector_store, keep_ids: Iterable[str], document_types: Iterable[str]) -> int:
+    """Delete documents of these types that are not in keep_ids (deleted rows, older index layouts)"""
+    keep_ids = set(keep_ids)
+    existing = vector_store.get(where={"type": {"$in": list(document_types)}}, include=[])["ids"]
+    stale = [doc_id for doc_id in existing if doc_id not in keep_ids]
+    if stale:
+        vector_store.delete(ids=stale)
+    return len(stale)
+
+class IncrementalRAGIndexer:
+    """
+    Keeps the product:{id} documents of one collection in step with committed
+    product and inventory changes (stock, price, location, ...).
+
+    Changed product ids are queued per database. The first change of a burst
+    starts a `debounce_seconds` timer; everything queued until it fires is
+    coalesced, re-read and upserted through the batched embedding pipeline.
+    Products that no longer exist are deleted from the index.
+    Nothing is queued while the collection is not loaded: its first query
+    indexes the current data anyway. That full index runs through
+    `index_all`, which holds off flushes, so changes committed while it
+    streams rows are applied after it rather than overwritten by it.
+    """
+
+    def __init__(self, collection_name: str, build_document: Callable, runtime: Optional[RAGRuntime] = None,
+                 debounce_seconds: Optional[float] = None, pipeline: Optional[EmbeddingPipeline] = None):
+        self.collection_name = collection_name
+        self.build_document = build_document
+        self._runtime = runtime
+        self.debounce_seconds = debounce_seconds if debounce_seconds is not None else float(
+            os.getenv("RAG_INDEX_DEBOUNCE_SECONDS", "2"))
+        self.pipeline = pipeline or EmbeddingPipeline()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[object, Set[int]] = {}  # bind -> product ids
+        self._timer: Optional[threading.Timer] = None
+
+    @property
+    def runtime(self) -> RAGRuntime:
+        return self._runtime or get_rag_runtime()
+
+    def enqueue(self, bind, product_ids: Iterable[int]):
+        """Queue products for re-indexing after the debounce interval"""
+        if not self.runtime.is_loaded(self.collection_name):
+            return
+        with self._lock:
+            self._pending.setdefault(bind, set()).update(product_ids)
+            if self._timer is None:
+                self._timer = threading.Timer(self.debounce_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def index_all(self, vector_store, index: Callable):
+        """Run a full `index(vector_store)`; flushes queued meanwhile wait and re-read newer rows after it"""
+        with self._flush_lock:
+            index(vector_store)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return sum(len(product_ids) for product_ids in self._pending.values())
+
+    def flush(self) -> Dict[str, int]:
+        """Re-index everything queued now; returns {"upserted", "deleted"}"""
+        totals = {"upserted": 0, "deleted": 0}
+        # One flush (or full index) at a time, so older rows are never written over newer ones
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            for bind, product_ids in pending.items():
+                try:
+                    upserted, deleted = self._sync(bind, sorted(product_ids))
+                    totals["upserted"] += upserted
+                    totals["deleted"] += deleted
+                except Exception as e:
+                    logger.error(f"Error re-indexing {len(product_ids)} products in {self.collection_name}: {str(e)}")
+        if totals["upserted"] or totals["deleted"]:
+            logger.info(f"RAG index {self.collection_name}: {totals['upserted']} upserted, {totals['deleted']} deleted")
+        return totals
+
+    def _sync(self, bind, product_ids: List[int]) -> Tuple[int, int]:
+        vector_store = self.runtime.vector_store(self.collection_name)
+        upserted = deleted = 0
+        db = Session(bind=bind)
+        try:
+            chunk_size = self.pipeline.write_batch_size
+            for start in range(0, len(product_ids), chunk_size):
+                chunk = product_ids[start:start + chunk_size]
+                found = set(index_products(vector_store, load_product_rows(db, chunk), self.build_document, self.pipeline))
+                missing = [product_document_id(product_id) for product_id in chunk
+                           if product_document_id(product_id) not in found]
+                if missing:
+                    vector_store.delete(ids=missing)
+                upserted += len(found)
+                deleted += len(missing)
+            persist_index(vector_store)
+        finally:
+            db.close()
+        return upserted, deleted
+
+# One indexer per product collection
+_indexers = {
+    collection_name: IncrementalRAGIndexer(collection_name, build_document)
+    for collection_name, build_document in PRODUCT_DOCUMENTS.items()
+}
+
+def get_rag_indexer(collection_name: str) -> IncrementalRAGIndexer:
+    """Get the process-wide incremental indexer of a collection"""
+    return _indexers[collection_name]
+
+@on_inventory_committed
+def _queue_rag_reindex(bind, product_ids):
+    for indexer in _indexers.values():
+        indexer.enqueue(bind, product_ids)
@@ -0,0 +1,153 @@
+import os
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+from .embedding_cache import CachedEmbeddings, EmbeddingCache
+
+logger = logging.getLogger(__name__)
+
+WAREHOUSE_COLLECTION = "warehouse_knowledge"
+ENHANCED_COLLECTION = "enhanced_warehouse_knowledge"
+
+class RAGRuntime:
+    """
+    Process-wide embedding model and vector store handles for the RAG services.
+
+    Nothing is loaded at construction: the sentence-transformer, the vector
+    store client (Chroma, or the NumPy index with RAG_VECTOR_BACKEND=numpy)
+    and each collection are created on the first query that needs
+    them and then shared by every service instance and request. The model
+    sits behind a persistent embedding cache, so re-indexing unchanged
+    documents does not re-embed them. After a failed model load, queries fail
+    fast for `retry_seconds` (doubling with each further failure, up to
+    `max_retry_seconds`) instead of retrying the download on every request.
+    """
+
+    def __init__(self, embedding_model: Optional[str] = None, vector_db_path: Optional[str] = None,
+                 embeddings_factory: Optional[Callable[[str], Any]] = None,
+                 vector_store_factory: Optional[Callable[[str, Any], Any]] = None,
+                 embedding_cache: Optional[EmbeddingCache] = None, vector_backend: Optional[str] = None,
+                 retry_seconds: Optional[float] = None, max_retry_seconds: float = 600.0):
+        self.embedding_model = embedding_model or os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+        self.vector_db_path = vector_db_path or os.getenv("VECTOR_DB_PATH", "./data/chroma_db")
+        self._embeddings_factory = embeddings_factory or self._load_embeddings
+        self._vector_store_factory = vector_store_factory or self._open_collection
+        self._embedding_cache = embedding_cache
+        self.vector_backend = vector_backend or os.getenv("RAG_VECTOR_BACKEND", "chroma")
+        self.retry_seconds = retry_seconds if retry_seconds is not None else float(
+            os.getenv("RAG_LOAD_RETRY_SECONDS", "30"))
+        self.max_retry_seconds = max_retry_seconds
+        self._lock = threading.RLock()
+        self._index_lock = threading.Lock()
+        self._embeddings = None
+        self._client = None
+        self._vector_stores: Dict[str, Any] = {}
+        self._retrievers: Dict[Tuple[str, int], Any] = {}
+        self._indexed: Set[str] = set()
+        self._load_error: Optional[str] = None
+        self._load_failures = 0
+        self._retry_at = 0.0
+
+    @property
+    def embeddings(self):
+        """Shared embedding model (loaded on first use)"""
+        if self._embeddings is None:
+            with self._lock:
+                if self._embeddings is None:
+                    self._raise_if_failed()
+                    try:
+                        self._embeddings = self._embeddings_factory(self.embedding_model)
+                    except Exception as e:
+                        self._load_failures += 1
+                        backoff = min(self.retry_seconds * 2 ** (self._load_failures - 1), self.max_retry_seconds)
+                        self._load_error = str(e)
+                        self._retry_at = time.monotonic() + backoff
+                        logger.error(f"Could not load embedding model {self.embedding_model} "
+                                     f"(retrying in {backoff:g}s): {str(e)}")
+                        raise
+                    self._load_error = None
+                    self._load_failures = 0
+                    logger.info(f"Loaded embedding model {self.embedding_model}")
+        return self._embeddings
+
+    def vector_store(self, collection_name: str):
+        """Shared vector store handle for a collection (opened on first use)"""
+        store = self._vector_stores.get(collection_name)
+        if store is None:
+            with self._lock:
+                store = self._vector_stores.get(collection_name)
+                if store is None:
+                    store = self._vector_store_factory(collection_name, self.embeddings)
+                    self._vector_stores[collection_name] = store
+        return store
+
+    def retriever(self, collection_name: str, top_k: int):
+        """Shared similarity retriever over a collection"""
+        key = (collection_name, top_k)
+        retriever = self._retrievers.get(key)
+        if retriever is None:
+            retriever = self.vector_store(collection_name).as_retriever(
+                search_type="similarity",
+                search_kwargs={"k": top_k}
+            )
+            self._retrievers[key] = retriever
+        return retriever
+
+    def ensure_indexed(self, collection_name: str, index: Callable[[Any], None]):
+        """
+        Run `index(vector_store)` once per process for a collection. If it
+        raises, the next query tries again.
+        """
+        if collection_name in self._indexed:
+            return
+        vector_store = self.vector_store(collection_name)
+        with self._index_lock:
+            if collection_name in self._indexed:
+                return
+            index(vector_store)
+            self._indexed.add(collection_name)
+
+    def is_loaded(self, collection_name: str) -> bool:
+        """Whether a collection is open (does not trigger loading)"""
+        return collection_name in self._vector_stores
+
+    def _raise_if_failed(self):
+        if self._load_error is not None and time.monotonic() < self._retry_at:
+            raise RuntimeError(f"RAG runtime unavailable: {self._load_error}")
+
+    def _load_embeddings(self, model_name: str):
+        from langchain_huggingface import HuggingFaceEmbeddings
+
+        cache = self._embedding_cache or EmbeddingCache()
+        return CachedEmbeddings(HuggingFaceEmbeddings(model_name=model_name), model_name, cache)
+
+    def _open_collection(self, collection_name: str, embeddings):
+        if self.vector_backend == "numpy":
+            from .numpy_vector_store import NumpyVectorStore
+
+            return NumpyVectorStore(os.path.join(self.vector_db_path, "numpy", collection_name), embeddings,
+                                    dtype=os.getenv("RAG_VECTOR_DTYPE", "float32"))
+
+        import chromadb
+        from langchain_chroma import Chroma
+
+        if self._client is None:
+            os.makedirs(self.vector_db_path, exist_ok=True)
+            self._client = chromadb.PersistentClient(path=self.vector_db_path)
+        return Chroma(
+            client=self._client,
+            embedding_function=embeddings,
+            collection_name=collection_name
+        )
+
+_rag_runtime = None
+_rag_runtime_lock = threading.Lock()
+
+def get_rag_runtime() -> RAGRuntime:
+    global _rag_runtime
+    if _rag_runtime is None:
+        with _rag_runtime_lock:
+            if _rag_runtime is None:
+                _rag_runtime = RAGRuntime()
+    return _rag_runtime
@@ -2,12 +2,15 @@ import os
 import logging
 from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import SentenceTransformerEmbeddings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.docstore.document import Document
 from langchain.schema import BaseRetriever
 from ..models.database_models import Product, Inventory, Vendor, Customer, InboundShipment, OutboundOrder
+from .rag_runtime import WAREHOUSE_COLLECTION, get_rag_runtime
+from .rag_indexer import (
+    chunk_ids, get_rag_indexer, index_products, load_product_rows, persist_index, prune_documents,
+    warehouse_product_document
+)
 
 logger = logging.getLogger(__name__)
 
@@ -16,85 +19,41 @@ class WarehouseRAGService:
     
     def __init__(self, db: Session):
         self.db = db
-        self.vector_store = None
-        self.retriever = None
-        self.embeddings = None
-        self._initialize_rag()
+        # Embeddings and the vector store are process-wide and load on the first query
+        self.rag_runtime = get_rag_runtime()
+        self.top_k = int(os.getenv("TOP_K_RETRIEVAL", "5"))
     
-    def _initialize_rag(self):
-        """Initialize RAG components"""
-        try:
-            # Initialize embeddings
-            embedding_model = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
-            self.embeddings = SentenceTransformerEmbeddings(model_name=embedding_model)
-            
-            # Initialize vector store
-            vector_db_path = os.getenv("VECTOR_DB_PATH", "./data/chroma_db")
-            os.makedirs(vector_db_path, exist_ok=True)
-            
-            self.vector_store = Chroma(
-                persist_directory=vector_db_path,
-                embedding_function=self.embeddings,
-                collection_name="warehouse_knowledge"
-            )
-            
-            # Create retriever
-            top_k = int(os.getenv("TOP_K_RETRIEVAL", "5"))
-            self.retriever = self.vector_store.as_retriever(
-                search_type="similarity",
-                search_kwargs={"k": top_k}
-            )
-            
-            # Index warehouse data
-            self._index_warehouse_data()
-            
-            logger.info("RAG service initialized successfully")
-            
-        except Exception as e:
-            logger.error(f"Failed to initialize RAG service: {str(e)}")
-            raise
+    @property
+    def vector_store(self):
+        """Shared vector store, indexed on first use"""
+        self._ensure_indexed()
+        return self.rag_runtime.vector_store(WAREHOUSE_COLLECTION)
+    
+    @property
+    def retriever(self):
+        """Shared retriever over the warehouse collection"""
+        self._ensure_indexed()
+        return self.rag_runtime.retriever(WAREHOUSE_COLLECTION, self.top_k)
     
-    def _index_warehouse_data(self):
+    def _ensure_indexed(self):
+        """Load the shared runtime and index the collection once per process"""
+        indexer = get_rag_indexer(WAREHOUSE_COLLECTION)
+        self.rag_runtime.ensure_indexed(
+            WAREHOUSE_COLLECTION, lambda vector_store: indexer.index_all(vector_store, self._index_warehouse_data)
+        )
+    
+    def _index_warehouse_data(self, vector_store):
         """Index warehouse data into vector store"""
         try:
-            # Check if data is already indexed
-            if self.vector_store._collection.count() > 0:
-                logger.info("Vector store already contains data, skipping indexing")
-                return
+            # Rebuilt on the first query of each process under stable ids; products
+            # stream through the batched embedding pipeline and the embedding
+            # cache means only changed texts are embedded again
+            keep_ids = index_products(vector_store, load_product_rows(self.db), warehouse_product_document,
+                                      get_rag_indexer(WAREHOUSE_COLLECTION).pipeline)
+            logger.info(f"Indexed {len(keep_ids)} product documents")
             
             documents = []
             
-            # Index product information
-            products = self.db.query(Product).all()
-            for product in products:
-                inventory = self.db.query(Inventory).filter(Inventory.product_id == product.id).first()
-                
-                content = f"""
-                Product Information:
-                SKU: {product.sku}
-                Name: {product.name}
-                Description: {product.description or 'No description'}
-                Category: {product.category}
-                Unit: {product.unit}
-                Unit Price: ${product.unit_price}
-                Reorder Level: {product.reorder_level}
-                Location: {product.location or 'Not specified'}
-                Current Stock: {inventory.quantity if inventory else 0}
-                Available Stock: {inventory.available_quantity if inventory else 0}
-                Reserved Stock: {inventory.reserved_quantity if inventory else 0}
-                """
-                
-                doc = Document(
-                    page_content=content.strip(),
-                    metadata={
-                        "type": "product",
-                        "sku": product.sku,
-                        "product_id": product.id,
-                        "category": product.category
-                    }
-                )
-                documents.append(doc)
-            
             # Index vendor information
             vendors = self.db.query(Vendor).all()
             for vendor in vendors:
@@ -164,11 +123,18 @@ class WarehouseRAGService:
                 )
                 
                 split_docs = text_splitter.split_documents(documents)
-                self.vector_store.add_documents(split_docs)
-                self.vector_store.persist()
+                ids = chunk_ids(split_docs)
+                vector_store.add_documents(split_docs, ids=ids)
+                keep_ids.extend(ids)
                 
                 logger.info(f"Indexed {len(split_docs)} document chunks into vector store")
             
+            # Drop documents of deleted rows (and any left by older index layouts)
+            removed = prune_documents(vector_store, keep_ids, ("product", "vendor", "customer", "procedure"))
+            if removed:
+                logger.info(f"Removed {removed} stale document chunks")
+            persist_index(vector_store)
+            
         except Exception as e:
             logger.error(f"Error indexing warehouse data: {str(e)}")
             raise
@@ -241,17 +207,10 @@ class WarehouseRAGService:
     def retrieve_relevant_info(self, query: str, top_k: Optional[int] = None) -> List[Document]:
         """Retrieve relevant information for a query"""
         try:
-            if not self.retriever:
-                logger.warning("Retriever not initialized")
-                return []
-            
             # Use custom top_k if provided
             if top_k:
-                retriever = self.vector_store.as_retriever(
-                    search_type="similarity",
-                    search_kwargs={"k": top_k}
-                )
-                return retriever.get_relevant_documents(query)
+                self._ensure_indexed()
+                return self.rag_runtime.retriever(WAREHOUSE_COLLECTION, top_k).get_relevant_documents(query)
             
             return self.retriever.get_relevant_documents(query)
             
@@ -278,16 +237,13 @@ class WarehouseRAGService:
             return "Error retrieving warehouse context."
     
     def update_product_info(self, product_id: int):
-        """Update specific product information in vector store"""
-        try:
-            # This would be called when product data changes
-            # For now, we'll implement a simple re-indexing
-            # In production, you'd want to update only the specific document
-            logger.info(f"Product {product_id} updated, consider re-indexing")
-            
-        except Exception as e:
-            logger.error(f"Error updating product info: {str(e)}")
+        """Queue a product's document for re-indexing (debounced, batched)"""
+        get_rag_indexer(WAREHOUSE_COLLECTION).enqueue(self.db.get_bind(), [product_id])
     
     def is_available(self) -> bool:
-        """Check if RAG service is available"""
-        return self.vector_store is not None and self.retriever is not None
+        """Check if RAG service is available (loads the shared runtime on first call)"""
+        try:
+            return self.vector_store is not None
+        except Exception as e:
+            logger.error(f"RAG service unavailable: {str(e)}")
+            return False
@@ -0,0 +1,215 @@
+import csv
+import io
+import itertools
+import logging
+import os
+from datetime import datetime
+from typing import BinaryIO, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from ..models.database_models import Product, SalesHistory
+
+logger = logging.getLogger(__name__)
+
+SALES_COLUMNS = ["sku", "quantity_sold", "sale_date", "unit_price", "total_value", "customer_type", "channel"]
+REQUIRED_COLUMNS = ["sku", "quantity_sold", "sale_date"]
+INSERT_COLUMNS = ["product_id", "quantity_sold", "sale_date", "unit_price", "total_value",
+                  "customer_type", "season", "channel", "created_at"]
+
+# Month (1-12) -> season; index 0 is unused
+SEASON_BY_MONTH = np.array(["", "Winter", "Winter", "Spring", "Spring", "Spring", "Summer",
+                            "Summer", "Summer", "Fall", "Fall", "Fall", "Winter"], dtype=object)
+
+# SQLAlchemy's storage format for DateTime on SQLite
+SQLITE_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+# Example SKUs / rows quoted in each chunk's error summary
+ERROR_EXAMPLES = 5
+
+def seasons_for(dates: pd.Series) -> np.ndarray:
+    """Season name for each date (Winter: Dec-Feb, Spring: Mar-May, Summer: Jun-Aug, Fall: Sep-Nov)"""
+    return SEASON_BY_MONTH[dates.dt.month.to_numpy()]
+
+def _summarize(first_row: int, last_row: int, problem: str, values: pd.Series) -> str:
+    examples = values.unique()[:ERROR_EXAMPLES].tolist()
+    more = f" (+{values.nunique() - len(examples)} more)" if values.nunique() > len(examples) else ""
+    return f"Rows {first_row}-{last_row}: {len(values)} rows skipped, {problem}: {', '.join(map(str, examples))}{more}"
+
+def _parse_dates(values: pd.Series) -> pd.Series:
+    """ISO 8601 dates in one vectorized pass; anything else falls back to per-value parsing"""
+    dates = pd.to_datetime(values, errors="coerce", format="ISO8601")
+    retry = dates.isna() & values.notna()
+    if retry.any():
+        dates[retry] = pd.to_datetime(values[retry], errors="coerce", format="mixed")
+    return dates
+
+class SalesIngestionService:
+    """
+    Streaming bulk ingestion of sales history.
+
+    Input is processed in chunks of `chunk_size` rows: SKUs resolve through
+    one sku -> id map loaded up front, seasons are derived column-wise, and
+    each chunk is written with COPY on PostgreSQL or a single executemany
+    elsewhere, then committed. Memory use depends on the chunk size, not the
+    file size.
+    """
+
+    def __init__(self, chunk_size: Optional[int] = None):
+        self.chunk_size = chunk_size or int(os.getenv("SALES_INGEST_CHUNK_SIZE", "50000"))
+
+    def ingest_csv(self, db: Session, source: BinaryIO) -> Dict:
+        """Ingest a sales CSV (header row with at least sku, quantity_sold, sale_date) from a file object"""
+        # Everything is read as text so SKUs like "NA" or "0012" survive; columns are converted per chunk
+        try:
+            chunks = pd.read_csv(
+                source, chunksize=self.chunk_size, dtype=str, keep_default_na=False, encoding="utf-8",
+                usecols=lambda column: column.strip() in SALES_COLUMNS
+            )
+        except ValueError as e:
+            # Empty, undecodable or unparseable header (pandas errors are ValueErrors)
+            return self._failure(f"Invalid CSV file: {str(e)}")
+        return self._ingest_chunks(db, chunks, first_row=2)
+
+    def ingest_records(self, db: Session, records: List[Dict]) -> Dict:
+        """Ingest sales records given as dicts (the JSON API shape)"""
+        frame = pd.DataFrame.from_records(records, columns=SALES_COLUMNS) if records else pd.DataFrame(columns=SALES_COLUMNS)
+        return self._ingest_chunks(
+            db, (frame.iloc[offset:offset + self.chunk_size] for offset in range(0, len(frame), self.chunk_size)),
+            first_row=1
+        )
+
+    def _ingest_chunks(self, db: Session, chunks, first_row: int) -> Dict:
+        """
+        Write chunk by chunk; errors name rows by number (for CSV, the file line).
+        A file that turns unreadable after some chunks were committed stops
+        there and still succeeds, reporting the committed rows and where it stopped.
+        """
+        try:
+            sku_to_id = dict(db.query(Product.sku, Product.id).all())
+            ingested_count = 0
+            errors = []
+            chunks = iter(chunks)
+            for chunk_number in itertools.count(1):
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    break
+                except ValueError as e:
+                    # Malformed line or undecodable bytes (pandas parse and decode errors are ValueErrors)
+                    if chunk_number == 1:
+                        return self._failure(f"Invalid CSV file: {str(e)}")
+                    error = f"Rows {first_row} onward not ingested, rows before {first_row} were committed: {str(e)}"
+                    logger.warning(f"Sales ingestion stopped at chunk {chunk_number}: {error}")
+                    errors.append(error)
+                    break
+                chunk.columns = [column.strip() for column in chunk.columns]
+                missing = [column for column in REQUIRED_COLUMNS if column not in chunk.columns]
+                if missing:
+                    return self._failure(f"Missing required columns: {', '.join(missing)}")
+                last_row = first_row + len(chunk) - 1
+                rows, chunk_errors = self._prepare(chunk, sku_to_id, first_row, last_row)
+                try:
+                    if len(rows):
+                        self._write(db, rows)
+                    db.commit()
+                    ingested_count += len(rows)
+                except Exception as e:
+                    db.rollback()
+                    chunk_errors.append(f"Rows {first_row}-{last_row}: chunk not written: {str(e)}")
+                if chunk_errors:
+                    logger.warning(f"Sales ingestion chunk {chunk_number}: {'; '.join(chunk_errors)}")
+                errors.extend(chunk_errors)
+                first_row = last_row + 1
+
+            return {
+                "success": True,
+                "ingested_count": ingested_count,
+                "errors": errors,
+                "message": f"Successfully ingested {ingested_count} sales records"
+            }
+
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error ingesting sales data: {str(e)}")
+            return self._failure(str(e))
+
+    def _failure(self, error: str) -> Dict:
+        return {
+            "success": False,
+            "error": error,
+            "message": "Failed to ingest sales data"
+        }
+
+    def _prepare(self, chunk: pd.DataFrame, sku_to_id: Dict[str, int], first_row: int, last_row: int):
+        """Vectorized validation and conversion of one chunk; returns (rows to insert, error summaries)"""
+        def column(name, default):
+            if name not in chunk:
+                return pd.Series(default, index=chunk.index, dtype=object)
+            values = chunk[name]
+            return values.where(values.notna() & (values != ""), default)
+
+        sku = column("sku", "").astype(str).str.strip()
+        product_id = sku.map(sku_to_id)
+        quantity = pd.to_numeric(column("quantity_sold", 0), errors="coerce")
+        sale_date = _parse_dates(column("sale_date", None))
+
+        errors = []
+        unknown = product_id.isna()
+        if unknown.any():
+            errors.append(_summarize(first_row, last_row, "product not found for SKU", sku[unknown]))
+        bad_quantity = ~unknown & (quantity.isna() | (quantity != quantity.round()))
+        if bad_quantity.any():
+            errors.append(_summarize(first_row, last_row, "invalid quantity_sold in row",
+                                     pd.Series(np.flatnonzero(bad_quantity.to_numpy()) + first_row)))
+        bad_date = ~unknown & ~bad_quantity & sale_date.isna()
+        if bad_date.any():
+            errors.append(_summarize(first_row, last_row, "invalid sale_date in row",
+                                     pd.Series(np.flatnonzero(bad_date.to_numpy()) + first_row)))
+
+        valid = ~(unknown | bad_quantity | bad_date)
+        sale_date = sale_date[valid]
+        rows = pd.DataFrame({
+            "product_id": product_id[valid].astype(np.int64),
+            "quantity_sold": quantity[valid].astype(np.int64),
+            "sale_date": sale_date,
+            "unit_price": pd.to_numeric(column("unit_price", 0.0)[valid], errors="coerce").fillna(0.0),
+            "total_value": pd.to_numeric(column("total_value", 0.0)[valid], errors="coerce").fillna(0.0),
+            "customer_type": column("customer_type", "retail")[valid].astype(str),
+            "season": seasons_for(sale_date),
+            "channel": column("channel", "store")[valid].astype(str),
+            "created_at": datetime.utcnow()
+        }, columns=INSERT_COLUMNS)
+        return rows, errors
+
+    def _write(self, db: Session, rows: pd.DataFrame):
+        connection = db.connection()
+        if connection.dialect.name == "postgresql":
+            # COPY streams the whole chunk in one round trip
+            buffer = io.StringIO()
+            rows.to_csv(buffer, index=False, header=False, quoting=csv.QUOTE_MINIMAL,
+                        date_format="%Y-%m-%d %H:%M:%S.%f")
+            buffer.seek(0)
+            with connection.connection.dbapi_connection.cursor() as cursor:
+                cursor.copy_expert(
+                    f"COPY {SalesHistory.__tablename__} ({', '.join(INSERT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                    buffer
+                )
+            return
+
+        if connection.dialect.name == "sqlite":
+            # Driver-level executemany with dates pre-formatted the way SQLAlchemy stores them on
+            # SQLite, skipping per-value bind processing
+            rows = rows.assign(sale_date=rows["sale_date"].dt.strftime(SQLITE_DATETIME_FORMAT),
+                               created_at=rows["created_at"].dt.strftime(SQLITE_DATETIME_FORMAT))
+            connection.exec_driver_sql(
+                f"INSERT INTO {SalesHistory.__tablename__} ({', '.join(INSERT_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in INSERT_COLUMNS)})",
+                list(zip(*(rows[name].tolist() for name in INSERT_COLUMNS)))
+            )
+            return
+
+        # Other backends: one executemany through SQLAlchemy
+        columns = [rows[name].tolist() for name in INSERT_COLUMNS]
+        connection.execute(insert(SalesHistory.__table__), [dict(zip(INSERT_COLUMNS, values)) for values in zip(*columns)])
@@ -0,0 +1,118 @@
+import logging
+import threading
+from typing import Optional
+from sqlalchemy.orm import Session
+from .enhanced_nlp_processor import EnhancedNLPProcessor
+from .enhanced_smart_llm_service import EnhancedSmartLLMService
+from .product_name_index import ProductNameIndex, get_product_name_index
+from .rag_runtime import RAGRuntime, get_rag_runtime
+
+logger = logging.getLogger(__name__)
+
+class ServiceContainer:
+    """
+    Application-scoped container for stateless service components.
+
+    The NLP processor, LLM service and Phase 3 services hold no per-request
+    state, so they are built once per process and shared. Request handlers
+    get lightweight wrappers (e.g. ChatbotService) bound only to their DB session.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._nlp_processor: Optional[EnhancedNLPProcessor] = None
+        self._llm_service: Optional[EnhancedSmartLLMService] = None
+        self._forecasting_service = None
+        self._space_service = None
+        self._phase3_enabled: Optional[bool] = None
+
+    @property
+    def nlp_processor(self) -> EnhancedNLPProcessor:
+        """Shared NLP processor (pattern tables are built once)"""
+        if self._nlp_processor is None:
+            with self._lock:
+                if self._nlp_processor is None:
+                    self._nlp_processor = EnhancedNLPProcessor()
+        return self._nlp_processor
+
+    @property
+    def llm_service(self) -> EnhancedSmartLLMService:
+        """Shared LLM service (the HuggingFace availability probe runs once)"""
+        if self._llm_service is None:
+            with self._lock:
+                if self._llm_service is None:
+                    self._llm_service = EnhancedSmartLLMService()
+        return self._llm_service
+
+    @property
+    def product_index(self) -> ProductNameIndex:
+        """Shared product name index (loaded on first lookup)"""
+        return get_product_name_index()
+
+    @property
+    def rag_runtime(self) -> RAGRuntime:
+        """Shared RAG embeddings and vector stores (loaded on the first RAG query)"""
+        return get_rag_runtime()
+
+    @property
+    def forecasting_service(self):
+        """Shared ForecastingService, or None if Phase 3 is unavailable"""
+        self._ensure_phase3()
+        return self._forecasting_service
+
+    @property
+    def space_service(self):
+        """Shared SpaceOptimizationService, or None if Phase 3 is unavailable"""
+        self._ensure_phase3()
+        return self._space_service
+
+    @property
+    def phase3_enabled(self) -> bool:
+        self._ensure_phase3()
+        return self._phase3_enabled
+
+    def _ensure_phase3(self):
+        if self._phase3_enabled is not None:
+            return
+        llm_service = self.llm_service
+        with self._lock:
+            if self._phase3_enabled is not None:
+                return
+            try:
+                from .forecasting_service import ForecastingService
+                from .space_optimization_service import SpaceOptimizationService
+
+                self._forecasting_service = ForecastingService(llm_service=llm_service)
+                self._space_service = SpaceOptimizationService(llm_service=llm_service)
+                self._phase3_enabled = True
+            except Exception as e:
+                logger.warning(f"Phase 3 services unavailable: {str(e)}")
+                self._forecasting_service = None
+                self._space_service = None
+                self._phase3_enabled = False
+
+    def warm_up(self):
+        """Build all shared components eagerly (called at application startup)"""
+        self.nlp_processor
+        self.llm_service
+        self._ensure_phase3()
+        logger.info("Service container initialized")
+
+    def create_chatbot_service(self, db: Session):
+        """Create a per-request ChatbotService bound to the given DB session"""
+        from .chatbot_service import ChatbotService
+
+        return ChatbotService(
+            db,
+            nlp_processor=self.nlp_processor,
+            forecasting_service=self.forecasting_service,
+            space_service=self.space_service,
+            product_index=self.product_index,
+        )
+
+# Process-wide container instance
+service_container = ServiceContainer()
+
+def get_service_container() -> ServiceContainer:
+    """Get the process-wide service container"""
+    return service_container
@@ -19,8 +19,8 @@ class SpaceOptimizationService:
     Implements smart layout suggestions and product placement optimization
     """
     
-    def __init__(self):
-        self.llm_service = EnhancedSmartLLMService()
+    def __init__(self, llm_service: Optional[EnhancedSmartLLMService] = None):
+        self.llm_service = llm_service or EnhancedSmartLLMService()
         
     def analyze_product_velocity(self, db: Session) -> Dict:
         """
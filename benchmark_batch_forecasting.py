@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark forecasting every product:
+the per-product generate_demand_forecast loop vs. the vectorized batch engine
+"""
+import sys
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from backend.app.models.database_models import Base, Product, SalesHistory
+from backend.app.services.batch_forecasting_service import BatchForecastingService, week_numbers, week_start
+from backend.app.services.forecasting_service import ForecastingService
+
+PRODUCT_COUNTS = [1000, 10000]
+HISTORY_WEEKS = 104
+LOOP_SAMPLE = 200  # the per-product loop is timed on a sample and extrapolated
+
+def create_session(path, products):
+    """File-backed database with one sales row per product per week (seasonal Poisson demand)"""
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    db.execute(insert(Product.__table__), [
+        {"sku": f"FC{i:06d}", "name": f"Forecast Item {i}", "reorder_level": 20} for i in range(products)
+    ])
+    
+    rng = np.random.default_rng(42)
+    first_week = int(week_numbers([datetime.utcnow()])[0]) - HISTORY_WEEKS
+    base = rng.uniform(2, 50, size=products)
+    weeks = np.arange(HISTORY_WEEKS)
+    demand = rng.poisson(base[:, None] * (1 + 0.3 * np.sin(2 * np.pi * weeks / 52))[None, :])
+    for start in range(0, products, 1000):
+        db.execute(insert(SalesHistory.__table__), [
+            {"product_id": i + 1, "quantity_sold": int(demand[i, week]),
+             "sale_date": week_start(first_week + week) + timedelta(days=2)}
+            for i in range(start, min(start + 1000, products)) for week in range(HISTORY_WEEKS)
+        ])
+    db.commit()
+    return engine, db
+
+def run_benchmark(products):
+    """Return (per-product loop seconds extrapolated to all products, batch seconds)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, db = create_session(os.path.join(tmp, "forecast.db"), products)
+        
+        service = ForecastingService()
+        start_time = time.perf_counter()
+        for product_id in range(1, LOOP_SAMPLE + 1):
+            service.generate_demand_forecast(db, product_id, 4)
+        loop_seconds = (time.perf_counter() - start_time) / LOOP_SAMPLE * products
+        
+        start_time = time.perf_counter()
+        result = BatchForecastingService().generate_all_forecasts(db, 4)
+        batch_seconds = time.perf_counter() - start_time
+        assert result["success"], result
+        
+        db.close()
+        engine.dispose()
+    return loop_seconds, batch_seconds
+
+if __name__ == "__main__":
+    print(f"{'products':>9} {'loop (s, est.)':>15} {'batch (s)':>10} {'speedup':>9}")
+    for products in PRODUCT_COUNTS:
+        loop_seconds, batch_seconds = run_benchmark(products)
+        print(f"{products:>9} {loop_seconds:>15.1f} {batch_seconds:>10.2f} {loop_seconds / batch_seconds:>8.0f}x")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark stock adjustment throughput:
+one update_stock call per line vs. a single bulk_update_stock transaction
+"""
+import sys
+import os
+import random
+import tempfile
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.app.models.database_models import Base, Product, Inventory
+from backend.app.services.inventory_service import InventoryService
+
+PRODUCTS = 500
+BATCH_SIZES = [100, 1000, 5000]
+
+def create_session(path):
+    """Create a file-backed database (commits pay a real fsync) seeded with products"""
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    for i in range(PRODUCTS):
+        product = Product(sku=f"BENCH{i:05d}", name=f"Benchmark Item {i}")
+        db.add(product)
+        db.flush()
+        db.add(Inventory(product_id=product.id, quantity=10000,
+                         reserved_quantity=0, available_quantity=10000))
+    db.commit()
+    return engine, db
+
+def make_adjustments(count, seed=42):
+    rng = random.Random(seed)
+    return [
+        {"product_id": rng.randint(1, PRODUCTS), "quantity_change": rng.randint(-5, 5),
+         "movement_type": "adjustment", "reason": "cycle count"}
+        for _ in range(count)
+    ]
+
+def run_benchmark(batch_size):
+    """Return (single-item seconds, bulk seconds) for one batch size"""
+    adjustments = make_adjustments(batch_size)
+    timings = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for label in ("single", "bulk"):
+            engine, db = create_session(os.path.join(tmp, f"{label}.db"))
+            service = InventoryService(db)
+            start_time = time.perf_counter()
+            if label == "single":
+                for adjustment in adjustments:
+                    service.update_stock(adjustment["product_id"], adjustment["quantity_change"],
+                                         adjustment["movement_type"], reason=adjustment["reason"])
+            else:
+                service.bulk_update_stock(adjustments)
+            timings.append(time.perf_counter() - start_time)
+            db.close()
+            engine.dispose()
+    return tuple(timings)
+
+if __name__ == "__main__":
+    print(f"{'lines':>8} {'single (lines/s)':>18} {'bulk (lines/s)':>16} {'speedup':>9}")
+    for batch_size in BATCH_SIZES:
+        single_seconds, bulk_seconds = run_benchmark(batch_size)
+        print(f"{batch_size:>8} {batch_size / single_seconds:>18.0f} "
+              f"{batch_size / bulk_seconds:>16.0f} {single_seconds / bulk_seconds:>8.1f}x")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-message chatbot latency:
+per-request ChatbotService construction vs. the shared service container
+"""
+import sys
+import os
+import time
+import statistics
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from backend.app.models.database_models import Base, Product, Inventory
+from backend.app.services.chatbot_service import ChatbotService
+from backend.app.services.service_container import ServiceContainer
+
+MESSAGES = [
+    "Do we have any laptops?",
+    "What items are running low?",
+    "Check stock for Wireless Mouse",
+    "How are things looking?",
+    "help",
+]
+ITERATIONS = 40
+
+def create_session():
+    """Create an in-memory database seeded with a small catalog"""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+    for i, name in enumerate(["Gaming Laptop", "Wireless Mouse", "Mechanical Keyboard",
+                              "Monitor 24-inch", "Wireless Headphones", "Smartphone"]):
+        product = Product(sku=f"ELEC{i + 1:03d}", name=name, category="Electronics",
+                          unit_price=10.0 * (i + 1), reorder_level=10, location=f"A{i + 1}")
+        db.add(product)
+        db.flush()
+        db.add(Inventory(product_id=product.id, quantity=5 + i * 10,
+                         reserved_quantity=0, available_quantity=5 + i * 10))
+    db.commit()
+    return db
+
+def run_benchmark(build_service, db):
+    """Time one chat message per iteration, including service construction"""
+    timings = []
+    for i in range(ITERATIONS):
+        message = MESSAGES[i % len(MESSAGES)]
+        start_time = time.perf_counter()
+        service = build_service(db)
+        service.process_message(message, session_id="bench", user_id="bench")
+        timings.append((time.perf_counter() - start_time) * 1000)
+
+    return sorted(timings)
+
+def report(label, timings):
+    """Print latency statistics for one run"""
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<28} mean {statistics.mean(timings):8.2f} ms   "
+          f"median {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms")
+
+def main():
+    print("Chat message latency benchmark")
+    print("=" * 70)
+    db = create_session()
+
+    # Silence the debug prints in the chatbot handlers during timing
+    devnull = open(os.devnull, "w")
+    stdout = sys.stdout
+
+    container = ServiceContainer()
+    container.warm_up()
+
+    sys.stdout = devnull
+    try:
+        before = run_benchmark(lambda session: ChatbotService(session), db)
+        after = run_benchmark(container.create_chatbot_service, db)
+    finally:
+        sys.stdout = stdout
+        devnull.close()
+
+    report("per-request construction", before)
+    report("shared service container", after)
+    print(f"Speedup (mean): {statistics.mean(before) / statistics.mean(after):.1f}x")
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent chat and dashboard traffic against the database
+engine settings from create_database_engine (SQLite pragmas / Postgres pool)
+
+Set BENCH_POSTGRES_URL to also run the PostgreSQL pool settings.
+"""
+import sys
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+from backend.app.database import create_database_engine, get_sqlite_pragmas, get_postgres_pool_options
+from backend.app.models.database_models import Base, Product, Inventory, StockMovement
+from backend.app.services.inventory_service import InventoryService
+from backend.app.services.service_container import ServiceContainer
+
+PRODUCTS = 2000
+MOVEMENTS = 5000
+CHAT_THREADS = 4
+DASHBOARD_THREADS = 4
+STOCK_THREADS = 2
+OPERATIONS_PER_THREAD = 30
+
+MESSAGES = [
+    "Do we have any laptops?",
+    "What items are running low?",
+    "Check stock for Benchmark Item 42",
+    "How are things looking?",
+]
+
+def seed(engine):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    rng = random.Random(1)
+    for i in range(PRODUCTS):
+        quantity = rng.randint(0, 200)
+        db.add(Product(id=i + 1, sku=f"BENCH{i:05d}", name=f"Benchmark Item {i}", reorder_level=20))
+        db.add(Inventory(product_id=i + 1, quantity=quantity, reserved_quantity=0, available_quantity=quantity))
+    db.flush()
+    for i in range(MOVEMENTS):
+        db.add(StockMovement(product_id=rng.randint(1, PRODUCTS), movement_type="adjustment", quantity=1))
+    db.commit()
+    db.close()
+
+def chat_worker(SessionLocal, container, timings, errors, seed):
+    rng = random.Random(seed)
+    for _ in range(OPERATIONS_PER_THREAD):
+        db = SessionLocal()
+        start_time = time.perf_counter()
+        try:
+            container.create_chatbot_service(db).process_message(rng.choice(MESSAGES), session_id="bench")
+            timings.append((time.perf_counter() - start_time) * 1000)
+        except Exception:
+            errors.append(1)
+        finally:
+            db.close()
+
+def dashboard_worker(SessionLocal, container, timings, errors, seed):
+    for _ in range(OPERATIONS_PER_THREAD):
+        db = SessionLocal()
+        start_time = time.perf_counter()
+        try:
+            # Bypass the summary cache so every request reads the database
+            service = InventoryService(db)
+            service._build_inventory_summary()
+            service.get_stock_movements_page(limit=50)
+            timings.append((time.perf_counter() - start_time) * 1000)
+        except Exception:
+            errors.append(1)
+        finally:
+            db.close()
+
+def stock_worker(SessionLocal, container, timings, errors, seed):
+    rng = random.Random(seed)
+    for _ in range(OPERATIONS_PER_THREAD):
+        db = SessionLocal()
+        start_time = time.perf_counter()
+        try:
+            if InventoryService(db).update_stock(rng.randint(1, PRODUCTS), rng.randint(-3, 3), "adjustment"):
+                timings.append((time.perf_counter() - start_time) * 1000)
+            else:
+                errors.append(1)
+        finally:
+            db.close()
+
+def run_setting(engine, container):
+    """Run all traffic types at once; return {traffic: (timings, errors)} and wall time"""
+    seed(engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    results = {name: ([], []) for name in ("chat", "dashboard", "stock update")}
+    workers = (
+        [("chat", chat_worker)] * CHAT_THREADS
+        + [("dashboard", dashboard_worker)] * DASHBOARD_THREADS
+        + [("stock update", stock_worker)] * STOCK_THREADS
+    )
+    threads = [
+        threading.Thread(target=worker, args=(SessionLocal, container, *results[name], i))
+        for i, (name, worker) in enumerate(workers)
+    ]
+    start_time = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - start_time
+
+def report(label, results, wall_seconds):
+    print(f"\n{label}  (wall {wall_seconds:.2f} s)")
+    for name, (timings, errors) in results.items():
+        if timings:
+            timings.sort()
+            p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+            print(f"  {name:<13} ok {len(timings):4d}  errors {len(errors):3d}   "
+                  f"median {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms")
+        else:
+            print(f"  {name:<13} ok    0  errors {len(errors):3d}")
+
+def main():
+    settings = [
+        ("sqlite: driver defaults", {}),
+        ("sqlite: tuned (WAL, synchronous=NORMAL)", None),
+        ("sqlite: tuned, synchronous=FULL", dict(get_sqlite_pragmas(), synchronous="FULL")),
+    ]
+
+    container = ServiceContainer()
+    container.warm_up()
+    devnull = open(os.devnull, "w")
+    stdout = sys.stdout
+
+    print("Concurrent chat + dashboard + stock update traffic")
+    print(f"{CHAT_THREADS} chat, {DASHBOARD_THREADS} dashboard, {STOCK_THREADS} stock threads "
+          f"x {OPERATIONS_PER_THREAD} operations, {PRODUCTS} products")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, (label, pragmas) in enumerate(settings):
+            engine = create_database_engine(f"sqlite:///{os.path.join(tmp, f'bench{i}.db')}", sqlite_pragmas=pragmas)
+            sys.stdout = devnull
+            try:
+                results, wall_seconds = run_setting(engine, container)
+            finally:
+                sys.stdout = stdout
+            with engine.connect() as connection:
+                journal_mode = connection.execute(text("PRAGMA journal_mode")).scalar()
+            report(f"{label}  [journal_mode={journal_mode}]", results, wall_seconds)
+            engine.dispose()
+
+    postgres_url = os.getenv("BENCH_POSTGRES_URL")
+    if postgres_url:
+        pool_settings = [
+            ("postgres: pool 5, no overflow", dict(get_postgres_pool_options(), pool_size=5, max_overflow=0)),
+            ("postgres: tuned pool", None),
+        ]
+        for label, options in pool_settings:
+            engine = create_database_engine(postgres_url, pool_options=options)
+            sys.stdout = devnull
+            try:
+                results, wall_seconds = run_setting(engine, container)
+            finally:
+                sys.stdout = stdout
+            report(label, results, wall_seconds)
+            engine.dispose()
+
+    devnull.close()
+
+if __name__ == "__main__":
+    main()
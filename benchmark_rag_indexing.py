@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark RAG product indexing:
+the previous build-everything-then-embed path vs. the streamed, batched embedding pipeline,
+with peak Python memory. A NumPy random-projection embedder stands in for the
+sentence-transformer so the numbers isolate pipeline overhead and memory.
+"""
+import sys
+import os
+import tempfile
+import time
+import tracemalloc
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from backend.app.models.database_models import Base, Product, Inventory
+from backend.app.services.embedding_pipeline import EmbeddingPipeline
+from backend.app.services.rag_indexer import enhanced_product_document, index_products, load_product_rows
+
+PRODUCT_COUNTS = [10000, 100000]
+PREVIOUS_PATH_MAX = 10000  # the previous path holds every vector as Python floats
+DIMENSIONS = 384
+TEXT_BYTES = 512
+
+class ProjectionEmbeddings:
+    """Text bytes times a fixed random matrix (the matmul releases the GIL, like torch)"""
+
+    def __init__(self):
+        self.matrix = np.random.default_rng(5).standard_normal((TEXT_BYTES, DIMENSIONS)).astype(np.float32)
+
+    def embed_documents(self, texts):
+        raw = np.zeros((len(texts), TEXT_BYTES), dtype=np.float32)
+        for row, text in enumerate(texts):
+            data = np.frombuffer(text.encode("utf-8")[:TEXT_BYTES], dtype=np.uint8)
+            raw[row, :len(data)] = data
+        vectors = raw @ self.matrix
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+class SinkStore:
+    """Accepts upserts and keeps only a count"""
+
+    def __init__(self):
+        self.embeddings = ProjectionEmbeddings()
+        self._collection = self
+        self.count = 0
+
+    def upsert(self, ids, embeddings, metadatas, documents):
+        self.count += len(ids)
+
+def create_session(path, products):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    for start in range(0, products, 20000):
+        ids = range(start + 1, min(start + 20000, products) + 1)
+        db.execute(insert(Product.__table__), [
+            {"id": i, "sku": f"RX{i:06d}", "name": f"Indexed Item {i}", "category": "parts",
+             "unit_price": 3.5, "reorder_level": 10, "location": f"A-{i % 90:02d}"} for i in ids
+        ])
+        db.execute(insert(Inventory.__table__), [
+            {"product_id": i, "quantity": i % 200, "reserved_quantity": 0, "available_quantity": i % 200} for i in ids
+        ])
+    db.commit()
+    return engine, db
+
+def index_all_at_once(db, store):
+    """The previous path: every product's document in one list, then one embed and one write"""
+    documents = [enhanced_product_document(*row) for row in load_product_rows(db)]
+    vectors = store.embeddings.embed_documents([text for text, _ in documents]).tolist()
+    store.upsert([f"product:{i}" for i in range(len(documents))], vectors,
+                 [metadata for _, metadata in documents], [text for text, _ in documents])
+
+def measure(function):
+    """(seconds, peak MB); memory is traced in a second run because tracemalloc slows allocation"""
+    start_time = time.perf_counter()
+    function()
+    seconds = time.perf_counter() - start_time
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 1e6
+
+if __name__ == "__main__":
+    workers = os.cpu_count() or 1
+    print(f"{'products':>9} {'previous':>9} {'prev MB':>8} {'pipeline':>9} {'pipe MB':>8} {'docs/s':>8}  ({workers} workers)")
+    for products in PRODUCT_COUNTS:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine, db = create_session(os.path.join(tmp, "index.db"), products)
+            previous = "-", "-"
+            if products <= PREVIOUS_PATH_MAX:
+                seconds, peak_mb = measure(lambda: index_all_at_once(db, SinkStore()))
+                previous = f"{seconds:.2f}s", f"{peak_mb:.1f}"
+            pipeline = EmbeddingPipeline(batch_size=64, max_workers=workers, write_batch_size=1000)
+            store = SinkStore()
+            seconds, peak_mb = measure(lambda: index_products(store, load_product_rows(db),
+                                                              enhanced_product_document, pipeline))
+            assert store.count == 2 * products
+            print(f"{products:>9} {previous[0]:>9} {previous[1]:>8} {seconds:>8.2f}s {peak_mb:>8.1f} "
+                  f"{products / seconds:>8.0f}")
+            db.close()
+            engine.dispose()
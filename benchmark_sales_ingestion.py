@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark sales CSV ingestion:
+the per-row lookup / ORM add path vs. the streaming bulk ingester, with peak Python memory
+"""
+import sys
+import os
+import csv
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from backend.app.models.database_models import Base, Product, SalesHistory
+from backend.app.services.sales_ingestion_service import SalesIngestionService
+
+PRODUCTS = 5000
+ROW_COUNTS = [200000, 1000000]
+ROW_LOOP_SAMPLE = 5000  # the per-row path is timed on a sample and extrapolated
+
+def create_session(path):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    db.execute(insert(Product.__table__), [
+        {"sku": f"IN{i:06d}", "name": f"Ingestion Item {i}"} for i in range(PRODUCTS)
+    ])
+    db.commit()
+    return engine, db
+
+def write_csv(path, rows):
+    rng = np.random.default_rng(3)
+    first_day = date(2023, 1, 1)
+    with open(path, "w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["sku", "quantity_sold", "sale_date", "unit_price", "total_value", "customer_type", "channel"])
+        for start in range(0, rows, 100000):
+            count = min(100000, rows - start)
+            products = rng.integers(0, PRODUCTS, size=count)
+            quantities = rng.integers(1, 20, size=count)
+            days = rng.integers(0, 730, size=count)
+            for product, quantity, day in zip(products, quantities, days):
+                writer.writerow([f"IN{product:06d}", quantity, (first_day + timedelta(days=int(day))).isoformat(),
+                                 1.5, quantity * 1.5, "retail", "store"])
+
+def ingest_row_by_row(db, path, limit):
+    """The previous path: whole file in memory, iterrows, one product lookup and ORM add per row"""
+    frame = pd.read_csv(path, nrows=limit)
+    for _, row in frame.iterrows():
+        product = db.query(Product).filter(Product.sku == row["sku"]).first()
+        sale_date = pd.to_datetime(row["sale_date"])
+        db.add(SalesHistory(product_id=product.id, quantity_sold=int(row["quantity_sold"]), sale_date=sale_date,
+                            unit_price=float(row["unit_price"]), total_value=float(row["total_value"]),
+                            customer_type=row["customer_type"], channel=row["channel"]))
+    db.commit()
+
+def run_benchmark(rows):
+    """Return (row-by-row seconds extrapolated, bulk seconds, bulk peak MB, file MB)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sales.csv")
+        write_csv(path, rows)
+        engine, db = create_session(os.path.join(tmp, "ingest.db"))
+
+        start_time = time.perf_counter()
+        ingest_row_by_row(db, path, ROW_LOOP_SAMPLE)
+        loop_seconds = (time.perf_counter() - start_time) / ROW_LOOP_SAMPLE * rows
+
+        start_time = time.perf_counter()
+        with open(path, "rb") as handle:
+            result = SalesIngestionService().ingest_csv(db, handle)
+        bulk_seconds = time.perf_counter() - start_time
+        assert result["success"] and result["ingested_count"] == rows, result
+
+        # Memory in a second, traced pass (tracemalloc slows allocation-heavy code down)
+        tracemalloc.start()
+        with open(path, "rb") as handle:
+            SalesIngestionService().ingest_csv(db, handle)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        file_mb = os.path.getsize(path) / 1e6
+        db.close()
+        engine.dispose()
+    return loop_seconds, bulk_seconds, peak / 1e6, file_mb
+
+if __name__ == "__main__":
+    print(f"{'rows':>10} {'file MB':>8} {'row loop (est)':>15} {'bulk':>8} {'speedup':>8} {'peak MB':>8}")
+    for rows in ROW_COUNTS:
+        loop_seconds, bulk_seconds, peak_mb, file_mb = run_benchmark(rows)
+        print(f"{rows:>10} {file_mb:>8.1f} {loop_seconds:>14.1f}s {bulk_seconds:>7.2f}s "
+              f"{loop_seconds / bulk_seconds:>7.1f}x {peak_mb:>8.1f}")
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Benchmark the NumPy vector index (float32 and int8) against Chroma on the product corpus:
+recall@10 against exact search, query latency with and without a metadata filter,
+and persist / reload time. Uses the sentence-transformer when it is installed,
+otherwise a NumPy random-projection embedder; Chroma is skipped when chromadb is missing.
+"""
+import sys
+import os
+import tempfile
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from backend.app.models.database_models import Base, Product, Inventory
+from backend.app.services.numpy_vector_store import NumpyVectorStore
+from backend.app.services.rag_indexer import enhanced_product_document, load_product_rows, product_documents
+
+PRODUCT_COUNTS = [10000, 100000]
+CATEGORIES = ["tools", "electrical", "plumbing", "fasteners", "safety", "garden"]
+QUERIES = 100
+TOP_K = 10
+TEXT_BYTES = 512
+DIMENSIONS = 384
+
+class ProjectionEmbeddings:
+    """Text bytes times a fixed random matrix"""
+
+    def __init__(self):
+        self.matrix = np.random.default_rng(5).standard_normal((TEXT_BYTES, DIMENSIONS)).astype(np.float32)
+
+    def embed_documents(self, texts):
+        raw = np.zeros((len(texts), TEXT_BYTES), dtype=np.float32)
+        for row, text in enumerate(texts):
+            data = np.frombuffer(text.encode("utf-8")[:TEXT_BYTES], dtype=np.uint8)
+            raw[row, :len(data)] = data
+        return (raw @ self.matrix).tolist()
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+def load_embeddings():
+    try:
+        from langchain_huggingface import HuggingFaceEmbeddings
+        return HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2"), "all-MiniLM-L6-v2"
+    except ImportError:
+        return ProjectionEmbeddings(), "random projection (sentence-transformers not installed)"
+
+def product_corpus(products):
+    """(ids, texts, metadatas) of the enhanced product documents of a synthetic catalog"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    rng = np.random.default_rng(9)
+    db.execute(insert(Product.__table__), [
+        {"id": i, "sku": f"RX{i:06d}", "name": f"{CATEGORIES[i % 6].title()} item {rng.integers(1, 999)}",
+         "category": CATEGORIES[i % 6], "unit_price": float(rng.integers(1, 500)), "reorder_level": 10,
+         "location": f"{'ABCDEF'[i % 6]}-{i % 90:02d}"} for i in range(1, products + 1)
+    ])
+    db.execute(insert(Inventory.__table__), [
+        {"product_id": i, "quantity": i % 200, "reserved_quantity": 0, "available_quantity": i % 200}
+        for i in range(1, products + 1)
+    ])
+    db.commit()
+    ids, texts, metadatas = [], [], []
+    for doc_id, text, metadata in product_documents(load_product_rows(db), enhanced_product_document):
+        ids.append(doc_id)
+        texts.append(text)
+        metadatas.append(metadata)
+    db.close()
+    return ids, texts, metadatas
+
+def exact_results(vectors, metadatas, queries, category=None):
+    matrix = np.asarray(vectors, dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    keep = np.array([category is None or metadata["category"] == category for metadata in metadatas])
+    results = []
+    for query in queries:
+        scores = np.where(keep, matrix @ (np.asarray(query, dtype=np.float32) / np.linalg.norm(query)), -np.inf)
+        results.append(set(np.argsort(-scores)[:TOP_K].tolist()))
+    return results
+
+def evaluate(search, queries, truth, ids):
+    """(recall@10, median ms, p95 ms) of search(query) -> list of ids"""
+    positions = {doc_id: position for position, doc_id in enumerate(ids)}
+    latencies, hits = [], 0
+    for query, expected in zip(queries, truth):
+        start_time = time.perf_counter()
+        found = search(query)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+        hits += len(expected & {positions[doc_id] for doc_id in found})
+    return hits / (len(queries) * TOP_K), float(np.median(latencies)), float(np.percentile(latencies, 95))
+
+def benchmark_numpy(tmp, dtype, ids, texts, metadatas, vectors, queries, truth, filtered_truth, embeddings):
+    path = os.path.join(tmp, f"numpy-{dtype}")
+    store = NumpyVectorStore(path, embeddings, dtype=dtype)
+    start_time = time.perf_counter()
+    for start in range(0, len(ids), 5000):
+        store.upsert(ids[start:start + 5000], vectors[start:start + 5000], metadatas[start:start + 5000],
+                     texts[start:start + 5000])
+    build_seconds = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    store.persist()
+    persist_ms = (time.perf_counter() - start_time) * 1000
+    start_time = time.perf_counter()
+    store = NumpyVectorStore(path, embeddings, dtype=dtype)
+    reload_ms = (time.perf_counter() - start_time) * 1000
+    plain = evaluate(lambda q: [r[0] for r in store.search(q, TOP_K)], queries, truth, ids)
+    filtered = evaluate(lambda q: [r[0] for r in store.search(q, TOP_K, where={"category": "tools"})],
+                        queries, filtered_truth, ids)
+    return build_seconds, persist_ms, reload_ms, plain, filtered
+
+def benchmark_chroma(tmp, ids, texts, metadatas, vectors, queries, truth, filtered_truth):
+    import chromadb
+
+    path = os.path.join(tmp, "chroma")
+    client = chromadb.PersistentClient(path=path)
+    collection = client.create_collection("benchmark", metadata={"hnsw:space": "cosine"})
+    start_time = time.perf_counter()
+    for start in range(0, len(ids), 5000):
+        collection.upsert(ids=ids[start:start + 5000], embeddings=vectors[start:start + 5000],
+                          metadatas=metadatas[start:start + 5000], documents=texts[start:start + 5000])
+    build_seconds = time.perf_counter() - start_time
+    del client, collection
+    start_time = time.perf_counter()
+    collection = chromadb.PersistentClient(path=path).get_collection("benchmark")
+    collection.query(query_embeddings=[queries[0]], n_results=1)
+    reload_ms = (time.perf_counter() - start_time) * 1000
+    plain = evaluate(lambda q: collection.query(query_embeddings=[q], n_results=TOP_K)["ids"][0], queries, truth, ids)
+    filtered = evaluate(lambda q: collection.query(query_embeddings=[q], n_results=TOP_K,
+                                                   where={"category": "tools"})["ids"][0],
+                        queries, filtered_truth, ids)
+    return build_seconds, None, reload_ms, plain, filtered
+
+def report(name, result):
+    build_seconds, persist_ms, reload_ms, plain, filtered = result
+    persist = f"{persist_ms:.0f}ms" if persist_ms is not None else "auto"
+    print(f"  {name:<14} build {build_seconds:6.2f}s  persist {persist:>7}  reload {reload_ms:7.1f}ms  "
+          f"recall {plain[0]:.3f}  p50 {plain[1]:6.2f}ms  p95 {plain[2]:6.2f}ms  |  "
+          f"filtered recall {filtered[0]:.3f}  p50 {filtered[1]:6.2f}ms")
+
+if __name__ == "__main__":
+    embeddings, model_name = load_embeddings()
+    print(f"Embeddings: {model_name}")
+    for products in PRODUCT_COUNTS:
+        ids, texts, metadatas = product_corpus(products)
+        vectors = [list(map(float, vector)) for vector in embeddings.embed_documents(texts)]
+        rng = np.random.default_rng(17)
+        queries = [embeddings.embed_query(f"stock level of {texts[i].splitlines()[0]}")
+                   for i in rng.integers(0, products, QUERIES)]
+        truth = exact_results(vectors, metadatas, queries)
+        filtered_truth = exact_results(vectors, metadatas, queries, category="tools")
+        print(f"{products} products")
+        with tempfile.TemporaryDirectory() as tmp:
+            for dtype in ("float32", "int8"):
+                report(f"numpy {dtype}", benchmark_numpy(tmp, dtype, ids, texts, metadatas, vectors,
+                                                         queries, truth, filtered_truth, embeddings))
+            try:
+                report("chroma hnsw", benchmark_chroma(tmp, ids, texts, metadatas, vectors,
+                                                       queries, truth, filtered_truth))
+            except ImportError:
+                print("  chroma hnsw    skipped (chromadb not installed)")
@@ -0,0 +1,34 @@
+"""
+Shared fixtures for the root-level test scripts
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from backend.app.models.database_models import Base
+
+def create_sqlite_session():
+    """(engine, session) on a fresh in-memory SQLite database with every table created"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    return engine, db
+
+@pytest.fixture
+def new_session():
+    """Factory for create_sqlite_session; every session and engine is closed after the test"""
+    created = []
+
+    def factory():
+        engine, db = create_sqlite_session()
+        created.append((engine, db))
+        return engine, db
+
+    yield factory
+    for engine, db in created:
+        db.close()
+        engine.dispose()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Load test: latency of light endpoints while heavy forecasting requests run
+at the same time, driven in-process through the ASGI app's own event loop.
+A handler that blocks the event loop shows up directly in the light p99.
+"""
+import sys
+import os
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+WORKDIR = tempfile.mkdtemp(prefix="warehouse_load_test_")
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+sys.path.append(BACKEND)
+# database.py creates ./smart_warehouse.db relative to the working directory
+os.chdir(WORKDIR)
+
+import httpx
+from app.main import app
+from app.database import SessionLocal
+from app.models.database_models import Product, Inventory, SalesHistory
+
+PRODUCTS = 150
+SALES_DAYS = 90
+HEAVY_CLIENTS = 2
+LIGHT_CLIENTS = 8
+DURATION_SECONDS = 15
+LIGHT_ENDPOINTS = ["/health", "/api/inventory/low-stock", "/api/dashboard/overview"]
+HEAVY_ENDPOINT = "/api/phase3/forecast/all-products?weeks=4"
+
+# The services print debug output; results go to the real stdout
+REPORT = sys.stdout
+
+def seed():
+    db = SessionLocal()
+    rng = random.Random(3)
+    start_date = datetime.utcnow() - timedelta(days=SALES_DAYS)
+    for i in range(PRODUCTS):
+        product = Product(sku=f"LOAD{i:04d}", name=f"Load Test Item {i}", reorder_level=20, unit_price=9.99)
+        db.add(product)
+        db.flush()
+        quantity = rng.randint(0, 100)
+        db.add(Inventory(product_id=product.id, quantity=quantity, reserved_quantity=0, available_quantity=quantity))
+        for day in range(SALES_DAYS):
+            db.add(SalesHistory(product_id=product.id, sale_date=start_date + timedelta(days=day),
+                                quantity_sold=rng.randint(0, 12), unit_price=9.99))
+    db.commit()
+    db.close()
+
+async def client_loop(client, endpoints, deadline, timings, rng):
+    while time.perf_counter() < deadline:
+        endpoint = rng.choice(endpoints)
+        start_time = time.perf_counter()
+        response = await client.get(endpoint)
+        response.raise_for_status()
+        timings.append((time.perf_counter() - start_time) * 1000)
+
+async def run_phase(client, heavy_clients):
+    deadline = time.perf_counter() + DURATION_SECONDS
+    light, heavy = [], []
+    tasks = [client_loop(client, LIGHT_ENDPOINTS, deadline, light, random.Random(i)) for i in range(LIGHT_CLIENTS)]
+    tasks += [client_loop(client, [HEAVY_ENDPOINT], deadline, heavy, random.Random(100 + i))
+              for i in range(heavy_clients)]
+    await asyncio.gather(*tasks)
+    return light, heavy
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def report(label, timings):
+    if not timings:
+        print(f"  {label:<26} no completed requests", file=REPORT)
+        return
+    print(f"  {label:<26} n={len(timings):5d}   p50 {statistics.median(timings):8.1f} ms   "
+          f"p99 {percentile(timings, 0.99):8.1f} ms   max {max(timings):8.1f} ms", file=REPORT)
+
+async def main():
+    await app.router.startup()
+    seed()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=300) as client:
+        print(f"{LIGHT_CLIENTS} light clients, {DURATION_SECONDS}s per phase, {PRODUCTS} products", file=REPORT)
+        light, _ = await run_phase(client, heavy_clients=0)
+        print("\nLight traffic only", file=REPORT)
+        report("light endpoints", light)
+
+        light, heavy = await run_phase(client, heavy_clients=HEAVY_CLIENTS)
+        print(f"\nLight traffic + {HEAVY_CLIENTS} concurrent all-product forecasts", file=REPORT)
+        report("light endpoints", light)
+        report("forecast/all-products", heavy)
+    await app.router.shutdown()
+
+if __name__ == "__main__":
+    with open(os.devnull, "w") as devnull:
+        sys.stdout = devnull
+        try:
+            asyncio.run(main())
+        finally:
+            sys.stdout = REPORT
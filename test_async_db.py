@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test the optional async database path against the sync one
+"""
+import sys
+import os
+import asyncio
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from backend.app.database import (
+    create_database_engine, create_async_database_engine, to_async_url, get_async_db
+)
+from backend.app.models.database_models import Base, Product, Inventory
+from backend.app.routers import async_reads
+from backend.app.services.inventory_service import InventoryService, AsyncInventoryService
+
+def create_databases(directory):
+    url = f"sqlite:///{os.path.join(directory, 'async_test.db')}"
+    engine = create_database_engine(url)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+    for i in range(12):
+        product = Product(sku=f"AS{i:03d}", name=f"Async Item {i}", unit_price=2.5, reorder_level=10)
+        db.add(product)
+        db.flush()
+        db.add(Inventory(product_id=product.id, quantity=i * 2, available_quantity=i * 2))
+    db.commit()
+    
+    async_engine = create_async_database_engine(url)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    return engine, db, async_engine, AsyncSessionLocal
+
+async def run_with_session(AsyncSessionLocal, function, *args):
+    async with AsyncSessionLocal() as async_db:
+        return await function(async_db, *args)
+
+def test_to_async_url():
+    """Sync URLs map onto their async drivers"""
+    assert to_async_url("sqlite:///./smart_warehouse.db") == "sqlite+aiosqlite:///./smart_warehouse.db"
+    assert to_async_url("postgresql://u:p@h:5432/d") == "postgresql+asyncpg://u:p@h:5432/d"
+
+def test_async_service_matches_sync_service():
+    """Async summary, low-stock and movement reads return what the sync service returns"""
+    with tempfile.TemporaryDirectory() as directory:
+        engine, db, async_engine, AsyncSessionLocal = create_databases(directory)
+        service = InventoryService(db)
+        service.update_stock(1, 5, "inbound", reason="restock")
+        service.update_stock(2, -1, "outbound", reason="sale")
+        
+        async def read_async():
+            async with AsyncSessionLocal() as async_db:
+                async_service = AsyncInventoryService(async_db)
+                return (
+                    await async_service.get_inventory_summary(),
+                    await async_service.get_low_stock_items(),
+                    await async_service.get_stock_movements_page(limit=1)
+                )
+        
+        try:
+            summary, low_stock, page = asyncio.run(read_async())
+            assert summary == service._build_inventory_summary()
+            assert [item["product_id"] for item in low_stock] == \
+                [item["product_id"] for item in summary["low_stock_alerts"]]
+            assert page["movements"] == service.get_stock_movements_page(limit=1)["movements"]
+            assert page["next_cursor"] is not None
+            
+            # A sync write invalidates what the async path serves
+            service.update_stock(12, -20, "outbound", reason="clearance")
+            summary, low_stock, _ = asyncio.run(read_async())
+            assert 12 in [item["product_id"] for item in summary["low_stock_alerts"]]
+            assert 12 in [item["product_id"] for item in low_stock]
+        finally:
+            db.close()
+            asyncio.run(async_engine.dispose())
+            engine.dispose()
+
+def test_async_routes():
+    """The async routers serve the same payloads as their sync counterparts"""
+    with tempfile.TemporaryDirectory() as directory:
+        engine, db, async_engine, AsyncSessionLocal = create_databases(directory)
+        InventoryService(db).update_stock(3, 4, "inbound", reason="restock")
+        
+        async def override_get_async_db():
+            async with AsyncSessionLocal() as async_db:
+                yield async_db
+        
+        app = FastAPI()
+        app.include_router(async_reads.inventory_router, prefix="/api/inventory")
+        app.include_router(async_reads.dashboard_router, prefix="/api/dashboard")
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        
+        try:
+            client = TestClient(app)
+            overview = client.get("/api/dashboard/overview").json()
+            assert overview["inventory"]["total_products"] == 12
+            assert overview["inventory"]["total_value"] == round(sum(i * 2 for i in range(12)) * 2.5 + 4 * 2.5, 2)
+            assert overview["operations"]["recent_movements"] == 1
+            metrics = asyncio.run(run_with_session(AsyncSessionLocal, async_reads.fetch_overview_metrics_async, True))
+            assert async_reads.build_overview(metrics) == overview
+            
+            alerts = client.get("/api/dashboard/inventory-alerts").json()
+            assert alerts["count"] == len(alerts["alerts"]) > 0
+            
+            activity = client.get("/api/dashboard/recent-activity").json()
+            assert activity["activities"][0]["details"]["sku"] == "AS002"
+            
+            low_stock = client.get("/api/inventory/low-stock").json()
+            assert low_stock == client.get("/api/inventory/summary").json()["low_stock_alerts"]
+            
+            assert client.get("/api/inventory/movements?cursor=bogus").status_code == 400
+            assert len(client.get("/api/inventory/movements").json()) == 1
+        finally:
+            db.close()
+            asyncio.run(async_engine.dispose())
+            engine.dispose()
+
+if __name__ == "__main__":
+    test_to_async_url()
+    test_async_service_matches_sync_service()
+    test_async_routes()
+    print("✅ Async database tests passed")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test the single-transaction bulk stock update against the single-item path
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import pytest
+from sqlalchemy import func
+from backend.app.models.database_models import Product, Inventory, StockMovement
+from backend.app.services.inventory_service import InventoryService
+
+def create_session(new_session, product_count=3, quantity=100, reserved=10):
+    engine, db = new_session()
+    for i in range(product_count):
+        product = Product(sku=f"BULK{i:03d}", name=f"Bulk Item {i}")
+        db.add(product)
+        db.flush()
+        db.add(Inventory(product_id=product.id, quantity=quantity,
+                         reserved_quantity=reserved, available_quantity=quantity - reserved))
+    db.commit()
+    return db
+
+def test_bulk_update_matches_single_item_path(new_session):
+    adjustments = [
+        {"product_id": 1, "quantity_change": 5, "movement_type": "adjustment", "reason": "count"},
+        {"product_id": 2, "quantity_change": -7, "movement_type": "adjustment", "reason": "damage"},
+        {"product_id": 1, "quantity_change": -2, "movement_type": "adjustment", "reason": "count"},
+        {"product_id": 3, "quantity_change": 40, "movement_type": "inbound", "reason": "receipt"},
+    ]
+
+    single_db = create_session(new_session)
+    single_service = InventoryService(single_db)
+    for adjustment in adjustments:
+        assert single_service.update_stock(adjustment["product_id"], adjustment["quantity_change"],
+                                           adjustment["movement_type"], reason=adjustment["reason"])
+
+    bulk_db = create_session(new_session)
+    result = InventoryService(bulk_db).bulk_update_stock(adjustments)
+    assert result["applied"] == 4 and result["failed"] == 0
+    assert result["products_updated"] == 3
+
+    def levels(db):
+        return [(i.product_id, i.quantity, i.reserved_quantity, i.available_quantity)
+                for i in db.query(Inventory).order_by(Inventory.product_id).all()]
+
+    def movements(db):
+        return [(m.product_id, m.movement_type, m.quantity, m.reason)
+                for m in db.query(StockMovement).order_by(StockMovement.id).all()]
+
+    assert levels(bulk_db) == levels(single_db)
+    assert movements(bulk_db) == movements(single_db)
+    assert all(m.created_at is not None for m in bulk_db.query(StockMovement).all())
+
+def test_bulk_update_reports_failed_lines(new_session):
+    db = create_session(new_session, product_count=1)
+    result = InventoryService(db).bulk_update_stock([
+        {"product_id": 1, "quantity_change": 3, "movement_type": "adjustment"},
+        {"product_id": 999, "quantity_change": 3, "movement_type": "adjustment"},
+    ])
+
+    assert [line["success"] for line in result["results"]] == [True, False]
+    assert result["results"][1]["error"] == "Inventory record not found"
+    assert db.query(Inventory).filter(Inventory.product_id == 1).first().quantity == 103
+    assert db.query(func.count(StockMovement.id)).scalar() == 1
+
+if __name__ == "__main__":
+    if pytest.main([__file__, "-q"]) != 0:
+        sys.exit(1)
+    print("✅ Bulk stock update agrees with the single-item path")
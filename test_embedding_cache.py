@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test the persistent embedding cache keyed by model and text hash
+"""
+import sys
+import os
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import pytest
+from backend.app.models.database_models import Product, Inventory
+from backend.app.services.embedding_cache import CachedEmbeddings, EmbeddingCache
+from backend.app.services.embedding_pipeline import EmbeddingPipeline
+from backend.app.services.rag_indexer import (
+    enhanced_product_document, index_products, load_product_rows, product_document_id, prune_documents
+)
+
+MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+class CountingModel:
+    """Deterministic 4-dimensional embeddings; records every text it embeds"""
+
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[len(text), sum(map(ord, text)) % 97, 1.0, 0.5] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+class EmbeddingVectorStore:
+    """Minimal store: embeds add_texts itself, takes precomputed vectors through the collection API"""
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+        self._collection = self
+        self.documents = {}
+
+    def add_texts(self, texts, metadatas=None, ids=None):
+        self.upsert(ids, self.embeddings.embed_documents(texts), metadatas, texts)
+
+    def upsert(self, ids, embeddings, metadatas, documents):
+        for doc_id, metadata, vector in zip(ids, metadatas, embeddings):
+            self.documents[doc_id] = (metadata, vector)
+
+    def get(self, where=None, include=None):
+        types = where["type"]["$in"]
+        return {"ids": [doc_id for doc_id, (metadata, _) in self.documents.items() if metadata["type"] in types]}
+
+    def delete(self, ids=None):
+        for doc_id in ids:
+            del self.documents[doc_id]
+
+def create_session(new_session, products=6):
+    engine, db = new_session()
+    for i in range(products):
+        product = Product(sku=f"EMB{i:03d}", name=f"Embedded Item {i}", category="parts", unit_price=1.0, reorder_level=5)
+        db.add(product)
+        db.flush()
+        db.add(Inventory(product_id=product.id, quantity=20, reserved_quantity=0, available_quantity=20))
+    db.commit()
+    return db
+
+def test_only_uncached_texts_reach_the_model():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "embeddings.db")
+        model = CountingModel()
+        embeddings = CachedEmbeddings(model, MODEL, EmbeddingCache(path))
+        first = embeddings.embed_documents(["pallet", "forklift", "pallet"])
+        assert model.embedded == ["pallet", "forklift"] and first[0] == first[2]
+        assert embeddings.embed_documents(["forklift", "pallet"]) == [first[1], first[0]]
+        assert len(model.embedded) == 2 and embeddings.hits == 3 and embeddings.misses == 2
+
+        # A new process reads the same file; another model name is a separate key space
+        restarted = CachedEmbeddings(model, MODEL, EmbeddingCache(path))
+        assert restarted.embed_documents(["pallet", "shelf"]) == [first[0], CountingModel().embed_query("shelf")]
+        assert model.embedded[2:] == ["shelf"]
+        CachedEmbeddings(model, "other-model", EmbeddingCache(path)).embed_documents(["pallet"])
+        assert model.embedded[3:] == ["pallet"]
+        assert EmbeddingCache(path).count(MODEL) == 3
+
+def test_reindex_after_restart_embeds_only_changed_products(new_session):
+    db = create_session(new_session)
+    cache = EmbeddingCache(":memory:")
+    model = CountingModel()
+    store = EmbeddingVectorStore(CachedEmbeddings(model, MODEL, cache))
+    pipeline = EmbeddingPipeline(batch_size=4, max_workers=2)
+    assert index_products(store, load_product_rows(db), enhanced_product_document, pipeline) == [
+        product_document_id(product_id) for product_id in range(1, 7)
+    ]
+    assert len(model.embedded) == 6
+
+    inventory = db.query(Inventory).filter(Inventory.product_id == 2).one()
+    inventory.available_quantity = 2
+    db.commit()
+    model.embedded = []
+    store = EmbeddingVectorStore(CachedEmbeddings(model, MODEL, cache))
+    index_products(store, load_product_rows(db), enhanced_product_document, pipeline)
+    assert len(model.embedded) == 1 and "Available Stock: 2 available" in model.embedded[0]
+    assert len(store.documents) == 6
+
+def test_full_reindex_prunes_documents_of_deleted_rows(new_session):
+    db = create_session(new_session, products=3)
+    store = EmbeddingVectorStore(CachedEmbeddings(CountingModel(), MODEL, EmbeddingCache(":memory:")))
+    store.add_texts(["legacy chunk", "gone"], metadatas=[{"type": "product_detailed"}, {"type": "product_detailed"}],
+                    ids=["3f2a-uuid", product_document_id(99)])
+    store.add_texts(["kept"], metadatas=[{"type": "other"}], ids=["other:0"])
+    keep_ids = index_products(store, load_product_rows(db), enhanced_product_document, EmbeddingPipeline(max_workers=1))
+    removed = prune_documents(store, keep_ids, ["product_detailed"])
+    assert removed == 2
+    assert sorted(store.documents) == ["other:0", "product:1", "product:2", "product:3"]
+
+if __name__ == "__main__":
+    if pytest.main([__file__, "-q"]) != 0:
+        sys.exit(1)
+    print("✅ Embedding cache tests passed")
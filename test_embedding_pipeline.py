@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test the batched, threaded embedding pipeline used for RAG indexing
+"""
+import sys
+import os
+import threading
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from backend.app.services.embedding_pipeline import EmbeddingPipeline
+
+class SlowEmbeddings:
+    """Embeds each text as [len(text)] after a short pause; records batch sizes and threads"""
+
+    def __init__(self, fail_on=None):
+        self.batch_sizes = []
+        self.threads = set()
+        self.fail_on = fail_on
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        time.sleep(0.002)
+        with self._lock:
+            self.batch_sizes.append(len(texts))
+            self.threads.add(threading.current_thread().name)
+        if self.fail_on in texts:
+            raise RuntimeError("model crashed")
+        return [[float(len(text))] for text in texts]
+
+class RecordingStore:
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+        self._collection = self
+        self.writes = []
+        self.vectors = {}
+
+    def upsert(self, ids, embeddings, metadatas, documents):
+        self.writes.append(len(ids))
+        for doc_id, vector, text in zip(ids, embeddings, documents):
+            assert vector == [float(len(text))]
+            self.vectors[doc_id] = vector
+
+def documents(count, produced=None):
+    for i in range(count):
+        if produced is not None:
+            produced.append(i)
+        yield f"doc:{i}", "x" * (i % 17 + 1), {"type": "test"}
+
+def test_documents_are_embedded_in_batches_and_written_in_order():
+    store = RecordingStore(SlowEmbeddings())
+    pipeline = EmbeddingPipeline(batch_size=5, max_workers=3, write_batch_size=7)
+    assert pipeline.run(store, documents(53)) == [f"doc:{i}" for i in range(53)]
+    assert store.embeddings.batch_sizes.count(5) == 10 and sorted(store.embeddings.batch_sizes)[0] == 3
+    assert store.writes == [7] * 7 + [4]
+    assert len(store.vectors) == 53
+    assert all(name.startswith("rag-embed") for name in store.embeddings.threads)
+    assert len(store.embeddings.threads) > 1
+
+def test_memory_is_bounded_by_the_in_flight_batches():
+    store = RecordingStore(SlowEmbeddings())
+    produced = []
+    backlog = []
+
+    def upsert(ids, embeddings, metadatas, documents):
+        backlog.append(len(produced) - sum(store.writes))
+        RecordingStore.upsert(store, ids, embeddings, metadatas, documents)
+
+    store.upsert = upsert
+    pipeline = EmbeddingPipeline(batch_size=10, max_workers=2, write_batch_size=25)
+    pipeline.run(store, documents(2000, produced))
+    assert sum(store.writes) == 2000
+    # Read but unwritten documents never exceed the in-flight batches plus one write chunk
+    assert max(backlog) <= (2 * 2 + 1) * 10 + 25
+
+def test_embedding_errors_propagate():
+    store = RecordingStore(SlowEmbeddings(fail_on="x" * 17))
+    try:
+        EmbeddingPipeline(batch_size=4, max_workers=2).run(store, documents(40))
+        assert False, "embedding error should propagate"
+    except RuntimeError as e:
+        assert str(e) == "model crashed"
+
+if __name__ == "__main__":
+    test_documents_are_embedded_in_batches_and_written_in_order()
+    test_memory_is_bounded_by_the_in_flight_batches()
+    test_embedding_errors_propagate()
+    print("✅ Embedding pipeline tests passed")
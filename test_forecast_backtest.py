@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test the rolling-origin forecast backtesting harness
+"""
+import sys
+import os
+import json
+from datetime import timedelta
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import pytest
+from sqlalchemy import insert
+from backend.app.models.database_models import Product, SalesHistory
+from backend.app.services.batch_forecasting_service import week_start
+from backend.app.services.backtesting_service import BacktestingService
+from backend.app.services.forecasting_service import ForecastingService
+
+FIRST_WEEK = 2800
+WEEKS = 24
+
+class FixedLLM:
+    def __init__(self, available=True):
+        self.calls = 0
+        self.available = available
+
+    def get_completion(self, prompt):
+        self.calls += 1
+        if not self.available:
+            raise ConnectionError("LLM service unavailable")
+        return json.dumps({f"week_{week}": 10 for week in range(1, 5)} | {"confidence": 0.8, "insights": []})
+
+def create_session(new_session):
+    engine, db = new_session()
+    for sku in ("BT-CONSTANT", "BT-SEASONAL", "BT-TREND", "BT-NEW"):
+        db.add(Product(sku=sku, name=f"Backtest {sku}"))
+    db.commit()
+
+    series = {
+        1: [10] * WEEKS,
+        2: [10, 20, 30, 40] * (WEEKS // 4),
+        3: [week + 1 for week in range(WEEKS)],
+        4: [0] * (WEEKS - 3) + [5, 5, 5],  # too little history to be scored
+    }
+    db.execute(insert(SalesHistory.__table__), [
+        {"product_id": product_id, "quantity_sold": quantity,
+         "sale_date": week_start(FIRST_WEEK + week) + timedelta(days=3)}
+        for product_id, quantities in series.items() for week, quantity in enumerate(quantities) if quantity
+    ])
+    db.commit()
+    return db
+
+def as_of():
+    return week_start(FIRST_WEEK + WEEKS) + timedelta(days=1)
+
+def test_origins_leave_a_full_horizon():
+    service = BacktestingService(horizon=4, origins=3, step=2, min_train_weeks=8)
+    assert service.origin_columns(24) == [16, 18, 20]
+    assert service.origin_columns(10) == []
+
+def test_accuracy_is_scored_per_sku_and_overall(new_session):
+    db = create_session(new_session)
+    service = BacktestingService(horizon=2, origins=4, season_length=4, history_weeks=WEEKS)
+    report = service.run(db, ["naive", "seasonal_naive", "moving_average", "batch"], as_of=as_of())
+
+    assert report["success"] and len(report["origins"]) == 4
+    per_sku = {entry["sku"]: entry for entry in report["per_sku"]}
+    assert per_sku["BT-CONSTANT"]["naive"] == {"mape": 0.0, "wape": 0.0, "bias": 0.0}
+    assert per_sku["BT-SEASONAL"]["seasonal_naive"]["wape"] == 0.0
+    assert "naive" not in per_sku["BT-NEW"]
+
+    # Trend y = t + 1: the naive forecast at origin o is o, missing by 1 and 2 units
+    origins = range(WEEKS - 2 - 3, WEEKS - 2 + 1)
+    actual = sum((o + 1) + (o + 2) for o in origins)
+    assert per_sku["BT-TREND"]["naive"]["wape"] == round(100 * 3 * len(origins) / actual, 2)
+    assert per_sku["BT-TREND"]["naive"]["bias"] == -per_sku["BT-TREND"]["naive"]["wape"]
+
+    naive = report["forecasters"]["naive"]
+    assert naive["skus"] == 3 and naive["forecasts"] == 12
+    assert naive["seconds_per_sku"] is not None and naive["runtime_seconds"] >= 0
+    assert set(report["ranking"]) == {"naive", "seasonal_naive", "moving_average", "batch"}
+    assert report["partial_coverage"] == {} and naive["coverage"] == 1.0
+
+def test_forecasters_with_partial_coverage_are_not_ranked(new_session):
+    db = create_session(new_session)
+    # A 22-week season is only available at the last of the four origins
+    service = BacktestingService(horizon=2, origins=4, season_length=22, history_weeks=WEEKS)
+    report = service.run(db, ["naive", "seasonal_naive", "moving_average"], as_of=as_of())
+    assert report["forecasters"]["seasonal_naive"]["forecasts"] == 3
+    assert report["ranking"] == sorted(["naive", "moving_average"], key=lambda name: report["forecasters"][name]["wape"])
+    assert report["partial_coverage"] == {"seasonal_naive": 0.25}
+
+def test_llm_path_is_sampled_and_reports_fallbacks(new_session):
+    db = create_session(new_session)
+    llm = FixedLLM()
+    service = BacktestingService(horizon=2, origins=2, season_length=4, history_weeks=WEEKS, llm_max_products=2)
+    report = service.run(db, ["llm"], as_of=as_of(), forecasting_service=ForecastingService(llm_service=llm))
+    assert report["success"] and llm.calls == 4
+    assert report["forecasters"]["llm"]["skus"] == 2 and report["forecasters"]["llm"]["fallback_forecasts"] == 0
+    per_sku = {entry["sku"]: entry for entry in report["per_sku"]}
+    assert per_sku["BT-CONSTANT"]["llm"]["wape"] == 0.0 and "llm" not in per_sku["BT-TREND"]
+
+    llm.available = False
+    report = service.run(db, ["llm"], as_of=as_of(), forecasting_service=ForecastingService(llm_service=llm))
+    assert report["forecasters"]["llm"]["fallback_forecasts"] == 4
+
+    # Opt-in only: the default set skips it even when a forecasting service is given
+    llm.available = True
+    calls = llm.calls
+    report = service.run(db, as_of=as_of(), forecasting_service=ForecastingService(llm_service=llm))
+    assert report["success"] and "llm" not in report["forecasters"] and llm.calls == calls
+
+def test_unknown_forecasters_are_rejected(new_session):
+    db = create_session(new_session)
+    report = BacktestingService().run(db, ["naive", "prophet"])
+    assert not report["success"] and "prophet" in report["error"]
+
+if __name__ == "__main__":
+    if pytest.main([__file__, "-q"]) != 0:
+        sys.exit(1)
+    print("✅ Forecast backtest tests passed")
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test the forecast cache keyed by each product's sales-history watermark
+"""
+import sys
+import os
+import json
+from datetime import datetime, timedelta
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import pytest
+from backend.app.database import assert_max_queries
+from backend.app.models.database_models import Product, SalesHistory, DemandForecast, ForecastCacheEntry
+from backend.app.services import forecast_cache
+from backend.app.services.forecast_cache import ForecastCache
+from backend.app.services.forecasting_service import ForecastingService
+from backend.app.services.batch_forecasting_service import BatchForecastingService
+
+class CountingLLM:
+    """Returns a fixed JSON forecast and counts the calls"""
+
+    def __init__(self, available=True):
+        self.calls = 0
+        self.available = available
+
+    def get_completion(self, prompt):
+        self.calls += 1
+        if not self.available:
+            raise ConnectionError("LLM service unavailable")
+        return json.dumps({"week_1": 12, "week_2": 14, "confidence": 0.8, "insights": ["steady demand"]})
+
+def create_session(new_session, monkeypatch):
+    monkeypatch.setattr(forecast_cache, "_forecast_cache", ForecastCache(max_age_hours=24))
+    engine, db = new_session()
+    for i in range(3):
+        db.add(Product(sku=f"FC{i:03d}", name=f"Cached Forecast Item {i}", reorder_level=20))
+    db.flush()
+    for product_id in (1, 2):
+        for day in range(10):
+            db.add(SalesHistory(product_id=product_id, quantity_sold=3, sale_date=datetime(2024, 5, 1) + timedelta(days=day)))
+    db.commit()
+    return engine, db
+
+def add_sale(db, product_id, sale_date):
+    db.add(SalesHistory(product_id=product_id, quantity_sold=5, sale_date=sale_date))
+    db.commit()
+
+def forecast_rows(db, product_id):
+    return db.query(DemandForecast).filter(DemandForecast.product_id == product_id).count()
+
+def test_unchanged_sales_return_the_stored_forecast(new_session, monkeypatch):
+    engine, db = create_session(new_session, monkeypatch)
+    llm = CountingLLM()
+    service = ForecastingService(llm_service=llm)
+
+    first = service.generate_demand_forecast(db, 1, weeks=2)
+    assert first["success"] and "cached" not in first
+    # Product, sales watermark, cache entry
+    with assert_max_queries(3, bind=engine):
+        second = service.generate_demand_forecast(db, 1, weeks=2)
+    assert second["cached"] and second["forecasts"] == first["forecasts"]
+    assert second["ai_insights"] == ["steady demand"]
+    assert llm.calls == 1 and forecast_rows(db, 1) == 2
+
+    # Another horizon is its own cache entry and replaces the outstanding rows
+    service.generate_demand_forecast(db, 1, weeks=1)
+    assert llm.calls == 2 and forecast_rows(db, 1) == 1
+
+def test_new_sales_invalidate_only_their_product(new_session, monkeypatch):
+    engine, db = create_session(new_session, monkeypatch)
+    llm = CountingLLM()
+    service = ForecastingService(llm_service=llm)
+    service.generate_demand_forecast(db, 1, weeks=2)
+    service.generate_demand_forecast(db, 2, weeks=2)
+
+    # An older sale still changes the row count
+    add_sale(db, 1, datetime(2024, 1, 1))
+    assert "cached" not in service.generate_demand_forecast(db, 1, weeks=2)
+    assert service.generate_demand_forecast(db, 2, weeks=2)["cached"]
+    assert llm.calls == 3
+    assert forecast_rows(db, 1) == 2 and forecast_rows(db, 2) == 2
+
+def test_first_sale_moves_a_product_off_the_heuristic(new_session, monkeypatch):
+    engine, db = create_session(new_session, monkeypatch)
+    llm = CountingLLM()
+    service = ForecastingService(llm_service=llm)
+    heuristic = service.generate_demand_forecast(db, 3, weeks=2)
+    assert heuristic["forecasts"][0]["predicted_demand"] == 10
+    assert service.generate_demand_forecast(db, 3, weeks=2)["cached"] and llm.calls == 0
+
+    add_sale(db, 3, datetime(2024, 6, 1))
+    result = service.generate_demand_forecast(db, 3, weeks=2)
+    assert "cached" not in result and result["forecasts"][0]["predicted_demand"] == 12
+    assert forecast_rows(db, 3) == 2
+
+def test_heuristic_forecast_with_sales_outside_history_is_cached(new_session, monkeypatch):
+    engine, db = create_session(new_session, monkeypatch)
+    llm = CountingLLM()
+    service = ForecastingService(llm_service=llm)
+    # Sales exist (non-zero watermark) but none are returned as forecasting history
+    service._get_historical_sales = lambda db, product_id: []
+    first = service.generate_demand_forecast(db, 1, weeks=2)
+    assert first["forecasts"][0]["predicted_demand"] == 10
+    # Product, sales watermark, both cache keys
+    with assert_max_queries(4, bind=engine):
+        second = service.generate_demand_forecast(db, 1, weeks=2)
+    assert second["cached"] and second["forecasts"] == first["forecasts"]
+    assert llm.calls == 0 and forecast_rows(db, 1) == 2
+
+def test_fallback_and_expired_results_are_recomputed(new_session, monkeypatch):
+    engine, db = create_session(new_session, monkeypatch)
+    llm = CountingLLM(available=False)
+    service = ForecastingService(llm_service=llm)
+    service.generate_demand_forecast(db, 1, weeks=2)
+    service.generate_demand_forecast(db, 1, weeks=2)
+    assert llm.calls == 2 and forecast_rows(db, 1) == 2
+    assert db.query(ForecastCacheEntry).count() == 0
+
+    llm.available = True
+    service.generate_demand_forecast(db, 1, weeks=2)
+    db.query(ForecastCacheEntry).update({"generated_at": datetime.utcnow() - timedelta(hours=25)})
+    db.commit()
+    assert "cached" not in service.generate_demand_forecast(db, 1, weeks=2)
+    assert llm.calls == 4
+
+def test_batch_forecasts_supersede_cached_results(new_session, monkeypatch):
+    engine, db = create_session(new_session, monkeypatch)
+    service = ForecastingService(llm_service=CountingLLM())
+    service.generate_demand_forecast(db, 1, weeks=2)
+    BatchForecastingService().generate_all_forecasts(db, weeks=2)
+    assert db.query(ForecastCacheEntry).count() == 0
+    assert forecast_rows(db, 1) == 2
+    assert "cached" not in service.generate_demand_forecast(db, 1, weeks=2)
+
+if __name__ == "__main__":
+    if pytest.main([__file__, "-q"]) != 0:
+        sys.exit(1)
+    print("✅ Forecast cache tests passed")
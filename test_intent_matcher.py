@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test the precompiled intent matcher against per-pattern matching
+"""
+import sys
+import os
+import re
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from backend.app.services.enhanced_nlp_processor import EnhancedNLPProcessor
+
+SAMPLE_MESSAGES = [
+    "What items are running low?",
+    "Do we have any laptops?",
+    "Set TOOL001 stock to 100",
+    "Check stock for Wireless Mouse",
+    "Show me low stock items",
+    "Is everything ok?",
+    "We got 50 more keyboards today",
+    "The truck just got here",
+    "Customer wants 5 monitors",
+    "Give me a summary",
+    "warehouse status",
+    "SKU: ELEC001",
+    "dispatch order ORD001",
+    "help",
+    "hello there, can you please check the inventory for headphones asap?",
+    "how many smartphones do we have",
+    "I'm not sure where the gaming laptop is, could you find it?",
+    "any red flags",
+    "correct mouse count to 12",
+    "",
+]
+
+def reference_classify(processor, message):
+    """Original per-pattern classification loop"""
+    best_intent, best_confidence = "help_general", 0.0
+    for intent, pattern_groups in processor.intent_patterns.items():
+        confidence = 0.0
+        for pattern in pattern_groups.get("casual_patterns", []):
+            if re.search(pattern, message, re.IGNORECASE):
+                confidence = max(confidence, 0.8)
+        for pattern in pattern_groups.get("formal_patterns", []):
+            if re.search(pattern, message, re.IGNORECASE):
+                confidence = max(confidence, 0.9)
+        if confidence > best_confidence:
+            best_intent, best_confidence = intent, confidence
+    return best_intent, best_confidence
+
+def reference_normalize(processor, message):
+    """Original one-substitution-per-synonym normalization"""
+    normalized = message.lower().strip()
+    for technical_term, synonyms in processor.layman_translations.items():
+        for synonym in synonyms:
+            pattern = r'\b' + re.escape(synonym) + r'\b'
+            normalized = re.sub(pattern, technical_term, normalized)
+    return normalized
+
+def test_classification_matches_reference():
+    processor = EnhancedNLPProcessor()
+    for message in SAMPLE_MESSAGES:
+        for text in (message, processor.normalize_message(message)):
+            assert processor.classify_intent_enhanced(text) == reference_classify(processor, text), text
+
+def test_normalization_matches_reference():
+    processor = EnhancedNLPProcessor()
+    for message in SAMPLE_MESSAGES:
+        assert processor.normalize_message(message) == reference_normalize(processor, message), message
+
+def test_scores_cover_every_intent():
+    processor = EnhancedNLPProcessor()
+    scores = processor.score_intents("show me low stock items")
+    assert set(scores) == set(processor.intent_patterns)
+    assert scores["alerts_monitoring"] == 0.9
+
+if __name__ == "__main__":
+    test_classification_matches_reference()
+    test_normalization_matches_reference()
+    test_scores_cover_every_intent()
+    print("✅ Compiled matcher agrees with per-pattern matching")
+
+    processor = EnhancedNLPProcessor()
+    rounds = 200
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        for message in SAMPLE_MESSAGES:
+            reference_classify(processor, reference_normalize(processor, message))
+    reference_ms = (time.perf_counter() - start_time) * 1000
+
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        for message in SAMPLE_MESSAGES:
+            processor.classify_intent_enhanced(processor.normalize_message(message))
+    compiled_ms = (time.perf_counter() - start_time) * 1000
+
+    total = rounds * len(SAMPLE_MESSAGES)
+    print(f"Per-pattern matching: {reference_ms / total * 1000:.1f} µs/message")
+    print(f"Compiled matcher:     {compiled_ms / total * 1000:.1f} µs/message")
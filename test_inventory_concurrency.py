@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Concurrency stress test for InventoryService stock mutations:
+many threads hammer one SKU and the final levels must show no drift
+"""
+import sys
+import os
+import random
+import tempfile
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from backend.app.models.database_models import Base, Product, Inventory, StockMovement
+from backend.app.services.inventory_service import InventoryService
+
+THREADS = 16
+OPERATIONS_PER_THREAD = 50
+INITIAL_QUANTITY = 1000
+
+def create_database(path):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 60})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = SessionLocal()
+    product = Product(sku="STRESS001", name="Stress Test Widget", reorder_level=10)
+    db.add(product)
+    db.flush()
+    db.add(Inventory(product_id=product.id, quantity=INITIAL_QUANTITY,
+                     reserved_quantity=0, available_quantity=INITIAL_QUANTITY))
+    db.commit()
+    product_id = product.id
+    db.close()
+    return engine, SessionLocal, product_id
+
+def worker(SessionLocal, product_id, seed, results):
+    rng = random.Random(seed)
+    stock_delta = 0
+    reserved_delta = 0
+    failures = 0
+    db = SessionLocal()
+    service = InventoryService(db)
+    try:
+        for _ in range(OPERATIONS_PER_THREAD):
+            operation = rng.choice(["add", "remove", "reserve", "release"])
+            amount = rng.randint(1, 5)
+            if operation == "add":
+                ok = service.update_stock(product_id, amount, "adjustment", reason="stress")
+                stock_delta += amount if ok else 0
+            elif operation == "remove":
+                ok = service.update_stock(product_id, -amount, "adjustment", reason="stress")
+                stock_delta -= amount if ok else 0
+            elif operation == "reserve":
+                ok = service.reserve_stock(product_id, amount)
+                reserved_delta += amount if ok else 0
+            else:
+                # Only release what this worker reserved, so the floor at zero never applies
+                amount = min(amount, reserved_delta)
+                ok = amount == 0 or service.release_stock(product_id, amount)
+                reserved_delta -= amount if ok else 0
+            failures += 0 if ok else 1
+    finally:
+        db.close()
+    results.append((stock_delta, reserved_delta, failures))
+
+def test_concurrent_stock_mutations_do_not_drift():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, SessionLocal, product_id = create_database(os.path.join(tmp, "stress.db"))
+
+        results = []
+        threads = [
+            threading.Thread(target=worker, args=(SessionLocal, product_id, seed, results))
+            for seed in range(THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        expected_quantity = INITIAL_QUANTITY + sum(r[0] for r in results)
+        expected_reserved = sum(r[1] for r in results)
+
+        db = SessionLocal()
+        inventory = db.query(Inventory).filter(Inventory.product_id == product_id).first()
+        movement_total = db.query(func.sum(StockMovement.quantity)).filter(
+            StockMovement.product_id == product_id
+        ).scalar() or 0
+        db.close()
+        engine.dispose()
+
+        print(f"threads={THREADS} ops={THREADS * OPERATIONS_PER_THREAD} "
+              f"failed={sum(r[2] for r in results)}")
+        print(f"quantity={inventory.quantity} (expected {expected_quantity}), "
+              f"reserved={inventory.reserved_quantity} (expected {expected_reserved}), "
+              f"available={inventory.available_quantity}")
+
+        assert inventory.quantity == expected_quantity
+        assert inventory.reserved_quantity == expected_reserved
+        assert inventory.available_quantity == inventory.quantity - inventory.reserved_quantity
+        assert INITIAL_QUANTITY + movement_total == inventory.quantity
+
+if __name__ == "__main__":
+    test_concurrent_stock_mutations_do_not_drift()
+    print("✅ No drift under concurrent stock mutations")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test that the cached inventory summary is served without queries between
+writes and is invalidated by every kind of stock change
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import pytest
+from backend.app.database import assert_max_queries
+from backend.app.models.database_models import Product, Inventory
+from backend.app.services.inventory_service import InventoryService
+
+def create_session(new_session, quantities=(50, 5)):
+    engine, db = new_session()
+    for i, quantity in enumerate(quantities):
+        product = Product(sku=f"SC{i:03d}", name=f"Summary Item {i}", reorder_level=10)
+        db.add(product)
+        db.flush()
+        db.add(Inventory(product_id=product.id, quantity=quantity,
+                         reserved_quantity=0, available_quantity=quantity))
+    db.commit()
+    return engine, db
+
+def available(summary, product_id):
+    return next(item["available_quantity"] for item in summary["inventory"] if item["product_id"] == product_id)
+
+def test_summary_served_from_cache_between_writes(new_session):
+    engine, db = create_session(new_session)
+    service = InventoryService(db)
+    first = service.get_inventory_summary()
+    with assert_max_queries(0, bind=engine):
+        assert service.get_inventory_summary() is first
+    assert first["low_stock_count"] == 1
+
+def test_stock_mutations_invalidate_summary(new_session):
+    engine, db = create_session(new_session)
+    service = InventoryService(db)
+    service.get_inventory_summary()
+
+    assert service.update_stock(1, -45, "outbound")
+    summary = service.get_inventory_summary()
+    assert available(summary, 1) == 5 and summary["low_stock_count"] == 2
+
+    assert service.reserve_stock(2, 3)
+    assert available(service.get_inventory_summary(), 2) == 2
+
+    assert service.release_stock(2, 3)
+    assert available(service.get_inventory_summary(), 2) == 5
+
+    service.bulk_update_stock([{"product_id": 2, "quantity_change": 20, "movement_type": "inbound"}])
+    summary = service.get_inventory_summary()
+    assert available(summary, 2) == 25 and summary["low_stock_count"] == 1
+
+def test_orm_changes_invalidate_summary(new_session):
+    engine, db = create_session(new_session)
+    service = InventoryService(db)
+    assert service.get_inventory_summary()["low_stock_count"] == 1
+
+    db.query(Product).filter(Product.id == 1).first().reorder_level = 100
+    db.commit()
+    assert service.get_inventory_summary()["low_stock_count"] == 2
+
+    service.create_product({"sku": "SC999", "name": "New Summary Item"})
+    assert service.get_inventory_summary()["total_products"] == 3
+
+def test_failed_mutation_keeps_cache(new_session):
+    engine, db = create_session(new_session)
+    service = InventoryService(db)
+    first = service.get_inventory_summary()
+    assert not service.reserve_stock(2, 500)
+    assert not service.update_stock(999, 1, "adjustment")
+    assert service.get_inventory_summary() is first
+
+def test_separate_databases_do_not_share_summary(new_session):
+    _, first_db = create_session(new_session, quantities=(50, 5))
+    _, second_db = create_session(new_session, quantities=(1, 2, 3))
+    assert InventoryService(first_db).get_inventory_summary()["total_products"] == 2
+    assert InventoryService(second_db).get_inventory_summary()["total_products"] == 3
+
+if __name__ == "__main__":
+    if pytest.main([__file__, "-q"]) != 0:
+        sys.exit(1)
+    print("✅ Inventory summary cache is invalidated on every stock change")
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Test that the KPI rollup tables track their source rows and back the analytics endpoints
+"""
+import sys
+import os
+import uuid
+import threading
+from datetime import datetime, timedelta
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import pytest
+from sqlalchemy import create_engine, func, insert, text
+from sqlalchemy.orm import sessionmaker
+from backend.app.database import assert_max_queries
+from backend.app.models.database_models import (
+    Base, Product, Inventory, StockMovement, InboundShipment, OutboundOrder, ChatMessage,
+    MovementDailyRollup
+)
+from backend.app.routers.dashboard import get_performance_metrics, get_top_products
+from backend.app.services.inventory_service import InventoryService
+from backend.app.services.kpi_rollup_service import KpiRollupService
+
+def create_session(new_session):
+    engine, db = new_session()
+    for i in range(5):
+        product = Product(sku=f"KR{i:03d}", name=f"Rollup Item {i}")
+        db.add(product)
+        db.flush()
+        db.add(Inventory(product_id=product.id, quantity=100, reserved_quantity=0, available_quantity=100))
+    db.commit()
+    return engine, db
+
+def seed_activity(db):
+    now = datetime.utcnow()
+    service = InventoryService(db)
+    service.update_stock(1, 10, "inbound", reason="restock")
+    service.update_stock(2, -3, "outbound", reason="sale")
+    service.bulk_update_stock([
+        {"product_id": 3, "quantity_change": 4, "movement_type": "inbound"},
+        {"product_id": 3, "quantity_change": -2, "movement_type": "outbound"},
+        {"product_id": 4, "quantity_change": -1, "movement_type": "adjustment"},
+    ])
+    # An old movement outside the 30-day window
+    db.add(StockMovement(product_id=5, movement_type="outbound", quantity=-7, created_at=now - timedelta(days=60)))
+    
+    for i, status in enumerate(["pending", "completed", "completed"]):
+        db.add(InboundShipment(shipment_number=f"IN-{i}", vendor_id=1, status=status))
+    for i, status in enumerate(["pending", "picking", "delivered", "dispatched"]):
+        db.add(OutboundOrder(order_number=f"OUT-{i}", customer_id=1, status=status))
+    db.add(OutboundOrder(order_number="OUT-OLD", customer_id=1, status="delivered", created_at=now - timedelta(days=45)))
+    for intent in ["inventory_check", "inventory_check", None]:
+        db.add(ChatMessage(session_id=1, user_id=1, user_message="hi", bot_response="hello", intent=intent))
+    db.commit()
+
+def raw_performance_metrics(db, days):
+    start_date = datetime.utcnow() - timedelta(days=days)
+    def count(model, *conditions):
+        return db.query(func.count(model.id)).filter(model.created_at >= start_date, *conditions).scalar()
+    return {
+        "inbound": (count(InboundShipment), count(InboundShipment, InboundShipment.status == "completed")),
+        "outbound": (count(OutboundOrder), count(OutboundOrder, OutboundOrder.status.in_(["dispatched", "delivered"]))),
+        "movements": (count(StockMovement, StockMovement.movement_type == "inbound"),
+                      count(StockMovement, StockMovement.movement_type == "outbound"))
+    }
+
+def test_performance_metrics_match_raw_aggregates(new_session):
+    engine, db = create_session(new_session)
+    seed_activity(db)
+    
+    with assert_max_queries(3, bind=engine):
+        metrics = get_performance_metrics(days=30, db=db)
+    raw = raw_performance_metrics(db, 30)
+    assert (metrics["inbound"]["total_shipments"], metrics["inbound"]["completed_shipments"]) == raw["inbound"] == (3, 2)
+    assert (metrics["outbound"]["total_orders"], metrics["outbound"]["dispatched_orders"]) == raw["outbound"] == (4, 2)
+    assert (metrics["movements"]["inbound_movements"], metrics["movements"]["outbound_movements"]) == raw["movements"] == (2, 2)
+
+def test_rollups_follow_updates_deletes_and_rollbacks(new_session):
+    engine, db = create_session(new_session)
+    seed_activity(db)
+    rollups = KpiRollupService(db)
+    
+    # A status change moves the order between buckets
+    order = db.query(OutboundOrder).filter(OutboundOrder.order_number == "OUT-0").one()
+    order.status = "packed"
+    db.commit()
+    assert rollups.order_counts_by_status("outbound") == {"picking": 1, "packed": 1, "dispatched": 1, "delivered": 2}
+    
+    db.delete(db.query(InboundShipment).filter(InboundShipment.status == "pending").one())
+    db.commit()
+    assert rollups.order_counts_by_status("inbound") == {"completed": 2}
+    
+    db.add(ChatMessage(session_id=1, user_id=1, user_message="x", bot_response="y", intent="outbound"))
+    db.flush()
+    db.rollback()
+    assert rollups.chat_message_count() == 3
+    assert rollups.movement_count_since(datetime.utcnow() - timedelta(days=30)) == 5
+    
+    top = get_top_products(limit=5, metric="movement", db=db)["products"]
+    assert (top[0]["sku"], top[0]["movement_count"], top[0]["total_quantity"]) == ("KR002", 2, 6)
+    assert sum(p["movement_count"] for p in top) == 6
+    assert KpiRollupService(db).reconcile() == []
+
+def test_reconcile_rebuilds_after_bypassing_writes(new_session):
+    engine, db = create_session(new_session)
+    seed_activity(db)
+    
+    # Core inserts skip the ORM events, leaving the movement rollups stale
+    db.execute(insert(StockMovement.__table__), [
+        {"product_id": 1, "movement_type": "inbound", "quantity": 5, "created_at": datetime.utcnow()}
+    ])
+    db.commit()
+    rollups = KpiRollupService(db)
+    assert rollups.movement_totals_by_type()["inbound"]["count"] == 2
+    
+    assert rollups.reconcile() == ["kpi_movement_daily", "kpi_movement_hourly"]
+    assert rollups.movement_totals_by_type()["inbound"] == {"count": 3, "quantity": 19}
+    assert rollups.order_counts_by_status("outbound")["delivered"] == 2
+    assert db.query(func.sum(MovementDailyRollup.movement_count)).scalar() == db.query(StockMovement).count()
+
+def test_concurrent_postgres_reconciles_do_not_double_count():
+    url = os.getenv("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL not set")
+
+    schema = f"rollup_test_{uuid.uuid4().hex[:8]}"
+    admin = create_engine(url)
+    with admin.begin() as connection:
+        connection.execute(text(f"CREATE SCHEMA {schema}"))
+    engine = create_engine(url, connect_args={"options": f"-csearch_path={schema}"})
+    try:
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            connection.execute(insert(Product.__table__), [{"sku": "KRPG", "name": "Rollup Item"}])
+            # Core inserts skip the ORM events, so every worker finds the rollups stale at startup
+            connection.execute(insert(StockMovement.__table__), [
+                {"product_id": 1, "movement_type": "inbound", "quantity": 1, "created_at": datetime.utcnow()}
+                for _ in range(2000)
+            ])
+        Session = sessionmaker(bind=engine)
+        barrier = threading.Barrier(4)
+
+        def worker_startup():
+            db = Session()
+            try:
+                barrier.wait()
+                KpiRollupService(db).reconcile()
+            finally:
+                db.close()
+
+        threads = [threading.Thread(target=worker_startup) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        db = Session()
+        assert db.query(func.sum(MovementDailyRollup.movement_count)).scalar() == 2000
+        db.close()
+    finally:
+        engine.dispose()
+        with admin.begin() as connection:
+            connection.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+        admin.dispose()
+
+if __name__ == "__main__":
+    if pytest.main([__file__, "-q"]) != 0:
+        sys.exit(1)
+    print("✅ KPI rollups match their source tables")
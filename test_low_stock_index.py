@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test that the incrementally maintained low stock index always agrees with a
+full catalog scan and only re-reads the products that changed
+"""
+import sys
+import os
+import random
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import pytest
+from backend.app.database import assert_max_queries
+from backend.app.models.database_models import Product, Inventory
+from backend.app.services.chatbot_service import ChatbotService
+from backend.app.services.enhanced_nlp_processor import EnhancedNLPProcessor
+from backend.app.services.inventory_service import InventoryService
+from backend.app.services.inventory_summary_cache import InventorySummaryCache, LocalVersionStore
+from backend.app.services.low_stock_index import LowStockIndex, get_low_stock_index
+from backend.app.services.product_name_index import ProductNameIndex
+
+def create_session(new_session, product_count=40, seed=7):
+    rng = random.Random(seed)
+    engine, db = new_session()
+    for i in range(product_count):
+        product = Product(sku=f"LS{i:04d}", name=f"Low Stock Item {i}", reorder_level=rng.randint(5, 20))
+        db.add(product)
+        db.flush()
+        quantity = rng.randint(0, 40)
+        db.add(Inventory(product_id=product.id, quantity=quantity,
+                         reserved_quantity=0, available_quantity=quantity))
+    db.commit()
+    return engine, db
+
+def reference_low_stock(db):
+    """Full scan, as every caller used to do"""
+    rows = db.query(Product, Inventory).join(Inventory, Product.id == Inventory.product_id).filter(
+        Inventory.available_quantity <= Product.reorder_level
+    ).all()
+    return sorted((inventory.available_quantity / product.reorder_level, product.id,
+                   inventory.available_quantity, product.reorder_level)
+                  for product, inventory in rows)
+
+def indexed_low_stock(db):
+    return [(item["shortfall_ratio"], item["product_id"], item["available_quantity"], item["reorder_level"])
+            for item in get_low_stock_index().get_low_stock_items(db)]
+
+def test_index_tracks_random_mutations(new_session):
+    engine, db = create_session(new_session)
+    service = InventoryService(db)
+    rng = random.Random(11)
+    assert indexed_low_stock(db) == reference_low_stock(db)
+
+    for step in range(200):
+        product_id = rng.randint(1, 40)
+        operation = rng.choice(["stock", "reserve", "release", "bulk", "reorder"])
+        if operation == "stock":
+            service.update_stock(product_id, rng.randint(-10, 10), "adjustment")
+        elif operation == "reserve":
+            service.reserve_stock(product_id, rng.randint(1, 10))
+        elif operation == "release":
+            service.release_stock(product_id, rng.randint(1, 10))
+        elif operation == "bulk":
+            service.bulk_update_stock([
+                {"product_id": rng.randint(1, 40), "quantity_change": rng.randint(-10, 10),
+                 "movement_type": "adjustment"} for _ in range(5)
+            ])
+        else:
+            db.query(Product).filter(Product.id == product_id).first().reorder_level = rng.randint(1, 30)
+            db.commit()
+        if step % 10 == 0:
+            assert indexed_low_stock(db) == reference_low_stock(db), step
+
+    assert indexed_low_stock(db) == reference_low_stock(db)
+
+def test_reads_only_touch_changed_products(new_session):
+    engine, db = create_session(new_session, product_count=2000)
+    service = InventoryService(db)
+    get_low_stock_index().get_low_stock_items(db)
+
+    with assert_max_queries(0, bind=engine):
+        get_low_stock_index().get_low_stock_items(db)
+
+    service.update_stock(1, -1000, "adjustment")
+    with assert_max_queries(1, bind=engine) as counter:
+        items = get_low_stock_index().get_low_stock_items(db)
+    assert "IN" in counter.statements[0]
+    assert items[0]["product_id"] == 1
+
+def test_summary_and_chatbot_alerts_read_index(new_session):
+    engine, db = create_session(new_session)
+    service = InventoryService(db)
+    summary = service.get_inventory_summary()
+    expected = [item["product_id"] for item in get_low_stock_index().get_low_stock_items(db)]
+    assert [item["product_id"] for item in summary["low_stock_alerts"]] == expected
+    assert summary["low_stock_count"] == len(reference_low_stock(db))
+
+    chatbot = ChatbotService(db, nlp_processor=EnhancedNLPProcessor(), forecasting_service=object(),
+                             space_service=object(), product_index=ProductNameIndex())
+    response = chatbot._handle_layman_alerts("any alerts?", {}, {}, "casual")
+    assert response["action_taken"] == "alerts_checked"
+    out_of_stock = db.query(Inventory).filter(Inventory.quantity <= 0).count()
+    assert response["data"]["out_of_stock"] == out_of_stock
+    assert response["data"]["low_stock"] == len(expected)
+
+def test_commits_in_other_workers_reload_index(new_session):
+    engine, db = create_session(new_session)
+    # Two workers sharing one version store, as with INVENTORY_CACHE_BACKEND=redis
+    shared_versions = LocalVersionStore()
+    cache_a = InventorySummaryCache(shared_versions)
+    cache_b = InventorySummaryCache(shared_versions)
+    index_a = LowStockIndex(summary_cache=cache_a)
+    index_b = LowStockIndex(summary_cache=cache_b)
+    index_a.get_low_stock_items(db)
+    index_b.get_low_stock_items(db)
+
+    # Worker A commits: it bumps the shared version and marks only its own index
+    InventoryService(db).update_stock(1, -1000, "adjustment")
+    cache_a.invalidate()
+    index_a.mark_dirty([1])
+
+    with assert_max_queries(1, bind=engine) as counter:
+        items = index_a.get_low_stock_items(db)
+    assert " IN (" in counter.statements[0]
+    with assert_max_queries(1, bind=engine) as counter:
+        assert index_b.get_low_stock_items(db) == items
+    # A full reload, not a refresh of the ids worker B never heard about
+    assert " IN (" not in counter.statements[0] and "<=" in counter.statements[0]
+    assert items[0]["product_id"] == 1
+
+    with assert_max_queries(0, bind=engine):
+        index_b.get_low_stock_items(db)
+
+if __name__ == "__main__":
+    if pytest.main([__file__, "-q"]) != 0:
+        sys.exit(1)
+    print("✅ Low stock index agrees with a full scan")
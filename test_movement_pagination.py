@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test keyset pagination and streaming export of the stock movement history
+"""
+import sys
+import os
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from backend.app.database import get_db
+from backend.app.models.database_models import Product, StockMovement
+from backend.app.routers import inventory
+from backend.app.services.inventory_service import InventoryService
+
+BASE_TIME = datetime(2024, 1, 1, 12, 0, 0)
+
+def create_session(new_session):
+    engine, db = new_session()
+    for i in range(3):
+        db.add(Product(sku=f"PG{i:03d}", name=f"Paged Item {i}"))
+    db.flush()
+    for i in range(95):
+        # Groups of five movements share a timestamp, so pages split inside ties
+        db.add(StockMovement(
+            product_id=i % 3 + 1,
+            movement_type="inbound" if i % 2 else "outbound",
+            reference_type="inbound_shipment" if i % 2 else "outbound_order",
+            quantity=i,
+            created_at=BASE_TIME + timedelta(minutes=i // 5)
+        ))
+    db.commit()
+    return engine, db
+
+def collect_pages(service, limit, **filters):
+    rows, cursor = [], None
+    while True:
+        page = service.get_stock_movements_page(limit=limit, cursor=cursor, **filters)
+        rows.extend(page["movements"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            return rows
+
+def test_pages_cover_history_exactly_once(new_session):
+    engine, db = create_session(new_session)
+    service = InventoryService(db)
+    expected = [m["id"] for m in service.get_stock_movements(limit=1000)]
+    assert len(expected) == 95
+
+    for limit in (1, 7, 10, 94, 95, 200):
+        assert [m["id"] for m in collect_pages(service, limit)] == expected
+
+def test_pages_apply_filters(new_session):
+    engine, db = create_session(new_session)
+    service = InventoryService(db)
+    start_date = BASE_TIME + timedelta(minutes=3)
+    end_date = BASE_TIME + timedelta(minutes=15)
+    rows = collect_pages(service, 4, product_id=2, movement_type="inbound",
+                         start_date=start_date, end_date=end_date)
+
+    expected = db.query(StockMovement).filter(
+        StockMovement.product_id == 2,
+        StockMovement.movement_type == "inbound",
+        StockMovement.created_at >= start_date,
+        StockMovement.created_at < end_date
+    ).order_by(StockMovement.created_at.desc(), StockMovement.id.desc()).all()
+    assert [m["id"] for m in rows] == [m.id for m in expected]
+    assert all(m["product_sku"] == "PG001" for m in rows)
+
+def test_invalid_cursor_rejected(new_session):
+    engine, db = create_session(new_session)
+    try:
+        InventoryService(db).get_stock_movements_page(cursor="not-a-cursor")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("invalid cursor was accepted")
+
+def test_keyset_query_uses_composite_index(new_session):
+    engine, db = create_session(new_session)
+    with engine.connect() as connection:
+        plan = connection.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM stock_movements WHERE product_id = 1 "
+            "ORDER BY created_at DESC, id DESC LIMIT 10"
+        )).all()
+    details = " ".join(row[-1] for row in plan)
+    assert "ix_stock_movements_product_created_at_id" in details
+    assert "TEMP B-TREE" not in details
+
+def test_movements_api_and_export(new_session):
+    engine, db = create_session(new_session)
+    app = FastAPI()
+    app.include_router(inventory.router, prefix="/api/inventory")
+    app.dependency_overrides[get_db] = lambda: db
+    client = TestClient(app)
+
+    first = client.get("/api/inventory/movements", params={"limit": 50})
+    assert first.status_code == 200 and len(first.json()) == 50
+    second = client.get("/api/inventory/movements",
+                        params={"limit": 50, "cursor": first.headers["x-next-cursor"]})
+    assert len(second.json()) == 45 and "x-next-cursor" not in second.headers
+    assert client.get("/api/inventory/movements", params={"cursor": "bogus"}).status_code == 400
+
+    ndjson = client.get("/api/inventory/movements/export", params={"movement_type": "outbound"})
+    lines = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert ndjson.headers["content-type"].startswith("application/x-ndjson")
+    assert len(lines) == 48 and all(line["movement_type"] == "outbound" for line in lines)
+
+    exported = client.get("/api/inventory/movements/export", params={"format": "csv"})
+    rows = list(csv.DictReader(io.StringIO(exported.text)))
+    assert len(rows) == 95 and rows[0]["product_name"].startswith("Paged Item")
+
+if __name__ == "__main__":
+    if pytest.main([__file__, "-q"]) != 0:
+        sys.exit(1)
+    print("✅ Stock movement history pages and exports correctly")
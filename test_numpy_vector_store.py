@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Test the NumPy vector index backend for the RAG services
+"""
+import sys
+import os
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import numpy as np
+from backend.app.services.numpy_vector_store import NumpyVectorStore
+from backend.app.services.embedding_pipeline import EmbeddingPipeline
+from backend.app.services.rag_indexer import prune_documents
+from backend.app.services.rag_runtime import RAGRuntime, ENHANCED_COLLECTION
+
+DIMENSIONS = 32
+
+class RandomEmbeddings:
+    """Fixed random vector per text"""
+
+    def __init__(self):
+        self.vectors = {}
+        self.rng = np.random.default_rng(11)
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        if text not in self.vectors:
+            self.vectors[text] = self.rng.standard_normal(DIMENSIONS).tolist()
+        return self.vectors[text]
+
+def corpus(count):
+    texts = [f"product {i}" for i in range(count)]
+    metadatas = [{"type": "product_detailed" if i % 4 else "procedure", "category": f"cat{i % 3}", "sku": f"S{i}"}
+                 for i in range(count)]
+    return [f"product:{i}" for i in range(count)], texts, metadatas
+
+def exact_top_k(embeddings, texts, query, k, keep=None):
+    matrix = np.array(embeddings.embed_documents(texts), dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    query = np.asarray(query, dtype=np.float32) / np.linalg.norm(query)
+    scores = matrix @ query
+    order = [i for i in np.argsort(-scores) if keep is None or keep(i)]
+    return [f"product:{i}" for i in order[:k]]
+
+def test_top_k_matches_exact_search_with_filters():
+    embeddings = RandomEmbeddings()
+    store = NumpyVectorStore(None, embeddings)
+    ids, texts, metadatas = corpus(500)
+    store.add_texts(texts, metadatas, ids=ids)
+    query = embeddings.embed_query("where are the drills?")
+
+    results = store.search(query, k=10)
+    assert [doc_id for doc_id, *_ in results] == exact_top_k(embeddings, texts, query, 10)
+    scores = [score for *_, score in results]
+    assert scores == sorted(scores, reverse=True) and -1.0 <= scores[-1] <= scores[0] <= 1.0
+    assert results[0][1] == texts[int(results[0][0].split(":")[1])]
+
+    filtered = store.search(query, k=10, where={"type": "product_detailed", "category": {"$in": ["cat1", "cat2"]}})
+    assert [doc_id for doc_id, *_ in filtered] == exact_top_k(
+        embeddings, texts, query, 10, keep=lambda i: i % 4 and i % 3 in (1, 2))
+    assert store.search(query, k=5, where={"category": "unknown"}) == []
+    assert len(store.search(query, k=1000, where={"type": "procedure"})) == 125
+
+def test_upserts_replace_and_deletes_remove_documents():
+    embeddings = RandomEmbeddings()
+    store = NumpyVectorStore(None, embeddings)
+    ids, texts, metadatas = corpus(20)
+    store.add_texts(texts, metadatas, ids=ids)
+    store.add_texts(["restocked drill"], [{"type": "product_detailed", "category": "tools"}], ids=["product:3"])
+    assert store.count() == 20
+    top = store.search(embeddings.embed_query("restocked drill"), k=1)[0]
+    assert top[0] == "product:3" and top[2]["category"] == "tools" and abs(top[3] - 1.0) < 1e-5
+
+    store.delete(ids=["product:3", "product:7", "missing"])
+    assert store.count() == 18
+    assert "product:3" not in store.get(include=[])["ids"]
+    assert store.get(where={"category": "tools"}, include=[])["ids"] == []
+    # Procedures are rows 0, 4, 8, 12 and 16
+    assert prune_documents(store, ["product:4"], ["procedure"]) == 4
+    assert store.get(where={"type": "procedure"}, include=[])["ids"] == ["product:4"]
+    assert store.count() == 14
+
+def test_persisted_index_reloads_memory_mapped():
+    embeddings = RandomEmbeddings()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index")
+        store = NumpyVectorStore(path, embeddings)
+        ids, texts, metadatas = corpus(300)
+        EmbeddingPipeline(batch_size=32, max_workers=2, write_batch_size=100).run(store, zip(ids, texts, metadatas))
+        store.persist()
+        query = embeddings.embed_query("cordless")
+        expected = store.search(query, k=8, where={"type": "product_detailed"})
+
+        reloaded = NumpyVectorStore(path, embeddings)
+        assert isinstance(reloaded._vectors, np.memmap) and reloaded.count() == 300
+        assert reloaded.search(query, k=8, where={"type": "product_detailed"}) == expected
+
+        # A write copies the matrix into memory; persisting replaces the version on disk
+        reloaded.delete(ids=[expected[0][0]])
+        reloaded.persist()
+        assert sorted(os.listdir(path)) == sorted([reloaded._version, "index.json", "index.lock"])
+        assert NumpyVectorStore(path, embeddings).search(query, k=7, where={"type": "product_detailed"}) == expected[1:]
+        # The first store memory-mapped a deleted version and can still read it
+        assert reloaded.search(query, k=7, where={"type": "product_detailed"}) == expected[1:]
+
+def test_workers_sharing_a_path_persist_separate_versions():
+    embeddings = RandomEmbeddings()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index")
+        ids, texts, metadatas = corpus(50)
+        first, second = NumpyVectorStore(path, embeddings), NumpyVectorStore(path, embeddings)
+        first.add_texts(texts, metadatas, ids=ids)
+        second.add_texts(texts[:10], metadatas[:10], ids=ids[:10])
+        first.persist()
+        old = NumpyVectorStore(path, embeddings)
+        second.persist()
+        assert first._version != second._version
+        assert sorted(os.listdir(path)) == sorted([second._version, "index.json", "index.lock"])
+        assert NumpyVectorStore(path, embeddings).count() == 10
+        assert old.get(ids=["product:42"])["ids"] == ["product:42"]
+
+        # Another writer's new version is kept until it swaps index.json
+        os.makedirs(os.path.join(path, "in-progress"))
+        first.add_texts(["new"], [{"type": "procedure"}], ids=["extra"])
+        first.persist()
+        assert sorted(os.listdir(path)) == sorted([first._version, "in-progress", "index.json", "index.lock"])
+        assert NumpyVectorStore(path, embeddings).count() == 51
+
+def test_int8_quantization_keeps_recall():
+    embeddings = RandomEmbeddings()
+    exact = NumpyVectorStore(None, embeddings)
+    quantized = NumpyVectorStore(None, embeddings, dtype="int8")
+    ids, texts, metadatas = corpus(2000)
+    vectors = embeddings.embed_documents(texts)
+    exact.upsert(ids, vectors, metadatas, texts)
+    quantized.upsert(ids, vectors, metadatas, texts)
+    assert quantized._vectors.dtype == np.int8
+
+    hits = 0
+    for q in range(20):
+        query = embeddings.embed_query(f"query {q}")
+        truth = {doc_id for doc_id, *_ in exact.search(query, k=10)}
+        hits += len(truth & {doc_id for doc_id, *_ in quantized.search(query, k=10)})
+    assert hits / 200 >= 0.95
+
+def test_runtime_opens_numpy_collections():
+    with tempfile.TemporaryDirectory() as tmp:
+        runtime = RAGRuntime(vector_db_path=tmp, embeddings_factory=lambda model_name: RandomEmbeddings(),
+                             vector_backend="numpy")
+        store = runtime.vector_store(ENHANCED_COLLECTION)
+        assert isinstance(store, NumpyVectorStore)
+        assert store.path == os.path.join(tmp, "numpy", ENHANCED_COLLECTION)
+
+if __name__ == "__main__":
+    test_top_k_matches_exact_search_with_filters()
+    test_upserts_replace_and_deletes_remove_documents()
+    test_persisted_index_reloads_memory_mapped()
+    test_workers_sharing_a_path_persist_separate_versions()
+    test_int8_quantization_keeps_recall()
+    test_runtime_opens_numpy_collections()
+    print("✅ NumPy vector store tests passed")
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test chunked, resumable forecast runs on the process pool
+"""
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import pytest
+import numpy as np
+from sqlalchemy import insert
+from backend.app.models.database_models import Product, SalesHistory, DemandForecast, ForecastRun
+from backend.app.services.batch_forecasting_service import (
+    BatchForecastingService, WeeklyDemand, week_start, week_numbers
+)
+from backend.app.services.parallel_forecasting_service import ParallelForecastingService, tune_seasonal_forecasts
+
+PRODUCTS = 7
+WEEKS = 3
+
+def create_session(new_session):
+    engine, db = new_session()
+    for i in range(PRODUCTS):
+        db.add(Product(sku=f"PF{i:03d}", name=f"Parallel Forecast Item {i}", reorder_level=10))
+    db.commit()
+
+    # 30 complete weeks of sales for all but the last product, every third one seasonal
+    first_week = int(week_numbers([datetime.utcnow()])[0]) - 30
+    sales = [
+        {
+            "product_id": product_id,
+            "quantity_sold": (10, 20, 30, 40)[week % 4] if product_id % 3 == 0 else product_id,
+            "sale_date": week_start(first_week + week) + timedelta(days=2)
+        }
+        for product_id in range(1, PRODUCTS) for week in range(30)
+    ]
+    db.execute(insert(SalesHistory.__table__), sales)
+    db.commit()
+    return db
+
+def test_tuning_picks_each_products_season():
+    rows = np.array([[8.0] * 30, [10, 20, 30, 40] * 7 + [10, 20]], dtype=float)
+    demand = WeeklyDemand(np.array([1, 2]), 0, rows, np.zeros(2, dtype=np.int64))
+    result = tune_seasonal_forecasts(demand, 4)
+
+    assert result["method"][0] != "holt_winters" and result["season_length"][0] == 0
+    assert result["method"][1] == "holt_winters" and result["season_length"][1] == 4
+    assert np.allclose(result["forecast"][1], [30, 40, 10, 20], atol=1)
+    assert np.allclose(result["forecast"][0], 8)
+
+def test_run_commits_every_chunk(new_session):
+    db = create_session(new_session)
+    service = ParallelForecastingService(chunk_size=2, max_workers=2, history_weeks=52)
+    reports = []
+    result = service.run(db, WEEKS, progress=reports.append)
+
+    assert result["success"] and result["run"]["status"] == "completed"
+    assert [report["completed_products"] for report in reports][-1] == PRODUCTS
+    assert len(reports) == 4
+    assert db.query(DemandForecast).count() == PRODUCTS * WEEKS
+    assert db.query(DemandForecast).filter(DemandForecast.model_version == "simple_heuristic").count() == WEEKS
+    assert db.query(DemandForecast).filter(DemandForecast.model_version == "tuned_holt_winters_4").count() == 2 * WEEKS
+
+    status = service.get_run_status(db, result["run"]["id"])
+    assert status["run"]["chunks"] == {"completed": 4} and status["run"]["progress"] == 100.0
+
+def test_interrupted_run_resumes_without_duplicates(new_session):
+    db = create_session(new_session)
+    service = ParallelForecastingService(chunk_size=2, max_workers=1, history_weeks=52)
+
+    def crash(report):
+        raise RuntimeError("worker host lost")
+
+    interrupted = service.run(db, WEEKS, progress=crash)
+    assert not interrupted["success"] and interrupted["run"]["status"] == "failed"
+    assert interrupted["run"]["completed_products"] == 2
+    assert db.query(DemandForecast).count() == 2 * WEEKS
+
+    resumed = service.run(db, WEEKS)
+    assert resumed["success"] and resumed["run"]["id"] == interrupted["run"]["id"]
+    assert resumed["run"]["completed_products"] == PRODUCTS
+    assert db.query(DemandForecast).count() == PRODUCTS * WEEKS
+    assert db.query(ForecastRun).count() == 1
+
+def test_live_run_is_not_started_twice(new_session):
+    db = create_session(new_session)
+    service = ParallelForecastingService(chunk_size=2, max_workers=1)
+    first = service.start_run(db, WEEKS)
+    second = service.start_run(db, WEEKS)
+    assert first["success"] and not first["resumed"]
+    assert not second["success"] and second["run"]["id"] == first["run"]["id"]
+
+def test_progress_counts_only_planned_products(new_session):
+    db = create_session(new_session)
+    db.query(SalesHistory).filter(SalesHistory.product_id == 4).delete()
+    db.delete(db.get(Product, 4))
+    db.commit()
+    service = ParallelForecastingService(chunk_size=PRODUCTS, max_workers=1)
+    started = service.start_run(db, WEEKS)
+    assert started["run"]["total_products"] == PRODUCTS - 1
+
+    # Created inside the chunk's id range and deleted from it after planning
+    db.add(Product(id=4, sku="PF-LATE", name="Created After Planning", reorder_level=10))
+    db.delete(db.get(Product, 2))
+    db.commit()
+    result = service.execute_run(db, started["run"]["id"])
+    assert result["success"] and result["run"]["progress"] == 100.0
+    assert result["run"]["completed_products"] == result["run"]["total_products"] == PRODUCTS - 1
+    assert db.query(DemandForecast).filter(DemandForecast.product_id == 4).count() == 0
+    assert db.query(DemandForecast).count() == (PRODUCTS - 2) * WEEKS
+
+@pytest.fixture
+def host_ahead_of_utc(monkeypatch):
+    """Local clock 14 hours ahead of UTC for the test"""
+    if not hasattr(time, "tzset"):
+        pytest.skip("time.tzset is not available")
+    monkeypatch.setenv("TZ", "Etc/GMT-14")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+@pytest.mark.parametrize("regenerate", [
+    lambda db: ParallelForecastingService(chunk_size=PRODUCTS, max_workers=1).run(db, WEEKS),
+    lambda db: BatchForecastingService().generate_all_forecasts(db, weeks=WEEKS),
+], ids=["parallel", "batch"])
+def test_forecasts_due_later_today_utc_are_replaced(new_session, host_ahead_of_utc, regenerate):
+    db = create_session(new_session)
+    # An earlier forecast still due in UTC, though already past on the local clock
+    db.add(DemandForecast(product_id=1, forecast_date=datetime.utcnow() + timedelta(hours=1), predicted_demand=99,
+                          confidence_level=0.5, forecast_type="weekly", model_version="earlier"))
+    db.commit()
+
+    assert regenerate(db)["success"]
+    assert db.query(DemandForecast).filter(DemandForecast.model_version == "earlier").count() == 0
+    assert db.query(DemandForecast).count() == PRODUCTS * WEEKS
+
+if __name__ == "__main__":
+    if pytest.main([__file__, "-q"]) != 0:
+        sys.exit(1)
+    print("✅ Parallel forecast run tests passed")
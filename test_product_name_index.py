@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Test the in-memory product name index against the original linear product lookup
+"""
+import sys
+import os
+import io
+import time
+import difflib
+import contextlib
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import pytest
+from sqlalchemy import delete, insert, update
+from backend.app.models.database_models import Product
+from backend.app.services.chatbot_service import ChatbotService
+from backend.app.services.enhanced_nlp_processor import EnhancedNLPProcessor
+from backend.app.services.product_name_index import ProductNameIndex
+
+CATALOG = [
+    "Gaming Laptop", "Wireless Mouse", "Optical Mouse", "Mechanical Keyboard",
+    "Monitor 24-inch", "Wireless Headphones", "Smartphone", "Cotton T-Shirt",
+    "Denim Jeans", "Running Sneakers", "USB-C Charging Cable", "Laptop Stand Aluminum",
+    "Desk Lamp LED", "Notebook A4 Ruled", "Power Bank 10000mAh", "Office Chair Ergonomic",
+    "Tablet", "Mouse",
+]
+
+QUERIES = [
+    "Gaming Laptop", "gaming laptops", "Laptops", "Laptop", "phones", "Phone", "mouse",
+    "headphones", "shirt", "pants", "shoes", "wireless", "The Wireless Mouse Pad",
+    "mechanical keybord", "Desk Lamp", "lamp led desk", "monitr 24 inch", "tablets",
+    "power bank", "ergonomic chair", "xyz", "a", "Cable", "Sneaker", "Jeans Denim",
+]
+
+def create_session(new_session, names):
+    engine, db = new_session()
+    for i, name in enumerate(names):
+        db.add(Product(sku=f"SKU{i:05d}", name=name))
+    db.commit()
+    return db
+
+def reference_find(service, product_name):
+    """The original cascade: full catalog scan for every tier"""
+    products = service.db.query(Product).order_by(Product.id).all()
+    clean = service._clean_product_name(product_name)
+    synonyms = {
+        'laptop': ['gaming laptop', 'computer', 'notebook'],
+        'phone': ['smartphone', 'mobile', 'cell phone'],
+        'phones': ['smartphone', 'mobile', 'cell phone'],
+        'mouse': ['wireless mouse', 'optical mouse'],
+        'headphones': ['wireless headphones', 'headset'],
+        'shirt': ['t-shirt', 'cotton t-shirt'],
+        'pants': ['jeans', 'denim jeans'],
+        'shoes': ['sneakers', 'running sneakers'],
+    }
+    for product in products:
+        if product.name.lower() == clean.lower():
+            return product
+    singular = service._get_singular_form(clean)
+    if singular != clean:
+        for product in products:
+            if product.name.lower() == singular.lower():
+                return product
+    terms = [clean.lower()] + synonyms.get(clean.lower(), [])
+    for term in terms:
+        for product in products:
+            if term in product.name.lower():
+                return product
+    for product in products:
+        if clean.lower() in product.name.lower() or product.name.lower() in clean.lower():
+            return product
+    words = set(clean.lower().split())
+    best_match, best_score = None, 0
+    for product in products:
+        common = words.intersection(set(product.name.lower().split()))
+        if common:
+            score = len(common) / max(len(words), len(set(product.name.lower().split())))
+            if score > best_score and score >= 0.5:
+                best_match, best_score = product, score
+    if best_match:
+        return best_match
+    matches = difflib.get_close_matches(clean, [p.name for p in products], n=1, cutoff=0.6)
+    if matches:
+        for product in products:
+            if product.name == matches[0]:
+                return product
+    return None
+
+def make_service(db):
+    return ChatbotService(db, nlp_processor=EnhancedNLPProcessor(), forecasting_service=object(),
+                          space_service=object(), product_index=ProductNameIndex())
+
+def test_index_matches_linear_cascade(new_session):
+    db = create_session(new_session, CATALOG)
+    service = make_service(db)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for query in QUERIES:
+            expected = reference_find(service, query)
+            actual = service._find_product_by_name(query)
+            assert (actual.id if actual else None) == (expected.id if expected else None), query
+
+def test_index_refreshes_after_product_changes(new_session):
+    db = create_session(new_session, CATALOG)
+    service = make_service(db)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert service._find_product_by_name("Label Printer") is None
+        db.add(Product(sku="NEW001", name="Label Printer"))
+        db.commit()
+        assert service._find_product_by_name("Label Printer").sku == "NEW001"
+
+        product = db.query(Product).filter(Product.sku == "NEW001").first()
+        product.name = "Thermal Label Printer"
+        db.commit()
+        assert service._find_product_by_name("Thermal Label Printer").sku == "NEW001"
+
+def test_index_sees_changes_made_by_other_workers(new_session):
+    engine, db = new_session()
+    for i, name in enumerate(CATALOG):
+        db.add(Product(sku=f"SKU{i:05d}", name=name))
+    db.commit()
+    index = ProductNameIndex(check_seconds=0)
+    assert index.find_exact(db, "Label Printer") is None
+
+    # Core statements fire no mapper events, like a commit in another process
+    db.execute(insert(Product), [{"sku": "OTHER1", "name": "Label Printer"}])
+    db.commit()
+    assert index.find_exact(db, "Label Printer") == len(CATALOG) + 1
+
+    db.execute(update(Product).where(Product.sku == "OTHER1").values(name="Barcode Scanner"))
+    db.commit()
+    assert index.find_exact(db, "Label Printer") is None
+    assert index.find_close_match(db, "Barcode Scaner") == len(CATALOG) + 1
+
+def test_product_deleted_by_another_worker_is_a_miss(new_session):
+    db = create_session(new_session, CATALOG)
+    service = ChatbotService(db, nlp_processor=EnhancedNLPProcessor(), forecasting_service=object(),
+                             space_service=object(), product_index=ProductNameIndex(check_seconds=3600))
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert service._find_product_by_name("mouse").name == "Mouse"
+        # Deleted elsewhere (no mapper events) while the index still lists it
+        db.execute(delete(Product).where(Product.name == "Mouse"))
+        db.commit()
+        assert service._find_product_by_name("mouse").name == "Wireless Mouse"
+        db.execute(delete(Product).where(Product.name == "Tablet"))
+        db.commit()
+        assert service._find_product_by_name("tablet") is None
+
+def test_close_match_agrees_with_full_difflib_on_similar_names(new_session):
+    # Trigrams ignore case and difflib does not, so the closest name can rank low by trigram count
+    names = [f"tools item {i}" for i in range(3000)] + [f"Tools Item {i}" for i in range(0, 3000, 7)]
+    db = create_session(new_session, names)
+    index = ProductNameIndex()
+    for query in ["Tools Item 4", "Tools Item 1234", "Tools itme 77", "tools item 700", "Tools Item",
+                  "tols item 2999", "TOOLS ITEM 14", "Tolls Itm 5", "zzzz"]:
+        matches = difflib.get_close_matches(query, names, n=1, cutoff=0.6)
+        expected = names.index(matches[0]) + 1 if matches else None
+        assert index.find_close_match(db, query, max_candidates=20) == expected, query
+
+if __name__ == "__main__":
+    from conftest import create_sqlite_session
+
+    if pytest.main([__file__, "-q"]) != 0:
+        sys.exit(1)
+    print("✅ Product name index agrees with the linear cascade")
+
+    # Lookup latency on a large synthetic catalog
+    adjectives = ["Wireless", "Gaming", "Compact", "Premium", "Ergonomic", "Portable", "Smart", "Heavy Duty"]
+    nouns = ["Mouse", "Keyboard", "Monitor", "Laptop", "Speaker", "Router", "Charger", "Cable", "Lamp", "Chair"]
+    names = [f"{adjectives[i % 8]} {nouns[(i // 8) % 10]} Model {i}" for i in range(50000)]
+    db = create_session(create_sqlite_session, names)
+    service = make_service(db)
+    queries = ["Gaming Mouse Model 4242", "wireless keybord", "Label Printer", "portable router model 17"]
+    with contextlib.redirect_stdout(io.StringIO()):
+        service._find_product_by_name("warm up")
+        start_time = time.perf_counter()
+        for query in queries:
+            reference_find(service, query)
+        linear_ms = (time.perf_counter() - start_time) * 1000 / len(queries)
+        start_time = time.perf_counter()
+        for query in queries:
+            service._find_product_by_name(query)
+        indexed_ms = (time.perf_counter() - start_time) * 1000 / len(queries)
+    print(f"50k products - linear cascade: {linear_ms:.1f} ms/lookup, index: {indexed_ms:.2f} ms/lookup")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Guard against N+1 query regressions in the stock movement and dashboard endpoints
+"""
+import sys
+import os
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import pytest
+from fastapi import Response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.app.database import assert_max_queries
+from backend.app.models.database_models import Base, Product, Inventory, StockMovement
+from backend.app.routers.dashboard import get_recent_activity, get_dashboard_overview, fetch_overview_metrics
+from backend.app.routers.inventory import get_stock_movements
+
+MOVEMENTS = 200
+
+def create_session(new_session):
+    engine, db = new_session()
+    for i in range(20):
+        product = Product(sku=f"QC{i:03d}", name=f"Query Count Item {i}")
+        db.add(product)
+        db.flush()
+        db.add(Inventory(product_id=product.id, quantity=100, reserved_quantity=0, available_quantity=100))
+    for i in range(MOVEMENTS):
+        db.add(StockMovement(product_id=i % 20 + 1, movement_type="adjustment", quantity=1, reason="seed"))
+    # A movement whose product no longer exists is still listed as "Unknown"
+    db.add(StockMovement(product_id=999, movement_type="adjustment", quantity=1))
+    db.commit()
+    return engine, db
+
+def test_stock_movements_use_one_query(new_session):
+    engine, db = create_session(new_session)
+    with assert_max_queries(1, bind=engine):
+        movements = get_stock_movements(Response(), limit=1000, db=db)
+    assert len(movements) == MOVEMENTS + 1
+    assert sum(1 for m in movements if m["product_sku"] == "Unknown") == 1
+    assert all(m["product_name"].startswith("Query Count Item") for m in movements if m["product_sku"] != "Unknown")
+
+def test_recent_activity_uses_one_query(new_session):
+    engine, db = create_session(new_session)
+    with assert_max_queries(1, bind=engine):
+        response = get_recent_activity(limit=1000, db=db)
+    assert len(response["activities"]) == MOVEMENTS
+    assert response["activities"][0]["description"].startswith("Adjustment: 1 pcs of Query Count Item")
+
+def test_dashboard_overview_uses_one_query(new_session):
+    engine, db = create_session(new_session)
+    with assert_max_queries(1, bind=engine):
+        overview = get_dashboard_overview(db=db)
+    assert overview["inventory"] == {"total_products": 20, "low_stock_items": 0, "total_value": 0}
+    assert overview["operations"]["recent_movements"] == MOVEMENTS + 1
+    assert overview["chatbot"] == {"total_messages": 0, "recent_messages": 0}
+
+def test_parallel_overview_matches_single_statement():
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'overview.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+        for i in range(6):
+            product = Product(sku=f"PO{i:03d}", name=f"Parallel Item {i}", unit_price=1.5, reorder_level=10)
+            db.add(product)
+            db.flush()
+            db.add(Inventory(product_id=product.id, quantity=i * 4, available_quantity=i * 4))
+            db.add(StockMovement(product_id=product.id, movement_type="inbound", quantity=i * 4))
+        db.commit()
+        try:
+            metrics = fetch_overview_metrics(db, parallel=False)
+            assert fetch_overview_metrics(db, parallel=True) == metrics
+            assert metrics["low_stock_count"] == 3
+            assert metrics["total_value"] == sum(i * 4 for i in range(6)) * 1.5
+        finally:
+            db.close()
+            engine.dispose()
+
+def test_guard_fails_on_excess_queries(new_session):
+    engine, db = create_session(new_session)
+    try:
+        with assert_max_queries(1, bind=engine):
+            db.query(Product).first()
+            db.query(Inventory).first()
+    except AssertionError as e:
+        assert "got 2" in str(e)
+    else:
+        raise AssertionError("query guard did not fire")
+
+if __name__ == "__main__":
+    if pytest.main([__file__, "-q"]) != 0:
+        sys.exit(1)
+    print("✅ Stock movement and dashboard endpoints stay within their query budget")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Query-plan regression test: every hot query shape must be served by its index.
+Runs on SQLite; also runs on PostgreSQL when TEST_POSTGRES_URL points at a scratch database.
+"""
+import sys
+import os
+import uuid
+from datetime import datetime
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import pytest
+from sqlalchemy import create_engine, func, select, text
+from backend.app.models.database_models import (
+    Base, Inventory, StockMovement, SalesHistory, DemandForecast,
+    OutboundOrder, InboundShipment, ChatMessage
+)
+
+SINCE = datetime(2024, 1, 1)
+
+# (hot query, index that must serve it)
+HOT_QUERIES = [
+    (select(Inventory).where(Inventory.product_id == 1), "ix_inventory_product_id"),
+    (select(StockMovement).where(StockMovement.product_id == 1).order_by(StockMovement.created_at.desc()),
+     "ix_stock_movements_product_created_at_id"),
+    (select(SalesHistory.sale_date, SalesHistory.quantity_sold).where(
+        SalesHistory.product_id == 1, SalesHistory.sale_date >= SINCE
+    ), "ix_sales_history_product_sale_date"),
+    (select(DemandForecast).where(DemandForecast.product_id == 1, DemandForecast.forecast_date >= SINCE),
+     "ix_demand_forecasts_product_forecast_date"),
+    (select(func.count(OutboundOrder.id)).where(
+        OutboundOrder.status.in_(["pending", "picking", "packed"]), OutboundOrder.created_at >= SINCE
+    ), "ix_outbound_orders_status_created_at"),
+    (select(func.count(InboundShipment.id)).where(
+        InboundShipment.status == "completed", InboundShipment.created_at >= SINCE
+    ), "ix_inbound_shipments_status_created_at"),
+    (select(ChatMessage).where(ChatMessage.session_id == 1).order_by(ChatMessage.created_at),
+     "ix_chat_messages_session_created_at"),
+]
+
+def explain(connection, statement, prefix):
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    return "\n".join(str(row[-1]) for row in connection.execute(text(f"{prefix} {sql}")))
+
+def assert_plans_use_indexes(connection, prefix):
+    failures = []
+    for statement, index_name in HOT_QUERIES:
+        plan = explain(connection, statement, prefix)
+        if index_name not in plan:
+            failures.append(f"expected {index_name}:\n{plan}")
+    assert not failures, "\n\n".join(failures)
+
+def test_sqlite_hot_queries_use_indexes():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as connection:
+        assert_plans_use_indexes(connection, "EXPLAIN QUERY PLAN")
+
+def test_postgres_hot_queries_use_indexes():
+    url = os.getenv("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL not set")
+    
+    schema = f"plan_test_{uuid.uuid4().hex[:8]}"
+    engine = create_engine(url)
+    with engine.connect() as connection:
+        connection.execute(text(f"CREATE SCHEMA {schema}"))
+        connection.execute(text(f"SET search_path TO {schema}"))
+        try:
+            Base.metadata.create_all(bind=connection)
+            # Empty tables are cheapest to scan; rule that out so the plan shows index choice
+            connection.execute(text("SET enable_seqscan = off"))
+            assert_plans_use_indexes(connection, "EXPLAIN")
+        finally:
+            connection.rollback()
+            connection.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+            connection.commit()
+
+if __name__ == "__main__":
+    test_sqlite_hot_queries_use_indexes()
+    if os.getenv("TEST_POSTGRES_URL"):
+        test_postgres_hot_queries_use_indexes()
+    print("✅ Hot queries are served by their indexes")
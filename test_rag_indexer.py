@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test incremental re-indexing of product documents on committed changes
+"""
+import sys
+import os
+import time
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import pytest
+from backend.app.models.database_models import Product, Inventory
+from backend.app.services import rag_indexer
+from backend.app.services.rag_runtime import RAGRuntime, ENHANCED_COLLECTION
+from backend.app.services.rag_indexer import (
+    IncrementalRAGIndexer, enhanced_product_document, load_product_rows, product_documents
+)
+from backend.app.services.embedding_pipeline import EmbeddingPipeline
+
+class FakeEmbeddings:
+    def embed_documents(self, texts):
+        return [[float(len(text))] for text in texts]
+
+class FakeVectorStore:
+    """Records upserts (through the collection API) and deletes by id"""
+
+    def __init__(self, collection_name, embeddings):
+        self.embeddings = embeddings
+        self._collection = self
+        self.documents = {}
+        self.upsert_calls = []
+
+    def upsert(self, ids, embeddings, metadatas, documents):
+        self.upsert_calls.append(list(ids))
+        for text, metadata, doc_id in zip(documents, metadatas, ids):
+            self.documents[doc_id] = (text, metadata)
+
+    def delete(self, ids=None):
+        for doc_id in ids:
+            self.documents.pop(doc_id, None)
+
+def create_session(new_session, monkeypatch, debounce_seconds=60, batch_size=2):
+    runtime = RAGRuntime(embeddings_factory=lambda model_name: FakeEmbeddings(), vector_store_factory=FakeVectorStore)
+    pipeline = EmbeddingPipeline(batch_size=batch_size, max_workers=1, write_batch_size=batch_size)
+    indexer = IncrementalRAGIndexer(ENHANCED_COLLECTION, enhanced_product_document, runtime=runtime,
+                                    debounce_seconds=debounce_seconds, pipeline=pipeline)
+    monkeypatch.setitem(rag_indexer._indexers, ENHANCED_COLLECTION, indexer)
+
+    engine, db = new_session()
+    for i in range(5):
+        product = Product(sku=f"RAG{i:03d}", name=f"Indexed Item {i}", category="tools", unit_price=2.5, reorder_level=10)
+        db.add(product)
+        db.flush()
+        db.add(Inventory(product_id=product.id, quantity=50, reserved_quantity=0, available_quantity=50))
+    db.commit()
+    return db, runtime, indexer
+
+def set_stock(db, product_id, quantity):
+    inventory = db.query(Inventory).filter(Inventory.product_id == product_id).one()
+    inventory.quantity = inventory.available_quantity = quantity
+    db.commit()
+
+def test_changes_before_first_query_are_not_queued(new_session, monkeypatch):
+    db, runtime, indexer = create_session(new_session, monkeypatch)
+    set_stock(db, 1, 5)
+    assert indexer.pending_count() == 0
+
+def test_bursts_are_coalesced_into_batched_upserts(new_session, monkeypatch):
+    db, runtime, indexer = create_session(new_session, monkeypatch)
+    store = runtime.vector_store(ENHANCED_COLLECTION)
+    for quantity in (40, 30, 3):
+        set_stock(db, 1, quantity)
+    set_stock(db, 2, 20)
+    product = db.get(Product, 3)
+    product.unit_price = 4.0
+    product.location = "B-07"
+    db.commit()
+    assert indexer.pending_count() == 3
+
+    assert indexer.flush() == {"upserted": 3, "deleted": 0}
+    assert store.upsert_calls == [["product:1", "product:2"], ["product:3"]]
+    text, metadata = store.documents["product:1"]
+    assert "Available Stock: 3 available" in text and "Stock Status: LOW STOCK" in text
+    assert metadata["stock_level"] == 3 and metadata["sku"] == "RAG000"
+    assert "Unit Price: $4.0" in store.documents["product:3"][0]
+    assert "Location: B-07" in store.documents["product:3"][0]
+    assert indexer.pending_count() == 0 and indexer.flush() == {"upserted": 0, "deleted": 0}
+
+def test_deleted_products_are_removed(new_session, monkeypatch):
+    db, runtime, indexer = create_session(new_session, monkeypatch)
+    store = runtime.vector_store(ENHANCED_COLLECTION)
+    set_stock(db, 4, 1)
+    indexer.flush()
+    assert "product:4" in store.documents
+
+    db.query(Inventory).filter(Inventory.product_id == 4).delete()
+    db.delete(db.get(Product, 4))
+    db.commit()
+    assert indexer.flush() == {"upserted": 0, "deleted": 1}
+    assert "product:4" not in store.documents
+
+def test_debounce_timer_flushes_in_the_background(new_session, monkeypatch):
+    db, runtime, indexer = create_session(new_session, monkeypatch, debounce_seconds=0.05)
+    store = runtime.vector_store(ENHANCED_COLLECTION)
+    set_stock(db, 5, 9)
+    set_stock(db, 5, 8)
+    deadline = time.monotonic() + 5
+    while "product:5" not in store.documents and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert store.upsert_calls == [["product:5"]]
+    assert "Available Stock: 8 available" in store.documents["product:5"][0]
+
+def test_changes_during_first_index_are_applied_after_it(new_session, monkeypatch):
+    db, runtime, indexer = create_session(new_session, monkeypatch, debounce_seconds=0)
+    flushed = threading.Event()
+
+    def full_index(vector_store):
+        documents = list(product_documents(load_product_rows(db), enhanced_product_document))
+        # Committed after the rebuild read product 1; the debounce timer fires at once
+        set_stock(db, 1, 2)
+        assert not flushed.wait(0.2), "flush must wait for the full index"
+        indexer.pipeline.run(vector_store, documents)
+
+    original_flush = indexer.flush
+    indexer.flush = lambda: (original_flush(), flushed.set())
+    runtime.ensure_indexed(ENHANCED_COLLECTION, lambda store: indexer.index_all(store, full_index))
+    assert flushed.wait(5)
+    store = runtime.vector_store(ENHANCED_COLLECTION)
+    assert "Available Stock: 2 available" in store.documents["product:1"][0]
+
+if __name__ == "__main__":
+    if pytest.main([__file__, "-q"]) != 0:
+        sys.exit(1)
+    print("✅ RAG indexer tests passed")
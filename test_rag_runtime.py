@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test the process-wide RAG runtime shared by the RAG services
+"""
+import sys
+import os
+import threading
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from backend.app.services.rag_runtime import RAGRuntime, ENHANCED_COLLECTION, WAREHOUSE_COLLECTION
+
+class FakeVectorStore:
+    def __init__(self, collection_name, embeddings):
+        self.collection_name = collection_name
+        self.embeddings = embeddings
+
+    def as_retriever(self, search_type, search_kwargs):
+        return (self, search_kwargs["k"])
+
+class CountingFactories:
+    def __init__(self, fail=False):
+        self.embedding_loads = 0
+        self.stores_opened = 0
+        self.fail = fail
+
+    def embeddings(self, model_name):
+        self.embedding_loads += 1
+        if self.fail:
+            raise ImportError("No module named 'langchain_huggingface'")
+        return object()
+
+    def vector_store(self, collection_name, embeddings):
+        self.stores_opened += 1
+        return FakeVectorStore(collection_name, embeddings)
+
+def create_runtime(fail=False):
+    factories = CountingFactories(fail)
+    runtime = RAGRuntime(embeddings_factory=factories.embeddings, vector_store_factory=factories.vector_store)
+    return runtime, factories
+
+def test_nothing_loads_until_first_use():
+    runtime, factories = create_runtime()
+    assert factories.embedding_loads == 0 and not runtime.is_loaded(ENHANCED_COLLECTION)
+
+    enhanced = runtime.vector_store(ENHANCED_COLLECTION)
+    warehouse = runtime.vector_store(WAREHOUSE_COLLECTION)
+    assert runtime.vector_store(ENHANCED_COLLECTION) is enhanced
+    assert enhanced.embeddings is warehouse.embeddings
+    assert factories.embedding_loads == 1 and factories.stores_opened == 2
+    assert runtime.retriever(ENHANCED_COLLECTION, 10) is runtime.retriever(ENHANCED_COLLECTION, 10)
+
+def test_concurrent_first_queries_load_and_index_once():
+    runtime, factories = create_runtime()
+    indexed = []
+    barrier = threading.Barrier(8)
+
+    def query():
+        barrier.wait()
+        runtime.ensure_indexed(ENHANCED_COLLECTION, indexed.append)
+
+    threads = [threading.Thread(target=query) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert factories.embedding_loads == 1 and factories.stores_opened == 1
+    assert indexed == [runtime.vector_store(ENHANCED_COLLECTION)]
+
+def test_failed_indexing_is_retried():
+    runtime, factories = create_runtime()
+    attempts = []
+
+    def index(vector_store):
+        attempts.append(vector_store)
+        if len(attempts) == 1:
+            raise ConnectionError("database unavailable")
+
+    try:
+        runtime.ensure_indexed(WAREHOUSE_COLLECTION, index)
+        assert False, "indexing error should propagate"
+    except ConnectionError:
+        pass
+    runtime.ensure_indexed(WAREHOUSE_COLLECTION, index)
+    runtime.ensure_indexed(WAREHOUSE_COLLECTION, index)
+    assert len(attempts) == 2
+
+def test_failed_model_load_is_retried_after_backoff():
+    factories = CountingFactories(fail=True)
+    runtime = RAGRuntime(embeddings_factory=factories.embeddings, vector_store_factory=factories.vector_store,
+                         retry_seconds=0.2)
+    for expected in (ImportError, RuntimeError, RuntimeError):
+        try:
+            runtime.vector_store(ENHANCED_COLLECTION)
+            assert False, "load error should propagate"
+        except expected:
+            pass
+    assert factories.embedding_loads == 1 and not runtime.is_loaded(ENHANCED_COLLECTION)
+
+    # The next query after the backoff tries again, and succeeds once the model loads
+    time.sleep(0.25)
+    factories.fail = False
+    assert runtime.vector_store(ENHANCED_COLLECTION) is not None
+    assert factories.embedding_loads == 2 and runtime.is_loaded(ENHANCED_COLLECTION)
+
+if __name__ == "__main__":
+    test_nothing_loads_until_first_use()
+    test_concurrent_first_queries_load_and_index_once()
+    test_failed_indexing_is_retried()
+    test_failed_model_load_is_retried_after_backoff()
+    print("✅ RAG runtime tests passed")
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Test that the route handler threadpool is sized to the database connection pool
+"""
+import sys
+import os
+import logging
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from backend.app.database import DEFAULT_THREADPOOL_SIZE, create_database_engine, get_threadpool_size, pool_capacity
+
+def test_threadpool_defaults_to_pool_capacity(tmp_path, monkeypatch, caplog):
+    monkeypatch.delenv("THREADPOOL_SIZE", raising=False)
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'pool.db'}", pool_size=3, max_overflow=2)
+    assert pool_capacity(engine) == 5 and get_threadpool_size(engine) == 5
+
+    monkeypatch.setenv("THREADPOOL_SIZE", "4")
+    assert get_threadpool_size(engine) == 4 and not caplog.records
+
+    # More threads than connections is allowed, but warned about at startup
+    monkeypatch.setenv("THREADPOOL_SIZE", "40")
+    with caplog.at_level(logging.WARNING):
+        assert get_threadpool_size(engine) == 40
+    assert "exceeds the database pool capacity (5" in caplog.text
+    engine.dispose()
+
+def test_unbounded_pools_keep_the_default(monkeypatch):
+    monkeypatch.delenv("THREADPOOL_SIZE", raising=False)
+    engine = create_database_engine("sqlite://", poolclass=StaticPool)
+    assert pool_capacity(engine) is None and get_threadpool_size(engine) == DEFAULT_THREADPOOL_SIZE
+    engine.dispose()
+
+if __name__ == "__main__":
+    if pytest.main([__file__, "-q"]) != 0:
+        sys.exit(1)
+    print("✅ Threadpool is sized to the connection pool")